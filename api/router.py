@@ -5,6 +5,7 @@ Centralized API routing with V2-only enforcement for legacy removal validation
 """
 
 import os
+import json
 import uuid
 import asyncio
 import mimetypes
@@ -13,7 +14,7 @@ from typing import Optional, List, Dict, Any
 from urllib.parse import urlparse
 
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, BackgroundTasks, Request
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse, Response
 from pydantic import BaseModel
 from bson import ObjectId
 from datetime import datetime
@@ -32,6 +33,9 @@ ENABLE_HYBRID = os.getenv("ENABLE_HYBRID", "false").lower() == "true"
 FORCE_V2_ONLY = os.getenv("FORCE_V2_ONLY", "false").lower() == "true"
 LEGACY_ENDPOINT_BEHAVIOR = os.getenv("LEGACY_ENDPOINT_BEHAVIOR", "warn")
 
+# Idle seconds before a streaming response sends an SSE keep-alive comment (keeps proxies from timing out)
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+
 print(f"🚩 KE-PR8: Feature flags - V1: {ENABLE_V1}, Hybrid: {ENABLE_HYBRID}")
 print(f"🚩 KE-PR10.5: V2-Only Mode: {FORCE_V2_ONLY}, Legacy Behavior: {LEGACY_ENDPOINT_BEHAVIOR}")
 
@@ -68,6 +72,39 @@ def clean_articles_for_api(articles: List[Dict[str, Any]]) -> List[Dict[str, Any
     
     return cleaned_articles
 
+def format_sse_event(event: Dict[str, Any]) -> str:
+    """Format a pipeline event as a server-sent event frame"""
+    payload = clean_articles_for_api([event])[0]
+    return f"event: {event['event']}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+async def stream_sse_events(events):
+    """Relay an async iterator of events as SSE frames, with keep-alives while it is idle"""
+    next_event = asyncio.ensure_future(events.__anext__())
+    try:
+        while True:
+            done, _ = await asyncio.wait({next_event}, timeout=SSE_KEEPALIVE_SECONDS)
+            if not done:
+                yield ": keep-alive\n\n"
+                continue
+            try:
+                event = next_event.result()
+            except StopAsyncIteration:
+                break
+            yield format_sse_event(event)
+            next_event = asyncio.ensure_future(events.__anext__())
+    except Exception as e:
+        print(f"❌ V2 ENGINE: Error while streaming events - {e}")
+        yield format_sse_event({"event": "pipeline_error", "error": str(e)})
+    finally:
+        # The pending __anext__ must finish before the generator can be closed
+        next_event.cancel()
+        try:
+            await next_event
+        except (asyncio.CancelledError, Exception):
+            # Cancelled, exhausted, or an error already relayed to the client
+            pass
+        await events.aclose()
+
 # Create main router
 router = APIRouter()
 
@@ -133,6 +170,13 @@ def health():
     }
 
 
+@router.get("/api/metrics")
+def metrics():
+    """Engine stage latency histograms and outcome counters in Prometheus text format"""
+    from engine.metrics import render_prometheus, PROMETHEUS_CONTENT_TYPE
+    return Response(content=render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 # ========================================
 # CONTENT PROCESSING ROUTES (V2 Engine)
 # ========================================
@@ -196,6 +240,69 @@ async def process_content_v2_route(
         print(f"❌ V2 ENGINE: Error in content processing - {e}")
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
 
+@router.post("/api/content/process/stream")
+async def process_content_v2_stream_route(
+    content: str = Form(...), 
+    content_type: str = Form("text")
+):
+    """V2 Engine: Process text content, streaming stage progress and finished articles as server-sent events"""
+    validate_v2_pipeline_exclusivity()
+    
+    import sys
+    import os
+    backend_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'backend')
+    if backend_path not in sys.path:
+        sys.path.append(backend_path)
+    
+    from server import stream_v2_pipeline_events
+    
+    print(f"📡 V2 ENGINE: Streaming content processing via API router - {len(content)} chars - engine=v2")
+    metadata = {
+        "content_type": content_type,
+        "source": "api_router_stream",
+        "engine": "v2",
+        "ke_pr10_5_v2_only": FORCE_V2_ONLY
+    }
+    
+    return StreamingResponse(
+        stream_sse_events(stream_v2_pipeline_events(content, metadata)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/api/content/upload/stream")
+async def upload_content_v2_stream_route(file: UploadFile = File(...)):
+    """V2 Engine: Process an uploaded document, streaming stage progress and articles as server-sent events
+    
+    PDF, DOCX and text documents are fed to the pipeline as they are extracted, their
+    images saved page by page; other uploads are extracted in full first. Each finished
+    article is sent as soon as its own style, linking and code normalization are done
+    (see Pipeline.stream).
+    """
+    validate_v2_pipeline_exclusivity()
+    
+    import sys
+    import os
+    backend_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'backend')
+    if backend_path not in sys.path:
+        sys.path.append(backend_path)
+    
+    from server import open_v2_upload_stream
+    
+    print(f"📡 V2 ENGINE: Streaming file upload via API router - {file.filename} - engine=v2")
+    metadata = {
+        "source": "api_router_upload_stream",
+        "engine": "v2",
+        "ke_pr10_5_v2_only": FORCE_V2_ONLY
+    }
+    events = await open_v2_upload_stream(file, metadata)
+    
+    return StreamingResponse(
+        stream_sse_events(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/api/content/upload")
 async def upload_content_v2_route(
     file: UploadFile = File(...),
@@ -224,6 +331,21 @@ async def upload_content_v2_route(
         
         result = await upload_file(file, json.dumps(metadata))
         
+        if isinstance(result, dict) and result.get("status") == "queued":
+            # Job queue mode: a worker processes the file; poll status_url for progress
+            return {
+                "status": "queued",
+                "job_id": result["job_id"],
+                "status_url": result["status_url"],
+                "articles": [],
+                "article_count": 0,
+                "chunks_created": 0,
+                "engine": "v2",
+                "filename": file.filename,
+                "v2_only_mode": FORCE_V2_ONLY,
+                "message": "File uploaded and queued for V2 processing"
+            }
+        
         # Clean the entire result object to avoid ObjectId serialization issues
         cleaned_result = clean_articles_for_api([result])[0] if isinstance(result, dict) else result
         
@@ -621,11 +743,23 @@ async def get_engine_status():
         sys.path.append(backend_path)
     
     from server import get_recent_qa_summaries
+    from engine.llm.failover import get_provider_health
+    from engine.extraction.cache import get_extraction_cache
     
     try:
         # Get QA summaries
         qa_summaries = await get_recent_qa_summaries(limit=5)
         
+        # LLM usage of those runs (each summary carries its run's ledger totals)
+        llm_usage = {"runs": 0, "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}
+        for summary in qa_summaries:
+            usage = summary.get("llm_usage") or {}
+            if usage:
+                llm_usage["runs"] += 1
+                for field in ("calls", "prompt_tokens", "completion_tokens"):
+                    llm_usage[field] += usage.get(field, 0)
+                llm_usage["cost_usd"] = round(llm_usage["cost_usd"] + usage.get("cost_usd", 0.0), 6)
+        
         return {
             "engine": "v2",
             "legacy": "disabled",
@@ -637,12 +771,18 @@ async def get_engine_status():
             },
             "endpoints": {
                 "text_processing": "/api/content/process",
+                "text_processing_stream": "/api/content/process/stream",
                 "file_upload": "/api/content/upload",
+                "file_upload_stream": "/api/content/upload/stream",
                 "url_processing": "/api/content/process-url",
                 "content_library": "/api/content/library",
                 "assets": "/api/assets",
                 "engine_status": "/api/engine",
-                "health_check": "/api/health"
+                "resume_run": "/api/engine/runs/{run_id}/resume",
+                "job_status": "/api/jobs/{job_id}",
+                "cancel_job": "/api/jobs/{job_id}/cancel",
+                "health_check": "/api/health",
+                "metrics": "/api/metrics"
             },
             "features": [
                 "v2_processing_pipeline",
@@ -651,10 +791,29 @@ async def get_engine_status():
                 "centralized_llm_client",
                 "api_router_organization",
                 "feature_flags_kill_switches",
-                "domain_based_routing"
+                "domain_based_routing",
+                "stage_checkpoints_resume",
+                "streaming_article_delivery",
+                "queued_upload_processing",
+                "run_cancellation_and_deadlines",
+                "prometheus_stage_metrics",
+                "streaming_llm_deltas",
+                "llm_token_budgets_and_usage_ledger",
+                "llm_hedging_and_failover",
+                "llm_batch_mode",
+                "llm_record_replay_cassettes",
+                "llm_structured_json_output",
+                "process_pool_extraction",
+                "page_parallel_pdf_extraction",
+                "streaming_block_ingest",
+                "spooled_upload_hashing",
+                "extraction_result_cache"
             ],
             "qa_summaries": qa_summaries,
             "qa_summary_count": len(qa_summaries),
+            "llm_usage": llm_usage,
+            "llm_circuit_breakers": get_provider_health().summary(),
+            "extraction_cache": get_extraction_cache().summary(),
             "message": "V2 Engine active with organized API routing and feature flags"
         }
         
@@ -670,6 +829,43 @@ async def get_engine_status():
         }
 
 
+@router.post("/api/engine/runs/{run_id}/resume")
+async def resume_engine_run(run_id: str, from_stage: Optional[str] = Form(None)):
+    """V2 Engine: Resume a pipeline run from its stage checkpoints"""
+    import sys
+    import os
+    backend_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'backend')
+    if backend_path not in sys.path:
+        sys.path.append(backend_path)
+    
+    from server import resume_v2_pipeline_run
+    from engine.v2.checkpoints import CheckpointNotFoundError
+    from engine.v2.scheduler import StageGraphError
+    
+    try:
+        result = await resume_v2_pipeline_run(run_id, from_stage)
+        articles = result.get("articles", [])
+        
+        return {
+            "status": "completed",
+            "run_id": run_id,
+            "from_stage": from_stage,
+            "articles": clean_articles_for_api(articles),
+            "article_count": len(articles),
+            "qa_report": result.get("qa_report"),
+            "version_id": result.get("version_id"),
+            "engine": "v2"
+        }
+        
+    except CheckpointNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except StageGraphError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"❌ V2 ENGINE: Error resuming run {run_id} - {e}")
+        raise HTTPException(status_code=500, detail=f"Resume failed: {str(e)}")
+
+
 # ========================================
 # VALIDATION & QA DIAGNOSTICS ROUTES
 # ========================================
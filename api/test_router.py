@@ -0,0 +1,42 @@
+"""
+Unit tests for API router helpers
+Tests for relaying pipeline events as server-sent events
+"""
+
+import asyncio
+import pytest
+from . import router
+from .router import stream_sse_events
+
+
+class TestStreamSSEEvents:
+    """Unit tests for stream_sse_events"""
+
+    @pytest.mark.asyncio
+    async def test_events_relayed_as_frames(self):
+        async def events():
+            yield {"event": "run_started", "run_id": "run_1"}
+
+        frames = [frame async for frame in stream_sse_events(events())]
+
+        assert frames == ['event: run_started\ndata: {"event": "run_started", "run_id": "run_1"}\n\n']
+
+    @pytest.mark.asyncio
+    async def test_disconnect_while_idle_closes_source(self, monkeypatch):
+        """Test that a client going away during a keep-alive, with __anext__ pending, closes the source cleanly"""
+        monkeypatch.setattr(router, "SSE_KEEPALIVE_SECONDS", 0.01)
+        closed = asyncio.Event()
+
+        async def events():
+            try:
+                yield {"event": "run_started"}
+                await asyncio.sleep(60)
+            finally:
+                closed.set()
+
+        stream = stream_sse_events(events())
+        await stream.__anext__()
+        assert await stream.__anext__() == ": keep-alive\n\n"
+        await stream.aclose()
+
+        assert closed.is_set()
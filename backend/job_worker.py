@@ -0,0 +1,45 @@
+"""
+Job worker entry point
+Consumes queued jobs (JOB_QUEUE_ENABLED=true on the API) out of the API process.
+Run any number of these, on any node that can reach MongoDB:
+
+    python backend/job_worker.py
+
+For bulk re-processing, a dedicated worker can send its LLM calls through provider
+batches (cheaper, but results take minutes to hours):
+
+    LLM_BATCH_MODE=true V2_RUN_DEADLINE_SECONDS=0 python backend/job_worker.py
+"""
+
+import os
+import sys
+import signal
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import run_file_upload_job
+from engine.jobs import JobWorker
+from engine.llm.client import close_llm_client
+from engine.extraction import shutdown_extraction_executor
+from engine.v2.style import shutdown_post_processing_executor
+
+
+async def main():
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        # Stop leasing new jobs and let in-flight jobs finish
+        loop.add_signal_handler(sig, stop_event.set)
+
+    worker = JobWorker({"file_upload": run_file_upload_job})
+    try:
+        await worker.run_forever(stop_event)
+    finally:
+        await close_llm_client()
+        shutdown_extraction_executor()
+        shutdown_post_processing_executor()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
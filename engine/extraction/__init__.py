@@ -0,0 +1,9 @@
+"""
+Document extraction.
+DOCX, PDF and PowerPoint conversion (and the V2 style post-processing passes)
+run in a bounded worker process pool.
+"""
+
+from .executor import ExtractionExecutor, ExtractionTimeout, get_extraction_executor, shutdown_extraction_executor
+
+__all__ = ['ExtractionExecutor', 'ExtractionTimeout', 'get_extraction_executor', 'shutdown_extraction_executor']
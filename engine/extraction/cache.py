@@ -0,0 +1,126 @@
+"""
+Extraction Cache
+Converter results keyed by file content hash and extractor version, so a re-uploaded
+document skips conversion and image extraction
+"""
+
+import os
+import copy
+import json
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..metrics import EXTRACTION_CACHE_LOOKUPS, EXTRACTION_CACHE_EVICTIONS
+
+# Bump when a converter's output changes so stale results are not served
+EXTRACTOR_VERSION = "1"
+
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    In-memory LRU of converter results (see engine.extraction.converters), bounded by
+    EXTRACTION_CACHE_MAX_ENTRIES and EXTRACTION_CACHE_MAX_BYTES.
+
+    Results reference images already written to disk and inserted into the Asset
+    Library by the run that produced them. A hit returns those references with no
+    pending assets; an entry whose image files have since been removed is dropped
+    and counts as a miss.
+    """
+
+    def __init__(self, enabled: bool = None, max_entries: int = None, max_bytes: int = None):
+        self.enabled = enabled if enabled is not None else os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+        self.max_entries = max_entries or int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "256"))
+        self.max_bytes = max_bytes or int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+
+        # cache_key -> (result, size in bytes)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @staticmethod
+    def key(content_sha256: str, converter: str, version: str = EXTRACTOR_VERSION) -> str:
+        """Cache key of a file's conversion by one converter"""
+        return f"{converter}:{version}:{content_sha256}"
+
+    def get(self, cache_key: str, image_counter: int = 0) -> Optional[Dict[str, Any]]:
+        """Copy of a cached result with no pending assets and image_counter unchanged, or None on a miss"""
+        entry = self._entries.get(cache_key)
+        if entry is not None and not all(os.path.exists(path) for path in self._image_paths(entry[0])):
+            self._evict(cache_key, "stale")
+            entry = None
+        if entry is None:
+            self.stats["misses"] += 1
+            EXTRACTION_CACHE_LOOKUPS.inc(result="miss")
+            return None
+
+        self._entries.move_to_end(cache_key)
+        self.stats["hits"] += 1
+        EXTRACTION_CACHE_LOOKUPS.inc(result="hit")
+        result = copy.deepcopy(entry[0])
+        result["pending_assets"] = []
+        result["image_counter"] = image_counter
+        return result
+
+    def set(self, cache_key: str, result: Dict[str, Any]):
+        """Remember a converter result"""
+        if not self.enabled:
+            return
+        size = len(json.dumps(result, default=str).encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        if cache_key in self._entries:
+            self._evict(cache_key, None)
+        self.stats["stores"] += 1
+        self._entries[cache_key] = (copy.deepcopy(result), size)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._evict(next(iter(self._entries)), "capacity")
+
+    @staticmethod
+    def _image_paths(result: Dict[str, Any]):
+        return [image["path"] for image in result.get("extracted_images", {}).values()
+                if isinstance(image, dict) and image.get("path")]
+
+    def _evict(self, cache_key: str, reason: Optional[str]):
+        _, size = self._entries.pop(cache_key)
+        self._bytes -= size
+        if reason:
+            self.stats["evictions"] += 1
+            EXTRACTION_CACHE_EVICTIONS.inc(reason=reason)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def summary(self) -> Dict[str, Any]:
+        """Hit/miss counters and memory usage, for diagnostics"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "extractor_version": EXTRACTOR_VERSION,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0
+        }
+
+
+_extraction_cache = None
+
+def get_extraction_cache() -> ExtractionCache:
+    """Get or create the process-wide extraction cache"""
+    global _extraction_cache
+    if _extraction_cache is None:
+        _extraction_cache = ExtractionCache()
+    return _extraction_cache
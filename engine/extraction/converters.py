@@ -0,0 +1,659 @@
+"""
+Document converters
+Synchronous DOCX, PDF and PowerPoint to HTML conversion, run in extraction worker processes.
+
+Each converter writes extracted images to disk itself and returns a small
+picklable result: the HTML, image references and the asset metadata the
+caller merges into its session (never the image bytes).
+"""
+
+import os
+import uuid
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from ..stores.assets import save_bytes, get_asset_path, read_file
+
+
+def _result(html: str, images: list = None, extracted_images: dict = None, pending_assets: list = None,
+            image_counter: int = 0, converter: str = "") -> Dict[str, Any]:
+    return {
+        "html": html,
+        "images": images or [],
+        "extracted_images": extracted_images or {},
+        "pending_assets": pending_assets or [],
+        "image_counter": image_counter,
+        "converter": converter
+    }
+
+
+def text_to_basic_html(text_content: str) -> str:
+    """Convert plain text content to basic HTML structure"""
+    try:
+        lines = text_content.split('\n')
+        html_parts = []
+
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+
+            # Simple heuristics for basic structure
+            if len(line) < 100 and line.isupper():
+                # All caps short lines might be headings
+                html_parts.append(f"<h2>{line}</h2>")
+            elif line.endswith(':') and len(line) < 80:
+                # Lines ending with colon might be subheadings
+                html_parts.append(f"<h3>{line}</h3>")
+            else:
+                # Regular paragraph
+                html_parts.append(f"<p>{line}</p>")
+
+        return '\n'.join(html_parts)
+
+    except Exception as e:
+        print(f"❌ Text to HTML conversion failed: {e}")
+        return f"<p>{text_content}</p>"
+
+
+def table_to_html(table: list, page_num: int, table_num: int) -> str:
+    """Convert a table array to HTML table"""
+    try:
+        if not table or not any(table):
+            return ""
+
+        html = [f'<h4>Table {table_num + 1} (Page {page_num + 1})</h4>']
+        html.append('<table border="1" cellpadding="5" cellspacing="0" style="border-collapse: collapse; margin: 1rem 0;">')
+
+        # Process rows
+        for row_num, row in enumerate(table):
+            if not row or not any(cell for cell in row if cell):
+                continue
+
+            html.append('<tr>')
+            for cell in row:
+                cell_content = str(cell).strip() if cell else ""
+                tag = "th" if row_num == 0 else "td"
+                html.append(f'<{tag}>{cell_content}</{tag}>')
+            html.append('</tr>')
+
+        html.append('</table>')
+        return '\n'.join(html)
+
+    except Exception as e:
+        print(f"⚠️ Error converting table to HTML: {e}")
+        return f"<p>Table {table_num + 1} (conversion error)</p>"
+
+
+# DOCX
+
+DOCX_STYLE_MAP = """
+    p[style-name='Heading 1'] => h1:fresh
+    p[style-name='Heading 2'] => h2:fresh
+    p[style-name='Heading 3'] => h3:fresh
+    p[style-name='Title'] => h1:fresh
+    p[style-name='Subtitle'] => h2:fresh
+    table => table.docx-table
+    tr => tr
+    td => td
+    th => th
+"""
+
+
+class DocxImageSaver:
+    """mammoth image handler: saves each image to the session and Asset Library directories"""
+
+    def __init__(self, session_id: str, image_counter: int):
+        self.session_id = session_id
+        self.image_counter = image_counter
+        self.extracted_images: Dict[str, dict] = {}
+        self.pending_assets: List[dict] = []
+
+    def __call__(self, image):
+        try:
+            self.image_counter += 1
+
+            # Determine file extension from content type
+            content_type = getattr(image, 'content_type', 'image/png')
+            if 'jpeg' in content_type or 'jpg' in content_type:
+                ext = 'jpg'
+            elif 'png' in content_type:
+                ext = 'png'
+            elif 'gif' in content_type:
+                ext = 'gif'
+            else:
+                ext = 'png'  # Default to PNG
+
+            image_filename = f"img_{self.image_counter}.{ext}"
+
+            # Get image data - mammoth uses different attribute names
+            try:
+                if hasattr(image, 'open'):
+                    with image.open() as image_data:
+                        image_bytes = image_data.read()
+                elif hasattr(image, 'bytes'):
+                    image_bytes = image.bytes
+                elif hasattr(image, 'data'):
+                    image_bytes = image.data
+                else:
+                    print(f"⚠️ Unknown image data format for image {self.image_counter}")
+                    image_bytes = b''
+            except Exception as img_error:
+                print(f"❌ Failed to extract image {self.image_counter}: {img_error}")
+                image_bytes = b''
+
+            image_id = f"doc_{self.session_id}_img_{self.image_counter}"
+            session_dir = f"static/uploads/session_{self.session_id}"
+            os.makedirs(session_dir, exist_ok=True)
+            image_path = os.path.join(session_dir, image_filename)
+
+            # Save image to the session AND the Asset Library
+            if image_bytes:
+                try:
+                    content_hash, session_filename = save_bytes(image_bytes, image_filename, session_dir)
+                    image_path = get_asset_path(session_filename, session_dir)
+                    print(f"💾 KE-PR3: Saved image to session: {image_path} ({len(image_bytes)} bytes)")
+
+                    try:
+                        asset_id = str(uuid.uuid4())
+                        asset_filename = f"{asset_id}_{image_filename}"
+                        save_bytes(image_bytes, asset_filename, "static/uploads")
+
+                        # Inserted into the Asset Library in one batch by the caller
+                        self.pending_assets.append({
+                            "id": asset_id,
+                            "filename": image_filename,
+                            "original_filename": image_filename,
+                            "asset_type": "image",
+                            "file_size": len(image_bytes),
+                            "content_type": content_type,
+                            "url": f"/api/static/uploads/{asset_filename}",
+                            "session_url": f"/api/static/uploads/session_{self.session_id}/{image_filename}",
+                            "created_at": datetime.utcnow().isoformat(),
+                            "source": "training_engine_extraction",
+                            "session_id": self.session_id
+                        })
+                        print(f"📚 OPTIMIZED: Queued for batch Asset Library insertion: {asset_filename}")
+
+                    except Exception as asset_error:
+                        print(f"⚠️ Failed to prepare Asset Library entry: {asset_error}")
+
+                except Exception as save_error:
+                    print(f"❌ Failed to save image {image_filename}: {save_error}")
+
+            self.extracted_images[image_id] = {
+                'filename': image_filename,
+                'path': image_path,
+                'url': f"/api/static/uploads/session_{self.session_id}/{image_filename}",
+                'alt_text': f"Image {self.image_counter}",
+                'content_type': content_type,
+                'size_bytes': len(image_bytes) if image_bytes else 0
+            }
+
+            return {"src": f"IMAGE_PLACEHOLDER_{image_id}"}
+
+        except Exception as e:
+            print(f"❌ Failed to save DOCX image: {e}")
+            return {"src": ""}
+
+
+def convert_docx(file_path: str, session_id: str, image_counter: int = 0) -> Dict[str, Any]:
+    """Convert DOCX to HTML using mammoth (converter "mammoth"), or as text when it is not a real DOCX ("text")"""
+    print(f"🔍 Converting DOCX file: {file_path}")
+
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"DOCX file not found: {file_path}")
+    print(f"📊 DOCX file size: {os.path.getsize(file_path)} bytes")
+
+    # Check if file is actually a valid zip file (DOCX format)
+    try:
+        with zipfile.ZipFile(file_path, 'r') as test_zip:
+            required_files = ['word/document.xml', '[Content_Types].xml']
+            if not any(req in test_zip.namelist() for req in required_files):
+                print("⚠️ File appears to be text content with .docx extension, treating as text")
+                text_content = read_file(file_path).decode('utf-8', errors='ignore')
+                return _result(text_to_basic_html(text_content), image_counter=image_counter, converter="text")
+    except zipfile.BadZipFile:
+        print("⚠️ File is not a valid zip file, treating as text content")
+        text_content = read_file(file_path).decode('utf-8', errors='ignore')
+        return _result(text_to_basic_html(text_content), image_counter=image_counter, converter="text")
+
+    import mammoth
+
+    saver = DocxImageSaver(session_id, image_counter)
+    with open(file_path, "rb") as docx_file:
+        result = mammoth.convert_to_html(
+            docx_file,
+            style_map=DOCX_STYLE_MAP,
+            convert_image=mammoth.images.inline(saver),
+            ignore_empty_paragraphs=False,  # Keep structure
+            include_embedded_style_map=True,  # Use document styles
+            include_default_style_map=True   # Use default styles
+        )
+
+    html_content = result.value
+    if result.messages:
+        print(f"📋 Mammoth conversion messages: {len(result.messages)}")
+        for msg in result.messages[:5]:
+            print(f"   - {msg}")
+
+    images = [
+        {'id': image_id, 'filename': data['filename'], 'url': data['url'], 'alt_text': data['alt_text']}
+        for image_id, data in saver.extracted_images.items()
+        if f"IMAGE_PLACEHOLDER_{image_id}" in html_content
+    ]
+    print(f"🖼️ Extracted {len(images)} images from DOCX")
+
+    return _result(html_content, images, saver.extracted_images, saver.pending_assets, saver.image_counter, "mammoth")
+
+
+# PDF
+
+def pymupdf_page_lines(text_dict: dict, markup: bool = True) -> List[Tuple[str, str, int]]:
+    """
+    Lines of a PyMuPDF text dictionary as (tag, text, block number). Large bold lines
+    are headings (h1-h3) by absolute font size, everything else "p"; with markup, bold
+    spans in body lines are wrapped in <strong>.
+    """
+    lines = []
+    for block_num, block in enumerate(text_dict.get("blocks", [])):
+        if "lines" not in block:
+            continue
+
+        for line in block["lines"]:
+            line_text_parts = []
+            tag = "p"
+
+            for span in line.get("spans", []):
+                text = span.get("text", "").strip()
+                if not text:
+                    continue
+
+                # Determine if this is a heading based on font size and formatting
+                font_size = span.get("size", 12)
+                is_bold = span.get("flags", 0) & 2**4  # Bold flag
+                is_large = font_size > 14
+
+                if is_large and is_bold:
+                    if font_size > 18:
+                        tag = "h1"
+                    elif font_size > 16:
+                        tag = "h2"
+                    else:
+                        tag = "h3"
+                elif is_bold and markup:
+                    text = f"<strong>{text}</strong>"
+
+                line_text_parts.append(text)
+
+            line_text = " ".join(line_text_parts).strip()
+            if line_text:
+                lines.append((tag, line_text, block_num))
+    return lines
+
+
+def _pymupdf_page_html(text_dict: dict, page_num: int) -> str:
+    """Process PyMuPDF text dictionary into structured HTML"""
+    try:
+        return '\n'.join(f'<{tag}>{text}</{tag}>' for tag, text, _ in pymupdf_page_lines(text_dict))
+
+    except Exception as e:
+        print(f"⚠️ Error processing PyMuPDF page {page_num}: {e}")
+        return "<p>Error processing page content</p>"
+
+
+def pymupdf_page_images(page, page_num: int, session_id: str, asset_dir: str) -> list:
+    """
+    Save the candidate content images of a PyMuPDF page (filtering out headers, footers,
+    decorative elements). Images repeated across pages are filtered later, in page order,
+    by is_template_image.
+    """
+    try:
+        candidates = []
+        image_list = page.get_images()
+
+        # Define header/footer regions (top/bottom 10% of page)
+        page_height = page.rect.height
+        header_boundary = page_height * 0.1
+        footer_boundary = page_height * 0.9
+
+        print(f"📄 Page {page_num + 1}: Found {len(image_list)} images, applying content filtering...")
+
+        for img_index, img in enumerate(image_list):
+            try:
+                xref = img[0]
+                img_rects = page.get_image_rects(xref)
+                if not img_rects:
+                    continue
+
+                img_rect = img_rects[0]  # Use first occurrence
+                img_y = img_rect.y0
+                img_height = img_rect.height
+                img_width = img_rect.width
+
+                base_image = page.parent.extract_image(xref)
+                image_bytes = base_image["image"]
+                image_ext = base_image["ext"]
+
+                # Filter 1: Skip very small images (likely bullets, icons, decorative elements)
+                if len(image_bytes) < 5000:
+                    print(f"  ❌ Skipped small image: {len(image_bytes)} bytes (likely decorative)")
+                    continue
+
+                # Filter 2: Skip images in header/footer regions
+                if img_y < header_boundary:
+                    print(f"  ❌ Skipped header image at y={img_y:.1f} (header boundary: {header_boundary:.1f})")
+                    continue
+                if img_y > footer_boundary:
+                    print(f"  ❌ Skipped footer image at y={img_y:.1f} (footer boundary: {footer_boundary:.1f})")
+                    continue
+
+                # Filter 3: Skip very small visual dimensions (likely icons)
+                if img_width < 50 or img_height < 50:
+                    print(f"  ❌ Skipped tiny image: {img_width}x{img_height} pixels (likely icon/bullet)")
+                    continue
+
+                # Filter 4: Skip extremely wide but short images (likely decorative bars/lines)
+                if img_width > 400 and img_height < 20:
+                    print(f"  ❌ Skipped decorative bar: {img_width}x{img_height} pixels")
+                    continue
+
+                image_filename = f"content_img_page{page_num + 1}_{img_index + 1}.{image_ext}"
+                image_path = os.path.join(asset_dir, image_filename)
+                with open(image_path, "wb") as img_file:
+                    img_file.write(image_bytes)
+
+                image_id = f"pdf_{session_id}_p{page_num + 1}_img{img_index + 1}"
+                candidate = {
+                    # Filter 5 key: same size and dimensions on 3+ pages is a template element
+                    'fingerprint': f"{len(image_bytes)}_{img_width}_{img_height}",
+                    'id': image_id,
+                    'files': [image_path],
+                    'extracted': {
+                        'filename': image_filename,
+                        'path': image_path,
+                        'url': f"/api/static/uploads/session_{session_id}/{image_filename}",
+                        'alt_text': f"Content Image from Page {page_num + 1}",
+                        'content_type': f"image/{image_ext}",
+                        'size_bytes': len(image_bytes),
+                        'dimensions': f"{img_width}x{img_height}",
+                        'position_y': img_y,
+                        'is_content_image': True
+                    },
+                    'image': {
+                        'id': image_id,
+                        'filename': image_filename,
+                        'url': f"/api/static/uploads/session_{session_id}/{image_filename}",
+                        'alt_text': f"Content Image from Page {page_num + 1}",
+                        'dimensions': f"{img_width}x{img_height}",
+                        'is_content': True
+                    },
+                    'asset': None
+                }
+
+                # Copy to main uploads directory for the Asset Library (inserted in one batch by the caller)
+                asset_id = str(uuid.uuid4())
+                asset_filename = f"{asset_id}_{image_filename}"
+                asset_path = os.path.join("/app/backend/static/uploads", asset_filename)
+                try:
+                    with open(asset_path, "wb") as asset_file:
+                        asset_file.write(image_bytes)
+                    candidate['files'].append(asset_path)
+                    candidate['asset'] = {
+                        "id": asset_id,
+                        "filename": image_filename,
+                        "original_filename": image_filename,
+                        "asset_type": "image",
+                        "file_size": len(image_bytes),
+                        "content_type": f"image/{image_ext}",
+                        "url": f"/api/static/uploads/{asset_filename}",
+                        "session_url": f"/api/static/uploads/session_{session_id}/{image_filename}",
+                        "created_at": datetime.utcnow().isoformat(),
+                        "source": "pdf_content_extraction",
+                        "session_id": session_id,
+                        "page_number": page_num + 1,
+                        "image_index": img_index + 1,
+                        "dimensions": f"{img_width}x{img_height}",
+                        "position_y": img_y,
+                        "is_content_image": True,
+                        "extraction_filters_passed": "size,position,template,content"
+                    }
+                except Exception as asset_error:
+                    print(f"⚠️ Failed to prepare content image for Asset Library: {asset_error}")
+
+                candidates.append(candidate)
+
+            except Exception as img_error:
+                print(f"⚠️ Failed to extract image {img_index} from page {page_num}: {img_error}")
+                continue
+
+        return candidates
+
+    except Exception as e:
+        print(f"❌ Error extracting images from page {page_num}: {e}")
+        return []
+
+
+def pdf_page_count(file_path: str) -> int:
+    """Number of pages in a PDF"""
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        raise Exception("PyMuPDF (fitz) not available")
+
+    with fitz.open(file_path) as doc:
+        return len(doc)
+
+
+def remove_page_images(pages: List[Dict[str, Any]]):
+    """Delete the image files written for page records that will not be merged"""
+    for record in pages:
+        for candidate in record['images']:
+            for path in candidate['files']:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+def extract_pymupdf_pages(file_path: str, session_id: str, asset_dir: str, first_page: int = 0,
+                          last_page: int = None, abort_path: str = None) -> List[Dict[str, Any]]:
+    """
+    Convert pages [first_page, last_page) of a PDF with PyMuPDF; returns one record per
+    page with its HTML and candidate images. Opens the document itself, so page ranges
+    of one document can be extracted in separate processes.
+
+    Stops before the next page once abort_path exists (a sibling range failed). A range
+    that fails or stops deletes the images it wrote.
+    """
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        raise Exception("PyMuPDF (fitz) not available")
+
+    pages = []
+    try:
+        os.makedirs(asset_dir, exist_ok=True)
+        with fitz.open(file_path) as doc:
+            last_page = len(doc) if last_page is None else min(last_page, len(doc))
+            print(f"📖 Processing PDF pages {first_page + 1}-{last_page} of {len(doc)} using PyMuPDF")
+            for page_num in range(first_page, last_page):
+                if abort_path and os.path.exists(abort_path):
+                    raise Exception(f"aborted before page {page_num + 1}")
+                page = doc.load_page(page_num)
+                pages.append({
+                    'page': page_num,
+                    'html': _pymupdf_page_html(page.get_text("dict"), page_num),
+                    'found_images': len(page.get_images()),
+                    'images': pymupdf_page_images(page, page_num, session_id, asset_dir)
+                })
+        return pages
+
+    except Exception as e:
+        remove_page_images(pages)
+        raise Exception(f"PyMuPDF processing failed: {str(e)}")
+
+
+def is_template_image(candidate: Dict[str, Any], page_num: int, image_fingerprints: Dict[str, dict]) -> bool:
+    """
+    Filter 5: whether a pymupdf_page_images candidate is a template element (same size and
+    dimensions on 3+ pages), given the fingerprints of the pages before it; a template
+    image's saved files are removed
+    """
+    fingerprint = candidate['fingerprint']
+    if fingerprint not in image_fingerprints:
+        image_fingerprints[fingerprint] = {'pages': [page_num + 1], 'size': candidate['extracted']['size_bytes']}
+        return False
+
+    seen_on = image_fingerprints[fingerprint]['pages']
+    seen_on.append(page_num + 1)
+    if len(seen_on) < 3:
+        return False
+    print(f"  ❌ Skipped template image: appears on pages {seen_on} (likely header/footer logo)")
+    for path in candidate['files']:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return True
+
+
+def merge_pymupdf_pages(pages: List[Dict[str, Any]], image_counter: int = 0) -> Dict[str, Any]:
+    """
+    Assemble page records (from one or more page ranges) in page order. Images that
+    appear on 3+ pages are dropped here, over the whole document, so the result does
+    not depend on how pages were split.
+    """
+    html_parts = []
+    images = []
+    extracted_images = {}
+    pending_assets = []
+    image_fingerprints: Dict[str, dict] = {}
+
+    for record in sorted(pages, key=lambda record: record['page']):
+        page_num = record['page']
+        if record['html'].strip():
+            html_parts.append(f"<h2>Page {page_num + 1}</h2>")
+            html_parts.append(record['html'])
+
+        kept = 0
+        for candidate in record['images']:
+            if is_template_image(candidate, page_num, image_fingerprints):
+                continue
+
+            kept += 1
+            image_counter += 1
+            extracted_images[candidate['id']] = candidate['extracted']
+            images.append(candidate['image'])
+            if candidate['asset']:
+                pending_assets.append(candidate['asset'])
+            print(f"💾 CONTENT IMAGE: Extracted {candidate['image']['filename']} "
+                  f"({candidate['extracted']['size_bytes']} bytes, {candidate['image']['dimensions']})")
+
+        filtered_count = record['found_images'] - kept
+        print(f"📊 Page {page_num + 1} filtering results: {kept} content images extracted, {filtered_count} decorative/template images filtered out")
+
+    html_content = '\n\n'.join(html_parts) if html_parts else "<p>No readable content found in PDF</p>"
+    print(f"✅ PyMuPDF: Extracted {len(html_parts) // 2} pages, {len(images)} images")
+    return _result(html_content, images, extracted_images, pending_assets, image_counter, "pymupdf")
+
+
+def convert_pdf_pymupdf(file_path: str, session_id: str, asset_dir: str, image_counter: int = 0) -> Dict[str, Any]:
+    """Convert PDF using PyMuPDF (fitz) - best for text and image extraction"""
+    return merge_pymupdf_pages(extract_pymupdf_pages(file_path, session_id, asset_dir), image_counter)
+
+
+def convert_pdf_pdfplumber(file_path: str) -> Dict[str, Any]:
+    """Convert PDF using pdfplumber - good for structured content and tables"""
+    try:
+        import pdfplumber
+    except ImportError:
+        raise Exception("pdfplumber not available")
+
+    try:
+        html_parts = []
+        with pdfplumber.open(file_path) as pdf:
+            print(f"📖 Processing PDF with {len(pdf.pages)} pages using pdfplumber")
+            for page_num, page in enumerate(pdf.pages):
+                page_text = page.extract_text()
+                if page_text:
+                    page_html = text_to_basic_html(page_text)
+                    if page_html.strip():
+                        html_parts.append(f"<h2>Page {page_num + 1}</h2>")
+                        html_parts.append(page_html)
+
+                for table_num, table in enumerate(page.extract_tables()):
+                    if table:
+                        html_parts.append(table_to_html(table, page_num, table_num))
+
+        html_content = '\n\n'.join(html_parts) if html_parts else "<p>No readable content found in PDF</p>"
+        print(f"✅ pdfplumber: Extracted {len(html_parts)} content blocks")
+        return _result(html_content, converter="pdfplumber")
+
+    except Exception as e:
+        raise Exception(f"pdfplumber processing failed: {str(e)}")
+
+
+def convert_pdf_pypdf2(file_path: str) -> Dict[str, Any]:
+    """Convert PDF using PyPDF2 - basic fallback"""
+    try:
+        import PyPDF2
+    except ImportError:
+        raise Exception("PyPDF2 not available")
+
+    try:
+        text_parts = []
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            print(f"📖 Processing PDF with {len(pdf_reader.pages)} pages using PyPDF2")
+
+            for page_num, page in enumerate(pdf_reader.pages):
+                try:
+                    page_text = page.extract_text()
+                    if page_text and page_text.strip():
+                        text_parts.append(f"Page {page_num + 1}")
+                        text_parts.append(page_text)
+                        text_parts.append("")  # Add spacing
+                except Exception as page_error:
+                    print(f"⚠️ Error extracting page {page_num}: {page_error}")
+                    continue
+
+        if not text_parts:
+            raise Exception("No text content extracted from any page")
+
+        full_text = '\n'.join(text_parts)
+        print(f"✅ PyPDF2: Extracted {len(full_text)} characters")
+        return _result(text_to_basic_html(full_text), converter="pypdf2")
+
+    except Exception as e:
+        raise Exception(f"PyPDF2 processing failed: {str(e)}")
+
+
+# PowerPoint
+
+def convert_ppt(file_path: str, session_id: str, image_counter: int = 0) -> Dict[str, Any]:
+    """Convert PowerPoint to HTML with slide structure"""
+    from pptx import Presentation
+
+    prs = Presentation(file_path)
+    html_parts = []
+    images = []
+
+    for i, slide in enumerate(prs.slides):
+        html_parts.append(f"<h2>Slide {i + 1}</h2>")
+
+        for shape in slide.shapes:
+            if hasattr(shape, "text") and shape.text.strip():
+                html_parts.append(f"<p>{shape.text}</p>")
+            elif shape.shape_type == 13:  # Picture type
+                image_counter += 1
+                image_id = f"ppt_{session_id}_img_{image_counter}"
+                images.append({
+                    'id': image_id,
+                    'filename': f"slide_{i+1}_img_{image_counter}.png",
+                    'alt_text': f"Slide {i+1} Image {image_counter}"
+                })
+                html_parts.append(f"<p>IMAGE_PLACEHOLDER_{image_id}</p>")
+
+    return _result('\n'.join(html_parts), images, image_counter=image_counter, converter="pptx")
@@ -0,0 +1,149 @@
+"""
+Extraction Executor
+Bounded process pool that runs CPU-heavy document converters off the event loop
+"""
+
+import os
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from ..metrics import EXTRACTION_JOBS, EXTRACTION_DURATION
+
+
+class ExtractionTimeout(Exception):
+    """A conversion exceeded its time limit; its worker process was killed"""
+    pass
+
+
+class ExtractionExecutor:
+    """
+    Runs converter functions in worker processes so one large document cannot
+    stall every other request on the event loop.
+
+    Converters must be picklable module-level functions that take and return
+    small values (paths, ids, HTML and image references); image bytes stay in
+    the worker, which writes them to disk itself.
+
+    A conversion that exceeds its timeout cannot be interrupted inside a worker,
+    so the pool is killed and recreated. Other conversions running or queued in
+    the killed pool are resubmitted once to the new one.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: Optional[float] = None,
+                 start_method: Optional[str] = None):
+        if max_workers is None:
+            max_workers = int(os.getenv("EXTRACTION_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+        if timeout is None:
+            timeout = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "300"))
+        # 0 workers runs conversions in the default thread pool (no isolation, timeouts cannot stop them)
+        self.max_workers = max(0, max_workers)
+        self.timeout = timeout
+        # spawn: workers never inherit the parent's event loop, threads or open connections
+        self.start_method = start_method or os.getenv("EXTRACTION_START_METHOD", "spawn")
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._generation = 0
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        """Lazy-loaded process pool"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.start_method)
+            )
+            print(f"⚙️ Extraction executor: started pool of {self.max_workers} {self.start_method} workers")
+        return self._pool
+
+    async def run(self, fn: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        """Run fn(*args) in a worker process; raises ExtractionTimeout after timeout seconds (0 = no limit)"""
+        converter = getattr(fn, "__name__", "converter")
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        try:
+            result = await self._submit(fn, args, timeout)
+        except ExtractionTimeout:
+            EXTRACTION_JOBS.inc(converter=converter, outcome="timeout")
+            raise
+        except Exception:
+            EXTRACTION_JOBS.inc(converter=converter, outcome="error")
+            raise
+        EXTRACTION_JOBS.inc(converter=converter, outcome="success")
+        EXTRACTION_DURATION.observe(time.monotonic() - start, converter=converter)
+        return result
+
+    async def _submit(self, fn: Callable[..., Any], args: tuple, timeout: float) -> Any:
+        loop = asyncio.get_running_loop()
+        limit = timeout if timeout and timeout > 0 else None
+
+        if self.max_workers == 0:
+            try:
+                return await asyncio.wait_for(loop.run_in_executor(None, fn, *args), timeout=limit)
+            except asyncio.TimeoutError:
+                raise ExtractionTimeout(f"{fn.__name__} exceeded {timeout}s")
+
+        for attempt in range(2):
+            generation = self._generation
+            future = loop.run_in_executor(self.pool, fn, *args)
+            try:
+                return await asyncio.wait_for(future, timeout=limit)
+            except asyncio.TimeoutError:
+                print(f"⏱️ Extraction executor: {fn.__name__} exceeded {timeout}s, recycling worker pool")
+                self._recycle(generation)
+                raise ExtractionTimeout(f"{fn.__name__} exceeded {timeout}s")
+            except BrokenProcessPool:
+                if generation != self._generation and attempt == 0:
+                    # Killed alongside another job's timeout: retry on the new pool
+                    continue
+                # A worker died under this job (crash, out of memory)
+                self._recycle(generation)
+                raise
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling() or generation == self._generation:
+                    # The caller was cancelled
+                    raise
+                # Still queued when another job's timeout killed the pool
+                if attempt == 0:
+                    continue
+                raise BrokenProcessPool(f"{fn.__name__} was dropped by a recycled worker pool")
+
+    def _recycle(self, generation: int):
+        """Kill the pool of the given generation; the next submission starts a fresh one"""
+        if generation != self._generation or self._pool is None:
+            return
+        pool, self._pool = self._pool, None
+        self._generation += 1
+        processes = list((pool._processes or {}).values())
+        # Queued jobs fail with BrokenProcessPool once the workers die and are resubmitted by _submit
+        pool.shutdown(wait=False)
+        for process in processes:
+            if process.is_alive():
+                process.kill()
+
+    def shutdown(self):
+        """Stop the worker processes (app shutdown)"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._generation += 1
+
+
+# Global extraction executor instance
+_extraction_executor: Optional[ExtractionExecutor] = None
+
+
+def get_extraction_executor() -> ExtractionExecutor:
+    """Get or create the global extraction executor"""
+    global _extraction_executor
+    if _extraction_executor is None:
+        _extraction_executor = ExtractionExecutor()
+    return _extraction_executor
+
+
+def shutdown_extraction_executor():
+    """Stop the global extraction executor's worker processes"""
+    if _extraction_executor is not None:
+        _extraction_executor.shutdown()
@@ -0,0 +1,83 @@
+"""
+Page-parallel PDF extraction
+Splits large PDFs into page ranges converted in separate worker processes, then
+reassembles pages in order
+"""
+
+import os
+import math
+import uuid
+import asyncio
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from .converters import (pdf_page_count, extract_pymupdf_pages, merge_pymupdf_pages, convert_pdf_pymupdf,
+                         remove_page_images)
+from .executor import ExtractionExecutor, get_extraction_executor
+
+
+def page_ranges(page_count: int, shards: int) -> List[Tuple[int, int]]:
+    """Split pages into at most shards contiguous [first, last) ranges of near-equal size"""
+    shards = max(1, min(shards, page_count))
+    size, extra = divmod(page_count, shards)
+    ranges = []
+    first = 0
+    for shard in range(shards):
+        last = first + size + (1 if shard < extra else 0)
+        ranges.append((first, last))
+        first = last
+    return ranges
+
+
+async def convert_pdf_pymupdf_parallel(file_path: str, session_id: str, asset_dir: str, image_counter: int = 0,
+                                       executor: Optional[ExtractionExecutor] = None) -> Dict[str, Any]:
+    """
+    Convert a PDF with PyMuPDF, sharding page ranges across extraction workers when
+    it has at least PDF_PARALLEL_MIN_PAGES pages (default 40). Each shard holds at
+    least PDF_PAGES_PER_SHARD pages (default 20); PDF_PARALLEL_PAGES=false converts
+    every document in a single job. The result is the same either way.
+
+    When a page range fails, the other ranges are stopped (queued ones exit at once,
+    running ones before their next page) and every image already written is deleted
+    before the error is raised.
+    """
+    executor = executor or get_extraction_executor()
+    enabled = os.getenv("PDF_PARALLEL_PAGES", "true").lower() == "true"
+    min_pages = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "40"))
+    pages_per_shard = max(1, int(os.getenv("PDF_PAGES_PER_SHARD", "20")))
+
+    if not enabled or executor.max_workers < 2:
+        return await executor.run(convert_pdf_pymupdf, file_path, session_id, asset_dir, image_counter)
+
+    page_count = await executor.run(pdf_page_count, file_path)
+    shards = min(executor.max_workers, math.ceil(page_count / pages_per_shard))
+    if page_count < min_pages or shards < 2:
+        return await executor.run(convert_pdf_pymupdf, file_path, session_id, asset_dir, image_counter)
+
+    ranges = page_ranges(page_count, shards)
+    print(f"🧩 PDF: Extracting {page_count} pages in {len(ranges)} parallel page ranges")
+    # Worker processes cannot be interrupted; creating this file tells them to stop
+    abort_path = os.path.join(tempfile.gettempdir(), f"pdf_abort_{uuid.uuid4().hex}")
+    tasks = [
+        asyncio.ensure_future(executor.run(extract_pymupdf_pages, file_path, session_id, asset_dir, first, last, abort_path))
+        for first, last in ranges
+    ]
+    try:
+        # Unlike gather, wait leaves the ranges running if this task is cancelled, so they can be stopped below
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            if task.exception():
+                raise task.exception()
+        results = [task.result() for task in tasks]
+    except BaseException as e:
+        print(f"⚠️ PDF: Page range failed - stopping {len(ranges) - 1} sibling ranges - {e!r}")
+        open(abort_path, "w").close()
+        try:
+            settled = await asyncio.gather(*tasks, return_exceptions=True)
+            for shard in settled:
+                if isinstance(shard, list):
+                    remove_page_images(shard)
+        finally:
+            os.remove(abort_path)
+        raise
+    return merge_pymupdf_pages([page for shard in results for page in shard], image_counter)
@@ -0,0 +1,265 @@
+"""
+Streaming extraction
+Generators that yield normalized blocks page by page (PDF) or section by section
+(DOCX, text), so a document never has to be held as one string
+
+Given a session_id, PDF and DOCX streams also yield image items: each page's images
+(PDF) or each referenced word/media entry (DOCX) is saved when it is reached, with
+the same filtering, session files and Asset Library entries as the full extractors.
+"""
+
+import os
+import asyncio
+import mimetypes
+import posixpath
+import threading
+import zipfile
+import xml.etree.ElementTree as ElementTree
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .converters import DocxImageSaver, is_template_image, pymupdf_page_images, pymupdf_page_lines
+
+STREAMABLE_EXTENSIONS = ('pdf', 'docx', 'txt', 'md', 'text')
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_V = "{urn:schemas-microsoft-com:vml}"
+_RELS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_END = object()
+
+
+def block(block_type: str, content: str, page: Optional[int] = None) -> Dict[str, Any]:
+    """Normalized block: block_type (heading_h1-h6, paragraph, list, code, table), content, page"""
+    return {"block_type": block_type, "content": content, "page": page}
+
+
+def image_block(url: str, alt_text: str, asset: Optional[Dict[str, Any]] = None,
+                page: Optional[int] = None) -> Dict[str, Any]:
+    """Image item: url of the saved image, alt text as content, and its Asset Library entry (None if not copied there)"""
+    return {"block_type": "image", "content": alt_text, "page": page, "url": url, "asset": asset}
+
+
+def classify_paragraph(paragraph: str) -> Tuple[str, str]:
+    """Block type and text of a plain-text / markdown paragraph"""
+    if paragraph.startswith('#'):
+        level = len(paragraph) - len(paragraph.lstrip('#'))
+        return f"heading_h{min(level, 6)}", paragraph.lstrip('# ').strip()
+    if paragraph.startswith('```'):
+        return "code", paragraph
+    if paragraph.startswith('- ') or paragraph.startswith('* '):
+        return "list", paragraph
+    return "paragraph", paragraph
+
+
+def iter_text_blocks(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Blank-line separated paragraphs of a line iterator, classified like V2ContentExtractor.extract_raw_text"""
+    paragraph = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line.strip():
+            paragraph.append(line)
+            continue
+        if paragraph:
+            yield block(*classify_paragraph('\n'.join(paragraph).strip()))
+            paragraph = []
+    if paragraph:
+        yield block(*classify_paragraph('\n'.join(paragraph).strip()))
+
+
+def iter_pdf_blocks(file_path: str, session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Headings and paragraphs of a PDF, one page loaded at a time (PyMuPDF), each page followed by its images given a session_id"""
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        raise Exception("PyMuPDF (fitz) not available")
+
+    asset_dir = f"static/uploads/session_{session_id}"
+    if session_id is not None:
+        os.makedirs(asset_dir, exist_ok=True)
+    image_fingerprints: Dict[str, dict] = {}
+    with fitz.open(file_path) as doc:
+        for page_num in range(len(doc)):
+            page = doc.load_page(page_num)
+            paragraph, paragraph_block = [], None
+            for tag, text, block_num in pymupdf_page_lines(page.get_text("dict"), markup=False):
+                if tag != "p" or block_num != paragraph_block:
+                    if paragraph:
+                        yield block("paragraph", " ".join(paragraph), page_num + 1)
+                    paragraph, paragraph_block = [], None
+                if tag != "p":
+                    yield block(f"heading_{tag}", text, page_num + 1)
+                else:
+                    # Lines of one PDF text block form one paragraph
+                    paragraph.append(text)
+                    paragraph_block = block_num
+            if paragraph:
+                yield block("paragraph", " ".join(paragraph), page_num + 1)
+            if session_id is None:
+                continue
+            for candidate in pymupdf_page_images(page, page_num, session_id, asset_dir):
+                # Template images are dropped from their third page on, as in merge_pymupdf_pages
+                if not is_template_image(candidate, page_num, image_fingerprints):
+                    extracted = candidate['extracted']
+                    yield image_block(extracted['url'], extracted['alt_text'], candidate['asset'], page_num + 1)
+
+
+def _docx_paragraph(element) -> Optional[Dict[str, Any]]:
+    text = "".join(node.text or "" for node in element.iter(f"{_W}t")).strip()
+    if not text:
+        return None
+    style = element.find(f"{_W}pPr/{_W}pStyle")
+    style_id = (style.get(f"{_W}val") if style is not None else "") or ""
+    normalized = style_id.lower().replace(" ", "")
+    if normalized == "title":
+        return block("heading_h1", text)
+    if normalized.startswith("heading"):
+        level = normalized[len("heading"):]
+        return block(f"heading_h{min(int(level), 6) if level.isdigit() else 5}", text)
+    if element.find(f"{_W}pPr/{_W}numPr") is not None or "list" in normalized:
+        return block("list", text)
+    return block("paragraph", text)
+
+
+def _docx_table(element) -> Optional[Dict[str, Any]]:
+    rows = []
+    for row in element.iter(f"{_W}tr"):
+        cells = ["".join(node.text or "" for node in cell.iter(f"{_W}t")).strip() for cell in row.iter(f"{_W}tc")]
+        if any(cells):
+            rows.append(" | ".join(cells))
+    return block("table", "\n".join(rows)) if rows else None
+
+
+def _docx_image_refs(element) -> List[str]:
+    """Relationship ids of the images in a paragraph or table (DrawingML and VML)"""
+    refs = [node.get(f"{_R}embed") for node in element.iter(f"{_A}blip")]
+    refs += [node.get(f"{_R}id") for node in element.iter(f"{_V}imagedata")]
+    return [ref for ref in refs if ref]
+
+
+class _DocxMedia:
+    """Saves the word/media entries a DOCX references, each once, with DocxImageSaver (as convert_docx does)"""
+
+    def __init__(self, docx: zipfile.ZipFile, session_id: str):
+        self.docx = docx
+        self.saver = DocxImageSaver(session_id, 0)
+        self.saved = set()
+        self.targets = {}
+        try:
+            rels = ElementTree.fromstring(docx.read("word/_rels/document.xml.rels"))
+        except KeyError:
+            return
+        names = set(docx.namelist())
+        for rel in rels.iter(f"{_RELS}Relationship"):
+            if rel.get("TargetMode") == "External":
+                continue
+            target = posixpath.normpath(posixpath.join("word", rel.get("Target", ""))).lstrip("/")
+            if target in names:
+                self.targets[rel.get("Id")] = target
+
+    def image_block(self, ref: str) -> Optional[Dict[str, Any]]:
+        """Image item of a referenced media entry, saved on its first reference"""
+        target = self.targets.get(ref)
+        if target is None or target in self.saved:
+            return None
+        self.saved.add(target)
+        content_type = mimetypes.guess_type(target)[0] or "image/png"
+        queued_assets = len(self.saver.pending_assets)
+        src = self.saver(SimpleNamespace(content_type=content_type, bytes=self.docx.read(target)))["src"]
+        if not src:
+            return None
+        saved = self.saver.extracted_images[src[len("IMAGE_PLACEHOLDER_"):]]
+        asset = self.saver.pending_assets.pop() if len(self.saver.pending_assets) > queued_assets else None
+        return image_block(saved['url'], saved['alt_text'], asset)
+
+
+def iter_docx_blocks(file_path: str, session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Paragraphs and tables of a DOCX in document order, parsed incrementally from
+    word/document.xml; given a session_id, each is followed by the images it references
+    """
+    with zipfile.ZipFile(file_path) as docx, docx.open("word/document.xml") as document_xml:
+        media = _DocxMedia(docx, session_id) if session_id is not None else None
+        depth = 0
+        for event, element in ElementTree.iterparse(document_xml, events=("start", "end")):
+            if element.tag != f"{_W}p" and element.tag != f"{_W}tbl":
+                continue
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            if depth:
+                # Paragraph inside a table: emitted with the table
+                continue
+            result = _docx_table(element) if element.tag == f"{_W}tbl" else _docx_paragraph(element)
+            image_refs = _docx_image_refs(element) if media else []
+            element.clear()
+            if result:
+                yield result
+            for ref in image_refs:
+                item = media.image_block(ref)
+                if item:
+                    yield item
+
+
+def iter_document_blocks(file_path: str, extension: str, session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Normalized blocks of a document file, produced as it is read; images are saved and yielded given a session_id"""
+    extension = extension.lower().lstrip('.')
+    if extension == 'pdf':
+        return iter_pdf_blocks(file_path, session_id)
+    if extension == 'docx':
+        return iter_docx_blocks(file_path, session_id)
+    if extension in ('txt', 'md', 'text'):
+        return _iter_text_file_blocks(file_path)
+    raise ValueError(f"Streaming extraction does not support .{extension} files")
+
+
+def _iter_text_file_blocks(file_path: str) -> Iterator[Dict[str, Any]]:
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        yield from iter_text_blocks(f)
+
+
+async def stream_document_blocks(file_path: str, extension: str, buffer_blocks: Optional[int] = None,
+                                 session_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Blocks of a document as an async iterator. Parsing runs in a worker thread that
+    stays at most EXTRACTION_STREAM_BUFFER blocks (default 64) ahead of the consumer,
+    so memory is bounded by the buffer rather than the document. Images are written
+    to disk by the worker thread; only their image items pass through the buffer.
+    """
+    if buffer_blocks is None:
+        buffer_blocks = int(os.getenv("EXTRACTION_STREAM_BUFFER", "64"))
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, buffer_blocks))
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for item in iter_document_blocks(file_path, extension, session_id):
+                if stop.is_set():
+                    return
+                # Blocks while the buffer is full
+                asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+            item = _END
+        except Exception as e:
+            item = e
+        if not stop.is_set():
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    producer = loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Consumer finished or went away: release a producer waiting on a full buffer
+        stop.set()
+        while not queue.empty():
+            queue.get_nowait()
+        await producer
@@ -0,0 +1,67 @@
+"""
+Unit tests for the extraction cache
+Tests for content-hash keys, hits without pending assets, stale image eviction and size bounds
+"""
+
+import hashlib
+from .cache import ExtractionCache, EXTRACTOR_VERSION, file_sha256
+from .converters import _result
+
+
+def _docx_result(image_path, counter=1):
+    return _result(
+        "<p>Hello</p>",
+        images=[{'id': "doc_s_img_1", 'filename': "img_1.png"}],
+        extracted_images={"doc_s_img_1": {'filename': "img_1.png", 'path': str(image_path)}},
+        pending_assets=[{'id': "asset-1"}],
+        image_counter=counter,
+        converter="mammoth"
+    )
+
+
+class TestExtractionCache:
+    """Unit tests for ExtractionCache"""
+
+    def test_key_covers_content_converter_and_version(self, tmp_path):
+        path = tmp_path / "doc.pdf"
+        path.write_bytes(b"%PDF-1.7 body")
+        digest = file_sha256(str(path))
+
+        assert digest == hashlib.sha256(b"%PDF-1.7 body").hexdigest()
+        assert ExtractionCache.key(digest, "pymupdf") == f"pymupdf:{EXTRACTOR_VERSION}:{digest}"
+        assert ExtractionCache.key(digest, "pymupdf") != ExtractionCache.key(digest, "pymupdf", version="0")
+
+    def test_hit_reuses_images_without_new_assets(self, tmp_path):
+        image = tmp_path / "img_1.png"
+        image.write_bytes(b"png")
+        cache = ExtractionCache(enabled=True)
+        cache.set("docx:1:abc", _docx_result(image))
+
+        result = cache.get("docx:1:abc", image_counter=7)
+        result["images"].append({'id': "mutated"})
+
+        assert result["pending_assets"] == [] and result["image_counter"] == 7
+        assert cache.get("docx:1:abc")["images"] == [{'id': "doc_s_img_1", 'filename': "img_1.png"}]
+        assert cache.get("docx:1:missing") is None
+        summary = cache.summary()
+        assert (summary["hits"], summary["misses"], summary["hit_rate"]) == (2, 1, 0.667)
+
+    def test_removed_image_file_is_a_miss(self, tmp_path):
+        image = tmp_path / "img_1.png"
+        image.write_bytes(b"png")
+        cache = ExtractionCache(enabled=True)
+        cache.set("docx:1:abc", _docx_result(image))
+        image.unlink()
+
+        assert cache.get("docx:1:abc") is None
+        assert cache.summary()["entries"] == 0 and cache.stats["evictions"] == 1
+
+    def test_least_recently_used_entries_evicted(self, tmp_path):
+        cache = ExtractionCache(enabled=True, max_entries=2)
+        for name in ("a", "b", "c"):
+            cache.set(name, _result(f"<p>{name}</p>"))
+            if name == "b":
+                cache.get("a")
+
+        assert cache.get("b") is None
+        assert cache.get("a")["html"] == "<p>a</p>" and cache.get("c")["html"] == "<p>c</p>"
@@ -0,0 +1,114 @@
+"""
+Unit tests for the extraction executor
+Tests for worker round trips, timeouts that recycle the pool, and DOCX conversion off the event loop
+"""
+
+import os
+import time
+import asyncio
+import zipfile
+import pytest
+from .executor import ExtractionExecutor, ExtractionTimeout
+from .converters import convert_docx, text_to_basic_html
+
+_DOCX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '</Types>'),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="word/document.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'),
+    "word/document.xml": (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+        '<w:p><w:r><w:t>Hello from a worker</w:t></w:r></w:p>'
+        '</w:body></w:document>'),
+}
+
+
+class TestExtractionExecutor:
+    """Unit tests for ExtractionExecutor"""
+
+    @pytest.mark.asyncio
+    async def test_runs_in_worker_process(self):
+        executor = ExtractionExecutor(max_workers=1, timeout=60)
+        try:
+            assert await executor.run(os.getpid) != os.getpid()
+            assert await executor.run(text_to_basic_html, "TITLE\nBody") == "<h2>TITLE</h2>\n<p>Body</p>"
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_timeout_recycles_pool_and_retries_other_jobs(self):
+        """Test that a stuck job is killed, a job sharing its pool is resubmitted, and later jobs run"""
+        executor = ExtractionExecutor(max_workers=2, timeout=60)
+        try:
+            first_pid = await executor.run(os.getpid)
+            stuck = executor.run(time.sleep, 60, timeout=1)
+            neighbour = executor.run(time.sleep, 2)
+            results = await asyncio.gather(stuck, neighbour, return_exceptions=True)
+
+            assert isinstance(results[0], ExtractionTimeout)
+            assert results[1] is None
+            assert await executor.run(os.getpid) != first_pid
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_timeout_resubmits_queued_jobs(self):
+        """Test that jobs still queued behind a stuck job run on the new pool instead of being cancelled"""
+        executor = ExtractionExecutor(max_workers=1, timeout=60)
+        try:
+            await executor.run(os.getpid)
+            stuck = executor.run(time.sleep, 60, timeout=1)
+            queued = [executor.run(text_to_basic_html, f"Line {i}") for i in range(4)]
+            results = await asyncio.gather(stuck, *queued, return_exceptions=True)
+
+            assert isinstance(results[0], ExtractionTimeout)
+            assert results[1:] == [f"<p>Line {i}</p>" for i in range(4)]
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_inline_mode_uses_threads(self):
+        executor = ExtractionExecutor(max_workers=0)
+        assert await executor.run(os.getpid) == os.getpid()
+
+
+class TestConvertDocx:
+    """Unit tests for the DOCX converter"""
+
+    @pytest.mark.asyncio
+    async def test_docx_converts_in_worker(self, tmp_path):
+        path = str(tmp_path / "doc.docx")
+        with zipfile.ZipFile(path, "w") as docx:
+            for name, content in _DOCX_PARTS.items():
+                docx.writestr(name, content)
+
+        executor = ExtractionExecutor(max_workers=1, timeout=60)
+        try:
+            result = await executor.run(convert_docx, path, "test", 0)
+        finally:
+            executor.shutdown()
+
+        assert result["converter"] == "mammoth"
+        assert "<p>Hello from a worker</p>" in result["html"]
+        assert result["images"] == [] and result["pending_assets"] == []
+
+    def test_text_with_docx_extension(self, tmp_path):
+        path = tmp_path / "notes.docx"
+        path.write_text("OVERVIEW\nSetup:\nInstall the agent.")
+
+        result = convert_docx(str(path), "test", 3)
+
+        assert result["converter"] == "text"
+        assert result["html"] == "<h2>OVERVIEW</h2>\n<h3>Setup:</h3>\n<p>Install the agent.</p>"
+        assert result["image_counter"] == 3
@@ -0,0 +1,109 @@
+"""
+Unit tests for page-parallel PDF extraction
+Tests for page range splitting and ordered reassembly of page records
+"""
+
+import os
+import asyncio
+import pytest
+from .pdf import page_ranges, convert_pdf_pymupdf_parallel
+from .converters import merge_pymupdf_pages, pdf_page_count, extract_pymupdf_pages
+
+
+def _page(page_num, html, images=(), found=None):
+    return {'page': page_num, 'html': html, 'images': list(images),
+            'found_images': len(images) if found is None else found}
+
+
+def _candidate(tmp_path, page_num, fingerprint="9000_300_200"):
+    filename = f"content_img_page{page_num + 1}_1.png"
+    path = tmp_path / filename
+    path.write_bytes(b"png")
+    image_id = f"pdf_s_p{page_num + 1}_img1"
+    return {
+        'fingerprint': fingerprint,
+        'id': image_id,
+        'files': [str(path)],
+        'extracted': {'filename': filename, 'path': str(path), 'size_bytes': 9000},
+        'image': {'id': image_id, 'filename': filename, 'dimensions': "300x200"},
+        'asset': {'id': f"asset-{page_num}"}
+    }
+
+
+class TestPageRanges:
+    """Unit tests for page_ranges"""
+
+    def test_even_contiguous_ranges(self):
+        assert page_ranges(10, 3) == [(0, 4), (4, 7), (7, 10)]
+        assert page_ranges(300, 4) == [(0, 75), (75, 150), (150, 225), (225, 300)]
+
+    def test_never_more_ranges_than_pages(self):
+        assert page_ranges(2, 4) == [(0, 1), (1, 2)]
+        assert page_ranges(5, 1) == [(0, 5)]
+
+
+class TestMergePages:
+    """Unit tests for merge_pymupdf_pages"""
+
+    def test_shards_reassemble_in_page_order(self):
+        shard_two = [_page(2, "<p>c</p>"), _page(3, "")]
+        shard_one = [_page(0, "<h1>Intro</h1>"), _page(1, "<p>b</p>")]
+
+        result = merge_pymupdf_pages(shard_two + shard_one)
+
+        assert result["html"] == "<h2>Page 1</h2>\n\n<h1>Intro</h1>\n\n<h2>Page 2</h2>\n\n<p>b</p>\n\n<h2>Page 3</h2>\n\n<p>c</p>"
+
+    def test_template_images_filtered_across_shard_boundaries(self, tmp_path):
+        """Test that a logo on three pages split over shards is dropped on its third page, as sequentially"""
+        pages = [_page(n, f"<p>{n}</p>", [_candidate(tmp_path, n)]) for n in range(4)]
+        pages.append(_page(4, "<p>4</p>", [_candidate(tmp_path, 4, fingerprint="12000_500_400")]))
+
+        sequential = merge_pymupdf_pages(pages, image_counter=5)
+        sharded = merge_pymupdf_pages(pages[3:] + pages[:3], image_counter=5)
+
+        assert sharded == sequential
+        assert [image['id'] for image in sharded['images']] == ["pdf_s_p1_img1", "pdf_s_p2_img1", "pdf_s_p5_img1"]
+        assert [asset['id'] for asset in sharded['pending_assets']] == ["asset-0", "asset-1", "asset-4"]
+        assert sharded['image_counter'] == 8
+        assert not os.path.exists(tmp_path / "content_img_page3_1.png")
+        assert os.path.exists(tmp_path / "content_img_page5_1.png")
+
+
+class _ShardExecutor:
+    """Executor stand-in running page ranges as coroutines: the first range writes an image,
+    the second fails, the third runs until told to stop"""
+
+    max_workers = 3
+
+    def __init__(self, tmp_path):
+        self.tmp_path = tmp_path
+        self.stopped = []
+
+    async def run(self, fn, *args):
+        if fn is pdf_page_count:
+            return 60
+        assert fn is extract_pymupdf_pages
+        first, last, abort_path = args[3:]
+        if first == 0:
+            return [_page(0, "<p>0</p>", [_candidate(self.tmp_path, 0)])]
+        if first == 20:
+            await asyncio.sleep(0.01)
+            raise RuntimeError("page 21 is corrupt")
+        while not os.path.exists(abort_path):
+            await asyncio.sleep(0.005)
+        self.stopped.append(first)
+        raise RuntimeError("aborted")
+
+
+class TestParallelConversion:
+    """Unit tests for convert_pdf_pymupdf_parallel"""
+
+    @pytest.mark.asyncio
+    async def test_failed_range_stops_siblings_and_removes_images(self, tmp_path):
+        executor = _ShardExecutor(tmp_path)
+
+        with pytest.raises(RuntimeError, match="page 21 is corrupt"):
+            await convert_pdf_pymupdf_parallel("doc.pdf", "s", str(tmp_path), executor=executor)
+
+        assert executor.stopped == [40]
+        assert os.listdir(tmp_path) == []
@@ -0,0 +1,201 @@
+"""
+Unit tests for streaming extraction
+Tests for block parsing of text and DOCX files, images streamed with their pages and
+paragraphs, the bounded block buffer, and building documents and analysis previews
+from a block stream
+"""
+
+import os
+import random
+import zipfile
+import pytest
+from .stream import iter_docx_blocks, iter_pdf_blocks, iter_text_blocks, stream_document_blocks
+from .test_executor import _DOCX_PARTS
+from ..v2.extractor import V2ContentExtractor
+from ..v2.analyzer import DocumentPreview
+
+_W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+_DOCUMENT_XML = (
+    f'<?xml version="1.0" encoding="UTF-8"?><w:document {_W}><w:body>'
+    '<w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr><w:r><w:t>Install</w:t></w:r></w:p>'
+    '<w:p><w:r><w:t>Run the </w:t></w:r><w:r><w:t>installer.</w:t></w:r></w:p>'
+    '<w:p><w:pPr><w:numPr><w:ilvl w:val="0"/></w:numPr></w:pPr><w:r><w:t>Accept the license</w:t></w:r></w:p>'
+    '<w:tbl><w:tr><w:tc><w:p><w:r><w:t>Key</w:t></w:r></w:p></w:tc><w:tc><w:p><w:r><w:t>Value</w:t></w:r></w:p></w:tc></w:tr>'
+    '<w:tr><w:tc><w:p><w:r><w:t>port</w:t></w:r></w:p></w:tc><w:tc><w:p><w:r><w:t>8080</w:t></w:r></w:p></w:tc></w:tr></w:tbl>'
+    '<w:p/>'
+    '<w:p><w:pPr><w:pStyle w:val="Heading2"/></w:pPr><w:r><w:t>Verify</w:t></w:r></w:p>'
+    '</w:body></w:document>'
+)
+
+_DRAWING = (
+    '<w:p><w:r><w:drawing><a:graphic xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">'
+    '<a:blip xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" r:embed="{ref}"/>'
+    '</a:graphic></w:drawing></w:r></w:p>'
+)
+
+_DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId5" Target="media/image1.png" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"/>'
+    '<Relationship Id="rId6" Target="https://example.com/logo.png" TargetMode="External" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"/>'
+    '</Relationships>'
+)
+
+_MARKDOWN = "# Guide\n\nIntro line one\nline two\n\n\n## Setup\n\n- step one\n- step two\n\n```\ncode\n```\n"
+
+
+def _write_docx(path, document_xml=_DOCUMENT_XML):
+    with zipfile.ZipFile(path, "w") as docx:
+        for name, content in _DOCX_PARTS.items():
+            docx.writestr(name, document_xml if name == "word/document.xml" else content)
+
+
+def _write_docx_with_images(path):
+    """DOCX whose image is referenced after the first paragraph and again after the table"""
+    first_paragraph_end = _DOCUMENT_XML.index("</w:p>") + len("</w:p>")
+    table_end = _DOCUMENT_XML.index("</w:tbl>") + len("</w:tbl>")
+    document_xml = (_DOCUMENT_XML[:first_paragraph_end] + _DRAWING.format(ref="rId5")
+                    + _DOCUMENT_XML[first_paragraph_end:table_end] + _DRAWING.format(ref="rId5")
+                    + _DRAWING.format(ref="rId6") + _DOCUMENT_XML[table_end:])
+    _write_docx(path, document_xml)
+    with zipfile.ZipFile(path, "a") as docx:
+        docx.writestr("word/_rels/document.xml.rels", _DOCUMENT_RELS)
+        docx.writestr("word/media/image1.png", b"png bytes")
+
+
+def _write_pdf_with_images(path, pages: int):
+    """PDF with a text line and the same content-sized image on every page"""
+    import fitz
+
+    # Noise, so the PNG stays above the 5000-byte decorative image filter
+    png = fitz.Pixmap(fitz.csRGB, 120, 120, random.Random(0).randbytes(120 * 120 * 3), False).tobytes("png")
+    with fitz.open() as doc:
+        for page_num in range(pages):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"Page {page_num + 1} text")
+            page.insert_image(fitz.Rect(72, 200, 272, 400), stream=png)
+        doc.save(str(path))
+
+
+class TestBlockParsers:
+    """Unit tests for the text and DOCX block generators"""
+
+    @pytest.mark.asyncio
+    async def test_text_blocks_match_raw_text_extraction(self):
+        streamed = list(iter_text_blocks(_MARKDOWN.splitlines(keepends=True)))
+        doc = await V2ContentExtractor().extract_raw_text(_MARKDOWN)
+
+        assert [(b["block_type"], b["content"]) for b in streamed] == [(b.block_type, b.content) for b in doc.blocks]
+
+    def test_docx_blocks_in_document_order(self, tmp_path):
+        path = tmp_path / "guide.docx"
+        _write_docx(path)
+
+        assert [(b["block_type"], b["content"]) for b in iter_docx_blocks(str(path))] == [
+            ("heading_h1", "Install"),
+            ("paragraph", "Run the installer."),
+            ("list", "Accept the license"),
+            ("table", "Key | Value\nport | 8080"),
+            ("heading_h2", "Verify"),
+        ]
+
+
+
+class TestStreamedImages:
+    """Unit tests for the image items of PDF and DOCX block streams"""
+
+    def test_docx_images_follow_their_paragraph(self, tmp_path, monkeypatch):
+        """Test that a referenced word/media entry is saved once, after the paragraph that first shows it"""
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / "guide.docx"
+        _write_docx_with_images(path)
+
+        blocks = list(iter_docx_blocks(str(path), session_id="job12345"))
+
+        assert [b["block_type"] for b in blocks] == ["heading_h1", "image", "paragraph", "list", "table", "heading_h2"]
+        image = blocks[1]
+        assert image["url"] == "/api/static/uploads/session_job12345/img_1.png"
+        assert image["asset"]["content_type"] == "image/png" and image["asset"]["file_size"] == len(b"png bytes")
+        assert len(os.listdir("static/uploads/session_job12345")) == 1
+        assert [b["block_type"] for b in iter_docx_blocks(str(path))] == ["heading_h1", "paragraph", "list", "table", "heading_h2"]
+
+    def test_pdf_images_streamed_per_page_without_template_images(self, tmp_path, monkeypatch):
+        """Test that each page's images follow its text and an image on every page stops from its third page"""
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / "guide.pdf"
+        _write_pdf_with_images(path, pages=4)
+
+        blocks = list(iter_pdf_blocks(str(path), session_id="job12345"))
+
+        assert [(b["block_type"], b["page"]) for b in blocks] == [
+            ("paragraph", 1), ("image", 1), ("paragraph", 2), ("image", 2), ("paragraph", 3), ("paragraph", 4)]
+        assert blocks[1]["content"] == "Content Image from Page 1"
+        assert sorted(os.listdir("static/uploads/session_job12345")) == [
+            "content_img_page1_1.png", "content_img_page2_1.png"]
+
+class TestStreamDocumentBlocks:
+    """Unit tests for stream_document_blocks"""
+
+    @pytest.mark.asyncio
+    async def test_small_buffer_yields_every_block(self, tmp_path):
+        path = tmp_path / "long.md"
+        path.write_text("\n\n".join(f"Paragraph {i}" for i in range(200)))
+
+        contents = [b["content"] async for b in stream_document_blocks(str(path), "md", buffer_blocks=2)]
+
+        assert contents == [f"Paragraph {i}" for i in range(200)]
+
+    @pytest.mark.asyncio
+    async def test_consumer_closing_early_releases_producer(self, tmp_path):
+        path = tmp_path / "long.txt"
+        path.write_text("\n\n".join(f"Paragraph {i}" for i in range(200)))
+
+        stream = stream_document_blocks(str(path), ".txt", buffer_blocks=1)
+        first = await stream.__anext__()
+        await stream.aclose()
+
+        assert first["content"] == "Paragraph 0"
+
+    @pytest.mark.asyncio
+    async def test_unsupported_extension_raises(self, tmp_path):
+        with pytest.raises(ValueError):
+            async for _ in stream_document_blocks(str(tmp_path / "deck.pptx"), "pptx"):
+                pass
+
+
+class TestExtractBlockStream:
+    """Unit tests for V2ContentExtractor.extract_block_stream"""
+
+    @pytest.mark.asyncio
+    async def test_incremental_preview_matches_document_preview(self, tmp_path):
+        path = tmp_path / "guide.docx"
+        _write_docx(path)
+        preview = DocumentPreview("guide", budget_tokens=12, block_tokens=4)
+
+        doc = await V2ContentExtractor().extract_block_stream(
+            stream_document_blocks(str(path), "docx"), title="guide", on_block=preview.add)
+
+        rebuilt = DocumentPreview("guide", budget_tokens=12, block_tokens=4)
+        for block in doc.blocks:
+            rebuilt.add(block)
+        assert [b.block_type for b in doc.blocks] == ["heading_h1", "paragraph", "list", "table", "heading_h2"]
+        assert doc.word_count == 14 and doc.metadata["block_count"] == 5
+        assert preview.render() == rebuilt.render(doc.word_count)
+
+    @pytest.mark.asyncio
+    async def test_image_items_become_media(self, tmp_path, monkeypatch):
+        """Test that streamed images are kept as media after the block they follow, not as text blocks"""
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / "guide.docx"
+        _write_docx_with_images(path)
+
+        doc = await V2ContentExtractor().extract_block_stream(
+            stream_document_blocks(str(path), "docx", session_id="job12345"), title="guide")
+
+        assert [b.block_type for b in doc.blocks] == ["heading_h1", "paragraph", "list", "table", "heading_h2"]
+        assert len(doc.media) == 1
+        assert doc.media[0].url == "/api/static/uploads/session_job12345/img_1.png"
+        assert doc.media[0].metadata["after_block"] == 0 and doc.media[0].metadata["asset"]["asset_type"] == "image"
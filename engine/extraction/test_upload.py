@@ -0,0 +1,74 @@
+"""
+Unit tests for upload spooling
+Tests for chunked spooling with hashing, cleanup and in-place file paths
+"""
+
+import io
+import os
+import hashlib
+import pytest
+from .upload import SpooledUpload, spool_upload, as_file_path
+
+
+class _Upload:
+    """Async read(size) over bytes, recording the requested chunk sizes"""
+
+    def __init__(self, data: bytes, filename: str = "report.pdf"):
+        self._data = io.BytesIO(data)
+        self.filename = filename
+        self.reads = []
+
+    async def read(self, size: int = -1) -> bytes:
+        self.reads.append(size)
+        return self._data.read(size)
+
+
+class TestSpoolUpload:
+    """Unit tests for spool_upload"""
+
+    @pytest.mark.asyncio
+    async def test_spools_in_chunks_and_hashes(self, tmp_path):
+        data = os.urandom(10_000)
+        upload = _Upload(data)
+
+        with await spool_upload(upload, suffix=".pdf", directory=str(tmp_path), chunk_size=4096) as spooled:
+            assert spooled.size == len(data)
+            assert spooled.sha256 == hashlib.sha256(data).hexdigest()
+            assert spooled.filename == "report.pdf"
+            assert spooled.path.endswith(".pdf") and os.path.dirname(spooled.path) == str(tmp_path)
+            assert spooled.read_bytes() == data
+            assert upload.reads == [4096] * 4
+
+        assert not os.path.exists(spooled.path)
+
+    @pytest.mark.asyncio
+    async def test_failed_read_removes_spool_file(self, tmp_path):
+        class _Failing(_Upload):
+            async def read(self, size: int = -1) -> bytes:
+                if self.reads:
+                    raise ConnectionError("client went away")
+                return await super().read(size)
+
+        with pytest.raises(ConnectionError):
+            await spool_upload(_Failing(b"x" * 100), directory=str(tmp_path), chunk_size=10)
+
+        assert os.listdir(tmp_path) == []
+
+
+class TestAsFilePath:
+    """Unit tests for as_file_path"""
+
+    def test_spooled_upload_is_read_in_place(self, tmp_path):
+        path = tmp_path / "upload.docx"
+        path.write_bytes(b"PK")
+
+        assert as_file_path(SpooledUpload(str(path), 2, "digest"), ".docx") == (str(path), False)
+
+    def test_bytes_are_written_to_an_owned_temp_file(self):
+        path, owned = as_file_path(b"%PDF-1.7", ".pdf")
+        try:
+            assert owned and path.endswith(".pdf")
+            with open(path, "rb") as f:
+                assert f.read() == b"%PDF-1.7"
+        finally:
+            os.unlink(path)
@@ -0,0 +1,86 @@
+"""
+Upload spooling
+Uploads are copied to a temporary file in fixed-size chunks while their SHA-256 is
+computed, so a request never holds a whole file in memory
+"""
+
+import os
+import hashlib
+import tempfile
+from typing import Optional, Tuple, Union
+
+
+class SpooledUpload:
+    """An upload on disk: path, size in bytes and SHA-256 hex digest of its content"""
+
+    def __init__(self, path: str, size: int, sha256: str, filename: Optional[str] = None):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.filename = filename
+
+    def read_bytes(self) -> bytes:
+        """Whole content; only for consumers that need it in memory anyway (text decoding)"""
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def open(self):
+        """Binary file object over the spooled content"""
+        return open(self.path, "rb")
+
+    def cleanup(self):
+        """Delete the spool file"""
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+
+
+async def spool_upload(file, suffix: str = "", directory: Optional[str] = None,
+                       chunk_size: Optional[int] = None) -> SpooledUpload:
+    """
+    Write an upload (anything with an async read(size), e.g. a FastAPI UploadFile)
+    to a temporary file in UPLOAD_SPOOL_DIR (default: the system temp dir),
+    UPLOAD_SPOOL_CHUNK_BYTES at a time (default 1 MiB), hashing it on the way.
+    The caller owns the returned spool and must clean it up.
+    """
+    chunk_size = chunk_size or int(os.getenv("UPLOAD_SPOOL_CHUNK_BYTES", str(1024 * 1024)))
+    directory = directory or os.getenv("UPLOAD_SPOOL_DIR") or None
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    spool = tempfile.NamedTemporaryFile(prefix="upload_", suffix=suffix, dir=directory, delete=False)
+    try:
+        with spool:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                spool.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        os.unlink(spool.name)
+        raise
+
+    return SpooledUpload(spool.name, size, digest.hexdigest(), filename=getattr(file, "filename", None))
+
+
+def as_file_path(source: Union[bytes, SpooledUpload], suffix: str = "") -> Tuple[str, bool]:
+    """
+    Path a converter can open for source, and whether the caller must delete it:
+    spooled uploads are read in place, bytes are written to a temporary file
+    """
+    if isinstance(source, SpooledUpload):
+        return source.path, False
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_file:
+        temp_file.write(source)
+        return temp_file.name, True
@@ -0,0 +1,9 @@
+"""
+Job queue workers.
+Out-of-process execution of queued uploads and processing jobs.
+"""
+
+from .worker import JobWorker
+from .cancel import watch_cancel_request
+
+__all__ = ['JobWorker', 'watch_cancel_request']
@@ -0,0 +1,30 @@
+"""
+Cross-process cancellation
+Runs processed inline by an API process are cancelled through their job record,
+so a cancel request served by any process reaches the one running the job
+"""
+
+import os
+import asyncio
+from typing import Optional
+from ..run_context import cancel_run
+
+
+async def watch_cancel_request(job_id: str, repository=None, interval: Optional[float] = None) -> bool:
+    """
+    Poll the job record every interval seconds (JOB_CANCEL_POLL_SECONDS, default 5)
+    and cancel the run in this process once cancel_requested is set; returns True
+    when it cancelled the run. Run it as a task next to the job and cancel the task
+    when the job ends.
+    """
+    if repository is None:
+        from ..stores.mongo import RepositoryFactory
+        repository = RepositoryFactory.get_processing_jobs()
+    interval = interval or float(os.getenv("JOB_CANCEL_POLL_SECONDS", "5"))
+
+    while True:
+        await asyncio.sleep(interval)
+        job = await repository.find_job(job_id)
+        if job and job.get("cancel_requested"):
+            print(f"🛑 JOB CANCEL: Cancellation requested for job {job_id} - stopping it")
+            return cancel_run(job_id, "cancelled by user")
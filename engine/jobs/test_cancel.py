@@ -0,0 +1,50 @@
+"""
+Unit tests for cross-process cancellation
+Tests for watch_cancel_request stopping an inline run once its job record is flagged
+"""
+
+import pytest
+import asyncio
+from .cancel import watch_cancel_request
+from ..run_context import RunContext, RunCancelledError
+
+
+class InMemoryJobRecords:
+    """In-memory stand-in for ProcessingJobsRepository.find_job"""
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+
+    async def find_job(self, job_id):
+        return self.jobs.get(job_id)
+
+
+class TestWatchCancelRequest:
+    """Unit tests for watch_cancel_request"""
+
+    @pytest.mark.asyncio
+    async def test_flagged_job_cancels_local_run(self):
+        """Test that a cancel request recorded by another process cancels the run here"""
+        records = InMemoryJobRecords({"j1": {"job_id": "j1", "status": "processing"}})
+
+        async def run():
+            with RunContext("j1") as run_context:
+                run_context.attach(asyncio.current_task())
+                await asyncio.sleep(5)
+
+        run_task = asyncio.create_task(run())
+        watch = asyncio.create_task(watch_cancel_request("j1", repository=records, interval=0.01))
+        await asyncio.sleep(0.03)
+        assert not run_task.done()
+
+        records.jobs["j1"]["cancel_requested"] = True
+        assert await asyncio.wait_for(watch, timeout=1) is True
+        with pytest.raises((asyncio.CancelledError, RunCancelledError)):
+            await run_task
+
+    @pytest.mark.asyncio
+    async def test_run_elsewhere_is_not_cancelled(self):
+        """Test that a flagged job not running in this process is left alone"""
+        records = InMemoryJobRecords({"j2": {"job_id": "j2", "cancel_requested": True}})
+
+        assert await watch_cancel_request("j2", repository=records, interval=0.01) is False
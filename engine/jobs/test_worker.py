@@ -0,0 +1,221 @@
+"""
+Unit tests for the job worker
+Tests for completion, retry, dead-lettering and lease loss with an in-memory queue
+"""
+
+import os
+import pytest
+import asyncio
+from .worker import JobWorker
+
+
+class InMemoryJobQueue:
+    """In-memory stand-in for the leasing methods of ProcessingJobsRepository"""
+
+    def __init__(self, jobs):
+        self.jobs = {job["job_id"]: {"attempts": 0, "max_attempts": 3, "queue_state": "queued", **job} for job in jobs}
+        self.deleted_payloads = []
+        self.lease_valid = True
+        self.renew_errors = 0
+
+    async def lease_next_job(self, worker_id, lease_seconds, job_types=None):
+        for job in self.jobs.values():
+            if job["queue_state"] == "queued" and job["attempts"] < job["max_attempts"]:
+                job.update(queue_state="leased", worker_id=worker_id, attempts=job["attempts"] + 1)
+                return dict(job)
+        return None
+
+    async def renew_lease(self, job_id, worker_id, lease_seconds):
+        if self.renew_errors:
+            self.renew_errors -= 1
+            raise ConnectionError("network blip")
+        return self.lease_valid and not self.jobs[job_id].get("cancel_requested")
+
+    async def request_cancel(self, job_id):
+        self.jobs[job_id]["cancel_requested"] = True
+
+    async def acknowledge_cancel(self, job_id, worker_id):
+        job = self.jobs[job_id]
+        if job.get("cancel_requested"):
+            job["queue_state"] = "cancelled"
+            return True
+        return False
+
+    async def complete_leased_job(self, job_id, worker_id, result=None):
+        self.jobs[job_id].update(result or {}, queue_state="done")
+        return True
+
+    async def release_failed_job(self, job_id, worker_id, error):
+        job = self.jobs[job_id]
+        job["queue_state"] = "queued" if job["attempts"] < job["max_attempts"] else "dead"
+        job["last_error"] = error
+        return job["queue_state"]
+
+    async def download_job_payload(self, payload_id, destination):
+        destination.write(b"file bytes")
+        return True
+
+    async def delete_job_payload(self, payload_id):
+        self.deleted_payloads.append(payload_id)
+        return True
+
+
+class TestJobWorker:
+    """Unit tests for JobWorker"""
+
+    @pytest.mark.asyncio
+    async def test_job_completes_with_payload(self):
+        """Test that the handler gets the payload as a file, deleted afterwards, and its result is stored"""
+        queue = InMemoryJobQueue([{"job_id": "j1", "job_type": "file_upload", "payload_id": "p1",
+                                   "original_filename": "guide.pdf"}])
+        payload_paths = []
+
+        async def handler(job):
+            payload_paths.append(job["payload_path"])
+            return {"size": os.path.getsize(job["payload_path"])}
+
+        worker = JobWorker({"file_upload": handler}, repository=queue, lease_seconds=1)
+        assert await worker.run_once() is True
+        assert await worker.run_once() is False
+
+        assert queue.jobs["j1"]["queue_state"] == "done"
+        assert queue.jobs["j1"]["size"] == 10
+        assert queue.deleted_payloads == ["p1"]
+        assert payload_paths[0].endswith(".pdf") and not os.path.exists(payload_paths[0])
+
+    @pytest.mark.asyncio
+    async def test_failures_retry_until_dead(self):
+        """Test that a failing job is retried up to max_attempts and then dead-lettered"""
+        queue = InMemoryJobQueue([{"job_id": "j1", "job_type": "file_upload", "payload_id": "p1"}])
+        calls = 0
+
+        async def handler(job):
+            nonlocal calls
+            calls += 1
+            raise RuntimeError("extraction failed")
+
+        worker = JobWorker({"file_upload": handler}, repository=queue, lease_seconds=1)
+        while await worker.run_once():
+            pass
+
+        assert calls == 3
+        assert queue.jobs["j1"]["queue_state"] == "dead"
+        assert queue.jobs["j1"]["last_error"] == "extraction failed"
+        assert queue.deleted_payloads == ["p1"]
+
+    @pytest.mark.asyncio
+    async def test_lost_lease_cancels_handler(self):
+        """Test that a handler is cancelled once its lease cannot be renewed"""
+        queue = InMemoryJobQueue([{"job_id": "j1", "job_type": "file_upload"}])
+        queue.lease_valid = False
+        cancelled = asyncio.Event()
+
+        async def handler(job):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        worker = JobWorker({"file_upload": handler}, repository=queue, lease_seconds=0.03)
+        await asyncio.wait_for(worker.run_once(), timeout=1)
+
+        assert cancelled.is_set()
+        assert queue.jobs["j1"]["queue_state"] == "leased"
+
+    @pytest.mark.asyncio
+    async def test_renewal_error_retried_while_lease_valid(self):
+        """Test that a failed renewal does not cancel a job whose lease has not expired"""
+        queue = InMemoryJobQueue([{"job_id": "j1", "job_type": "file_upload"}])
+        queue.renew_errors = 1
+
+        async def handler(job):
+            await asyncio.sleep(0.2)
+            return {"finished": True}
+
+        worker = JobWorker({"file_upload": handler}, repository=queue, lease_seconds=0.09)
+        await asyncio.wait_for(worker.run_once(), timeout=1)
+
+        assert queue.renew_errors == 0
+        assert queue.jobs["j1"]["queue_state"] == "done" and queue.jobs["j1"]["finished"] is True
+
+    @pytest.mark.asyncio
+    async def test_renewal_errors_past_expiry_cancel_handler(self):
+        """Test that a handler is cancelled once renewals have failed for the whole lease"""
+        queue = InMemoryJobQueue([{"job_id": "j1", "job_type": "file_upload"}])
+        queue.renew_errors = 100
+        cancelled = asyncio.Event()
+
+        async def handler(job):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        worker = JobWorker({"file_upload": handler}, repository=queue, lease_seconds=0.03)
+        await asyncio.wait_for(worker.run_once(), timeout=1)
+
+        assert cancelled.is_set()
+
+    @pytest.mark.asyncio
+    async def test_cancel_request_stops_running_job(self):
+        """Test that a cancellation requested mid-run stops the handler and marks the job cancelled"""
+        queue = InMemoryJobQueue([{"job_id": "j1", "job_type": "file_upload", "payload_id": "p1"}])
+        cancelled = asyncio.Event()
+
+        async def handler(job):
+            await queue.request_cancel(job["job_id"])
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        worker = JobWorker({"file_upload": handler}, repository=queue, lease_seconds=0.03)
+        await asyncio.wait_for(worker.run_once(), timeout=1)
+
+        assert cancelled.is_set()
+        assert queue.jobs["j1"]["queue_state"] == "cancelled"
+        assert queue.deleted_payloads == ["p1"]
+
+    @pytest.mark.asyncio
+    async def test_slots_run_jobs_concurrently(self):
+        """Test that run_forever runs up to concurrency jobs at once and stops cleanly"""
+        queue = InMemoryJobQueue([{"job_id": f"j{i}", "job_type": "file_upload"} for i in range(4)])
+        active = 0
+        peak = 0
+        stop_event = asyncio.Event()
+
+        async def handler(job):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+            if all(j["queue_state"] != "queued" for j in queue.jobs.values()):
+                stop_event.set()
+            return {}
+
+        worker = JobWorker({"file_upload": handler}, repository=queue, concurrency=2, lease_seconds=1, poll_interval=0.01)
+        await asyncio.wait_for(worker.run_forever(stop_event), timeout=1)
+
+        assert peak == 2
+        assert all(job["queue_state"] == "done" for job in queue.jobs.values())
+
+    @pytest.mark.asyncio
+    async def test_startup_purges_leftover_payloads(self):
+        """Test that a starting worker deletes every payload of jobs that ended without a worker"""
+        queue = InMemoryJobQueue([])
+        limits = []
+
+        async def purge_finished_payloads(limit=100):
+            limits.append(limit)
+            return 0
+
+        queue.purge_finished_payloads = purge_finished_payloads
+        stop_event = asyncio.Event()
+        stop_event.set()
+
+        await JobWorker({}, repository=queue).run_forever(stop_event)
+        assert limits == [None]
@@ -0,0 +1,164 @@
+"""
+Job Worker
+Leases queued jobs from MongoDB and runs them with heartbeats, so any number of
+worker processes (on any number of nodes) can share one queue
+"""
+
+import os
+import socket
+import time
+import asyncio
+import tempfile
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class JobWorker:
+    """
+    Runs queued jobs through registered handlers.
+
+    Each of the worker's slots leases one job at a time. While a handler runs, the
+    lease is renewed every lease_seconds / 3; if a worker dies, its lease expires
+    and another worker picks the job up (up to the job's max_attempts). A handler
+    whose lease is lost is cancelled so the job never runs twice concurrently; this
+    is also how a cancellation requested through the API reaches a running job.
+    """
+
+    def __init__(self, handlers: Dict[str, JobHandler], repository=None, concurrency: int = None,
+                 lease_seconds: float = None, poll_interval: float = None, worker_id: str = None):
+        self.handlers = handlers
+        self._repository = repository
+        self.concurrency = concurrency or int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+        self.lease_seconds = lease_seconds or float(os.getenv("JOB_LEASE_SECONDS", "120"))
+        self.poll_interval = poll_interval or float(os.getenv("JOB_POLL_INTERVAL", "2"))
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+    @property
+    def repository(self):
+        """Processing jobs repository, created on first use"""
+        if self._repository is None:
+            from ..stores.mongo import RepositoryFactory
+            self._repository = RepositoryFactory.get_processing_jobs()
+        return self._repository
+
+    async def run_forever(self, stop_event: asyncio.Event = None):
+        """Process jobs until stop_event is set; in-flight jobs finish before returning"""
+        stop_event = stop_event or asyncio.Event()
+        if hasattr(self.repository, 'ensure_queue_indexes'):
+            await self.repository.ensure_queue_indexes()
+        if hasattr(self.repository, 'purge_finished_payloads'):
+            # Payloads left behind by jobs that ended while no worker held them
+            await self.repository.purge_finished_payloads(limit=None)
+
+        print(f"👷 JOB WORKER: {self.worker_id} started - {self.concurrency} slots, handlers: {sorted(self.handlers)}")
+        await asyncio.gather(*[self._slot(stop_event) for _ in range(self.concurrency)])
+        print(f"👷 JOB WORKER: {self.worker_id} stopped")
+
+    async def _slot(self, stop_event: asyncio.Event):
+        """Lease and run jobs one at a time until stopped"""
+        while not stop_event.is_set():
+            if await self.run_once():
+                continue
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_once(self) -> bool:
+        """Lease and run a single job; returns False when the queue is empty"""
+        job = await self.repository.lease_next_job(self.worker_id, self.lease_seconds, list(self.handlers))
+        if not job:
+            return False
+
+        await self._process(job)
+        return True
+
+    async def _process(self, job: Dict[str, Any]):
+        """Run a leased job's handler under a heartbeat and record the outcome"""
+        job_id = job["job_id"]
+        print(f"⚙️ JOB WORKER: Running {job.get('job_type')} job {job_id} (attempt {job.get('attempts')}/{job.get('max_attempts')})")
+
+        handler_task = asyncio.create_task(self._run_handler(job))
+        heartbeat_task = asyncio.create_task(self._heartbeat(job_id, handler_task))
+        try:
+            result = await handler_task
+        except asyncio.CancelledError:
+            if not heartbeat_task.done():
+                raise
+            if await self.repository.acknowledge_cancel(job_id, self.worker_id):
+                print(f"🛑 JOB WORKER: Job {job_id} cancelled by request")
+                await self._delete_payload(job)
+            else:
+                print(f"⚠️ JOB WORKER: Lost lease on job {job_id} - abandoned to another worker")
+            return
+        except Exception as e:
+            queue_state = await self.repository.release_failed_job(job_id, self.worker_id, str(e))
+            print(f"❌ JOB WORKER: Job {job_id} failed - {e} - now {queue_state}")
+            if queue_state == "dead":
+                await self._delete_payload(job)
+            return
+        finally:
+            heartbeat_task.cancel()
+
+        await self.repository.complete_leased_job(job_id, self.worker_id, result)
+        await self._delete_payload(job)
+        print(f"✅ JOB WORKER: Job {job_id} completed")
+
+    async def _run_handler(self, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Call the handler registered for the job's type. A job payload is first
+        downloaded to a temporary file in UPLOAD_SPOOL_DIR with the extension of the
+        job's original_filename, passed as job["payload_path"] and deleted when the
+        handler returns.
+        """
+        handler = self.handlers.get(job.get("job_type"))
+        if handler is None:
+            raise ValueError(f"No handler registered for job type: {job.get('job_type')}")
+
+        if job.get("payload_id") is None:
+            return await handler(job)
+
+        directory = os.getenv("UPLOAD_SPOOL_DIR") or None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        suffix = os.path.splitext(job.get("original_filename") or "")[1]
+        spool = tempfile.NamedTemporaryFile(prefix="job_payload_", suffix=suffix, dir=directory, delete=False)
+        try:
+            with spool:
+                if not await self.repository.download_job_payload(job["payload_id"], spool):
+                    raise ValueError(f"Payload missing for job {job['job_id']}")
+            job["payload_path"] = spool.name
+            return await handler(job)
+        finally:
+            try:
+                os.unlink(spool.name)
+            except FileNotFoundError:
+                pass
+
+    async def _heartbeat(self, job_id: str, handler_task: asyncio.Task):
+        """
+        Renew the lease periodically; cancel the handler if the lease is lost.
+        A failed renewal is retried at the next beat while the lease is still valid.
+        """
+        renewed_at = time.monotonic()
+        while not handler_task.done():
+            await asyncio.sleep(self.lease_seconds / 3)
+            attempted_at = time.monotonic()
+            try:
+                held = await self.repository.renew_lease(job_id, self.worker_id, self.lease_seconds)
+            except Exception as e:
+                if time.monotonic() - renewed_at < self.lease_seconds:
+                    print(f"⚠️ JOB WORKER: Could not renew lease on job {job_id} - {e} - retrying")
+                    continue
+                print(f"❌ JOB WORKER: Lease on job {job_id} expired while renewals failed - {e}")
+                held = False
+            if not held:
+                handler_task.cancel()
+                return
+            renewed_at = attempted_at
+
+    async def _delete_payload(self, job: Dict[str, Any]):
+        if job.get("payload_id") is not None:
+            await self.repository.delete_job_payload(job["payload_id"])
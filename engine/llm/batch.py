@@ -0,0 +1,230 @@
+"""
+LLM Batch Mode
+Collects completion requests into provider batch jobs (OpenAI-compatible Batch API or
+Anthropic Message Batches), polls them and fans the results back to awaiting callers
+"""
+
+import os
+import json
+import uuid
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+_batch_mode: ContextVar = ContextVar("llm_batch_mode", default=None)
+
+
+@contextmanager
+def batch_mode(enabled: bool = True):
+    """
+    Route LLM completions made inside this block through provider batches.
+
+    Batches trade latency (minutes to hours) for throughput and cost, so use this
+    for bulk re-processing only, and leave the run deadline off (V2_RUN_DEADLINE_SECONDS=0).
+    """
+    token = _batch_mode.set(enabled)
+    try:
+        yield
+    finally:
+        _batch_mode.reset(token)
+
+
+def batch_mode_enabled() -> bool:
+    """Whether completions of the calling task go through batches (LLM_BATCH_MODE sets the default)"""
+    enabled = _batch_mode.get()
+    if enabled is None:
+        return os.getenv("LLM_BATCH_MODE", "false").lower() == "true"
+    return enabled
+
+
+# custom_id -> provider response body, or the error for that request
+BatchResults = Dict[str, Union[Dict[str, Any], Exception]]
+
+
+class OpenAIBatchAPI:
+    """OpenAI Batch API (also served by OpenAI-compatible local servers and the batch stub)"""
+
+    endpoint = "/v1/chat/completions"
+    terminal = {"completed", "failed", "expired", "cancelled"}
+
+    def __init__(self, client):
+        self.client = client
+        self.base_url = client.providers[client.provider]["base_url"]
+
+    def _headers(self, json_body: bool = True) -> Dict[str, str]:
+        headers = self.client._get_auth_headers()
+        if not json_body:
+            headers.pop("Content-Type", None)
+        return headers
+
+    async def _json(self, method: str, url: str, **kwargs) -> Dict[str, Any]:
+        from .client import LLMError
+        response = await self.client._http_client().request(method, url, **kwargs)
+        if response.status_code != 200:
+            raise LLMError(f"Batch API HTTP {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    async def create(self, requests: List[Tuple[str, Dict[str, Any]]]) -> str:
+        lines = [json.dumps({"custom_id": custom_id, "method": "POST", "url": self.endpoint, "body": payload})
+                 for custom_id, payload in requests]
+        upload = await self._json("POST", f"{self.base_url}/files", headers=self._headers(json_body=False),
+                                  data={"purpose": "batch"},
+                                  files={"file": ("batch.jsonl", "\n".join(lines).encode("utf-8"), "application/jsonl")})
+        batch = await self._json("POST", f"{self.base_url}/batches", headers=self._headers(), json={
+            "input_file_id": upload["id"], "endpoint": self.endpoint, "completion_window": "24h"})
+        return batch["id"]
+
+    async def status(self, batch_id: str) -> Tuple[bool, Dict[str, Any]]:
+        batch = await self._json("GET", f"{self.base_url}/batches/{batch_id}", headers=self._headers())
+        return batch.get("status") in self.terminal, batch
+
+    async def results(self, batch: Dict[str, Any]) -> BatchResults:
+        from .client import LLMError
+        if batch.get("status") == "failed" and not batch.get("output_file_id"):
+            errors = (batch.get("errors") or {}).get("data") or []
+            raise LLMError(f"Batch {batch['id']} failed: {errors[0].get('message') if errors else 'unknown error'}")
+
+        results: BatchResults = {}
+        for file_id in (batch.get("output_file_id"), batch.get("error_file_id")):
+            if not file_id:
+                continue
+            response = await self.client._http_client().get(f"{self.base_url}/files/{file_id}/content",
+                                                             headers=self._headers())
+            for line in response.text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                reply = record.get("response") or {}
+                if record.get("error") or reply.get("status_code") != 200:
+                    message = (record.get("error") or {}).get("message") or json.dumps(reply.get("body"))[:200]
+                    results[record["custom_id"]] = LLMError(f"HTTP {reply.get('status_code')}: {message}")
+                else:
+                    results[record["custom_id"]] = reply["body"]
+        return results
+
+    async def cancel(self, batch_id: str):
+        await self._json("POST", f"{self.base_url}/batches/{batch_id}/cancel", headers=self._headers())
+
+
+class AnthropicBatchAPI(OpenAIBatchAPI):
+    """Anthropic Message Batches API"""
+
+    async def create(self, requests: List[Tuple[str, Dict[str, Any]]]) -> str:
+        batch = await self._json("POST", f"{self.base_url}/messages/batches", headers=self._headers(), json={
+            "requests": [{"custom_id": custom_id, "params": payload} for custom_id, payload in requests]})
+        return batch["id"]
+
+    async def status(self, batch_id: str) -> Tuple[bool, Dict[str, Any]]:
+        batch = await self._json("GET", f"{self.base_url}/messages/batches/{batch_id}", headers=self._headers())
+        return batch.get("processing_status") == "ended", batch
+
+    async def results(self, batch: Dict[str, Any]) -> BatchResults:
+        from .client import LLMError
+        response = await self.client._http_client().get(batch["results_url"], headers=self._headers())
+        results: BatchResults = {}
+        for line in response.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            result = record.get("result") or {}
+            if result.get("type") == "succeeded":
+                results[record["custom_id"]] = result["message"]
+            else:
+                message = (result.get("error") or {}).get("message", result.get("type"))
+                results[record["custom_id"]] = LLMError(f"Batch request {result.get('type')}: {message}")
+        return results
+
+    async def cancel(self, batch_id: str):
+        await self._json("POST", f"{self.base_url}/messages/batches/{batch_id}/cancel", headers=self._headers())
+
+
+class BatchSubmitter:
+    """
+    Collects requests for up to max_wait_seconds (or max_batch_size requests),
+    submits them as one batch and polls it; every caller awaits its own result.
+
+    A caller that is cancelled just stops waiting. If every caller of a batch is
+    gone, the batch is cancelled at the provider.
+    """
+
+    def __init__(self, client, max_batch_size: int = None, max_wait_seconds: float = None,
+                 poll_interval: float = None, timeout_seconds: float = None):
+        self.client = client
+        self.api = AnthropicBatchAPI(client) if client.provider == "anthropic" else OpenAIBatchAPI(client)
+        self.max_batch_size = max_batch_size or int(os.getenv("LLM_BATCH_MAX_SIZE", "500"))
+        self.max_wait_seconds = max_wait_seconds if max_wait_seconds is not None else float(
+            os.getenv("LLM_BATCH_MAX_WAIT_SECONDS", "5"))
+        self.poll_interval = poll_interval or float(os.getenv("LLM_BATCH_POLL_INTERVAL", "30"))
+        self.timeout_seconds = timeout_seconds or float(os.getenv("LLM_BATCH_TIMEOUT_SECONDS", "86400"))
+        self._pending: List[Tuple[str, Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._batches = set()
+
+    async def submit(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a request payload for the next batch and wait for its response body"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((f"req-{uuid.uuid4().hex}", payload, future))
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_seconds, self.flush)
+        return await future
+
+    def flush(self):
+        """Submit the collected requests now"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        requests = [request for request in self._pending if not request[2].done()]
+        self._pending = []
+        if requests:
+            task = asyncio.get_running_loop().create_task(self._run_batch(requests))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, requests: List[Tuple[str, Dict[str, Any], asyncio.Future]]):
+        from .client import LLMError
+        batch_id = None
+        try:
+            batch_id = await self.api.create([(custom_id, payload) for custom_id, payload, _ in requests])
+            print(f"📦 LLM Batch: Submitted {batch_id} - {len(requests)} requests to {self.client.provider}")
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.timeout_seconds
+            while True:
+                done, batch = await self.api.status(batch_id)
+                if done:
+                    break
+                if all(future.done() for _, _, future in requests):
+                    print(f"📦 LLM Batch: Every caller of {batch_id} is gone, cancelling it")
+                    await self.api.cancel(batch_id)
+                    return
+                if loop.time() > deadline:
+                    await self.api.cancel(batch_id)
+                    raise LLMError(f"Batch {batch_id} not finished after {self.timeout_seconds:.0f}s")
+                await asyncio.sleep(self.poll_interval)
+
+            results = await self.api.results(batch)
+            print(f"📦 LLM Batch: {batch_id} finished - {len(results)}/{len(requests)} results")
+            for custom_id, _, future in requests:
+                if future.done():
+                    continue
+                outcome = results.get(custom_id)
+                if outcome is None:
+                    future.set_exception(LLMError(f"Batch {batch_id} returned no result for {custom_id}"))
+                elif isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+        except Exception as e:
+            print(f"❌ LLM Batch: {batch_id or 'submission'} failed - {e}")
+            for _, _, future in requests:
+                if not future.done():
+                    future.set_exception(e if isinstance(e, LLMError) else LLMError(f"Batch failed: {e}"))
+        finally:
+            # Stopped while polling (shutdown): callers must not wait forever
+            for _, _, future in requests:
+                if not future.done():
+                    future.set_exception(LLMError(f"Batch {batch_id} polling stopped"))
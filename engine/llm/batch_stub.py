@@ -0,0 +1,130 @@
+"""
+Local stand-in batch server
+A small OpenAI-compatible server (files, batches and chat completions) for tests and
+offline runs of bulk pipelines. Point the local provider at it:
+
+    uvicorn engine.llm.batch_stub:app --port 1234
+    LLM_PROVIDER=local LOCAL_LLM_URL=http://localhost:1234/v1 LLM_BATCH_MODE=true ...
+
+Completions are produced by a respond(body) callable; the default echoes the last
+user message. A respond() that raises fails just that request in the batch output.
+"""
+
+import json
+import time
+import uuid
+import asyncio
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.responses import PlainTextResponse
+
+Responder = Callable[[Dict[str, Any]], str]
+
+
+def echo_responder(body: Dict[str, Any]) -> str:
+    messages = body.get("messages") or [{}]
+    return f"[stub] {messages[-1].get('content', '')}"
+
+
+def _chat_completion(body: Dict[str, Any], text: str) -> Dict[str, Any]:
+    prompt_tokens = sum(len(str(message.get("content", ""))) // 4 for message in body.get("messages", []))
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "local-model"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(text) // 4,
+                  "total_tokens": prompt_tokens + len(text) // 4}
+    }
+
+
+def create_batch_stub_app(respond: Optional[Responder] = None, processing_seconds: float = 0.0) -> FastAPI:
+    """Stand-in server; batches complete processing_seconds after creation"""
+    respond = respond or echo_responder
+    app = FastAPI(title="LLM batch stub")
+    files: Dict[str, bytes] = {}
+    batches: Dict[str, Dict[str, Any]] = {}
+    app.state.files = files
+    app.state.batches = batches
+
+    def store_file(content: bytes, purpose: str) -> Dict[str, Any]:
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        files[file_id] = content
+        return {"id": file_id, "object": "file", "bytes": len(content), "purpose": purpose,
+                "created_at": int(time.time())}
+
+    def store_jsonl(records) -> Optional[str]:
+        if not records:
+            return None
+        return store_file("\n".join(json.dumps(record) for record in records).encode("utf-8"), "batch_output")["id"]
+
+    def run_request(line: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            text = respond(line["body"])
+        except Exception as e:
+            return {"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": line["custom_id"],
+                    "response": {"status_code": 500, "body": {"error": {"message": str(e)}}}, "error": None}
+        return {"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": line["custom_id"],
+                "response": {"status_code": 200, "body": _chat_completion(line["body"], text)}, "error": None}
+
+    async def process(batch_id: str):
+        await asyncio.sleep(processing_seconds)
+        batch = batches[batch_id]
+        if batch["status"] != "in_progress":
+            return
+        lines = [json.loads(line) for line in files[batch["input_file_id"]].decode("utf-8").splitlines() if line.strip()]
+        output = [run_request(line) for line in lines]
+        ok = [record for record in output if record["response"]["status_code"] == 200]
+        failed = [record for record in output if record["response"]["status_code"] != 200]
+        batch["output_file_id"] = store_jsonl(ok)
+        batch["error_file_id"] = store_jsonl(failed)
+        batch["request_counts"] = {"total": len(output), "completed": len(ok), "failed": len(failed)}
+        batch["status"] = "completed"
+        batch["completed_at"] = int(time.time())
+
+    @app.post("/v1/files")
+    async def upload_file(file: UploadFile = File(...), purpose: str = Form(...)):
+        return store_file(await file.read(), purpose)
+
+    @app.get("/v1/files/{file_id}/content")
+    async def file_content(file_id: str):
+        if file_id not in files:
+            raise HTTPException(status_code=404, detail="No such file")
+        return PlainTextResponse(files[file_id].decode("utf-8"))
+
+    @app.post("/v1/batches")
+    async def create_batch(request: Dict[str, Any]):
+        if request.get("input_file_id") not in files:
+            raise HTTPException(status_code=400, detail="Unknown input_file_id")
+        batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+        batches[batch_id] = {"id": batch_id, "object": "batch", "endpoint": request.get("endpoint"),
+                             "input_file_id": request["input_file_id"], "status": "in_progress",
+                             "completion_window": request.get("completion_window", "24h"),
+                             "created_at": int(time.time()), "output_file_id": None, "error_file_id": None}
+        asyncio.get_running_loop().create_task(process(batch_id))
+        return batches[batch_id]
+
+    @app.get("/v1/batches/{batch_id}")
+    async def get_batch(batch_id: str):
+        if batch_id not in batches:
+            raise HTTPException(status_code=404, detail="No such batch")
+        return batches[batch_id]
+
+    @app.post("/v1/batches/{batch_id}/cancel")
+    async def cancel_batch(batch_id: str):
+        if batch_id not in batches:
+            raise HTTPException(status_code=404, detail="No such batch")
+        if batches[batch_id]["status"] == "in_progress":
+            batches[batch_id]["status"] = "cancelled"
+        return batches[batch_id]
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(body: Dict[str, Any]):
+        return _chat_completion(body, respond(body))
+
+    return app
+
+
+app = create_batch_stub_app()
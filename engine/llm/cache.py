@@ -0,0 +1,155 @@
+"""
+LLM Completion Cache
+Content-addressed cache of LLM completions with an in-memory LRU tier and an optional MongoDB tier
+"""
+
+import os
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from ..metrics import LLM_CACHE_LOOKUPS, LLM_CACHE_EVICTIONS
+
+
+class CompletionCache:
+    """
+    Cache of completions keyed on a hash of provider, model, messages, temperature,
+    max_tokens and any extra payload parameters.
+
+    Lookups go to the in-memory LRU first, then to the persistent tier (MongoDB
+    collection with a TTL index) when enabled; persistent hits are promoted to
+    memory. Only calls at or below max_temperature are cached by default, since
+    higher-temperature output is meant to vary; callers can force or bypass caching
+    per call.
+    """
+
+    def __init__(self, enabled: bool = None, max_entries: int = None, max_bytes: int = None,
+                 ttl_seconds: float = None, max_temperature: float = None, persistent: bool = None,
+                 repository=None):
+        self.enabled = enabled if enabled is not None else os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        self.max_entries = max_entries or int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+        self.max_bytes = max_bytes or int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        self.ttl_seconds = ttl_seconds or float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+        self.max_temperature = max_temperature if max_temperature is not None else float(
+            os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.3"))
+        self.persistent = persistent if persistent is not None else os.getenv(
+            "LLM_CACHE_PERSISTENT", "false").lower() == "true"
+        self._repository = repository
+
+        # cache_key -> (completion, expires_at monotonic, size in bytes)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "persistent_hits": 0, "stores": 0, "evictions": 0}
+
+    @property
+    def repository(self):
+        """Persistent cache repository, created on first use"""
+        if self._repository is None:
+            from ..stores.mongo import RepositoryFactory
+            self._repository = RepositoryFactory.get_llm_completion_cache()
+        return self._repository
+
+    def should_cache(self, temperature: float, use_cache: Optional[bool] = None) -> bool:
+        """use_cache=False bypasses the cache, True caches regardless of temperature"""
+        if not self.enabled or use_cache is False:
+            return False
+        return use_cache is True or temperature <= self.max_temperature
+
+    @staticmethod
+    def key(provider: str, model: str, messages: List[Dict[str, str]], temperature: float,
+            max_tokens: int, extra: Optional[Dict[str, Any]] = None) -> str:
+        """Content address of a completion request"""
+        request = {
+            "provider": provider,
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "extra": extra or {}
+        }
+        return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    async def get(self, cache_key: str) -> Optional[str]:
+        """Cached completion, or None on a miss"""
+        entry = self._entries.get(cache_key)
+        if entry is not None:
+            completion, expires_at, _ = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(cache_key)
+                self.stats["hits"] += 1
+                LLM_CACHE_LOOKUPS.inc(tier="memory", result="hit")
+                return completion
+            self._evict(cache_key, "expired")
+        LLM_CACHE_LOOKUPS.inc(tier="memory", result="miss")
+
+        if self.persistent:
+            stored = await self.repository.find_completion(cache_key)
+            if stored and stored.get("completion") is not None:
+                self.stats["hits"] += 1
+                self.stats["persistent_hits"] += 1
+                LLM_CACHE_LOOKUPS.inc(tier="persistent", result="hit")
+                remaining = (stored["expires_at"] - datetime.utcnow()).total_seconds()
+                self._remember(cache_key, stored["completion"], max(remaining, 0))
+                return stored["completion"]
+            LLM_CACHE_LOOKUPS.inc(tier="persistent", result="miss")
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, cache_key: str, completion: str, metadata: Optional[Dict[str, Any]] = None):
+        """Store a completion in memory and, when enabled, in the persistent tier"""
+        self.stats["stores"] += 1
+        self._remember(cache_key, completion, self.ttl_seconds)
+        if self.persistent:
+            await self.repository.store_completion(
+                cache_key, completion, datetime.utcnow() + timedelta(seconds=self.ttl_seconds), metadata)
+
+    def _remember(self, cache_key: str, completion: str, ttl_seconds: float):
+        size = len(completion.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        if cache_key in self._entries:
+            self._evict(cache_key, None)
+        self._entries[cache_key] = (completion, time.monotonic() + ttl_seconds, size)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._evict(next(iter(self._entries)), "capacity")
+
+    def _evict(self, cache_key: str, reason: Optional[str]):
+        _, _, size = self._entries.pop(cache_key)
+        self._bytes -= size
+        if reason:
+            self.stats["evictions"] += 1
+            LLM_CACHE_EVICTIONS.inc(reason=reason)
+
+    def clear(self):
+        """Drop the in-memory tier"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def summary(self) -> Dict[str, Any]:
+        """Hit/miss counters and memory usage, for diagnostics"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "persistent": self.persistent,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0
+        }
+
+
+# Shared by every LLMClient instance (get_llm_client replaces instances)
+_completion_cache = None
+
+def get_completion_cache() -> CompletionCache:
+    """Get or create the process-wide completion cache"""
+    global _completion_cache
+    if _completion_cache is None:
+        _completion_cache = CompletionCache()
+    return _completion_cache
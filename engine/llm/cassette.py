@@ -0,0 +1,158 @@
+"""
+LLM Cassettes
+Record provider responses to a file and replay them without network access, for
+hermetic golden tests and reproducible pipeline benchmarks
+"""
+
+import os
+import json
+import math
+import random
+import asyncio
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+_active_cassette: ContextVar = ContextVar("llm_cassette", default=None)
+
+# Payload fields left out of the request address: the stream flag, and max_tokens,
+# which is derived from the token estimator (a new estimate must not invalidate recordings)
+_UNKEYED_FIELDS = ("stream", "max_tokens")
+
+# Cassettes configured through the environment, by (path, mode, latency, seed)
+_env_cassettes: Dict[tuple, "Cassette"] = {}
+
+
+def latency_model(spec: str, seed: int = 0) -> Callable[[float], float]:
+    """
+    Replay delay from a spec, given the recorded latency:
+
+        none                     no delay
+        recorded                 the latency seen while recording
+        fixed:SECONDS            constant delay
+        uniform:LOW,HIGH         uniformly distributed delay
+        lognormal:MEDIAN,SIGMA   long-tailed delay, like real providers
+
+    Random delays come from a generator seeded with seed, so a replay run is reproducible.
+    """
+    name, _, args = (spec or "none").strip().lower().partition(":")
+    params = [float(value) for value in args.split(",") if value.strip()]
+    rng = random.Random(seed)
+
+    if name == "none":
+        return lambda recorded: 0.0
+    if name == "recorded":
+        return lambda recorded: recorded
+    if name == "fixed" and len(params) == 1:
+        return lambda recorded: params[0]
+    if name == "uniform" and len(params) == 2:
+        return lambda recorded: rng.uniform(params[0], params[1])
+    if name == "lognormal" and len(params) == 2:
+        return lambda recorded: rng.lognormvariate(math.log(params[0]), params[1])
+    raise ValueError(f"Invalid cassette latency spec: {spec}")
+
+
+class Cassette:
+    """
+    Provider responses keyed by a hash of the provider and request payload.
+
+    In record mode real responses are appended and the file is rewritten after
+    each one. In replay mode recorded responses are served instead of calling the
+    provider; identical requests recorded several times are replayed in recorded
+    order (then from the start again).
+    """
+
+    def __init__(self, path: str, mode: str = "replay", latency: str = "none", seed: int = 0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Invalid cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.delay = latency_model(latency, seed)
+        self.interactions: Dict[str, List[Dict[str, Any]]] = {}
+        self._plays: Dict[str, int] = {}
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            if self.mode == "replay":
+                print(f"⚠️ LLM Cassette: {self.path} not found, every request will miss")
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.interactions = json.load(f).get("interactions", {})
+        print(f"📼 LLM Cassette: Loaded {sum(len(entries) for entries in self.interactions.values())} "
+              f"responses from {self.path} ({self.mode})")
+
+    @staticmethod
+    def key(provider: str, payload: Dict[str, Any]) -> str:
+        """Request address; requests differing only in _UNKEYED_FIELDS share recordings"""
+        request = {"provider": provider, "payload": {k: v for k, v in payload.items() if k not in _UNKEYED_FIELDS}}
+        return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    async def replay(self, provider: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Next recorded interaction for the request, after its simulated latency; None on a miss"""
+        key = self.key(provider, payload)
+        entries = self.interactions.get(key)
+        if not entries:
+            self.stats["misses"] += 1
+            return None
+
+        played = self._plays.get(key, 0)
+        self._plays[key] = played + 1
+        self.stats["hits"] += 1
+        entry = entries[played % len(entries)]
+        delay = self.delay(entry.get("latency_seconds", 0.0))
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return entry
+
+    def record(self, provider: str, payload: Dict[str, Any], completion: str,
+               response: Optional[Dict[str, Any]], latency_seconds: float):
+        """Append a real interaction (response is None for streamed requests) and save the file"""
+        self.interactions.setdefault(self.key(provider, payload), []).append({
+            "provider": provider,
+            "model": payload.get("model"),
+            "completion": completion,
+            "response": response,
+            "latency_seconds": round(latency_seconds, 4)
+        })
+        self.stats["recorded"] += 1
+        self.save()
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "interactions": self.interactions}, f, indent=1, sort_keys=True,
+                      ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+
+@contextmanager
+def use_cassette(path: str, mode: str = "replay", latency: str = "none", seed: int = 0):
+    """Record or replay the LLM requests made inside this block"""
+    cassette = Cassette(path, mode, latency, seed)
+    token = _active_cassette.set(cassette)
+    try:
+        yield cassette
+    finally:
+        _active_cassette.reset(token)
+
+
+def current_cassette() -> Optional[Cassette]:
+    """Cassette of the calling task, else the one configured by LLM_CASSETTE_MODE / LLM_CASSETTE_PATH"""
+    cassette = _active_cassette.get()
+    if cassette is not None:
+        return cassette
+
+    mode = os.getenv("LLM_CASSETTE_MODE", "off").lower()
+    if mode not in ("record", "replay"):
+        return None
+    config = (os.getenv("LLM_CASSETTE_PATH", "llm_cassette.json"), mode,
+              os.getenv("LLM_CASSETTE_LATENCY", "none"), int(os.getenv("LLM_CASSETTE_SEED", "0")))
+    if config not in _env_cassettes:
+        _env_cassettes[config] = Cassette(*config)
+    return _env_cassettes[config]
@@ -8,28 +8,120 @@ import time
 import json
 import httpx
 import asyncio
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator, Callable
 from datetime import datetime
 import random
+import inspect
 
 from ..logging_util import stage_log
+from ..run_context import check_current_run, detach_current_run, current_run_context
+from .cache import CompletionCache, get_completion_cache
+from .singleflight import get_single_flight
+from .ratelimit import get_concurrency_governor, parse_retry_after
+from .tokens import estimate_tokens, estimate_message_tokens, output_budget, truncate_to_tokens
+from .failover import get_provider_health
+from .batch import BatchSubmitter, batch_mode_enabled
+from .cassette import Cassette, current_cassette
+from .structured import parse_json, validate_schema
+from ..metrics import LLM_RATE_LIMITED, LLM_HEDGED_REQUESTS, LLM_STRUCTURED_OUTPUTS
 
 class LLMError(Exception):
     """Custom exception for LLM-related errors"""
     pass
 
+class LLMRateLimitError(LLMError):
+    """Provider rejected the request for rate limiting; retry_after is its requested delay, if any"""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class LLMStructuredOutputError(LLMError):
+    """Completion is not valid JSON or does not match the requested schema; text is the raw completion"""
+    
+    def __init__(self, message: str, text: str = ""):
+        super().__init__(message)
+        self.text = text
+
+class LLMCassetteMiss(LLMError):
+    """Replay cassette has no recorded response for the request"""
+    pass
+
+class _Route:
+    """One way to serve a request: a provider client, the model and the payload in that provider's format"""
+    
+    def __init__(self, client: "LLMClient", model: str, payload: Dict[str, Any]):
+        self.client = client
+        self.model = model
+        self.payload = payload
+    
+    @property
+    def name(self) -> str:
+        return f"{self.client.provider}/{self.model}"
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
 class LLMClient:
     """
     Centralized LLM client with provider switching, exponential backoff, 
     timeout controls, and secret redaction in logs
+    
+    Requests go through one long-lived httpx.AsyncClient per provider, so calls
+    reuse pooled keep-alive connections (multiplexed over HTTP/2 when h2 is
+    installed) instead of paying TCP and TLS setup every time. Call aclose() on
+    shutdown to release the connections.
+    
+    With a failover route (LLM_FAILOVER_PROVIDER / LLM_FAILOVER_MODEL, or any
+    other provider with an API key), requests skip a provider whose circuit
+    breaker is open. With LLM_HEDGE_ENABLED, a request still running after the
+    provider's p95 latency (or failing) is raced against the failover route;
+    the first success wins and the other request is cancelled.
+    
+    Inside batch_mode() (or with LLM_BATCH_MODE=true), completions are collected
+    into provider batch jobs instead: much slower, but cheaper and not bound by
+    the synchronous rate limits. Meant for bulk re-processing.
+    
+    Inside use_cassette() (or with LLM_CASSETTE_MODE=record|replay), provider
+    responses are recorded to a cassette file or replayed from it with no
+    network access, for hermetic tests and reproducible benchmarks.
     """
     
-    def __init__(self, provider: Optional[str] = None, timeout: int = 120):
+    def __init__(self, provider: Optional[str] = None, timeout: int = 120, cache: Optional[CompletionCache] = None):
         self.provider = provider or os.getenv("LLM_PROVIDER", "openai")
         self.timeout = timeout
         self.max_retries = 3
         self.base_delay = 1.0  # Base delay for exponential backoff
         
+        # Connection pool settings shared by every provider pool
+        self.pool_limits = httpx.Limits(
+            max_connections=int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "30"))
+        )
+        self.http2 = os.getenv("LLM_HTTP2", "true").lower() == "true"
+        if self.http2 and not _http2_available():
+            print("⚠️ LLMClient: h2 package not installed, using HTTP/1.1 connection pools")
+            self.http2 = False
+        
+        # Provider -> (pooled client, event loop it belongs to)
+        self._http_clients: Dict[str, Any] = {}
+        
+        # Completion cache (shared across client instances unless one is given)
+        self.cache = cache or get_completion_cache()
+        
+        # Identical concurrent requests share one provider call
+        self.single_flight_enabled = os.getenv("LLM_SINGLE_FLIGHT", "true").lower() == "true"
+        self.single_flight = get_single_flight()
+        
+        # Per-provider RPM/TPM budgets and the global in-flight cap (shared across instances)
+        self.governor = get_concurrency_governor()
+        
         # API Keys from environment
         self.openai_key = os.getenv("OPENAI_API_KEY")
         self.anthropic_key = os.getenv("ANTHROPIC_API_KEY")
@@ -57,6 +149,24 @@ class LLMClient:
         # Validate provider configuration
         self._validate_configuration()
         
+        # Failover route for hedging and circuit breaking (breakers/latencies shared across instances)
+        self.health = get_provider_health()
+        self.failover_model = os.getenv("LLM_FAILOVER_MODEL")
+        self.failover_provider = os.getenv("LLM_FAILOVER_PROVIDER") or self._default_failover_provider()
+        self._failover_client: Optional["LLMClient"] = None
+        
+        # Batch submitter and the event loop it belongs to (created on first batch-mode request)
+        self._batch_submitter: Optional[BatchSubmitter] = None
+        self._batch_loop = None
+        self.hedge_enabled = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+        self.hedge_min_delay = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1.0"))
+        # Delay before hedging while too few latencies are known for a p95
+        self.hedge_default_delay = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "15"))
+        
+        # Provider JSON modes for complete_json (OpenAI-compatible local servers vary, so opt-in)
+        self.json_mode = os.getenv("LLM_JSON_MODE", "true").lower() == "true"
+        self.local_json_mode = os.getenv("LOCAL_LLM_JSON_MODE", "false").lower() == "true"
+        
         print(f"🤖 LLMClient initialized - Provider: {self.provider}, Timeout: {timeout}s")
     
     def _validate_configuration(self):
@@ -66,6 +176,11 @@ class LLMClient:
         
         provider_config = self.providers[self.provider]
         
+        cassette = current_cassette()
+        if cassette is not None and cassette.mode == "replay":
+            # Replayed responses need no API key: keep the provider the cassette was recorded with
+            return
+        
         if provider_config["requires_key"]:
             if self.provider == "openai" and not self.openai_key:
                 print(f"⚠️ OpenAI API key not found, falling back to local provider")
@@ -74,6 +189,13 @@ class LLMClient:
                 print(f"⚠️ Anthropic API key not found, falling back to local provider")
                 self.provider = "local"
     
+    def _default_failover_provider(self) -> Optional[str]:
+        """Another provider with an API key, else the same provider when a failover model is set"""
+        for provider, key in (("openai", self.openai_key), ("anthropic", self.anthropic_key)):
+            if provider != self.provider and key:
+                return provider
+        return self.provider if self.failover_model else None
+    
     def _get_auth_headers(self) -> Dict[str, str]:
         """Get authentication headers for the current provider"""
         headers = {"Content-Type": "application/json"}
@@ -112,7 +234,10 @@ class LLMClient:
         user_message: str = None,
         model: str = None,
         temperature: float = 0.7,
-        max_tokens: int = 4000,
+        max_tokens: Optional[int] = None,
+        use_cache: Optional[bool] = None,
+        on_delta: Optional[Callable[[str], Any]] = None,
+        call_type: str = "default",
         **kwargs
     ) -> str:
         """
@@ -124,43 +249,382 @@ class LLMClient:
             user_message: User message content  
             model: Model to use (defaults to provider default)
             temperature: Generation temperature
-            max_tokens: Maximum tokens to generate
+            max_tokens: Maximum tokens to generate; None sizes it for call_type
+                and the prompt (always clamped to the model's context window;
+                LLMError if the prompt leaves less than the call type's floor,
+                see output_budget)
+            use_cache: False bypasses the completion cache and request coalescing,
+                True caches even above the cache temperature limit; None caches
+                low-temperature calls only
+            on_delta: Callback (sync or async) for each text delta; streams the
+                request instead of waiting for the whole completion (see
+                complete_stream for what streamed requests skip)
+            call_type: Kind of call (article, style, outline...) for the output
+                budget and the run's usage ledger
             **kwargs: Additional provider-specific parameters
         
         Returns:
             Generated text completion
         """
         
+        if on_delta is not None:
+            deltas = self.complete_stream(prompt, system_message, user_message, model, temperature, max_tokens,
+                                          use_cache=use_cache, on_delta=on_delta, call_type=call_type, **kwargs)
+            return "".join([delta async for delta in deltas]).strip()
+        
         # Handle different input formats
         messages = self._format_messages(prompt, system_message, user_message)
         
         provider_config = self.providers[self.provider]
         model = model or provider_config["default_model"]
+        max_tokens = output_budget(call_type, estimate_message_tokens(messages), model, max_tokens)
+        ledger = self._current_ledger()
         
-        # Prepare request payload
-        payload = self._prepare_payload(messages, model, temperature, max_tokens, **kwargs)
+        cache_key = None
+        if self.cache.should_cache(temperature, use_cache):
+            cache_key = self.cache.key(self.provider, model, messages, temperature, max_tokens, kwargs)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                print(f"💾 LLM Cache hit - Provider: {self.provider}, Model: {model}, {len(cached)} chars")
+                if ledger is not None:
+                    ledger.record(call_type, self.provider, model, cached=True)
+                return cached
         
-        # Execute request with retries
+        # Prepare request payload (per route: the failover provider may use another format)
+        def build_payload(client: "LLMClient", route_model: str) -> Dict[str, Any]:
+            return client._prepare_payload(messages, route_model, temperature, max_tokens, **kwargs)
+        
+        payload = build_payload(self, model)
+        
+        if not self.single_flight_enabled or use_cache is False:
+            return await self._complete_with_retries(payload, model, cache_key, call_type, ledger, build_payload)
+        
+        # Coalesce with an identical request already in flight (same key as the cache)
+        check_current_run("llm_completion")
+        flight_key = cache_key or self.cache.key(self.provider, model, messages, temperature, max_tokens, kwargs)
+        
+        async def shared_request():
+            # Serves several callers: one caller's cancelled run must not fail the others
+            # (the provider call is charged to the run that started it)
+            detach_current_run()
+            return await self._complete_with_retries(payload, model, cache_key, call_type, ledger, build_payload)
+        
+        return await self.single_flight.do(flight_key, shared_request)
+    
+    async def _complete_with_retries(self, payload: Dict[str, Any], model: str, cache_key: Optional[str],
+                                     call_type: str = "default", ledger=None,
+                                     build_payload: Optional[Callable[["LLMClient", str], Dict[str, Any]]] = None) -> str:
+        """Execute a completion request with retries, cache the result and record it in the run's ledger"""
+        start = time.monotonic()
         for attempt in range(self.max_retries):
+            # Do not start (or retry) a request for a cancelled or expired run
+            check_current_run("llm_completion")
             try:
                 print(f"🤖 LLM Request - Provider: {self.provider}, Model: {model}, Attempt: {attempt + 1}")
                 
-                response = await self._make_request(payload)
-                result = self._extract_completion(response)
+                route, response, result = await self._routed_request(
+                    _Route(self, model, payload), call_type, build_payload)
                 
-                print(f"✅ LLM Success - {len(result)} chars generated")
+                print(f"✅ LLM Success - {len(result)} chars generated by {route.name}")
+                if ledger is not None:
+                    prompt_tokens, completion_tokens, estimated = self._usage(response, route.payload, result)
+                    ledger.record(call_type, route.client.provider, route.model, prompt_tokens, completion_tokens,
+                                  latency_seconds=time.monotonic() - start, retries=attempt, estimated_usage=estimated)
+                if cache_key:
+                    await self.cache.set(cache_key, result, {"provider": route.client.provider, "model": route.model})
                 return result
                 
             except Exception as e:
                 print(f"⚠️ LLM Attempt {attempt + 1} failed: {str(e)}")
                 
-                if attempt < self.max_retries - 1:
-                    delay = self._exponential_backoff(attempt)
+                if attempt < self.max_retries - 1 and not isinstance(e, LLMCassetteMiss):
+                    delay = self._retry_delay(e, attempt)
                     print(f"⏳ Retrying in {delay:.1f}s...")
                     await asyncio.sleep(delay)
                 else:
                     print(f"❌ LLM failed after {self.max_retries} attempts")
+                    if ledger is not None:
+                        ledger.record(call_type, self.provider, model, self._prompt_tokens(payload),
+                                      latency_seconds=time.monotonic() - start, retries=attempt,
+                                      estimated_usage=True, error=str(e))
+                    raise LLMError(f"LLM completion failed: {str(e)}")
+    
+    async def _routed_request(self, primary: _Route, call_type: str,
+                              build_payload: Optional[Callable[["LLMClient", str], Dict[str, Any]]] = None):
+        """
+        Send a request on a healthy route and return (route, response, text).
+        
+        A provider whose circuit breaker is open is skipped for the failover route.
+        With hedging, the failover route is started once the primary is slower
+        than its p95 latency or has failed; the first success wins and the other
+        request is cancelled.
+        """
+        if batch_mode_enabled():
+            # Batches have their own quotas and latency profile: no hedging, in-flight slots or breaker
+            response = await self._batch().submit(primary.payload)
+            return primary, response, self._extract_completion(response)
+        
+        failover = self._failover_route(build_payload)
+        if failover is not None and failover.client.provider != self.provider \
+                and self.health.breaker(failover.client.provider).state == "closed" \
+                and not self.health.breaker(self.provider).allow():
+            print(f"🔀 LLM Failover: {self.provider} circuit open, sending to {failover.name}")
+            primary, failover = failover, None
+        
+        if failover is None or not self.hedge_enabled:
+            return (primary, *await primary.client._send(primary, call_type))
+        
+        first = asyncio.ensure_future(primary.client._send(primary, call_type))
+        routes = {first: primary}
+        pending = {first}
+        hedged = False
+        error = None
+        try:
+            while pending:
+                timeout = None if hedged else self._hedge_delay(primary.client.provider, call_type)
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if hedged:
+                            LLM_HEDGED_REQUESTS.inc(provider=primary.client.provider,
+                                                    winner="primary" if task is first else "hedge")
+                        return (routes[task], *task.result())
+                    error = task.exception()
+                
+                if not hedged:
+                    hedged = True
+                    reason = f"failed ({error})" if error else f"still running after {timeout:.1f}s"
+                    print(f"🏁 LLM Hedge: {primary.name} {reason}, sending to {failover.name}")
+                    hedge = asyncio.ensure_future(failover.client._send(failover, call_type))
+                    routes[hedge] = failover
+                    pending.add(hedge)
+            raise error
+        finally:
+            # Cancel the losing request (or both, if the caller was cancelled)
+            for task in routes:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*routes, return_exceptions=True)
+    
+    async def _send(self, route: _Route, call_type: str):
+        """One request to this client's provider, counted by its circuit breaker and latency tracker"""
+        breaker = self.health.breaker(self.provider)
+        try:
+            async with self.governor.slot(self.provider, self._estimate_request_tokens(route.payload)):
+                start = time.monotonic()
+                try:
+                    response = await self._make_request(route.payload)
+                    result = self._extract_completion(response)
+                except Exception:
+                    breaker.record(False)
+                    raise
+        except asyncio.CancelledError:
+            # A lost hedge or cancelled run says nothing about the provider
+            breaker.release()
+            raise
+        breaker.record(True)
+        self.health.latency(self.provider, call_type).observe(time.monotonic() - start)
+        return response, result
+    
+    def _batch(self) -> BatchSubmitter:
+        """Batch submitter for this provider, created on first use in the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._batch_submitter is None or self._batch_loop is not loop:
+            self._batch_submitter = BatchSubmitter(self)
+            self._batch_loop = loop
+        return self._batch_submitter
+    
+    def _hedge_delay(self, provider: str, call_type: str) -> float:
+        """Seconds before hedging: the provider's p95 latency for this call type"""
+        p95 = self.health.latency(provider, call_type).percentile(0.95)
+        if p95 is None:
+            return self.hedge_default_delay
+        return max(self.hedge_min_delay, p95)
+    
+    def _failover_route(self, build_payload) -> Optional[_Route]:
+        """Route on the failover provider/model, or None when none is configured or usable"""
+        if build_payload is None or self.failover_provider is None:
+            return None
+        
+        if self._failover_client is None:
+            if self.failover_provider == self.provider:
+                self._failover_client = self
+            else:
+                client = LLMClient(provider=self.failover_provider, timeout=self.timeout, cache=self.cache)
+                if client.provider != self.failover_provider:
+                    print(f"⚠️ LLM Failover: {self.failover_provider} is not configured, failover disabled")
+                    self.failover_provider = None
+                    return None
+                self._failover_client = client
+        
+        client = self._failover_client
+        model = self.failover_model or client.providers[client.provider]["default_model"]
+        return _Route(client, model, build_payload(client, model))
+    
+    async def complete_stream(
+        self,
+        prompt: str = None,
+        system_message: str = None,
+        user_message: str = None,
+        model: str = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        use_cache: Optional[bool] = None,
+        on_delta: Optional[Callable[[str], Any]] = None,
+        call_type: str = "default",
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a completion as text deltas (OpenAI, Anthropic and local providers)
+        
+        Takes the same arguments as complete(). Each delta is also passed to
+        on_delta (sync or async) before it is yielded. A cached completion is
+        yielded as a single delta. Failures before the first delta are retried;
+        once deltas were delivered a failure raises LLMError instead.
+        
+        A stream stays on this client's provider: it is not coalesced with
+        identical in-flight requests, hedged or failed over (deltas already
+        delivered cannot be taken back), though its outcome still counts toward
+        the provider's circuit breaker. In batch mode the request goes through
+        complete() and the whole completion is yielded as a single delta.
+        """
+        if batch_mode_enabled():
+            result = await self.complete(prompt, system_message, user_message, model, temperature, max_tokens,
+                                         use_cache=use_cache, call_type=call_type, **kwargs)
+            await self._notify_delta(on_delta, result)
+            yield result
+            return
+        
+        messages = self._format_messages(prompt, system_message, user_message)
+        model = model or self.providers[self.provider]["default_model"]
+        max_tokens = output_budget(call_type, estimate_message_tokens(messages), model, max_tokens)
+        ledger = self._current_ledger()
+        
+        cache_key = None
+        if self.cache.should_cache(temperature, use_cache):
+            cache_key = self.cache.key(self.provider, model, messages, temperature, max_tokens, kwargs)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                print(f"💾 LLM Cache hit (stream) - Provider: {self.provider}, Model: {model}, {len(cached)} chars")
+                if ledger is not None:
+                    ledger.record(call_type, self.provider, model, cached=True)
+                await self._notify_delta(on_delta, cached)
+                yield cached
+                return
+        
+        payload = self._prepare_payload(messages, model, temperature, max_tokens, stream=True, **kwargs)
+        estimated_tokens = self._estimate_request_tokens(payload)
+        breaker = self.health.breaker(self.provider)
+        chunks = []
+        start = time.monotonic()
+        
+        for attempt in range(self.max_retries):
+            check_current_run("llm_completion")
+            try:
+                print(f"🤖 LLM Stream - Provider: {self.provider}, Model: {model}, Attempt: {attempt + 1}")
+                
+                async with self.governor.slot(self.provider, estimated_tokens):
+                    async for delta in self._stream_request(payload):
+                        chunks.append(delta)
+                        await self._notify_delta(on_delta, delta)
+                        yield delta
+                breaker.record(True)
+                break
+                
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
+            except Exception as e:
+                breaker.record(False)
+                if chunks or attempt == self.max_retries - 1:
+                    if ledger is not None:
+                        ledger.record(call_type, self.provider, model, self._prompt_tokens(payload),
+                                      estimate_tokens("".join(chunks)), latency_seconds=time.monotonic() - start,
+                                      retries=attempt, estimated_usage=True, error=str(e))
+                if chunks:
+                    # Retrying would repeat deltas the caller already received
+                    print(f"❌ LLM Stream interrupted after {sum(len(c) for c in chunks)} chars: {str(e)}")
+                    raise LLMError(f"LLM stream interrupted: {str(e)}")
+                
+                print(f"⚠️ LLM Stream attempt {attempt + 1} failed: {str(e)}")
+                if attempt < self.max_retries - 1 and not isinstance(e, LLMCassetteMiss):
+                    delay = self._retry_delay(e, attempt)
+                    print(f"⏳ Retrying in {delay:.1f}s...")
+                    await asyncio.sleep(delay)
+                else:
+                    print(f"❌ LLM stream failed after {self.max_retries} attempts")
                     raise LLMError(f"LLM completion failed: {str(e)}")
+        
+        result = "".join(chunks)
+        print(f"✅ LLM Stream complete - {len(result)} chars in {len(chunks)} deltas")
+        if ledger is not None:
+            # Stream events carry no usage here: token counts are estimates
+            ledger.record(call_type, self.provider, model, self._prompt_tokens(payload), estimate_tokens(result),
+                          latency_seconds=time.monotonic() - start, retries=attempt, estimated_usage=True)
+        if cache_key and result.strip():
+            # Cached like a non-streamed completion, so both paths serve the same text
+            await self.cache.set(cache_key, result.strip(), {"provider": self.provider, "model": model})
+    
+    async def complete_json(
+        self,
+        prompt: str = None,
+        system_message: str = None,
+        user_message: str = None,
+        schema: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Generate a JSON completion and return it parsed
+        
+        Uses the provider's structured output (OpenAI json_schema / JSON mode,
+        an assistant "{" prefill for Anthropic) and repairs common defects
+        locally in one pass: code fences, surrounding prose, trailing commas and
+        output truncated at max_tokens. The result is checked against schema
+        (type, enum, required, properties, items) when one is given.
+        
+        Takes the same other arguments as complete(). Raises
+        LLMStructuredOutputError (with the raw text) when the completion is not
+        usable, so stages can fall back without another LLM call.
+        """
+        if not any("json" in (text or "").lower() for text in (prompt, system_message, user_message)):
+            # OpenAI JSON mode requires the word in the messages
+            if prompt:
+                prompt = f"{prompt}\n\nRespond with JSON only."
+            else:
+                system_message = f"{system_message or ''}\n\nRespond with JSON only."
+        
+        text = await self.complete(prompt, system_message, user_message, json_schema=schema or {}, **kwargs)
+        try:
+            value, repaired = parse_json(text)
+        except ValueError as e:
+            LLM_STRUCTURED_OUTPUTS.inc(outcome="invalid")
+            raise LLMStructuredOutputError(f"LLM response is not valid JSON: {e}", text)
+        
+        errors = validate_schema(value, schema) if schema else []
+        if errors:
+            LLM_STRUCTURED_OUTPUTS.inc(outcome="invalid")
+            raise LLMStructuredOutputError(f"LLM JSON does not match schema: {'; '.join(errors[:5])}", text)
+        
+        LLM_STRUCTURED_OUTPUTS.inc(outcome="repaired" if repaired else "parsed")
+        if repaired:
+            print(f"🩹 LLM JSON repaired locally - {len(text)} chars")
+        return value
+    
+    @staticmethod
+    async def _notify_delta(on_delta: Optional[Callable[[str], Any]], delta: str):
+        if on_delta is not None:
+            result = on_delta(delta)
+            if inspect.isawaitable(result):
+                await result
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Seconds before retrying: the provider's Retry-After for rate limits, else exponential backoff"""
+        if isinstance(error, LLMRateLimitError):
+            # Honor the provider's delay and hold back every other caller of this provider too
+            delay = error.retry_after if error.retry_after is not None else self._exponential_backoff(attempt)
+            self.governor.limiter(self.provider).pause(delay)
+            return delay
+        return self._exponential_backoff(attempt)
     
     def _format_messages(self, prompt: str = None, system_message: str = None, user_message: str = None) -> List[Dict[str, str]]:
         """Format messages for LLM provider"""
@@ -181,8 +645,10 @@ class LLMClient:
         
         return messages
     
-    def _prepare_payload(self, messages: List[Dict[str, str]], model: str, temperature: float, max_tokens: int, **kwargs) -> Dict[str, Any]:
-        """Prepare provider-specific request payload"""
+    def _prepare_payload(self, messages: List[Dict[str, str]], model: str, temperature: float, max_tokens: int,
+                         stream: bool = False, json_schema: Optional[Dict[str, Any]] = None,
+                         **kwargs) -> Dict[str, Any]:
+        """Prepare provider-specific request payload (json_schema: see complete_json)"""
         base_payload = {
             "model": model,
             "temperature": temperature,
@@ -193,7 +659,7 @@ class LLMClient:
             payload = {
                 **base_payload,
                 "messages": messages,
-                "stream": False
+                "stream": stream
             }
         elif self.provider == "anthropic":
             # Anthropic has different message format
@@ -215,6 +681,10 @@ class LLMClient:
             
             if system_content:
                 payload["system"] = system_content
+            
+            if json_schema is not None and self.json_mode and json_schema.get("type", "object") == "object":
+                # No JSON mode: prefill the reply with "{" (parse_json restores it)
+                payload["messages"] = user_messages + [{"role": "assistant", "content": "{"}]
                 
         else:  # local or other providers
             payload = {
@@ -222,30 +692,170 @@ class LLMClient:
                 "messages": messages
             }
         
+        if json_schema is not None and self.json_mode and (self.provider == "openai" or self.local_json_mode):
+            payload["response_format"] = self._response_format(json_schema)
+        
+        if stream:
+            payload["stream"] = True
+        
         # Add any additional kwargs
         payload.update(kwargs)
         
         return payload
     
-    async def _make_request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Make HTTP request to LLM provider"""
+    @staticmethod
+    def _response_format(json_schema: Dict[str, Any]) -> Dict[str, Any]:
+        """OpenAI response_format: structured output for a schema, else JSON mode"""
+        if not json_schema:
+            return {"type": "json_object"}
+        return {"type": "json_schema", "json_schema": {"name": "response", "schema": json_schema, "strict": False}}
+    
+    def _completion_url(self) -> str:
+        """Completion endpoint of the current provider"""
         provider_config = self.providers[self.provider]
         
         if self.provider == "anthropic":
-            url = f"{provider_config['base_url']}/messages"
-        else:
-            url = f"{provider_config['base_url']}/chat/completions"
+            return f"{provider_config['base_url']}/messages"
+        return f"{provider_config['base_url']}/chat/completions"
+    
+    def _check_response(self, response, text: str):
+        """Feed rate limit headers to the limiter and raise for unsuccessful responses"""
+        self.governor.limiter(self.provider).update_from_headers(response.headers)
+        
+        if response.status_code in (429, 503):
+            LLM_RATE_LIMITED.inc(provider=self.provider)
+            raise LLMRateLimitError(f"HTTP {response.status_code}: {self._redact_secrets(text)}",
+                                    parse_retry_after(response.headers.get("retry-after")))
+        
+        if response.status_code != 200:
+            raise LLMError(f"HTTP {response.status_code}: {self._redact_secrets(text)}")
+    
+    async def _make_request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Make HTTP request to LLM provider"""
+        cassette = current_cassette()
+        if cassette is not None and cassette.mode == "replay":
+            entry = await self._replay(cassette, payload)
+            return entry["response"] or self._response_body(entry["completion"])
         
         headers = self._get_auth_headers()
+        start = time.monotonic()
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(url, headers=headers, json=payload)
-            
-            if response.status_code != 200:
-                error_text = self._redact_secrets(response.text)
-                raise LLMError(f"HTTP {response.status_code}: {error_text}")
+        response = await self._http_client().post(self._completion_url(), headers=headers, json=payload)
+        self._check_response(response, response.text if response.status_code != 200 else "")
+        
+        body = response.json()
+        if cassette is not None:
+            cassette.record(self.provider, payload, self._extract_completion(body), body, time.monotonic() - start)
+        return body
+    
+    async def _stream_request(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """Make a streaming HTTP request and yield text deltas from its server-sent events"""
+        cassette = current_cassette()
+        if cassette is not None and cassette.mode == "replay":
+            completion = (await self._replay(cassette, payload))["completion"]
+            for i in range(0, len(completion), 64):
+                yield completion[i:i + 64]
+            return
+        
+        headers = self._get_auth_headers()
+        start = time.monotonic()
+        deltas = []
+        
+        async with self._http_client().stream("POST", self._completion_url(), headers=headers, json=payload) as response:
+            error_text = (await response.aread()).decode("utf-8", "replace") if response.status_code != 200 else ""
+            self._check_response(response, error_text)
             
-            return response.json()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                delta = self._extract_stream_delta(json.loads(data))
+                if delta:
+                    deltas.append(delta)
+                    yield delta
+        
+        if cassette is not None:
+            cassette.record(self.provider, payload, "".join(deltas), None, time.monotonic() - start)
+    
+    async def _replay(self, cassette: Cassette, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Recorded interaction for a request, or LLMCassetteMiss"""
+        entry = await cassette.replay(self.provider, payload)
+        if entry is None:
+            raise LLMCassetteMiss(f"No recorded {self.provider} response in cassette {cassette.path} "
+                                  f"(record it with LLM_CASSETTE_MODE=record)")
+        return entry
+    
+    def _response_body(self, completion: str) -> Dict[str, Any]:
+        """Provider response body for a completion recorded from a stream"""
+        if self.provider == "anthropic":
+            return {"content": [{"type": "text", "text": completion}]}
+        return {"choices": [{"message": {"role": "assistant", "content": completion}}]}
+    
+    def _extract_stream_delta(self, event: Dict[str, Any]) -> Optional[str]:
+        """Extract the text delta from a provider stream event"""
+        if self.provider == "anthropic":
+            if event.get("type") == "error":
+                raise LLMError(f"Stream error: {event.get('error', {}).get('message', event)}")
+            if event.get("type") == "content_block_delta":
+                return event.get("delta", {}).get("text")
+            return None
+        
+        choices = event.get("choices") or []
+        if choices:
+            return (choices[0].get("delta") or {}).get("content")
+        return None
+    
+    def _prompt_tokens(self, payload: Dict[str, Any]) -> int:
+        """Estimated prompt tokens of a request payload"""
+        return estimate_tokens(payload.get("system", "")) + estimate_message_tokens(payload.get("messages", []))
+    
+    def _estimate_request_tokens(self, payload: Dict[str, Any]) -> int:
+        """Token cost of a request for TPM budgeting: prompt tokens plus max_tokens"""
+        return self._prompt_tokens(payload) + int(payload.get("max_tokens", 0))
+    
+    def _usage(self, response: Dict[str, Any], payload: Dict[str, Any], result: str):
+        """(prompt_tokens, completion_tokens, estimated) from the provider's usage block, else estimated"""
+        usage = response.get("usage") if isinstance(response, dict) else None
+        if isinstance(usage, dict):
+            prompt_tokens = usage.get("prompt_tokens", usage.get("input_tokens"))
+            completion_tokens = usage.get("completion_tokens", usage.get("output_tokens"))
+            if prompt_tokens is not None and completion_tokens is not None:
+                return int(prompt_tokens), int(completion_tokens), False
+        return self._prompt_tokens(payload), estimate_tokens(result), True
+    
+    @staticmethod
+    def _current_ledger():
+        """Usage ledger of the calling run, if any"""
+        run_context = current_run_context()
+        return run_context.llm_ledger if run_context is not None else None
+    
+    def _http_client(self, provider: Optional[str] = None) -> httpx.AsyncClient:
+        """Pooled HTTP client for a provider, created on first use in the running event loop"""
+        provider = provider or self.provider
+        loop = asyncio.get_running_loop()
+        
+        client, client_loop = self._http_clients.get(provider, (None, None))
+        # Pooled connections belong to the loop that opened them; a new loop (worker, tests) needs its own pool
+        if client is None or client.is_closed or client_loop is not loop:
+            client = httpx.AsyncClient(timeout=self.timeout, limits=self.pool_limits, http2=self.http2)
+            self._http_clients[provider] = (client, loop)
+            print(f"🔌 LLMClient: Opened connection pool for {provider} - HTTP/{'2' if self.http2 else '1.1'}, "
+                  f"max {self.pool_limits.max_connections} connections")
+        
+        return client
+    
+    async def aclose(self):
+        """Close every provider connection pool (app shutdown)"""
+        if self._failover_client is not None and self._failover_client is not self:
+            await self._failover_client.aclose()
+        loop = asyncio.get_running_loop()
+        clients, self._http_clients = self._http_clients, {}
+        for provider, (client, client_loop) in clients.items():
+            if client_loop is loop and not client.is_closed:
+                await client.aclose()
+                print(f"🔌 LLMClient: Closed connection pool for {provider}")
     
     def _extract_completion(self, response: Dict[str, Any]) -> str:
         """Extract completion text from provider response"""
@@ -281,37 +891,36 @@ class LLMClient:
             headers = self._get_auth_headers()
             payload = {"input": text}
             
-            async with httpx.AsyncClient(timeout=30) as client:
-                response = await client.post(url, headers=headers, json=payload)
-                
-                if response.status_code != 200:
-                    return {"ok": False, "error": f"HTTP {response.status_code}"}
-                
-                data = response.json()
-                result = data["results"][0]
-                
-                return {
-                    "ok": not result["flagged"],
-                    "categories": result.get("categories", {}),
-                    "category_scores": result.get("category_scores", {})
-                }
+            response = await self._http_client("openai").post(url, headers=headers, json=payload, timeout=30)
+            
+            if response.status_code != 200:
+                return {"ok": False, "error": f"HTTP {response.status_code}"}
+            
+            data = response.json()
+            result = data["results"][0]
+            
+            return {
+                "ok": not result["flagged"],
+                "categories": result.get("categories", {}),
+                "category_scores": result.get("category_scores", {})
+            }
                 
         except Exception as e:
             print(f"⚠️ Moderation check failed: {str(e)}")
             return {"ok": True, "error": str(e)}  # Fail open
     
-    @stage_log
+    @stage_log("llm_analyze_content")
     async def analyze_content(self, content: str, analysis_type: str = "general") -> Dict[str, Any]:
         """High-level content analysis wrapper"""
         from .prompts import CONTENT_ANALYSIS_PROMPT
         
         prompt = CONTENT_ANALYSIS_PROMPT.format(
             analysis_type=analysis_type,
-            content=content[:8000]  # Limit content length
+            content=truncate_to_tokens(content, int(os.getenv("LLM_CONTENT_ANALYSIS_TOKENS", "2000")))
         )
         
         try:
-            result = await self.complete(prompt=prompt, temperature=0.3)
+            result = await self.complete(prompt=prompt, temperature=0.3, call_type="content_analysis")
             return {
                 "analysis": result,
                 "analysis_type": analysis_type,
@@ -337,6 +946,18 @@ def get_llm_client(provider: Optional[str] = None, **kwargs) -> LLMClient:
     
     # Always create new instance if provider is specified
     if provider or _llm_client_instance is None:
+        previous = _llm_client_instance
         _llm_client_instance = LLMClient(provider=provider, **kwargs)
+        if previous is not None and previous._http_clients:
+            # Release the replaced client's connection pools
+            try:
+                asyncio.get_running_loop().create_task(previous.aclose())
+            except RuntimeError:
+                pass
     
-    return _llm_client_instance
\ No newline at end of file
+    return _llm_client_instance
+
+async def close_llm_client():
+    """Close the global LLM client's connection pools (app shutdown)"""
+    if _llm_client_instance is not None:
+        await _llm_client_instance.aclose()
\ No newline at end of file
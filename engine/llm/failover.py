@@ -0,0 +1,134 @@
+"""
+LLM Provider Health
+Circuit breakers and latency percentiles that drive request hedging and failover
+"""
+
+import os
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+from ..metrics import LLM_CIRCUIT_OPEN
+
+
+class CircuitBreaker:
+    """
+    Opens when a provider's error rate over the last window_seconds reaches
+    error_rate (after at least min_requests), so callers route around it. After
+    cooldown_seconds one probe request is allowed through; its outcome closes
+    or re-opens the breaker.
+    """
+
+    def __init__(self, provider: str, error_rate: float = None, min_requests: int = None,
+                 window_seconds: float = None, cooldown_seconds: float = None):
+        self.provider = provider
+        self.error_rate = error_rate if error_rate is not None else float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+        self.min_requests = min_requests or int(os.getenv("LLM_BREAKER_MIN_REQUESTS", "10"))
+        self.window_seconds = window_seconds or float(os.getenv("LLM_BREAKER_WINDOW_SECONDS", "60"))
+        self.cooldown_seconds = cooldown_seconds if cooldown_seconds is not None else float(
+            os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+        self._outcomes = deque()
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.cooldown_seconds:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        """Whether a request may go to this provider now (takes the probe slot when half-open)"""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open" or self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def release(self):
+        """A request ended without a verdict (cancelled): free the probe slot for the next one"""
+        self._probe_in_flight = False
+
+    def record(self, ok: bool):
+        now = time.monotonic()
+        if self._opened_at is not None:
+            # Any answer while open decides: a success closes, a failure restarts the cooldown
+            self._probe_in_flight = False
+            if ok:
+                self._close()
+            else:
+                self._opened_at = now
+            return
+
+        self._outcomes.append((now, ok))
+        while self._outcomes and self._outcomes[0][0] < now - self.window_seconds:
+            self._outcomes.popleft()
+        failures = sum(1 for _, outcome in self._outcomes if not outcome)
+        if len(self._outcomes) >= self.min_requests and failures / len(self._outcomes) >= self.error_rate:
+            self._open(now, failures)
+
+    def _open(self, now: float, failures: int):
+        print(f"🔌 LLM Circuit breaker: {self.provider} opened - {failures}/{len(self._outcomes)} "
+              f"requests failed in {self.window_seconds:.0f}s")
+        self._opened_at = now
+        self._outcomes.clear()
+        LLM_CIRCUIT_OPEN.set(1, provider=self.provider)
+
+    def _close(self):
+        print(f"🔌 LLM Circuit breaker: {self.provider} closed")
+        self._opened_at = None
+        LLM_CIRCUIT_OPEN.set(0, provider=self.provider)
+
+
+class LatencyTracker:
+    """Recent request latencies, for the hedging delay"""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=size)
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The q-quantile of recent latencies, or None until min_samples were seen"""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ProviderHealth:
+    """Breaker per provider and latency per (provider, call type), shared by every client"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latencies: Dict[Tuple[str, str], LatencyTracker] = {}
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        if provider not in self._breakers:
+            self._breakers[provider] = CircuitBreaker(provider)
+        return self._breakers[provider]
+
+    def latency(self, provider: str, call_type: str) -> LatencyTracker:
+        key = (provider, call_type)
+        if key not in self._latencies:
+            self._latencies[key] = LatencyTracker()
+        return self._latencies[key]
+
+    def summary(self) -> Dict[str, str]:
+        return {provider: breaker.state for provider, breaker in self._breakers.items()}
+
+
+_provider_health = None
+
+def get_provider_health() -> ProviderHealth:
+    """Get or create the process-wide provider health registry"""
+    global _provider_health
+    if _provider_health is None:
+        _provider_health = ProviderHealth()
+    return _provider_health
@@ -0,0 +1,77 @@
+"""
+LLM Usage Ledger
+Per-run record of prompt/completion tokens, latency, retries and estimated cost of LLM calls
+"""
+
+from typing import Any, Dict, List, Optional
+
+# USD per million (prompt, completion) tokens; unknown models are not priced
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "claude-3-5-sonnet-20241022": (3.00, 15.00),
+    "local-model": (0.0, 0.0),
+}
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return None
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+class LLMLedger:
+    """
+    LLM calls of one run. Provider-reported usage is used when the response has
+    it, otherwise token counts are estimates (estimated_usage=True).
+    """
+
+    def __init__(self):
+        self.entries: List[Dict[str, Any]] = []
+
+    def record(self, call_type: str, provider: str, model: str, prompt_tokens: int = 0,
+               completion_tokens: int = 0, latency_seconds: float = 0.0, retries: int = 0,
+               cached: bool = False, estimated_usage: bool = False, error: Optional[str] = None):
+        self.entries.append({
+            "call_type": call_type,
+            "provider": provider,
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "latency_seconds": round(latency_seconds, 3),
+            "retries": retries,
+            "cached": cached,
+            "estimated_usage": estimated_usage,
+            "cost_usd": estimate_cost(model, prompt_tokens, completion_tokens),
+            "error": error
+        })
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals for the run and per call type"""
+        by_call_type: Dict[str, Dict[str, Any]] = {}
+        for entry in self.entries:
+            totals = by_call_type.setdefault(entry["call_type"], _empty_totals())
+            _add(totals, entry)
+
+        totals = _empty_totals()
+        for entry in self.entries:
+            _add(totals, entry)
+        totals["by_call_type"] = by_call_type
+        return totals
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {"calls": 0, "cached_calls": 0, "failed_calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+            "latency_seconds": 0.0, "retries": 0, "cost_usd": 0.0}
+
+
+def _add(totals: Dict[str, Any], entry: Dict[str, Any]):
+    totals["calls"] += 1
+    totals["cached_calls"] += int(entry["cached"])
+    totals["failed_calls"] += int(entry["error"] is not None)
+    totals["prompt_tokens"] += entry["prompt_tokens"]
+    totals["completion_tokens"] += entry["completion_tokens"]
+    totals["latency_seconds"] = round(totals["latency_seconds"] + entry["latency_seconds"], 3)
+    totals["retries"] += entry["retries"]
+    totals["cost_usd"] = round(totals["cost_usd"] + (entry["cost_usd"] or 0.0), 6)
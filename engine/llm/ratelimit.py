@@ -0,0 +1,235 @@
+"""
+LLM Rate Limiting
+Per-provider request and token budgets plus a global cap on in-flight requests
+"""
+
+import os
+import time
+import asyncio
+import weakref
+from collections.abc import Mapping
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from ..metrics import LLM_QUEUE_DEPTH, LLM_IN_FLIGHT, LLM_QUEUE_WAIT
+
+# Default quotas per minute; override with LLM_RPM_<PROVIDER> / LLM_TPM_<PROVIDER> (0 = unlimited)
+DEFAULT_LIMITS = {
+    "openai": {"rpm": 500, "tpm": 200000},
+    "anthropic": {"rpm": 50, "tpm": 40000},
+    "local": {"rpm": 0, "tpm": 0},
+}
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at rate_per_minute, holding at most one
+    minute's quota. Callers reserve tokens up front and sleep off any deficit, so
+    waiters are served in arrival order without a lock.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = float(rate_per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take amount tokens; returns the seconds to wait before using them"""
+        amount = min(amount, self.capacity)
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens -= amount
+        wait = -self._tokens / self.rate_per_second if self._tokens < 0 else 0.0
+        return max(wait, self._paused_until - now)
+
+    def refund(self, amount: float):
+        """Return reserved tokens that were not used (cancelled waiter)"""
+        self._tokens = min(self.capacity, self._tokens + min(amount, self.capacity))
+
+    def pause(self, seconds: float):
+        """Hold every caller back for seconds (provider asked us to back off)"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def drain(self):
+        """Provider reports the quota exhausted: start refilling from empty"""
+        self._refill(time.monotonic())
+        self._tokens = min(self._tokens, 0.0)
+
+
+class ProviderRateLimiter:
+    """Requests/min and tokens/min budgets of one provider"""
+
+    def __init__(self, provider: str, rpm: float = None, tpm: float = None):
+        defaults = DEFAULT_LIMITS.get(provider, {"rpm": 0, "tpm": 0})
+        self.provider = provider
+        self.rpm = rpm if rpm is not None else float(os.getenv(f"LLM_RPM_{provider.upper()}", defaults["rpm"]))
+        self.tpm = tpm if tpm is not None else float(os.getenv(f"LLM_TPM_{provider.upper()}", defaults["tpm"]))
+        self.requests = TokenBucket(self.rpm) if self.rpm > 0 else None
+        self.tokens = TokenBucket(self.tpm) if self.tpm > 0 else None
+
+    def _buckets(self):
+        return [bucket for bucket in (self.requests, self.tokens) if bucket is not None]
+
+    async def acquire(self, estimated_tokens: int):
+        """Wait until the provider budget allows a request of estimated_tokens"""
+        reserved = []
+        try:
+            wait = 0.0
+            if self.requests is not None:
+                wait = max(wait, self.requests.reserve(1))
+                reserved.append((self.requests, 1))
+            if self.tokens is not None:
+                wait = max(wait, self.tokens.reserve(estimated_tokens))
+                reserved.append((self.tokens, estimated_tokens))
+            if wait > 0:
+                await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            for bucket, amount in reserved:
+                bucket.refund(amount)
+            raise
+
+    def pause(self, seconds: float):
+        """Back every caller of this provider off for seconds"""
+        print(f"🚦 LLM Rate limit: Pausing {self.provider} requests for {seconds:.1f}s")
+        for bucket in self._buckets():
+            bucket.pause(seconds)
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """Drain the budget the provider reports as exhausted, until its reset time"""
+        if not isinstance(headers, Mapping):
+            return
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            remaining = _header(headers, f"x-ratelimit-remaining-{kind}", f"anthropic-ratelimit-{kind}-remaining")
+            if bucket is None or remaining is None:
+                continue
+            try:
+                exhausted = float(remaining) <= 0
+            except ValueError:
+                continue
+            if exhausted:
+                bucket.drain()
+                reset = parse_reset(_header(headers, f"x-ratelimit-reset-{kind}", f"anthropic-ratelimit-{kind}-reset"))
+                if reset:
+                    bucket.pause(reset)
+
+
+class ConcurrencyGovernor:
+    """Process-wide cap on in-flight LLM requests, with queue-depth metrics"""
+
+    def __init__(self, max_in_flight: int = None):
+        self.max_in_flight = max_in_flight or int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+        # asyncio primitives belong to one event loop (API server, job worker, tests)
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._limiters: Dict[str, ProviderRateLimiter] = {}
+
+    def limiter(self, provider: str) -> ProviderRateLimiter:
+        if provider not in self._limiters:
+            self._limiters[provider] = ProviderRateLimiter(provider)
+        return self._limiters[provider]
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_in_flight)
+        return self._semaphores[loop]
+
+    @asynccontextmanager
+    async def slot(self, provider: str, estimated_tokens: int):
+        """Wait for provider quota, then for a global in-flight slot"""
+        start = time.monotonic()
+        LLM_QUEUE_DEPTH.inc(provider=provider, queue="rate_limit")
+        try:
+            await self.limiter(provider).acquire(estimated_tokens)
+        finally:
+            LLM_QUEUE_DEPTH.dec(provider=provider, queue="rate_limit")
+
+        semaphore = self._semaphore()
+        LLM_QUEUE_DEPTH.inc(provider=provider, queue="concurrency")
+        try:
+            await semaphore.acquire()
+        finally:
+            LLM_QUEUE_DEPTH.dec(provider=provider, queue="concurrency")
+        LLM_QUEUE_WAIT.observe(time.monotonic() - start, provider=provider)
+
+        LLM_IN_FLIGHT.inc(provider=provider)
+        try:
+            yield
+        finally:
+            LLM_IN_FLIGHT.dec(provider=provider)
+            semaphore.release()
+
+
+def _header(headers: Mapping[str, str], *names: str) -> Optional[str]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """Seconds until a rate limit resets: '20', '1.5s', '6m0s', '120ms' or an RFC 3339 timestamp"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    if value[0].isdigit() and value[-1] == "s":
+        seconds, number = 0.0, ""
+        units = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+        i = 0
+        try:
+            while i < len(value):
+                if value[i].isdigit() or value[i] == ".":
+                    number += value[i]
+                    i += 1
+                    continue
+                unit = "ms" if value[i:i + 2] == "ms" else value[i]
+                seconds += float(number) * units[unit]
+                number = ""
+                i += len(unit)
+            return seconds
+        except (KeyError, ValueError):
+            return None
+
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return max((reset_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except ValueError:
+        return None
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+_governor = None
+
+def get_concurrency_governor() -> ConcurrencyGovernor:
+    """Get or create the process-wide concurrency governor"""
+    global _governor
+    if _governor is None:
+        _governor = ConcurrencyGovernor()
+    return _governor
@@ -0,0 +1,68 @@
+"""
+Single-flight request coalescing
+Concurrent identical LLM requests share one in-flight provider call
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from ..metrics import LLM_REQUESTS_COALESCED
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Runs one call per key at a time; callers arriving while it is in flight await
+    the same result or exception.
+
+    The call runs in its own task, so cancelling one waiter never cancels the call
+    for the others. The call itself is cancelled only once every waiter has gone.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.stats = {"calls": 0, "coalesced": 0}
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        flight = self._flights.get(key)
+        if flight is None or flight.task.done() or flight.task.get_loop() is not loop:
+            flight = _Flight(loop.create_task(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _, key=key, flight=flight: self._forget(key, flight))
+            self.stats["calls"] += 1
+        else:
+            self.stats["coalesced"] += 1
+            LLM_REQUESTS_COALESCED.inc()
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Last waiter gone (cancelled): nobody needs the result anymore
+                flight.task.cancel()
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+# Shared by every LLMClient instance (get_llm_client replaces instances)
+_single_flight = None
+
+def get_single_flight() -> SingleFlight:
+    """Get or create the process-wide single-flight group"""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
@@ -0,0 +1,85 @@
+"""
+Streaming helpers
+Incremental decoding of JSON-formatted completions while they stream in
+"""
+
+import re
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class PartialJSONStringField:
+    """
+    Decodes one top-level string field of a JSON object as its deltas arrive.
+
+    Prompts that ask for {"html": "...", ...} stream the field value long before
+    the object is parseable; feed() returns the newly decoded characters of the
+    value so far. Escapes split across deltas are held until complete.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self._start = re.compile(r'"' + re.escape(field) + r'"\s*:\s*"')
+        self._buffer = ""
+        self._pos = None
+        self.done = False
+
+    def feed(self, delta: str) -> str:
+        if self.done:
+            return ""
+        self._buffer += delta
+
+        if self._pos is None:
+            match = self._start.search(self._buffer)
+            if not match:
+                return ""
+            self._pos = match.end()
+
+        out = []
+        buffer, pos = self._buffer, self._pos
+        while pos < len(buffer):
+            char = buffer[pos]
+            if char == '"':
+                self.done = True
+                pos += 1
+                break
+            if char != '\\':
+                out.append(char)
+                pos += 1
+                continue
+
+            if pos + 1 >= len(buffer):
+                break
+            code = buffer[pos + 1]
+            if code != 'u':
+                out.append(_ESCAPES.get(code, code))
+                pos += 2
+                continue
+            if pos + 6 > len(buffer):
+                break
+            try:
+                value = int(buffer[pos + 2:pos + 6], 16)
+            except ValueError:
+                out.append(buffer[pos:pos + 6])
+                pos += 6
+                continue
+            if 0xD800 <= value < 0xDC00:
+                # High surrogate: decode together with the low half that follows
+                tail = buffer[pos + 6:pos + 12]
+                if len(tail) < 6 and "\\u".startswith(tail[:2]):
+                    break
+                if tail[:2] == "\\u":
+                    try:
+                        low = int(buffer[pos + 8:pos + 12], 16)
+                    except ValueError:
+                        low = 0
+                    if 0xDC00 <= low < 0xE000:
+                        out.append(chr(0x10000 + ((value - 0xD800) << 10) + (low - 0xDC00)))
+                        pos += 12
+                        continue
+            out.append(chr(value))
+            pos += 6
+
+        # Keep only the undecoded tail
+        self._buffer, self._pos = buffer[pos:], 0
+        return "".join(out)
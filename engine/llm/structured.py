@@ -0,0 +1,135 @@
+"""
+LLM Structured Output
+Local JSON extraction, single-pass repair and schema checks for completions that
+should be JSON
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+_CODE_FENCE = re.compile(r"^\s*```[a-zA-Z0-9_-]*\s*\n?|\n?\s*```\s*$")
+
+_JSON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "null": type(None),
+}
+
+
+def _repair(text: str) -> str:
+    """
+    Scan from the first JSON bracket to its match, dropping trailing commas; a
+    truncated value (output cut off at max_tokens) is closed off instead
+    """
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        raise ValueError("no JSON object or array in response")
+
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = escaped = False
+    for char in text[min(starts):]:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            while out and out[-1] in " \t\r\n,":
+                out.pop()
+            if not stack:
+                break
+            stack.pop()
+            out.append(char)
+            if not stack:
+                return "".join(out)
+            continue
+        out.append(char)
+
+    # Truncated: close the open string and containers
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+    repaired = "".join(out).rstrip(" \t\r\n,")
+    if repaired.endswith(":"):
+        repaired += " null"
+    return repaired + "".join(reversed(stack))
+
+
+def parse_json(text: str) -> Tuple[Any, bool]:
+    """
+    Parse a JSON completion; returns (value, repaired).
+
+    Accepts code fences, prose around the JSON, raw control characters in strings,
+    trailing commas, truncated output, and a leading "{" missing because it was
+    prefilled in the request. Raises ValueError when nothing parseable is found.
+    """
+    if not text or not text.strip():
+        raise ValueError("empty response")
+    cleaned = _CODE_FENCE.sub("", text.strip())
+
+    try:
+        return json.loads(cleaned, strict=False), False
+    except json.JSONDecodeError:
+        pass
+
+    candidates = [cleaned]
+    if not cleaned.lstrip().startswith(("{", "[")):
+        # Continuation of a prefilled "{"
+        candidates.insert(0, "{" + cleaned)
+    error = None
+    for candidate in candidates:
+        try:
+            return json.loads(_repair(candidate), strict=False), True
+        except (ValueError, json.JSONDecodeError) as e:
+            error = error or e
+    raise ValueError(f"unparseable JSON ({error})")
+
+
+def validate_schema(value: Any, schema: Dict[str, Any], path: str = "$") -> List[str]:
+    """
+    Check a value against the JSON Schema subset stage prompts use: type, enum,
+    required, properties and items. Returns the problems found.
+    """
+    errors: List[str] = []
+    expected = schema.get("type")
+    if expected is not None:
+        types = expected if isinstance(expected, list) else [expected]
+        if not any(_is_type(value, name) for name in types):
+            return [f"{path}: expected {'/'.join(types)}, got {type(value).__name__}"]
+
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: {value!r} not one of {schema['enum']}")
+
+    if isinstance(value, dict):
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path}: missing '{key}'")
+        for key, subschema in schema.get("properties", {}).items():
+            if key in value:
+                errors.extend(validate_schema(value[key], subschema, f"{path}.{key}"))
+    elif isinstance(value, list) and "items" in schema:
+        for i, item in enumerate(value):
+            errors.extend(validate_schema(item, schema["items"], f"{path}[{i}]"))
+    return errors
+
+
+def _is_type(value: Any, name: str) -> bool:
+    if name == "integer":
+        return isinstance(value, int) and not isinstance(value, bool)
+    if name == "number":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return isinstance(value, _JSON_TYPES.get(name, object))
@@ -0,0 +1,101 @@
+"""
+Unit tests for LLM batch mode
+Tests against the local stand-in batch server: fan-out of results, per-request errors and cancellation
+"""
+
+import pytest
+import asyncio
+import httpx
+from unittest.mock import patch
+from .batch import batch_mode, batch_mode_enabled
+from .batch_stub import create_batch_stub_app
+from .client import LLMClient, LLMError
+from .cache import CompletionCache
+
+
+def _batch_client(app):
+    with patch.dict('os.environ', {'LLM_PROVIDER': 'local'}):
+        client = LLMClient(provider='local', cache=CompletionCache(enabled=False))
+    client.max_retries = 1
+    http = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+    client._http_clients['local'] = (http, asyncio.get_running_loop())
+    return client
+
+
+def _respond(body):
+    content = body['messages'][-1]['content']
+    if content == 'bad':
+        raise ValueError("model refused")
+    return content.upper()
+
+
+class TestBatchMode:
+    """Unit tests for batch submission through LLMClient"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_batch(self):
+        """Test that requests collected together go out as one batch and each caller gets its own result"""
+        app = create_batch_stub_app(_respond, processing_seconds=0.02)
+        client = _batch_client(app)
+
+        with patch.dict('os.environ', {'LLM_BATCH_MAX_WAIT_SECONDS': '0.05', 'LLM_BATCH_POLL_INTERVAL': '0.01'}):
+            with batch_mode():
+                results = await asyncio.gather(*[
+                    client.complete(prompt=f"doc {i}", use_cache=False) for i in range(5)])
+
+        assert results == [f"DOC {i}" for i in range(5)]
+        assert len(app.state.batches) == 1
+        assert all(batch["status"] == "completed" for batch in app.state.batches.values())
+
+    @pytest.mark.asyncio
+    async def test_failed_request_does_not_fail_the_batch(self):
+        """Test that one failing request raises for its caller only"""
+        app = create_batch_stub_app(_respond)
+        client = _batch_client(app)
+
+        with patch.dict('os.environ', {'LLM_BATCH_MAX_WAIT_SECONDS': '0.05', 'LLM_BATCH_POLL_INTERVAL': '0.01'}):
+            with batch_mode():
+                results = await asyncio.gather(client.complete(prompt="good", use_cache=False),
+                                               client.complete(prompt="bad", use_cache=False),
+                                               return_exceptions=True)
+
+        assert results[0] == "GOOD"
+        assert isinstance(results[1], LLMError)
+        assert "model refused" in str(results[1])
+
+    @pytest.mark.asyncio
+    async def test_batch_cancelled_when_every_caller_leaves(self):
+        """Test that a batch nobody waits for any more is cancelled at the provider"""
+        app = create_batch_stub_app(_respond, processing_seconds=5)
+        client = _batch_client(app)
+
+        with patch.dict('os.environ', {'LLM_BATCH_MAX_WAIT_SECONDS': '0.01', 'LLM_BATCH_POLL_INTERVAL': '0.01'}):
+            with batch_mode():
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(client.complete(prompt="slow", use_cache=False), timeout=0.1)
+                await asyncio.sleep(0.05)
+
+        assert [batch["status"] for batch in app.state.batches.values()] == ["cancelled"]
+
+    @pytest.mark.asyncio
+    async def test_streamed_request_goes_through_the_batch(self):
+        """Test that a streamed completion in batch mode is batched and delivered as one delta"""
+        app = create_batch_stub_app(_respond)
+        client = _batch_client(app)
+        received = []
+
+        with patch.dict('os.environ', {'LLM_BATCH_MAX_WAIT_SECONDS': '0.01', 'LLM_BATCH_POLL_INTERVAL': '0.01'}):
+            with batch_mode():
+                result = await client.complete(prompt="streamed", use_cache=False, on_delta=received.append)
+
+        assert result == "STREAMED" and received == ["STREAMED"]
+        assert len(app.state.batches) == 1
+
+    def test_batch_mode_scope(self):
+        assert batch_mode_enabled() is False
+        with batch_mode():
+            assert batch_mode_enabled() is True
+            with batch_mode(False):
+                assert batch_mode_enabled() is False
+        with patch.dict('os.environ', {'LLM_BATCH_MODE': 'true'}):
+            assert batch_mode_enabled() is True
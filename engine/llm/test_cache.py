@@ -0,0 +1,114 @@
+"""
+Unit tests for the LLM completion cache
+Tests for keying, LRU and TTL eviction, the persistent tier and LLMClient integration
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch, AsyncMock
+from .cache import CompletionCache
+from .client import LLMClient
+
+
+class InMemoryCompletionRepository:
+    """In-memory stand-in for LLMCompletionCacheRepository"""
+
+    def __init__(self):
+        self.records = {}
+
+    async def find_completion(self, cache_key):
+        record = self.records.get(cache_key)
+        if record and record["expires_at"] > datetime.utcnow():
+            return record
+        return None
+
+    async def store_completion(self, cache_key, completion, expires_at, metadata=None):
+        self.records[cache_key] = {"completion": completion, "expires_at": expires_at, **(metadata or {})}
+        return True
+
+
+def _key(content="hello", temperature=0.1):
+    return CompletionCache.key("openai", "gpt-4o-mini", [{"role": "user", "content": content}], temperature, 100)
+
+
+class TestCompletionCache:
+    """Unit tests for CompletionCache"""
+
+    def test_key_covers_request_parameters(self):
+        """Test that every keyed parameter changes the cache key"""
+        assert _key() == _key()
+        assert _key() != _key(content="other")
+        assert _key() != _key(temperature=0.2)
+
+    def test_temperature_policy_and_bypass(self):
+        """Test that only low-temperature calls are cached unless forced or bypassed"""
+        cache = CompletionCache(enabled=True, max_temperature=0.3)
+        assert cache.should_cache(0.1) is True
+        assert cache.should_cache(0.7) is False
+        assert cache.should_cache(0.7, use_cache=True) is True
+        assert cache.should_cache(0.1, use_cache=False) is False
+        assert CompletionCache(enabled=False).should_cache(0.1, use_cache=True) is False
+
+    @pytest.mark.asyncio
+    async def test_lru_and_ttl_eviction(self):
+        """Test that the least recently used entry is evicted first and expired entries miss"""
+        cache = CompletionCache(enabled=True, max_entries=2, ttl_seconds=60, persistent=False)
+        await cache.set("a", "A")
+        await cache.set("b", "B")
+        assert await cache.get("a") == "A"
+        await cache.set("c", "C")
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == "A"
+
+        cache._entries["a"] = ("A", 0, 1)
+        assert await cache.get("a") is None
+        assert cache.summary()["evictions"] == 2
+
+    @pytest.mark.asyncio
+    async def test_byte_cap(self):
+        """Test that the memory tier stays under its byte cap"""
+        cache = CompletionCache(enabled=True, max_bytes=10, persistent=False)
+        await cache.set("a", "12345")
+        await cache.set("b", "123456")
+        await cache.set("huge", "x" * 11)
+
+        assert await cache.get("a") is None
+        assert await cache.get("b") == "123456"
+        assert await cache.get("huge") is None
+
+    @pytest.mark.asyncio
+    async def test_persistent_tier_promotes_hits(self):
+        """Test that a completion stored persistently survives a cold memory tier"""
+        repository = InMemoryCompletionRepository()
+        cache = CompletionCache(enabled=True, persistent=True, repository=repository)
+        await cache.set("k", "stored")
+        cache.clear()
+
+        assert await cache.get("k") == "stored"
+        assert cache.summary()["persistent_hits"] == 1
+        assert "k" in cache._entries
+
+        repository.records["k"]["expires_at"] = datetime.utcnow() - timedelta(seconds=1)
+        cache.clear()
+        assert await cache.get("k") is None
+
+
+class TestClientCaching:
+    """Unit tests for caching in LLMClient.complete"""
+
+    @pytest.mark.asyncio
+    async def test_identical_low_temperature_calls_hit_cache(self):
+        """Test that a repeated deterministic call is served from the cache and bypass skips it"""
+        with patch.dict('os.environ', {'LLM_PROVIDER': 'local'}):
+            client = LLMClient(provider='local', cache=CompletionCache(enabled=True, persistent=False))
+        client._make_request = AsyncMock(return_value={'choices': [{'message': {'content': 'outline'}}]})
+
+        assert await client.complete(prompt="Plan", temperature=0.1) == 'outline'
+        assert await client.complete(prompt="Plan", temperature=0.1) == 'outline'
+        assert client._make_request.await_count == 1
+
+        await client.complete(prompt="Plan", temperature=0.1, use_cache=False)
+        await client.complete(prompt="Plan", temperature=0.9)
+        assert client._make_request.await_count == 3
+        assert 'use_cache' not in client._make_request.await_args.args[0]
@@ -0,0 +1,111 @@
+"""
+Unit tests for LLM cassettes
+Tests for recording provider responses, offline replay, replay order and simulated latency
+"""
+
+import json
+import pytest
+import asyncio
+import httpx
+from unittest.mock import patch
+from .cassette import Cassette, latency_model, use_cassette
+from .client import LLMClient, LLMError
+from .cache import CompletionCache
+
+
+def _client(handler, provider='local', env=None):
+    with patch.dict('os.environ', {'LLM_PROVIDER': provider, **(env or {})}):
+        client = LLMClient(provider=provider, cache=CompletionCache(enabled=False))
+    client._exponential_backoff = lambda attempt: 0
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client._http_clients[provider] = (http, asyncio.get_running_loop())
+    return client
+
+
+def _offline(request):
+    raise AssertionError(f"Replay must not reach the network: {request.url}")
+
+
+class TestCassette:
+    """Unit tests for recording and replaying through LLMClient"""
+
+    @pytest.mark.asyncio
+    async def test_record_then_replay_offline(self, tmp_path):
+        """Test that recorded responses are served in replay with no provider call"""
+        path = str(tmp_path / "cassette.json")
+        answers = iter(["first", "second"])
+
+        def handler(request):
+            return httpx.Response(200, json={"choices": [{"message": {"content": next(answers)}}],
+                                             "usage": {"prompt_tokens": 3, "completion_tokens": 1}})
+
+        with use_cassette(path, mode="record"):
+            client = _client(handler)
+            recorded = [await client.complete(prompt="Hi", use_cache=False) for _ in range(2)]
+        assert recorded == ["first", "second"]
+        assert len(json.load(open(path))["interactions"]) == 1
+
+        with use_cassette(path, mode="replay") as cassette:
+            client = _client(_offline)
+            replayed = [await client.complete(prompt="Hi", use_cache=False) for _ in range(3)]
+        assert replayed == ["first", "second", "first"]
+        assert cassette.stats == {"hits": 3, "misses": 0, "recorded": 0}
+
+    @pytest.mark.asyncio
+    async def test_streamed_recording_replays_for_both_call_styles(self, tmp_path):
+        """Test that a streamed recording replays as deltas and as a plain completion"""
+        path = str(tmp_path / "cassette.json")
+        events = [{"choices": [{"delta": {"content": "Hel"}}]}, {"choices": [{"delta": {"content": "lo"}}]}]
+
+        def handler(request):
+            body = "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+            return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+        with use_cassette(path, mode="record"):
+            client = _client(handler)
+            assert [d async for d in client.complete_stream(prompt="Hi", use_cache=False)] == ["Hel", "lo"]
+
+        with use_cassette(path, mode="replay"):
+            client = _client(_offline)
+            assert "".join([d async for d in client.complete_stream(prompt="Hi", use_cache=False)]) == "Hello"
+            assert await client.complete(prompt="Hi", use_cache=False) == "Hello"
+
+    @pytest.mark.asyncio
+    async def test_replay_miss_fails_without_retrying(self, tmp_path):
+        """Test that an unrecorded request fails at once instead of being retried"""
+        with use_cassette(str(tmp_path / "empty.json"), mode="replay") as cassette:
+            client = _client(_offline)
+            with pytest.raises(LLMError) as exc_info:
+                await client.complete(prompt="Unrecorded", use_cache=False)
+        assert "No recorded local response" in str(exc_info.value)
+        assert cassette.stats["misses"] == 1
+
+    def test_replay_keeps_provider_without_api_key(self, tmp_path):
+        with use_cassette(str(tmp_path / "cassette.json"), mode="replay"):
+            with patch.dict('os.environ', {'OPENAI_API_KEY': ''}):
+                client = LLMClient(provider='openai', cache=CompletionCache(enabled=False))
+        assert client.provider == 'openai'
+
+    def test_stream_flag_and_derived_fields_do_not_change_key(self):
+        payload = {"model": "m", "messages": [{"role": "user", "content": "Hi"}], "max_tokens": 1200}
+        assert Cassette.key("local", payload) == Cassette.key("local", {**payload, "stream": True})
+        assert Cassette.key("local", payload) == Cassette.key("local", {**payload, "max_tokens": 1350})
+        assert Cassette.key("local", payload) != Cassette.key("local", {**payload, "temperature": 0.7})
+        assert Cassette.key("local", payload) != Cassette.key("openai", payload)
+
+
+class TestLatencyModel:
+    """Unit tests for simulated replay latency"""
+
+    def test_specs(self):
+        assert latency_model("none")(2.5) == 0.0
+        assert latency_model("recorded")(2.5) == 2.5
+        assert latency_model("fixed:0.2")(2.5) == 0.2
+        assert 1.0 <= latency_model("uniform:1,2")(0) <= 2.0
+        with pytest.raises(ValueError):
+            latency_model("gamma:1")
+
+    def test_seeded_distributions_are_reproducible(self):
+        first = latency_model("lognormal:0.8,0.5", seed=7)
+        second = latency_model("lognormal:0.8,0.5", seed=7)
+        assert [first(0) for _ in range(5)] == [second(0) for _ in range(5)]
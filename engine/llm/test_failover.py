@@ -0,0 +1,184 @@
+"""
+Unit tests for hedged requests and provider failover
+Tests for the circuit breaker, latency percentiles, hedging races and routing around open breakers
+"""
+
+import pytest
+import asyncio
+from unittest.mock import patch
+from .failover import CircuitBreaker, LatencyTracker, ProviderHealth
+from .client import LLMClient, LLMError, _Route
+from .cache import CompletionCache
+from .ratelimit import ConcurrencyGovernor
+from ..metrics import LLM_HEDGED_REQUESTS
+
+
+def _client(provider='local', **env):
+    with patch.dict('os.environ', {'LLM_PROVIDER': provider, **env}):
+        client = LLMClient(provider=provider, cache=CompletionCache(enabled=False))
+    client.health = ProviderHealth()
+    client.governor = ConcurrencyGovernor(max_in_flight=8)
+    client._exponential_backoff = lambda attempt: 0
+    return client
+
+
+def _response(text):
+    return {'choices': [{'message': {'content': text}}]}
+
+
+class TestCircuitBreaker:
+    """Unit tests for CircuitBreaker"""
+
+    def test_opens_on_error_rate_and_probes_after_cooldown(self):
+        """Test that the breaker opens at the error rate, lets one probe through, and closes on success"""
+        breaker = CircuitBreaker("openai", error_rate=0.5, min_requests=4, window_seconds=60, cooldown_seconds=0)
+        for ok in (True, False, True):
+            breaker.record(ok)
+        assert breaker.state == "closed"
+
+        breaker.record(False)
+        assert breaker.state != "closed"
+
+        assert breaker.allow() is True
+        assert breaker.allow() is False
+        breaker.record(True)
+        assert breaker.state == "closed"
+        assert breaker.allow() is True
+
+    def test_open_breaker_rejects_until_cooldown(self):
+        breaker = CircuitBreaker("openai", error_rate=0.5, min_requests=2, window_seconds=60, cooldown_seconds=30)
+        breaker.record(False)
+        breaker.record(False)
+        assert breaker.state == "open"
+        assert breaker.allow() is False
+
+    def test_released_probe_frees_the_slot(self):
+        """Test that a probe ending without a verdict lets the next request probe"""
+        breaker = CircuitBreaker("openai", error_rate=0.5, min_requests=2, window_seconds=60, cooldown_seconds=0)
+        breaker.record(False)
+        breaker.record(False)
+
+        assert breaker.allow() is True
+        breaker.release()
+        assert breaker.state == "half_open"
+        assert breaker.allow() is True
+
+    def test_latency_percentile(self):
+        tracker = LatencyTracker(min_samples=10)
+        assert tracker.percentile(0.95) is None
+        for i in range(1, 101):
+            tracker.observe(i / 100)
+        assert tracker.percentile(0.95) == pytest.approx(0.96)
+
+
+class TestHedging:
+    """Unit tests for hedged requests in LLMClient"""
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_loses_to_hedge(self):
+        """Test that a request slower than the hedge delay is raced and the loser is cancelled"""
+        client = _client(LLM_FAILOVER_PROVIDER='local', LLM_FAILOVER_MODEL='backup-model',
+                         LLM_HEDGE_ENABLED='true', LLM_HEDGE_DEFAULT_DELAY='0.05')
+        primary_cancelled = asyncio.Event()
+
+        async def make_request(payload):
+            if payload['model'] == 'backup-model':
+                return _response('from backup')
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                primary_cancelled.set()
+                raise
+            return _response('from primary')
+
+        client._make_request = make_request
+        before = LLM_HEDGED_REQUESTS.value(provider='local', winner='hedge')
+
+        assert await client.complete(prompt="Hi", use_cache=False) == 'from backup'
+        assert primary_cancelled.is_set()
+        assert LLM_HEDGED_REQUESTS.value(provider='local', winner='hedge') == before + 1
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self):
+        """Test that a request finishing within the hedge delay never reaches the failover route"""
+        client = _client(LLM_FAILOVER_PROVIDER='local', LLM_FAILOVER_MODEL='backup-model',
+                         LLM_HEDGE_ENABLED='true', LLM_HEDGE_DEFAULT_DELAY='1')
+        models = []
+
+        async def make_request(payload):
+            models.append(payload['model'])
+            return _response('ok')
+
+        client._make_request = make_request
+        assert await client.complete(prompt="Hi", use_cache=False) == 'ok'
+        assert models == ['local-model']
+
+    @pytest.mark.asyncio
+    async def test_failed_primary_fails_over_without_waiting(self):
+        """Test that a primary error starts the failover route immediately"""
+        client = _client(LLM_FAILOVER_PROVIDER='local', LLM_FAILOVER_MODEL='backup-model',
+                         LLM_HEDGE_ENABLED='true', LLM_HEDGE_DEFAULT_DELAY='30')
+
+        async def make_request(payload):
+            if payload['model'] == 'backup-model':
+                return _response('from backup')
+            raise LLMError("HTTP 500: overloaded")
+
+        client._make_request = make_request
+        result = await asyncio.wait_for(client.complete(prompt="Hi", use_cache=False), timeout=5)
+        assert result == 'from backup'
+
+
+class TestBreakerRouting:
+    """Unit tests for routing around an open circuit breaker"""
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_does_not_wedge_breaker(self):
+        """Test that cancelling a half-open probe request lets a later request probe the provider"""
+        client = _client('local')
+        breaker = CircuitBreaker('local', error_rate=0.5, min_requests=2, cooldown_seconds=0)
+        breaker.record(False)
+        breaker.record(False)
+        client.health._breakers['local'] = breaker
+        started = asyncio.Event()
+
+        async def slow_request(payload):
+            started.set()
+            await asyncio.sleep(5)
+            return _response('late')
+
+        client._make_request = slow_request
+        assert breaker.allow() is True
+        route = _Route(client, 'local-model', {'model': 'local-model', 'messages': [{'role': 'user', 'content': 'Hi'}]})
+        probe = asyncio.ensure_future(client._send(route, "general"))
+        await started.wait()
+        probe.cancel()
+        await asyncio.gather(probe, return_exceptions=True)
+
+        assert breaker.allow() is True
+
+    @pytest.mark.asyncio
+    async def test_requests_route_around_failing_provider(self):
+        """Test that once a provider's breaker opens, requests go to the failover provider"""
+        client = _client('openai', OPENAI_API_KEY='sk-test-key', LLM_FAILOVER_PROVIDER='local')
+        client.max_retries = 1
+        client.health._breakers['openai'] = CircuitBreaker('openai', error_rate=0.5, min_requests=2, cooldown_seconds=60)
+        failover = _client('local')
+        failover.health = client.health
+        client._failover_client = failover
+
+        async def failing_request(payload):
+            raise LLMError("HTTP 500: upstream")
+
+        async def failover_request(payload):
+            return _response('from local')
+
+        client._make_request = failing_request
+        failover._make_request = failover_request
+
+        for _ in range(2):
+            with pytest.raises(LLMError):
+                await client.complete(prompt="Hi", use_cache=False)
+        assert client.health.breaker('openai').state == "open"
+
+        assert await client.complete(prompt="Hi", use_cache=False) == 'from local'
@@ -204,14 +204,14 @@ class TestLLMClient:
             client = LLMClient(provider='openai')
             
             # Mock the HTTP response
-            mock_response = AsyncMock()
+            mock_response = Mock()
             mock_response.status_code = 200
             mock_response.json.return_value = {
                 'results': [{'flagged': False, 'categories': {}, 'category_scores': {}}]
             }
             
             with patch('httpx.AsyncClient') as mock_client:
-                mock_client.return_value.__aenter__.return_value.post.return_value = mock_response
+                mock_client.return_value.post = AsyncMock(return_value=mock_response)
                 
                 result = await client.moderate("Test content")
                 assert result['ok'] is True
@@ -232,14 +232,14 @@ class TestLLMClient:
             client = LLMClient(provider='openai')
             
             # Mock successful HTTP response
-            mock_response = AsyncMock()
+            mock_response = Mock()
             mock_response.status_code = 200
             mock_response.json.return_value = {
                 'choices': [{'message': {'content': 'Mocked LLM response'}}]
             }
             
             with patch('httpx.AsyncClient') as mock_client:
-                mock_client.return_value.__aenter__.return_value.post.return_value = mock_response
+                mock_client.return_value.post = AsyncMock(return_value=mock_response)
                 
                 result = await client.complete(prompt="Test prompt")
                 assert result == 'Mocked LLM response'
@@ -251,16 +251,32 @@ class TestLLMClient:
             client = LLMClient(provider='openai')
             
             # Mock failed HTTP responses
-            mock_response = AsyncMock()
+            mock_response = Mock()
             mock_response.status_code = 500
             mock_response.text = "Server error"
             
             with patch('httpx.AsyncClient') as mock_client:
-                mock_client.return_value.__aenter__.return_value.post.return_value = mock_response
+                mock_client.return_value.post = AsyncMock(return_value=mock_response)
                 
                 with pytest.raises(LLMError, match="LLM completion failed"):
                     await client.complete(prompt="Test prompt")
     
+    @pytest.mark.asyncio
+    async def test_connection_pool_reused_until_closed(self):
+        """Test that requests share one pooled HTTP client per provider until aclose"""
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key', 'LLM_POOL_MAX_CONNECTIONS': '7'}):
+            client = LLMClient(provider='openai')
+            
+            pooled = client._http_client()
+            assert client._http_client() is pooled
+            assert client._http_client('local') is not pooled
+            assert client.pool_limits.max_connections == 7
+            
+            await client.aclose()
+            assert pooled.is_closed
+            assert client._http_client() is not pooled
+            await client.aclose()
+    
     def test_global_client_instance(self):
         """Test global client instance management"""
         with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}):
@@ -0,0 +1,110 @@
+"""
+Unit tests for LLM rate limiting
+Tests for token buckets, header parsing, the concurrency cap and Retry-After handling
+"""
+
+import pytest
+import asyncio
+from unittest.mock import patch
+from .ratelimit import TokenBucket, ProviderRateLimiter, ConcurrencyGovernor, parse_reset, parse_retry_after
+from .client import LLMClient, LLMRateLimitError
+from .cache import CompletionCache
+from ..metrics import LLM_QUEUE_DEPTH
+
+
+class TestTokenBucket:
+    """Unit tests for TokenBucket"""
+
+    def test_reservations_wait_off_the_deficit(self):
+        """Test that reservations beyond the quota wait for the refill, in order"""
+        bucket = TokenBucket(rate_per_minute=60)
+        assert bucket.reserve(60) == 0
+        assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+        assert bucket.reserve(1) == pytest.approx(2.0, abs=0.05)
+
+        bucket.refund(2)
+        assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+    def test_pause_and_drain(self):
+        """Test that a pause holds callers back even with tokens available"""
+        bucket = TokenBucket(rate_per_minute=600)
+        bucket.pause(5)
+        assert bucket.reserve(1) == pytest.approx(5.0, abs=0.05)
+
+        drained = TokenBucket(rate_per_minute=600)
+        drained.drain()
+        assert drained.reserve(10) == pytest.approx(1.0, abs=0.05)
+
+    def test_exhausted_budget_from_headers(self):
+        """Test that a provider-reported empty budget pauses until its reset"""
+        limiter = ProviderRateLimiter("openai", rpm=100, tpm=1000)
+        limiter.update_from_headers({"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "6m0s"})
+        assert limiter.tokens.reserve(1) == pytest.approx(360, abs=1)
+        assert limiter.requests.reserve(1) == 0
+
+
+class TestHeaderParsing:
+    """Unit tests for rate limit header parsing"""
+
+    def test_parse_reset(self):
+        assert parse_reset("20") == 20
+        assert parse_reset("1.5s") == 1.5
+        assert parse_reset("1m30s") == 90
+        assert parse_reset("120ms") == pytest.approx(0.12)
+        assert parse_reset("soon") is None
+        assert parse_reset(None) is None
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("3") == 3
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+        assert parse_retry_after("later") is None
+
+
+class TestConcurrencyGovernor:
+    """Unit tests for the global in-flight cap"""
+
+    @pytest.mark.asyncio
+    async def test_in_flight_requests_are_capped(self):
+        """Test that no more than max_in_flight requests run at once and queues drain"""
+        governor = ConcurrencyGovernor(max_in_flight=2)
+        active = 0
+        peak = 0
+
+        async def request():
+            nonlocal active, peak
+            async with governor.slot("local", 100):
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*[request() for _ in range(6)])
+        assert peak == 2
+        assert LLM_QUEUE_DEPTH.value(provider="local", queue="concurrency") == 0
+
+
+class TestClientRateLimits:
+    """Unit tests for rate limit handling in LLMClient"""
+
+    @pytest.mark.asyncio
+    async def test_retry_after_is_honored(self):
+        """Test that a 429 retries after the provider's delay and pauses the provider"""
+        with patch.dict('os.environ', {'LLM_PROVIDER': 'local'}):
+            client = LLMClient(provider='local', cache=CompletionCache(enabled=False))
+        client.governor = ConcurrencyGovernor(max_in_flight=4)
+        client.governor._limiters['local'] = ProviderRateLimiter('local', rpm=600, tpm=0)
+        responses = [LLMRateLimitError("HTTP 429", retry_after=0.05),
+                     {'choices': [{'message': {'content': 'ok'}}]}]
+
+        async def make_request(payload):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        client._make_request = make_request
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        assert await client.complete(prompt="Hello", use_cache=False) == 'ok'
+
+        assert 0.05 <= loop.time() - start < 1.0
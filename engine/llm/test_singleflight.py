@@ -0,0 +1,106 @@
+"""
+Unit tests for single-flight request coalescing
+Tests for shared results, error propagation and cancellation of individual waiters
+"""
+
+import pytest
+import asyncio
+from unittest.mock import patch
+from .singleflight import SingleFlight
+from .client import LLMClient
+from .cache import CompletionCache
+
+
+class TestSingleFlight:
+    """Unit tests for SingleFlight"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        """Test that identical concurrent calls run once and sequential calls run again"""
+        group = SingleFlight()
+        calls = 0
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return "result"
+
+        results = await asyncio.gather(*[group.do("k", fn) for _ in range(5)])
+        assert results == ["result"] * 5
+        assert calls == 1
+        assert group.stats["coalesced"] == 4
+        assert group.in_flight() == 0
+
+        await group.do("k", fn)
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_every_waiter(self):
+        """Test that a failing call raises in every waiter"""
+        group = SingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise ValueError("provider down")
+
+        results = await asyncio.gather(*[group.do("k", fn) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_others(self):
+        """Test that the call survives one waiter's cancellation and stops when all are gone"""
+        group = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def fn():
+            started.set()
+            try:
+                await asyncio.sleep(0.05)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return "result"
+
+        first = asyncio.ensure_future(group.do("k", fn))
+        second = asyncio.ensure_future(group.do("k", fn))
+        await started.wait()
+        first.cancel()
+
+        assert await second == "result"
+        assert first.cancelled()
+
+        third = asyncio.ensure_future(group.do("k2", fn))
+        await asyncio.sleep(0.01)
+        third.cancel()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert cancelled.is_set()
+
+
+class TestClientCoalescing:
+    """Unit tests for coalescing in LLMClient.complete"""
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_reach_provider_once(self):
+        """Test that concurrent identical completions share one provider request"""
+        with patch.dict('os.environ', {'LLM_PROVIDER': 'local'}):
+            client = LLMClient(provider='local', cache=CompletionCache(enabled=False))
+        client.single_flight = SingleFlight()
+        requests = 0
+
+        async def make_request(payload):
+            nonlocal requests
+            requests += 1
+            await asyncio.sleep(0.02)
+            return {'choices': [{'message': {'content': 'links'}}]}
+
+        client._make_request = make_request
+        results = await asyncio.gather(*[client.complete(prompt="Relate", temperature=0.7) for _ in range(3)])
+
+        assert results == ['links'] * 3
+        assert requests == 1
+
+        await asyncio.gather(*[client.complete(prompt="Relate", use_cache=False) for _ in range(2)])
+        assert requests == 3
@@ -0,0 +1,155 @@
+"""
+Unit tests for streaming completions
+Tests for SSE delta parsing per provider, incremental callbacks, retries and partial JSON decoding
+"""
+
+import json
+import pytest
+import asyncio
+import httpx
+from unittest.mock import patch
+from .client import LLMClient, LLMError
+from .cache import CompletionCache
+from .streaming import PartialJSONStringField
+
+
+def _streaming_client(provider, events, env=None):
+    """LLMClient whose provider answers every request with the given SSE events"""
+    with patch.dict('os.environ', {'LLM_PROVIDER': provider, **(env or {})}):
+        client = LLMClient(provider=provider, cache=CompletionCache(enabled=True, persistent=False))
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        body = "".join(f"data: {event if isinstance(event, str) else json.dumps(event)}\n\n" for event in events)
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client._http_clients[provider] = (http, asyncio.get_running_loop())
+    return client, requests
+
+
+class TestCompleteStream:
+    """Unit tests for LLMClient.complete_stream"""
+
+    @pytest.mark.asyncio
+    async def test_openai_style_deltas(self):
+        """Test that chat completion chunks are yielded as deltas up to [DONE]"""
+        events = [{"choices": [{"delta": {"role": "assistant"}}]},
+                  {"choices": [{"delta": {"content": "Hel"}}]},
+                  {"choices": [{"delta": {"content": "lo"}}]},
+                  "[DONE]"]
+        client, requests = _streaming_client('local', events)
+
+        deltas = [delta async for delta in client.complete_stream(prompt="Hi", temperature=0.9)]
+
+        assert deltas == ["Hel", "lo"]
+        assert requests[0]["stream"] is True
+
+    @pytest.mark.asyncio
+    async def test_anthropic_deltas_and_callbacks(self):
+        """Test that content_block_delta events reach sync and async callbacks in order"""
+        events = [{"type": "message_start", "message": {}},
+                  {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "<p>"}},
+                  {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "Hi</p>"}},
+                  {"type": "message_stop"}]
+        client, requests = _streaming_client('anthropic', events, {'ANTHROPIC_API_KEY': 'test-key'})
+        received = []
+
+        async def on_delta(delta):
+            received.append(delta)
+
+        result = await client.complete(system_message="Write", user_message="Hi", temperature=0.9, on_delta=on_delta)
+
+        assert result == "<p>Hi</p>"
+        assert received == ["<p>", "Hi</p>"]
+        assert requests[0]["stream"] is True
+
+    @pytest.mark.asyncio
+    async def test_cached_completion_is_one_delta(self):
+        """Test that a cached low-temperature completion is replayed without a request"""
+        events = [{"choices": [{"delta": {"content": "a"}}]}, {"choices": [{"delta": {"content": "b"}}]}, "[DONE]"]
+        client, requests = _streaming_client('local', events)
+
+        assert await client.complete(prompt="Hi", temperature=0.1, on_delta=lambda delta: None) == "ab"
+        deltas = [delta async for delta in client.complete_stream(prompt="Hi", temperature=0.1)]
+
+        assert deltas == ["ab"]
+        assert len(requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_streamed_result_stripped_like_plain_completion(self):
+        """Test that a streamed completion is returned and cached stripped, as complete() would"""
+        events = [{"choices": [{"delta": {"content": "\n <p>Hi"}}]}, {"choices": [{"delta": {"content": "</p>\n"}}]}, "[DONE]"]
+        client, requests = _streaming_client('local', events)
+        received = []
+
+        assert await client.complete(prompt="Hi", temperature=0.1, on_delta=received.append) == "<p>Hi</p>"
+        assert await client.complete(prompt="Hi", temperature=0.1) == "<p>Hi</p>"
+
+        assert received == ["\n <p>Hi", "</p>\n"]
+        assert len(requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_outcomes_count_toward_circuit_breaker(self):
+        """Test that failed and successful streams are recorded by the provider's breaker"""
+        with patch.dict('os.environ', {'LLM_PROVIDER': 'local'}):
+            client = LLMClient(provider='local', cache=CompletionCache(enabled=False))
+        client._exponential_backoff = lambda attempt: 0
+        attempts = 0
+
+        async def stream_request(payload):
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise LLMError("HTTP 500: upstream")
+            yield "ok"
+
+        client._stream_request = stream_request
+        breaker = client.health.breaker('local')
+        outcomes = []
+        breaker.record = outcomes.append
+
+        assert await client.complete(prompt="Hi", on_delta=lambda delta: None) == "ok"
+        assert outcomes == [False, True]
+
+    @pytest.mark.asyncio
+    async def test_no_retry_after_partial_output(self):
+        """Test that failures retry before the first delta but not after it"""
+        with patch.dict('os.environ', {'LLM_PROVIDER': 'local'}):
+            client = LLMClient(provider='local', cache=CompletionCache(enabled=False))
+        client._exponential_backoff = lambda attempt: 0
+        attempts = 0
+
+        async def stream_request(payload):
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise LLMError("HTTP 500: upstream")
+            yield "partial"
+            raise LLMError("connection reset")
+
+        client._stream_request = stream_request
+        received = []
+
+        with pytest.raises(LLMError, match="interrupted"):
+            await client.complete(prompt="Hi", on_delta=received.append)
+
+        assert attempts == 2
+        assert received == ["partial"]
+
+
+class TestPartialJSONStringField:
+    """Unit tests for PartialJSONStringField"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 5, 7])
+    def test_decodes_field_across_chunk_boundaries(self, chunk_size):
+        """Test that escapes split across deltas decode exactly once"""
+        html = '<p class="lead">Café \\ "quoted"\n\U0001F600</p>'
+        document = json.dumps({"title": "T", "html": html, "summary": "S"})
+        field = PartialJSONStringField("html")
+
+        decoded = "".join(field.feed(document[i:i + chunk_size]) for i in range(0, len(document), chunk_size))
+
+        assert decoded == html
+        assert field.done
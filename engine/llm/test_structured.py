@@ -0,0 +1,117 @@
+"""
+Unit tests for structured (JSON) output
+Tests for local JSON repair, schema checks and provider JSON modes in complete_json
+"""
+
+import json
+import pytest
+import asyncio
+import httpx
+from unittest.mock import patch
+from .structured import parse_json, validate_schema
+from .client import LLMClient, LLMStructuredOutputError
+from .cache import CompletionCache
+
+SCHEMA = {"type": "object", "required": ["html", "summary"],
+          "properties": {"html": {"type": "string"}, "summary": {"type": "string"}}}
+
+
+def _json_client(provider, reply, env=None):
+    """LLMClient whose provider answers every request with reply; returns the client and request bodies"""
+    with patch.dict('os.environ', {'LLM_PROVIDER': provider, **(env or {})}):
+        client = LLMClient(provider=provider, cache=CompletionCache(enabled=False))
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        if provider == 'anthropic':
+            return httpx.Response(200, json={"content": [{"type": "text", "text": reply}]})
+        return httpx.Response(200, json={"choices": [{"message": {"content": reply}}]})
+
+    client._http_clients[provider] = (httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+                                      asyncio.get_running_loop())
+    return client, requests
+
+
+class TestParseJson:
+    """Unit tests for parse_json repair"""
+
+    def test_clean_json_is_not_repaired(self):
+        assert parse_json('{"a": [1, 2]}') == ({"a": [1, 2]}, False)
+
+    def test_fences_prose_and_trailing_commas(self):
+        text = 'Here you go:\n```json\n{"a": [1, 2,], "b": "x",}\n```\nThanks!'
+        assert parse_json(text) == ({"a": [1, 2], "b": "x"}, True)
+
+    def test_truncated_output_is_closed(self):
+        value, repaired = parse_json('{"html": "<p>Hello</p>", "items": [{"x": 1}, {"x": "unfinish')
+        assert repaired is True
+        assert value == {"html": "<p>Hello</p>", "items": [{"x": 1}, {"x": "unfinish"}]}
+
+    def test_prefilled_brace_and_raw_newlines(self):
+        assert parse_json('"html": "<p>a\nb</p>", "summary": "s"}')[0] == {"html": "<p>a\nb</p>", "summary": "s"}
+
+    def test_braces_inside_strings(self):
+        assert parse_json('Result: {"code": "if (x) { y(); }"} done')[0] == {"code": "if (x) { y(); }"}
+
+    def test_no_json_raises(self):
+        with pytest.raises(ValueError):
+            parse_json("I cannot help with that.")
+
+    def test_validate_schema(self):
+        assert validate_schema({"html": "<p/>", "summary": "s"}, SCHEMA) == []
+        errors = validate_schema({"html": 3}, SCHEMA)
+        assert "$: missing 'summary'" in errors
+        assert any(error.startswith("$.html: expected string") for error in errors)
+        assert validate_schema({"n": True}, {"properties": {"n": {"type": "integer"}}}) != []
+
+
+class TestCompleteJson:
+    """Unit tests for LLMClient.complete_json"""
+
+    @pytest.mark.asyncio
+    async def test_openai_uses_structured_output(self):
+        """Test that the schema is sent as response_format and the reply parsed"""
+        client, requests = _json_client('openai', '{"html": "<p>Hi</p>", "summary": "s"}',
+                                        {'OPENAI_API_KEY': 'sk-test-key'})
+
+        result = await client.complete_json(system_message="Write JSON", user_message="Go", schema=SCHEMA)
+
+        assert result == {"html": "<p>Hi</p>", "summary": "s"}
+        assert requests[0]["response_format"]["json_schema"]["schema"] == SCHEMA
+
+    @pytest.mark.asyncio
+    async def test_anthropic_prefills_brace(self):
+        """Test that Anthropic requests end with an assistant "{" and the reply is completed with it"""
+        client, requests = _json_client('anthropic', '"html": "<p>Hi</p>", "summary": "s"}',
+                                        {'ANTHROPIC_API_KEY': 'test-key'})
+
+        result = await client.complete_json(prompt="Write the article as JSON", schema=SCHEMA)
+
+        assert result == {"html": "<p>Hi</p>", "summary": "s"}
+        assert requests[0]["messages"][-1] == {"role": "assistant", "content": "{"}
+        assert "response_format" not in requests[0]
+
+    @pytest.mark.asyncio
+    async def test_local_json_mode_is_opt_in(self):
+        """Test that local servers get no response_format unless enabled, and the prompt asks for JSON"""
+        client, requests = _json_client('local', '{"ok": true}')
+        assert await client.complete_json(prompt="Say ok") == {"ok": True}
+        assert "response_format" not in requests[0]
+        assert "JSON" in requests[0]["messages"][-1]["content"]
+
+        client, requests = _json_client('local', '{"ok": true}', {'LOCAL_LLM_JSON_MODE': 'true'})
+        await client.complete_json(prompt="Say ok as json")
+        assert requests[0]["response_format"] == {"type": "json_object"}
+
+    @pytest.mark.asyncio
+    async def test_schema_mismatch_raises_with_text(self):
+        """Test that a reply missing required fields raises once, keeping the raw text for fallbacks"""
+        client, requests = _json_client('local', '{"html": "<p>Hi</p>"}')
+
+        with pytest.raises(LLMStructuredOutputError) as exc_info:
+            await client.complete_json(prompt="Write JSON", schema=SCHEMA)
+
+        assert "missing 'summary'" in str(exc_info.value)
+        assert exc_info.value.text == '{"html": "<p>Hi</p>"}'
+        assert len(requests) == 1
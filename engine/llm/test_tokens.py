@@ -0,0 +1,116 @@
+"""
+Unit tests for token budgeting and the LLM usage ledger
+Tests for estimates, truncation, block packing, adaptive max_tokens and per-run usage recording
+"""
+
+import pytest
+from unittest.mock import patch, AsyncMock
+from .tokens import estimate_tokens, truncate_to_tokens, pack_blocks, output_budget
+from .ledger import LLMLedger
+from .client import LLMClient, LLMError
+from .cache import CompletionCache
+from ..run_context import RunContext
+
+
+class TestTokenEstimates:
+    """Unit tests for estimates and truncation"""
+
+    def test_estimate_grows_with_text(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("word") >= 1
+        assert estimate_tokens("word " * 100) > estimate_tokens("word " * 10)
+
+    def test_truncate_fits_budget_at_word_boundary(self):
+        text = " ".join(f"word{i}" for i in range(500))
+        truncated = truncate_to_tokens(text, 50)
+
+        assert estimate_tokens(truncated) <= 50
+        assert text.startswith(truncated)
+        assert text[len(truncated)] == " "
+        assert truncate_to_tokens("short", 50) == "short"
+
+
+class TestPackBlocks:
+    """Unit tests for context packing"""
+
+    def test_most_relevant_blocks_kept_in_document_order(self):
+        """Test that higher-scored blocks win the budget and come back in document order"""
+        blocks = ["alpha " * 40, "beta " * 40, "gamma " * 40]
+        budget = estimate_tokens(blocks[0]) + estimate_tokens(blocks[2])
+
+        packed = pack_blocks(blocks, budget, scores=[0.5, 0.1, 0.9])
+
+        assert [index for index, _ in packed] == [0, 2]
+        assert sum(estimate_tokens(text) for _, text in packed) <= budget
+
+    def test_partial_block_truncated(self):
+        """Test that the last block is truncated to the remaining budget"""
+        packed = pack_blocks(["one " * 100, "two " * 100], 150, min_tokens=10)
+
+        assert [index for index, _ in packed] == [0, 1]
+        assert estimate_tokens(packed[1][1]) <= 150 - estimate_tokens(packed[0][1])
+
+
+class TestOutputBudget:
+    """Unit tests for adaptive max_tokens"""
+
+    def test_scales_with_prompt_between_floor_and_cap(self):
+        assert output_budget("article", 100, "gpt-4o-mini") == 2000
+        assert output_budget("article", 4000, "gpt-4o-mini") == 6000
+        assert output_budget("article", 20000, "gpt-4o-mini") == 8000
+        assert output_budget("analysis", 5000, "gpt-4o-mini") == 1000
+
+        with patch.dict('os.environ', {'LLM_MAX_TOKENS_ARTICLE': '3000'}):
+            assert output_budget("article", 4000, "gpt-4o-mini") == 3000
+
+    def test_clamped_to_context_window(self):
+        """Test that prompt plus completion never exceeds the model's window"""
+        assert output_budget("article", 5000, "local-model") == 8192 - 5000 - 256
+        assert output_budget("default", 100, "local-model", requested=16000) <= 8192 - 100
+
+    def test_prompt_leaving_less_than_floor_raises(self):
+        """Test that a prompt that leaves too little of the window fails instead of shrinking max_tokens"""
+        with pytest.raises(LLMError):
+            output_budget("article", 7000, "local-model")
+        with pytest.raises(LLMError):
+            output_budget("gap_fill", 8000, "unknown-model")
+        assert output_budget("article", 7000, "local-model", requested=500) == 500
+
+
+class TestUsageLedger:
+    """Unit tests for per-run usage recording"""
+
+    def test_summary_totals_by_call_type(self):
+        ledger = LLMLedger()
+        ledger.record("article", "openai", "gpt-4o-mini", 1000, 2000, latency_seconds=2.0, retries=1)
+        ledger.record("article", "openai", "gpt-4o-mini", cached=True)
+        ledger.record("style", "openai", "gpt-4o-mini", 500, 500, latency_seconds=1.0)
+
+        summary = ledger.summary()
+        assert summary["calls"] == 3
+        assert summary["cached_calls"] == 1
+        assert summary["prompt_tokens"] == 1500
+        assert summary["retries"] == 1
+        assert summary["cost_usd"] == pytest.approx((1500 * 0.15 + 2500 * 0.60) / 1_000_000)
+        assert summary["by_call_type"]["article"]["completion_tokens"] == 2000
+
+    @pytest.mark.asyncio
+    async def test_client_records_calls_of_the_current_run(self):
+        """Test that provider usage, estimates and cache hits land in the run's ledger"""
+        with patch.dict('os.environ', {'LLM_PROVIDER': 'local'}):
+            client = LLMClient(provider='local', cache=CompletionCache(enabled=True, persistent=False))
+        client._make_request = AsyncMock(return_value={
+            'choices': [{'message': {'content': 'outline'}}],
+            'usage': {'prompt_tokens': 42, 'completion_tokens': 7}
+        })
+
+        with RunContext("job-ledger", deadline_seconds=0) as run_context:
+            await client.complete(prompt="Plan", temperature=0.1, call_type="outline")
+            await client.complete(prompt="Plan", temperature=0.1, call_type="outline")
+
+        payload = client._make_request.await_args.args[0]
+        assert payload["max_tokens"] == output_budget("outline", estimate_tokens("Plan") + 4, "local-model")
+        entries = run_context.llm_ledger.entries
+        assert [(e["prompt_tokens"], e["completion_tokens"], e["cached"]) for e in entries] == [(42, 7, False), (0, 0, True)]
+        assert entries[0]["call_type"] == "outline"
+        assert run_context.budget_summary()["llm_usage"]["calls"] == 2
@@ -0,0 +1,136 @@
+"""
+Token Budgeting
+Token estimates, context-window-aware prompt packing and adaptive max_tokens per call type
+"""
+
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # optional: exact counts for OpenAI models when installed
+    _encoding = None
+
+# Context window (tokens) per model; unknown models use the default
+CONTEXT_WINDOWS = {
+    "gpt-4o-mini": 128000,
+    "gpt-4o": 128000,
+    "claude-3-5-sonnet-20241022": 200000,
+    "local-model": int(os.getenv("LOCAL_LLM_CONTEXT_WINDOW", "8192")),
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Call type -> (floor, ratio of prompt tokens, cap) for the completion budget.
+# Caps override with LLM_MAX_TOKENS_<CALL_TYPE>.
+OUTPUT_BUDGETS = {
+    "default": (4000, 0.0, 4000),
+    "content_analysis": (1000, 0.0, 1000),
+    "analysis": (1000, 0.0, 1000),
+    "outline": (1500, 0.5, 4000),
+    "prewrite": (1500, 0.5, 3000),
+    "article": (2000, 1.5, 8000),
+    "style": (1000, 1.2, 8000),
+    "adaptive": (1000, 0.0, 1000),
+    "crossqa": (2000, 0.0, 4000),
+    "validation": (1000, 0.0, 2000),
+    "gap_fill": (400, 0.0, 400),
+}
+
+# Headroom for chat formatting tokens and estimate error
+_SAFETY_MARGIN = 256
+
+_WORDS = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Token count of text: exact with tiktoken, else a word/punctuation heuristic"""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    # BPE tokenizers split long words: ~1 token per 4 chars, at least one per word or symbol
+    pieces = _WORDS.findall(text)
+    return max(len(text) // 4, int(len(pieces) * 0.75), 1)
+
+
+def estimate_message_tokens(messages: Sequence[Dict[str, str]]) -> int:
+    """Prompt tokens of chat messages, including a few formatting tokens per message"""
+    return sum(estimate_tokens(message.get("content", "")) + 4 for message in messages)
+
+
+def context_window(model: Optional[str]) -> int:
+    return CONTEXT_WINDOWS.get(model or "", DEFAULT_CONTEXT_WINDOW)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of text within max_tokens, cut at a word boundary"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    if _encoding is not None:
+        prefix = _encoding.decode(_encoding.encode(text, disallowed_special=())[:max_tokens])
+    else:
+        # Binary search the prefix length (the heuristic is monotonic in length)
+        low, high = 0, len(text)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if estimate_tokens(text[:mid]) <= max_tokens:
+                low = mid
+            else:
+                high = mid - 1
+        prefix = text[:low]
+    cut = prefix.rfind(" ")
+    return prefix[:cut] if cut > len(prefix) // 2 else prefix
+
+
+def pack_blocks(blocks: Sequence[str], budget_tokens: int, scores: Optional[Sequence[float]] = None,
+                min_tokens: int = 32) -> List[Tuple[int, str]]:
+    """
+    Fit the most relevant blocks into budget_tokens.
+
+    Blocks are taken by descending score (ties keep document order); a block that
+    does not fit whole is truncated if at least min_tokens remain. Returns
+    (index, text) pairs in document order.
+    """
+    order = sorted(range(len(blocks)), key=lambda i: -(scores[i] if scores else 0.0))
+    remaining = budget_tokens
+    packed = {}
+    for i in order:
+        if remaining < min_tokens:
+            break
+        cost = estimate_tokens(blocks[i])
+        if cost <= remaining:
+            packed[i] = blocks[i]
+            remaining -= cost
+        else:
+            packed[i] = truncate_to_tokens(blocks[i], remaining)
+            remaining -= estimate_tokens(packed[i])
+    return sorted(packed.items())
+
+
+def output_budget(call_type: str, prompt_tokens: int, model: Optional[str] = None,
+                  requested: Optional[int] = None) -> int:
+    """
+    max_tokens for a call: the requested value, or the call type's budget scaled to
+    the prompt, clamped to what is left of the model's context window.
+
+    Raises:
+        LLMError: If the prompt leaves less than the call type's floor (or less than
+            requested, when that is smaller) of the context window; callers must
+            pack or truncate the prompt rather than get a cut-off completion
+    """
+    floor, ratio, cap = OUTPUT_BUDGETS.get(call_type, OUTPUT_BUDGETS["default"])
+    if requested is None:
+        cap = int(os.getenv(f"LLM_MAX_TOKENS_{call_type.upper()}", cap))
+        requested = min(cap, max(floor, int(prompt_tokens * ratio)))
+    window = context_window(model)
+    available = window - prompt_tokens - _SAFETY_MARGIN
+    if available < min(floor, requested):
+        from .client import LLMError
+        raise LLMError(f"Prompt of {prompt_tokens} tokens leaves {max(available, 0)} of the {window}-token "
+                       f"context window of {model or 'the default model'}; {call_type} calls need at least "
+                       f"{min(floor, requested)} for the completion")
+    return min(requested, available)
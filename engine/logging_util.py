@@ -1,19 +1,84 @@
 import time
+import asyncio
+import inspect
 import logging
 from functools import wraps
 
+from .metrics import STAGE_DURATION, STAGE_RUNS, STAGE_ARTICLES
+
 logger = logging.getLogger("ke")
 
-def stage_log(stage_name: str):
+def _job_id(args, kwargs):
+    job_id = kwargs.get("job_id") or (getattr(args[0], "job_id", None) if args else None)
+    if not job_id:
+        from .run_context import current_run_context
+        run_context = current_run_context()
+        job_id = run_context.job_id if run_context else None
+    return job_id or "-"
+
+def _article_count(out):
+    """Articles in a stage result: an article list, a (articles, ...) tuple or a dict holding one"""
+    if isinstance(out, tuple) and out:
+        out = out[0]
+    if isinstance(out, dict):
+        out = out.get("generated_articles", out.get("articles"))
+    if isinstance(out, list):
+        return len(out)
+    return None
+
+def _record(stage_name, job_id, start, out=None, error=None, outcome=None):
+    seconds = time.perf_counter() - start
+    if error is None:
+        outcome = outcome or "success"
+    elif isinstance(error, asyncio.CancelledError):
+        outcome = "cancelled"
+    else:
+        outcome = "failure"
+    STAGE_DURATION.observe(seconds, stage=stage_name)
+    STAGE_RUNS.inc(stage=stage_name, outcome=outcome)
+    articles = _article_count(out) if outcome == "success" else None
+    if articles is not None:
+        STAGE_ARTICLES.observe(articles, stage=stage_name)
+    event = {"event":"stage_end","stage":stage_name,"job_id":job_id,"duration_ms":int(seconds*1000),"outcome":outcome}
+    if articles is not None:
+        event["articles"] = articles
+    if error is not None:
+        event["error"] = str(error) or type(error).__name__
+    logger.info(event)
+
+def stage_log(stage_name: str, outcome=None):
+    """
+    Log and time a stage; coroutine functions are timed until they finish, not until they return a coroutine.
+    Stages that report failures in their result instead of raising pass outcome(result), returning
+    "failure"/"cancelled" for such results and None for successful ones.
+    """
     def deco(fn):
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                job_id = _job_id(args, kwargs)
+                logger.info({"event":"stage_start","stage":stage_name,"job_id":job_id})
+                try:
+                    out = await fn(*args, **kwargs)
+                except BaseException as e:
+                    _record(stage_name, job_id, start, error=e)
+                    raise
+                _record(stage_name, job_id, start, out, outcome=outcome and outcome(out))
+                return out
+            return async_wrapper
+
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            start = time.time()
-            job_id = kwargs.get("job_id") or (getattr(args[0], "job_id", None) if args else None) or "-"
+            start = time.perf_counter()
+            job_id = _job_id(args, kwargs)
             logger.info({"event":"stage_start","stage":stage_name,"job_id":job_id})
-            out = fn(*args, **kwargs)
-            dur = int((time.time()-start)*1000)
-            logger.info({"event":"stage_end","stage":stage_name,"job_id":job_id,"duration_ms":dur})
+            try:
+                out = fn(*args, **kwargs)
+            except BaseException as e:
+                _record(stage_name, job_id, start, error=e)
+                raise
+            _record(stage_name, job_id, start, out, outcome=outcome and outcome(out))
             return out
         return wrapper
-    return deco
\ No newline at end of file
+    return deco
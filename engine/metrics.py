@@ -0,0 +1,207 @@
+"""
+Engine Metrics
+In-process counters and histograms exported in the Prometheus text exposition format
+"""
+
+import math
+import threading
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Seconds: stage latencies range from a few milliseconds (planning) to minutes (generation)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+ARTICLE_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[str, str] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}" for key, value in values]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Counter):
+    """Value that goes up and down, with labels"""
+
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [per-bucket counts, sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(str(labels.get(name, "")) for name in self.labelnames))
+        return series[2] if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, [list(value[0]), value[1], value[2]]) for key, value in self._series.items())
+        lines = []
+        for key, (bucket_counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_number(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """Named metrics of this process"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        """Reset every metric's values (tests)"""
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.histogram(
+    "ke_stage_duration_seconds", "Wall-clock duration of engine stages", ("stage",))
+STAGE_RUNS = REGISTRY.counter(
+    "ke_stage_runs_total", "Engine stage executions by outcome", ("stage", "outcome"))
+STAGE_ARTICLES = REGISTRY.histogram(
+    "ke_stage_articles", "Articles produced per engine stage execution", ("stage",), buckets=ARTICLE_BUCKETS)
+
+LLM_CACHE_LOOKUPS = REGISTRY.counter(
+    "ke_llm_cache_lookups_total", "LLM completion cache lookups by tier and result", ("tier", "result"))
+LLM_CACHE_EVICTIONS = REGISTRY.counter(
+    "ke_llm_cache_evictions_total", "LLM completion cache entries evicted from memory", ("reason",))
+LLM_REQUESTS_COALESCED = REGISTRY.counter(
+    "ke_llm_requests_coalesced_total", "LLM requests served by an identical request already in flight")
+LLM_QUEUE_DEPTH = REGISTRY.gauge(
+    "ke_llm_queue_depth", "LLM requests waiting for rate limit quota or a concurrency slot", ("provider", "queue"))
+LLM_IN_FLIGHT = REGISTRY.gauge(
+    "ke_llm_in_flight", "LLM requests currently sent to a provider", ("provider",))
+LLM_QUEUE_WAIT = REGISTRY.histogram(
+    "ke_llm_queue_wait_seconds", "Time LLM requests waited for quota and a concurrency slot", ("provider",))
+LLM_RATE_LIMITED = REGISTRY.counter(
+    "ke_llm_rate_limited_total", "Provider responses that signalled a rate limit (429/503)", ("provider",))
+LLM_HEDGED_REQUESTS = REGISTRY.counter(
+    "ke_llm_hedged_requests_total", "LLM requests hedged to a secondary route, by which route won", ("provider", "winner"))
+LLM_CIRCUIT_OPEN = REGISTRY.gauge(
+    "ke_llm_circuit_open", "1 while a provider's circuit breaker routes requests around it", ("provider",))
+LLM_STRUCTURED_OUTPUTS = REGISTRY.counter(
+    "ke_llm_structured_outputs_total", "JSON completions by parse outcome (parsed, repaired, invalid)", ("outcome",))
+
+EXTRACTION_JOBS = REGISTRY.counter(
+    "ke_extraction_jobs_total", "Document conversions run by the extraction executor, by outcome", ("converter", "outcome"))
+EXTRACTION_DURATION = REGISTRY.histogram(
+    "ke_extraction_duration_seconds", "Wall-clock duration of document conversions", ("converter",))
+EXTRACTION_CACHE_LOOKUPS = REGISTRY.counter(
+    "ke_extraction_cache_lookups_total", "Extraction cache lookups by result", ("result",))
+EXTRACTION_CACHE_EVICTIONS = REGISTRY.counter(
+    "ke_extraction_cache_evictions_total", "Extraction cache entries evicted from memory", ("reason",))
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render_prometheus() -> str:
+    """Prometheus text exposition of all engine metrics"""
+    return REGISTRY.render()
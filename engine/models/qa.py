@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 class QAFlag(BaseModel):
     code: str            # e.g., P0_UNSUPPORTED_CLAIM
@@ -12,4 +12,5 @@ class QAReport(BaseModel):
     coverage_percent: float
     flags: List[QAFlag]
     broken_links: List[str] = []
-    missing_media: List[str] = []
\ No newline at end of file
+    missing_media: List[str] = []
+    llm_usage: Optional[Dict[str, Any]] = None   # run's LLM token/latency/cost ledger totals
\ No newline at end of file
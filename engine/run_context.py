@@ -0,0 +1,159 @@
+"""
+Run Context
+Cooperative cancellation, wall-clock deadlines and budget accounting for processing runs
+"""
+
+import os
+import time
+import asyncio
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Set
+
+
+class RunCancelledError(Exception):
+    """Raised when a run was cancelled (e.g. the user abandoned the upload)"""
+    pass
+
+
+class RunDeadlineExceeded(Exception):
+    """Raised when a run has used up its wall-clock deadline"""
+    pass
+
+
+_current_run: ContextVar = ContextVar("current_run_context", default=None)
+
+# Runs active in this process, by job_id, so an API call can cancel them
+_active_runs: Dict[str, "RunContext"] = {}
+
+
+class RunContext:
+    """
+    Per-run cancellation token, deadline and budget ledger.
+
+    Stages call check() at their boundaries and should_degrade() before optional
+    LLM work. cancel() also cancels every attached task, which aborts in-flight
+    LLM requests immediately rather than at the next check. LLM calls made under
+    the context are recorded in llm_ledger.
+    """
+
+    def __init__(self, job_id: str, deadline_seconds: float = None, optional_stage_reserve: float = None):
+        self.job_id = job_id
+        if deadline_seconds is None:
+            deadline_seconds = float(os.getenv("V2_RUN_DEADLINE_SECONDS", "0"))
+        # 0 (the default) disables the deadline
+        self.deadline_seconds = deadline_seconds or None
+        # Seconds that must remain for optional LLM stages to run
+        self.optional_stage_reserve = optional_stage_reserve if optional_stage_reserve is not None else float(
+            os.getenv("V2_OPTIONAL_STAGE_RESERVE_SECONDS", "90"))
+
+        self.started_at = time.monotonic()
+        self.cancel_reason: Optional[str] = None
+        self.stage_seconds: Dict[str, float] = {}
+        self.skipped_stages: List[str] = []
+        self._tasks: Set[asyncio.Task] = set()
+        self._tokens: List[Any] = []
+
+        from .llm.ledger import LLMLedger  # engine.llm imports this module
+        self.llm_ledger = LLMLedger()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_reason is not None
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without a deadline"""
+        if self.deadline_seconds is None:
+            return None
+        return max(0.0, self.deadline_seconds - self.elapsed())
+
+    def cancel(self, reason: str = "cancelled"):
+        """Cancel the run and every task attached to it"""
+        if self.cancelled:
+            return
+        self.cancel_reason = reason
+        print(f"🛑 RUN CONTEXT: Cancelling job {self.job_id} - {reason}")
+        for task in list(self._tasks):
+            task.cancel()
+
+    def attach(self, task: asyncio.Task):
+        """Cancel this task when the run is cancelled"""
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if self.cancelled:
+            task.cancel()
+
+    def check(self, stage: str = None):
+        """Raise if the run was cancelled or is past its deadline"""
+        where = f" before {stage}" if stage else ""
+        if self.cancelled:
+            raise RunCancelledError(f"Job {self.job_id} cancelled{where}: {self.cancel_reason}")
+        if self.remaining() == 0:
+            raise RunDeadlineExceeded(f"Job {self.job_id} exceeded its {self.deadline_seconds:.0f}s deadline{where}")
+
+    def should_degrade(self, stage: str = None) -> bool:
+        """True when too little time remains for optional LLM work; records the skip"""
+        remaining = self.remaining()
+        degrade = remaining is not None and remaining < self.optional_stage_reserve
+        if degrade and stage:
+            self.skipped_stages.append(stage)
+            print(f"⏱️ RUN CONTEXT: Skipping optional LLM work in {stage} - {remaining:.0f}s left - job {self.job_id}")
+        return degrade
+
+    def record_stage(self, stage: str, seconds: float):
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+    def budget_summary(self) -> Dict[str, Any]:
+        """Deadline and time spent per stage, for reports and diagnostics"""
+        remaining = self.remaining()
+        return {
+            "job_id": self.job_id,
+            "deadline_seconds": self.deadline_seconds,
+            "elapsed_seconds": round(self.elapsed(), 3),
+            "remaining_seconds": round(remaining, 3) if remaining is not None else None,
+            "stage_seconds": {stage: round(seconds, 3) for stage, seconds in self.stage_seconds.items()},
+            "skipped_stages": list(self.skipped_stages),
+            "cancelled": self.cancelled,
+            "cancel_reason": self.cancel_reason,
+            "llm_usage": self.llm_ledger.summary()
+        }
+
+    def __enter__(self):
+        """Make this the current run context and register it for cancel-by-id (re-entrant)"""
+        self._tokens.append(_current_run.set(self))
+        _active_runs[self.job_id] = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_run.reset(self._tokens.pop())
+        if not self._tokens and _active_runs.get(self.job_id) is self:
+            del _active_runs[self.job_id]
+        return False
+
+
+def current_run_context() -> Optional[RunContext]:
+    """The run context of the calling task, if any"""
+    return _current_run.get()
+
+
+def check_current_run(stage: str = None):
+    """Cooperative cancellation point for code that has no explicit run context"""
+    run_context = _current_run.get()
+    if run_context is not None:
+        run_context.check(stage)
+
+
+def detach_current_run():
+    """Clear the run context of the calling task (work shared by several runs, e.g. a coalesced LLM request)"""
+    _current_run.set(None)
+
+
+def cancel_run(job_id: str, reason: str = "cancelled by request") -> bool:
+    """Cancel a run active in this process; False if it is not running here"""
+    run_context = _active_runs.get(job_id)
+    if run_context is None:
+        return False
+    run_context.cancel(reason)
+    return True
@@ -5,9 +5,10 @@ Centralized MongoDB operations with repository pattern for clean data layer abst
 
 import os
 import asyncio
-from datetime import datetime
-from typing import Dict, Any, List, Optional, Union
+from datetime import datetime, timedelta
+from typing import BinaryIO, Dict, Any, List, Optional, Union
 from pymongo.errors import PyMongoError
+import gridfs.errors
 import motor.motor_asyncio
 
 # Import settings for MongoDB connection
@@ -315,6 +316,15 @@ class QAResultsRepository:
             print(f"❌ KE-PR9: Error inserting QA report: {e}")
             raise
     
+    async def update_llm_usage(self, run_id: str, llm_usage: Dict[str, Any]) -> bool:
+        """Attach a run's LLM usage summary to its stored QA report; False when none is stored"""
+        try:
+            result = await self.collection.update_many({"stored_job_id": run_id}, {"$set": {"llm_usage": llm_usage}})
+            return result.matched_count > 0
+        except Exception as e:
+            print(f"❌ KE-PR9: Error updating QA report LLM usage: {e}")
+            raise
+    
     async def find_recent_qa_summaries(self, limit: int = 10) -> List[Dict]:
         """Find recent QA summaries"""
         try:
@@ -574,6 +584,205 @@ class V2ProcessingRepository:
             print(f"❌ KE-PR9: Error finding recent processing results: {e}")
             return []
 
+# ========================================
+# V2 STAGE CHECKPOINTS REPOSITORY
+# ========================================
+
+class V2CheckpointRepository:
+    """
+    Repository for per-stage V2 pipeline checkpoints keyed by run_id and stage.
+    
+    Checkpoints expire V2_CHECKPOINT_RETENTION_DAYS (default 7, 0 keeps them) after
+    their last write through a TTL index. Payloads larger than
+    V2_CHECKPOINT_INLINE_MAX_BYTES (default 8 MiB) are stored in GridFS, like job
+    payloads, and expire with the same retention.
+    """
+    
+    def __init__(self):
+        self.db = get_database()
+        self.collection = self.db.v2_stage_checkpoints
+        self.retention_days = float(os.getenv("V2_CHECKPOINT_RETENTION_DAYS", "7"))
+        self.inline_max_bytes = int(os.getenv("V2_CHECKPOINT_INLINE_MAX_BYTES", str(8 * 1024 * 1024)))
+        self._indexes_ready = False
+        self._last_payload_purge = None
+    
+    def _payload_bucket(self):
+        """GridFS bucket holding checkpoint payloads over the inline size limit"""
+        return motor.motor_asyncio.AsyncIOMotorGridFSBucket(self.db, bucket_name="v2_checkpoint_payloads")
+    
+    async def _ensure_indexes(self):
+        """Lookup index by run and stage, and the TTL index that drops old checkpoints"""
+        if self._indexes_ready:
+            return
+        self._indexes_ready = True
+        try:
+            await self.collection.create_index([("run_id", 1), ("stage", 1)])
+            if self.retention_days > 0:
+                await self.collection.create_index("updated_at", expireAfterSeconds=int(self.retention_days * 86400))
+        except Exception as e:
+            print(f"⚠️ V2Checkpoints: Could not create checkpoint indexes - {e}")
+    
+    async def _purge_expired_payloads(self):
+        """Delete GridFS payloads past the retention (the TTL index only covers checkpoint documents), at most hourly"""
+        now = datetime.utcnow()
+        if self.retention_days <= 0 or (self._last_payload_purge and now - self._last_payload_purge < timedelta(hours=1)):
+            return
+        self._last_payload_purge = now
+        bucket = self._payload_bucket()
+        cursor = bucket.find({"uploadDate": {"$lt": now - timedelta(days=self.retention_days)}})
+        async for expired in cursor:
+            await bucket.delete(expired._id)
+    
+    async def _delete_payloads(self, query: Dict[str, Any]):
+        """Delete the GridFS payloads of the checkpoints matching query"""
+        bucket = self._payload_bucket()
+        async for checkpoint in self.collection.find({**query, "payload_id": {"$ne": None}}, {"payload_id": 1}):
+            try:
+                await bucket.delete(checkpoint["payload_id"])
+            except Exception as e:
+                print(f"⚠️ V2Checkpoints: Error deleting payload {checkpoint['payload_id']} - {e}")
+    
+    async def save_checkpoint(self, run_id: str, stage: str, checkpoint: Dict[str, Any]) -> bool:
+        """Insert or replace the checkpoint for one stage of a run"""
+        try:
+            await self._ensure_indexes()
+            await self._delete_payloads({"run_id": run_id, "stage": stage})
+            
+            checkpoint = {**checkpoint, "run_id": run_id, "stage": stage, "payload_id": None, "updated_at": datetime.utcnow()}
+            if len(checkpoint["payload"]) > self.inline_max_bytes:
+                checkpoint["payload_id"] = await self._payload_bucket().upload_from_stream(
+                    f"{run_id}/{stage}", checkpoint["payload"], metadata={"run_id": run_id, "stage": stage}
+                )
+                checkpoint["payload"] = None
+                await self._purge_expired_payloads()
+            
+            result = await self.collection.update_one(
+                {"run_id": run_id, "stage": stage},
+                {"$set": checkpoint, "$setOnInsert": {"created_at": datetime.utcnow()}},
+                upsert=True
+            )
+            return result.acknowledged
+        except Exception as e:
+            print(f"❌ V2Checkpoints: Error saving checkpoint {run_id}/{stage} - {e}")
+            return False
+    
+    async def find_checkpoints(self, run_id: str) -> List[Dict]:
+        """Find all stage checkpoints stored for a run, with GridFS payloads loaded"""
+        try:
+            cursor = self.collection.find({"run_id": run_id})
+            checkpoints = await cursor.to_list(length=None)
+            
+            for checkpoint in checkpoints:
+                if '_id' in checkpoint:
+                    checkpoint['_id'] = str(checkpoint['_id'])
+                if checkpoint.get('payload_id') is not None:
+                    stream = await self._payload_bucket().open_download_stream(checkpoint['payload_id'])
+                    checkpoint['payload'] = await stream.read()
+            
+            return checkpoints
+        except Exception as e:
+            print(f"❌ V2Checkpoints: Error finding checkpoints for {run_id} - {e}")
+            return []
+    
+    async def delete_checkpoints(self, run_id: str, stages: List[str]) -> int:
+        """Delete checkpoints for the given stages of a run"""
+        try:
+            query = {"run_id": run_id, "stage": {"$in": stages}}
+            await self._delete_payloads(query)
+            result = await self.collection.delete_many(query)
+            return result.deleted_count
+        except Exception as e:
+            print(f"❌ V2Checkpoints: Error deleting checkpoints for {run_id} - {e}")
+            return 0
+
+# ========================================
+# V2 ARTICLE SNAPSHOTS REPOSITORY
+# ========================================
+
+class V2ArticleSnapshotRepository:
+    """Repository for per-article V2 snapshots keyed by source document and block fingerprint"""
+    
+    def __init__(self):
+        self.collection = get_collection("v2_article_snapshots")
+    
+    async def find_latest_snapshots(self, document_key: str) -> List[Dict]:
+        """Find the article snapshots of the most recent run for a source document"""
+        try:
+            latest = await self.collection.find_one({"document_key": document_key}, sort=[("updated_at", -1)])
+            if not latest:
+                return []
+            
+            cursor = self.collection.find({"document_key": document_key, "run_id": latest["run_id"]})
+            snapshots = await cursor.to_list(length=None)
+            
+            for snapshot in snapshots:
+                if '_id' in snapshot:
+                    snapshot['_id'] = str(snapshot['_id'])
+            
+            return snapshots
+        except Exception as e:
+            print(f"❌ V2ArticleSnapshots: Error finding snapshots for {document_key} - {e}")
+            return []
+    
+    async def replace_snapshots(self, document_key: str, run_id: str, snapshots: List[Dict[str, Any]]) -> int:
+        """Store the article snapshots of a run and drop those of earlier runs"""
+        try:
+            now = datetime.utcnow()
+            for snapshot in snapshots:
+                await self.collection.update_one(
+                    {"document_key": document_key, "fingerprint": snapshot["fingerprint"]},
+                    {"$set": {**snapshot, "document_key": document_key, "run_id": run_id, "updated_at": now}},
+                    upsert=True
+                )
+            
+            await self.collection.delete_many({"document_key": document_key, "run_id": {"$ne": run_id}})
+            return len(snapshots)
+        except Exception as e:
+            print(f"❌ V2ArticleSnapshots: Error storing snapshots for {document_key} - {e}")
+            return 0
+
+class LLMCompletionCacheRepository:
+    """Repository for the persistent tier of the LLM completion cache"""
+    
+    def __init__(self):
+        self.collection = get_collection("llm_completion_cache")
+        self._indexes_ready = False
+    
+    async def _ensure_indexes(self):
+        """Unique cache key and a TTL index so MongoDB drops expired completions"""
+        if self._indexes_ready:
+            return
+        self._indexes_ready = True
+        await self.collection.create_index("cache_key", unique=True)
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+    
+    async def find_completion(self, cache_key: str) -> Optional[Dict]:
+        """Find an unexpired cached completion"""
+        try:
+            return await self.collection.find_one(
+                {"cache_key": cache_key, "expires_at": {"$gt": datetime.utcnow()}},
+                {"_id": 0}
+            )
+        except Exception as e:
+            print(f"❌ LLMCompletionCache: Error finding {cache_key[:12]} - {e}")
+            return None
+    
+    async def store_completion(self, cache_key: str, completion: str, expires_at: datetime,
+                               metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Store (or refresh) a cached completion"""
+        try:
+            await self._ensure_indexes()
+            await self.collection.update_one(
+                {"cache_key": cache_key},
+                {"$set": {**(metadata or {}), "cache_key": cache_key, "completion": completion,
+                          "expires_at": expires_at, "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            print(f"❌ LLMCompletionCache: Error storing {cache_key[:12]} - {e}")
+            return False
+
 # ========================================
 # KE-PR9.5: PROCESSING JOBS REPOSITORY
 # ========================================
@@ -704,6 +913,263 @@ class ProcessingJobsRepository:
         except Exception as e:
             print(f"❌ ProcessingJobs: Error counting jobs - {e}")
             return 0
+    
+    # Job queue: jobs carry a queue_state (queued, leased, done, dead, cancelled) next
+    # to the user-facing status; workers lease them with find_one_and_update and keep
+    # the lease alive with heartbeats, so jobs of crashed workers are leased again.
+    # Cancelling a leased job makes its next heartbeat fail, which stops the handler.
+    
+    def _payload_bucket(self):
+        """GridFS bucket holding job payloads (uploaded file bytes)"""
+        return motor.motor_asyncio.AsyncIOMotorGridFSBucket(self.db, bucket_name="job_payloads")
+    
+    async def ensure_queue_indexes(self):
+        """Create the indexes used by job leasing"""
+        try:
+            await self.collection.create_index([("queue_state", 1), ("created_at", 1)])
+            await self.collection.create_index("job_id")
+        except Exception as e:
+            print(f"⚠️ ProcessingJobs: Could not create queue indexes - {e}")
+    
+    async def enqueue_job(self, job_data: Dict[str, Any], payload: Union[bytes, BinaryIO, None] = None,
+                          max_attempts: int = 3) -> Optional[str]:
+        """Insert a job for workers to lease, storing its payload (bytes or a binary file object, read in chunks) in GridFS"""
+        try:
+            job_data = {
+                **job_data,
+                "status": "queued",
+                "queue_state": "queued",
+                "attempts": 0,
+                "max_attempts": max_attempts,
+                "payload_id": None
+            }
+            if payload is not None:
+                job_data["payload_id"] = await self._payload_bucket().upload_from_stream(
+                    job_data.get("original_filename") or job_data.get("job_id", "payload"),
+                    payload,
+                    metadata={"job_id": job_data.get("job_id")}
+                )
+            
+            inserted_id = await self.insert_job(job_data)
+            if inserted_id:
+                print(f"📥 ProcessingJobs: Job queued - {job_data.get('job_id')} ({job_data.get('job_type', 'unknown')})")
+            return inserted_id
+        except Exception as e:
+            print(f"❌ ProcessingJobs: Error enqueueing job - {e}")
+            return None
+    
+    async def lease_next_job(self, worker_id: str, lease_seconds: float,
+                             job_types: Optional[List[str]] = None) -> Optional[Dict]:
+        """Atomically lease the oldest queued job, or one whose lease has expired"""
+        try:
+            from pymongo import ReturnDocument
+            
+            now = datetime.utcnow()
+            
+            # Abandoned leases that used up their attempts are not retried again
+            dead = await self.collection.update_many(
+                {"queue_state": "leased", "lease_expires_at": {"$lt": now},
+                 "$expr": {"$gte": ["$attempts", "$max_attempts"]}},
+                {"$set": {"queue_state": "dead", "status": "failed", "updated_at": now,
+                          "error_message": "Job lease expired after the maximum number of attempts"}}
+            )
+            # Cancelled jobs whose worker died before acknowledging are not retried either
+            cancelled = await self.collection.update_many(
+                {"queue_state": "leased", "lease_expires_at": {"$lt": now}, "cancel_requested": True},
+                {"$set": {"queue_state": "cancelled", "status": "cancelled", "updated_at": now}}
+            )
+            if dead.modified_count or cancelled.modified_count:
+                await self.purge_finished_payloads()
+            
+            query = {
+                "$or": [
+                    {"queue_state": "queued"},
+                    {"queue_state": "leased", "lease_expires_at": {"$lt": now}}
+                ],
+                "cancel_requested": {"$ne": True},
+                "$expr": {"$lt": ["$attempts", "$max_attempts"]}
+            }
+            if job_types:
+                query["job_type"] = {"$in": job_types}
+            
+            job = await self.collection.find_one_and_update(
+                query,
+                {
+                    "$set": {
+                        "queue_state": "leased",
+                        "status": "processing",
+                        "worker_id": worker_id,
+                        "leased_at": now,
+                        "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                        "updated_at": now
+                    },
+                    "$inc": {"attempts": 1}
+                },
+                sort=[("created_at", 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            
+            if job and '_id' in job:
+                job['_id'] = str(job['_id'])
+            
+            return job
+        except Exception as e:
+            print(f"❌ ProcessingJobs: Error leasing job for {worker_id} - {e}")
+            return None
+    
+    async def renew_lease(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """
+        Extend a held lease (heartbeat); False means the lease was lost or cancelled.
+        Database errors are raised so the caller can retry before the lease expires.
+        """
+        now = datetime.utcnow()
+        result = await self.collection.update_one(
+            {"job_id": job_id, "worker_id": worker_id, "queue_state": "leased", "cancel_requested": {"$ne": True}},
+            {"$set": {"lease_expires_at": now + timedelta(seconds=lease_seconds), "heartbeat_at": now}}
+        )
+        return result.matched_count > 0
+    
+    async def complete_leased_job(self, job_id: str, worker_id: str, result: Optional[Dict] = None) -> bool:
+        """Mark a leased job as done"""
+        try:
+            now = datetime.utcnow()
+            update = await self.collection.update_one(
+                {"job_id": job_id, "worker_id": worker_id, "queue_state": "leased"},
+                {"$set": {**(result or {}), "queue_state": "done", "status": "completed",
+                          "completed_at": now, "updated_at": now},
+                 "$unset": {"lease_expires_at": ""}}
+            )
+            return update.matched_count > 0
+        except Exception as e:
+            print(f"❌ ProcessingJobs: Error completing job {job_id} - {e}")
+            return False
+    
+    async def release_failed_job(self, job_id: str, worker_id: str, error: str) -> str:
+        """Requeue a failed job while it has attempts left; returns the new queue_state"""
+        try:
+            now = datetime.utcnow()
+            owned = {"job_id": job_id, "worker_id": worker_id, "queue_state": "leased"}
+            
+            retried = await self.collection.update_one(
+                {**owned, "$expr": {"$lt": ["$attempts", "$max_attempts"]}},
+                {"$set": {"queue_state": "queued", "status": "queued", "last_error": error, "updated_at": now},
+                 "$unset": {"lease_expires_at": "", "worker_id": ""}}
+            )
+            if retried.matched_count:
+                return "queued"
+            
+            await self.collection.update_one(
+                owned,
+                {"$set": {"queue_state": "dead", "status": "failed", "error_message": error, "updated_at": now},
+                 "$unset": {"lease_expires_at": ""}}
+            )
+            return "dead"
+        except Exception as e:
+            print(f"❌ ProcessingJobs: Error releasing job {job_id} - {e}")
+            return "unknown"
+    
+    async def request_cancel(self, job_id: str) -> Optional[str]:
+        """
+        Cancel a queued job, or flag a running one (leased by a worker, or processed
+        inline by an API process watching it with watch_cancel_request) to stop;
+        returns the resulting status
+        """
+        try:
+            now = datetime.utcnow()
+            queued = await self.collection.find_one_and_update(
+                {"job_id": job_id, "queue_state": "queued"},
+                {"$set": {"queue_state": "cancelled", "status": "cancelled", "cancel_requested": True,
+                          "completed_at": now, "updated_at": now}},
+                projection={"payload_id": 1}
+            )
+            if queued:
+                print(f"🛑 ProcessingJobs: Queued job cancelled - {job_id}")
+                if queued.get("payload_id") is not None:
+                    await self.delete_job_payload(queued["payload_id"])
+                return "cancelled"
+            
+            leased = await self.collection.update_one(
+                {"job_id": job_id, "queue_state": "leased"},
+                {"$set": {"cancel_requested": True, "status": "cancelling", "updated_at": now}}
+            )
+            if leased.matched_count:
+                print(f"🛑 ProcessingJobs: Cancellation requested for running job - {job_id}")
+                return "cancelling"
+            
+            inline = await self.collection.update_one(
+                {"job_id": job_id, "queue_state": {"$exists": False}, "status": "processing"},
+                {"$set": {"cancel_requested": True, "updated_at": now}}
+            )
+            if inline.matched_count:
+                print(f"🛑 ProcessingJobs: Cancellation requested for inline job - {job_id}")
+                return "cancelling"
+            
+            job = await self.collection.find_one({"job_id": job_id}, {"status": 1})
+            return job.get("status") if job else None
+        except Exception as e:
+            print(f"❌ ProcessingJobs: Error cancelling job {job_id} - {e}")
+            return None
+    
+    async def acknowledge_cancel(self, job_id: str, worker_id: str) -> bool:
+        """Mark a job cancelled once its worker stopped it; False if the lease was lost for another reason"""
+        try:
+            now = datetime.utcnow()
+            update = await self.collection.update_one(
+                {"job_id": job_id, "worker_id": worker_id, "queue_state": "leased", "cancel_requested": True},
+                {"$set": {"queue_state": "cancelled", "status": "cancelled", "completed_at": now, "updated_at": now},
+                 "$unset": {"lease_expires_at": ""}}
+            )
+            return update.matched_count > 0
+        except Exception as e:
+            print(f"❌ ProcessingJobs: Error acknowledging cancel of {job_id} - {e}")
+            return False
+    
+    async def download_job_payload(self, payload_id, destination: BinaryIO) -> bool:
+        """Write a job payload from GridFS to a binary file object, chunk by chunk"""
+        try:
+            await self._payload_bucket().download_to_stream(payload_id, destination)
+            return True
+        except Exception as e:
+            print(f"❌ ProcessingJobs: Error loading payload {payload_id} - {e}")
+            return False
+    
+    async def delete_job_payload(self, payload_id) -> bool:
+        """Delete a job payload from GridFS and clear it from its job"""
+        try:
+            try:
+                await self._payload_bucket().delete(payload_id)
+            except gridfs.errors.NoFile:
+                pass  # Already deleted, e.g. by purge_finished_payloads on another worker
+            await self.collection.update_many({"payload_id": payload_id}, {"$set": {"payload_id": None}})
+            return True
+        except Exception as e:
+            print(f"⚠️ ProcessingJobs: Error deleting payload {payload_id} - {e}")
+            return False
+    
+    async def purge_finished_payloads(self, limit: Optional[int] = 100) -> int:
+        """
+        Delete the GridFS payloads of jobs that will not run again (done, dead or
+        cancelled) and still hold one, e.g. jobs swept by lease_next_job that no worker
+        finished. Each payload is claimed atomically, so concurrent workers never
+        delete the same one twice. limit=None purges them all.
+        """
+        purged = 0
+        try:
+            while limit is None or purged < limit:
+                job = await self.collection.find_one_and_update(
+                    {"queue_state": {"$in": ["done", "dead", "cancelled"]}, "payload_id": {"$ne": None}},
+                    {"$set": {"payload_id": None}},
+                    projection={"job_id": 1, "payload_id": 1}
+                )
+                if not job:
+                    break
+                await self.delete_job_payload(job["payload_id"])
+                purged += 1
+            if purged:
+                print(f"🧹 ProcessingJobs: Deleted {purged} payloads of finished jobs")
+        except Exception as e:
+            print(f"⚠️ ProcessingJobs: Error purging finished job payloads - {e}")
+        return purged
 
 # ========================================
 # REPOSITORY FACTORY
@@ -756,6 +1222,21 @@ class RepositoryFactory:
     def get_v2_processing():
         """Get V2 processing repository for general V2 operations"""
         return V2ProcessingRepository()
+    
+    @staticmethod
+    def get_v2_checkpoints() -> V2CheckpointRepository:
+        """Get V2 stage checkpoints repository"""
+        return V2CheckpointRepository()
+    
+    @staticmethod
+    def get_v2_article_snapshots() -> V2ArticleSnapshotRepository:
+        """Get V2 article snapshots repository"""
+        return V2ArticleSnapshotRepository()
+    
+    @staticmethod
+    def get_llm_completion_cache() -> LLMCompletionCacheRepository:
+        """Get LLM completion cache repository"""
+        return LLMCompletionCacheRepository()
 
 # ========================================
 # CONVENIENCE FUNCTIONS
@@ -0,0 +1,77 @@
+"""
+Unit tests for the job queue methods of ProcessingJobsRepository
+Tests for deleting the GridFS payloads of jobs that end without a worker
+"""
+
+import pytest
+import gridfs.errors
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from .mongo import ProcessingJobsRepository
+
+
+class FakePayloadBucket:
+    """Stand-in for the job_payloads GridFS bucket"""
+
+    def __init__(self, payload_ids):
+        self.files = set(payload_ids)
+        self.deleted = []
+
+    async def delete(self, payload_id):
+        if payload_id not in self.files:
+            raise gridfs.errors.NoFile(f"no file {payload_id}")
+        self.files.remove(payload_id)
+        self.deleted.append(payload_id)
+
+
+def _make_repository(payload_ids) -> ProcessingJobsRepository:
+    repository = ProcessingJobsRepository.__new__(ProcessingJobsRepository)
+    repository.collection = AsyncMock()
+    bucket = FakePayloadBucket(payload_ids)
+    repository._payload_bucket = lambda: bucket
+    return repository
+
+
+class TestJobPayloadCleanup:
+    """Unit tests for payload deletion on the paths no worker finishes"""
+
+    @pytest.mark.asyncio
+    async def test_cancelling_queued_job_deletes_payload(self):
+        """Test that a job cancelled before any worker leased it releases its payload"""
+        repository = _make_repository(["p1"])
+        repository.collection.find_one_and_update.return_value = {"_id": "1", "payload_id": "p1"}
+
+        assert await repository.request_cancel("j1") == "cancelled"
+        assert repository._payload_bucket().deleted == ["p1"]
+        repository.collection.update_many.assert_awaited_with({"payload_id": "p1"}, {"$set": {"payload_id": None}})
+
+    @pytest.mark.asyncio
+    async def test_lease_sweep_purges_payloads_of_swept_jobs(self):
+        """Test that jobs swept to dead or cancelled by lease_next_job have their payloads deleted"""
+        repository = _make_repository(["p1", "p2"])
+        repository.collection.update_many.return_value = SimpleNamespace(modified_count=1)
+        repository.collection.find_one_and_update.side_effect = [
+            {"job_id": "j1", "payload_id": "p1"}, {"job_id": "j2", "payload_id": "p2"}, None,  # purge claims
+            None  # no job left to lease
+        ]
+
+        assert await repository.lease_next_job("worker_1", 60) is None
+        assert repository._payload_bucket().deleted == ["p1", "p2"]
+        claim_query = repository.collection.find_one_and_update.await_args_list[0].args[0]
+        assert claim_query == {"queue_state": {"$in": ["done", "dead", "cancelled"]}, "payload_id": {"$ne": None}}
+
+    @pytest.mark.asyncio
+    async def test_sweep_without_changes_skips_purge(self):
+        """Test that an idle poll does not look for payloads to purge"""
+        repository = _make_repository([])
+        repository.collection.update_many.return_value = SimpleNamespace(modified_count=0)
+        repository.collection.find_one_and_update.return_value = None
+
+        await repository.lease_next_job("worker_1", 60)
+        assert repository.collection.find_one_and_update.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_already_deleted_payload_is_not_an_error(self):
+        """Test that deleting a payload another worker already purged still succeeds"""
+        repository = _make_repository([])
+        assert await repository.delete_job_payload("p1") is True
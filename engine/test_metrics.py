@@ -0,0 +1,99 @@
+"""
+Unit tests for engine metrics
+Tests for async-aware stage timing and the Prometheus text exposition
+"""
+
+import pytest
+import asyncio
+from .metrics import REGISTRY, STAGE_DURATION, STAGE_RUNS, STAGE_ARTICLES, Histogram, render_prometheus
+from .logging_util import stage_log
+
+
+class TestStageLog:
+    """Unit tests for stage_log timing"""
+
+    def setup_method(self):
+        REGISTRY.clear()
+
+    @pytest.mark.asyncio
+    async def test_async_stage_timed_until_completion(self):
+        """Test that coroutine stages are timed until they finish, with article counts"""
+        @stage_log("slow_stage")
+        async def slow_stage():
+            await asyncio.sleep(0.05)
+            return {"generated_articles": [{}, {}, {}]}
+
+        await slow_stage()
+
+        series = STAGE_DURATION._series[("slow_stage",)]
+        assert series[1] >= 0.05
+        assert STAGE_RUNS.value(stage="slow_stage", outcome="success") == 1
+        assert STAGE_ARTICLES._series[("slow_stage",)][1] == 3
+
+    @pytest.mark.asyncio
+    async def test_failures_are_counted_and_reraised(self):
+        """Test that failing sync and async stages count as failures"""
+        @stage_log("failing_async")
+        async def failing_async():
+            raise ValueError("boom")
+
+        @stage_log("failing_sync")
+        def failing_sync():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await failing_async()
+        with pytest.raises(ValueError):
+            failing_sync()
+
+        assert STAGE_RUNS.value(stage="failing_async", outcome="failure") == 1
+        assert STAGE_RUNS.value(stage="failing_sync", outcome="failure") == 1
+        assert STAGE_DURATION.count(stage="failing_sync") == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_reported_in_result_are_counted(self):
+        """Test that outcome() classifies returned results, e.g. runs that return a failure report"""
+        def outcome(result):
+            return result["status"] if result["status"] != "ok" else None
+
+        @stage_log("reporting_stage", outcome=outcome)
+        async def reporting_stage(status):
+            return {"status": status, "articles": [{}]}
+
+        for status in ("ok", "failure", "cancelled"):
+            await reporting_stage(status)
+
+        for status in ("success", "failure", "cancelled"):
+            assert STAGE_RUNS.value(stage="reporting_stage", outcome=status) == 1
+        # Article counts only describe successful runs
+        assert STAGE_ARTICLES.count(stage="reporting_stage") == 1
+
+
+class TestPrometheusExposition:
+    """Unit tests for the text exposition format"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket, sum and count samples of a histogram"""
+        histogram = Histogram("test_seconds", "Test histogram", ("stage",), buckets=(0.1, 1))
+        histogram.observe(0.05, stage="a")
+        histogram.observe(0.5, stage="a")
+        histogram.observe(5, stage="a")
+
+        assert histogram.samples() == [
+            'test_seconds_bucket{stage="a",le="0.1"} 1',
+            'test_seconds_bucket{stage="a",le="1"} 2',
+            'test_seconds_bucket{stage="a",le="+Inf"} 3',
+            'test_seconds_sum{stage="a"} 5.55',
+            'test_seconds_count{stage="a"} 3',
+        ]
+
+    def test_render_includes_help_and_type(self):
+        """Test that every registered metric is rendered with its metadata"""
+        REGISTRY.clear()
+        STAGE_RUNS.inc(stage='quote"d', outcome="success")
+        text = render_prometheus()
+
+        assert "# TYPE ke_stage_duration_seconds histogram" in text
+        assert "# TYPE ke_stage_runs_total counter" in text
+        assert 'ke_stage_runs_total{stage="quote\\"d",outcome="success"} 1' in text
+        assert text.endswith("\n")
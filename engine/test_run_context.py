@@ -0,0 +1,184 @@
+"""
+Unit tests for run contexts
+Tests for cancellation, deadlines, graceful degradation and their effect on V2 pipeline runs
+"""
+
+import pytest
+import asyncio
+from .run_context import (RunContext, RunCancelledError, RunDeadlineExceeded,
+                          current_run_context, check_current_run, cancel_run)
+from .v2.pipeline import Pipeline
+from .v2.checkpoints import StageCheckpointStore
+from .v2.scheduler import StageNode
+from .models.qa import QAReport
+
+
+class InMemoryQAResultsRepository:
+    """Test-local stand-in for QAResultsRepository"""
+
+    def __init__(self):
+        self.reports = []
+
+    async def insert_qa_report(self, qa_report):
+        self.reports.append(dict(qa_report))
+        return str(len(self.reports))
+
+    async def update_llm_usage(self, run_id, llm_usage):
+        matched = [report for report in self.reports if report.get("stored_job_id") == run_id]
+        for report in matched:
+            report["llm_usage"] = llm_usage
+        return bool(matched)
+
+
+def _make_pipeline(calls: list, stage_delay: float = 0) -> Pipeline:
+    """Pipeline whose stages are stubs that record their calls"""
+    pipeline = Pipeline.__new__(Pipeline)
+    pipeline.checkpoints = StageCheckpointStore(enabled=False)
+    pipeline._qa_results = InMemoryQAResultsRepository()
+
+    def stage(name):
+        async def fn(*args):
+            calls.append(name)
+            await asyncio.sleep(stage_delay)
+            return f"{name}_result"
+        return fn
+
+    graph = [StageNode(node.name, stage(node.name), node.inputs, node.output)
+             for node in Pipeline._build_stage_graph(pipeline)]
+    pipeline._build_stage_graph = lambda: graph
+    pipeline._create_qa_report = lambda job_id, *args: QAReport(job_id=job_id, coverage_percent=100.0, flags=[])
+    return pipeline
+
+
+class TestRunContext:
+    """Unit tests for RunContext"""
+
+    def test_check_raises_after_cancel(self):
+        """Test that check passes until the run is cancelled"""
+        run_context = RunContext("job_1", deadline_seconds=0)
+        run_context.check("extract")
+        run_context.cancel("user abandoned upload")
+
+        with pytest.raises(RunCancelledError, match="user abandoned upload"):
+            run_context.check("extract")
+
+    def test_deadline_and_degradation(self):
+        """Test that optional work is skipped inside the reserve and check fails past the deadline"""
+        run_context = RunContext("job_1", deadline_seconds=60, optional_stage_reserve=30)
+        assert run_context.should_degrade("cross_qa") is False
+
+        run_context.started_at -= 45
+        assert run_context.should_degrade("cross_qa") is True
+        run_context.check("review")
+
+        run_context.started_at -= 30
+        with pytest.raises(RunDeadlineExceeded):
+            run_context.check("review")
+        assert run_context.budget_summary()["skipped_stages"] == ["cross_qa"]
+
+    def test_no_deadline_never_degrades(self):
+        """Test that a deadline of 0 disables deadline handling"""
+        run_context = RunContext("job_1", deadline_seconds=0)
+        run_context.started_at -= 10_000
+        assert run_context.remaining() is None
+        assert run_context.should_degrade("cross_qa") is False
+        run_context.check()
+
+    def test_deadline_off_by_default(self, monkeypatch):
+        """Test that runs have no deadline unless V2_RUN_DEADLINE_SECONDS sets one"""
+        monkeypatch.delenv("V2_RUN_DEADLINE_SECONDS", raising=False)
+        assert RunContext("job_1").deadline_seconds is None
+
+        monkeypatch.setenv("V2_RUN_DEADLINE_SECONDS", "300")
+        assert RunContext("job_1").deadline_seconds == 300
+
+    @pytest.mark.asyncio
+    async def test_cancel_by_job_id_cancels_attached_tasks(self):
+        """Test that cancel_run reaches the active context and its tasks, and only while active"""
+        assert cancel_run("job_1") is False
+
+        with RunContext("job_1", deadline_seconds=0) as run_context:
+            assert current_run_context() is run_context
+            task = asyncio.ensure_future(asyncio.sleep(5))
+            run_context.attach(task)
+
+            assert cancel_run("job_1", "stop") is True
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            with pytest.raises(RunCancelledError):
+                check_current_run("llm_completion")
+
+        assert current_run_context() is None
+        assert cancel_run("job_1") is False
+
+
+class TestPipelineRunContext:
+    """Unit tests for cancellation and deadlines in V2 pipeline runs"""
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_in_flight_stages(self):
+        """Test that cancelling a run aborts in-flight stages and reports the cancellation"""
+        calls = []
+        pipeline = _make_pipeline(calls, stage_delay=0.05)
+        run_context = RunContext("job_1", deadline_seconds=0)
+
+        run_task = asyncio.ensure_future(pipeline.run("job_1", "content", {}, run_context=run_context))
+        await asyncio.sleep(0.07)
+        cancel_run("job_1")
+        articles, qa_report, version_id = await asyncio.wait_for(run_task, timeout=1)
+
+        assert articles == []
+        assert qa_report.flags[0].code == "P0_RUN_CANCELLED"
+        assert version_id == "error_job_1"
+        assert "review" not in calls
+
+    @pytest.mark.asyncio
+    async def test_deadline_bounds_run(self):
+        """Test that a run past its deadline stops and reports the deadline"""
+        calls = []
+        pipeline = _make_pipeline(calls, stage_delay=0.05)
+        run_context = RunContext("job_1", deadline_seconds=0.08)
+
+        _, qa_report, _ = await asyncio.wait_for(
+            pipeline.run("job_1", "content", {}, run_context=run_context), timeout=1)
+
+        assert qa_report.flags[0].code == "P0_RUN_DEADLINE_EXCEEDED"
+        assert "review" not in calls
+        assert run_context.stage_seconds
+
+    @pytest.mark.asyncio
+    async def test_llm_usage_stored_with_persisted_qa_report(self):
+        """Test that the run's LLM usage is written to the QA report validation persisted"""
+        calls = []
+        pipeline = _make_pipeline(calls)
+        qa_results = pipeline._qa_results
+        graph = pipeline._build_stage_graph()
+
+        async def validation(normalized_doc, articles, analysis, run_id):
+            await qa_results.insert_qa_report({"stored_job_id": run_id, "job_id": "job_1"})
+            return "validation_result"
+
+        pipeline._build_stage_graph = lambda: [
+            StageNode(node.name, validation, node.inputs, node.output) if node.name == "validation" else node
+            for node in graph]
+        pipeline._create_qa_report = lambda job_id, *args: QAReport(job_id=job_id, coverage_percent=100.0, flags=[])
+        run_context = RunContext("job_1", deadline_seconds=0)
+        run_context.llm_ledger.record("generate_articles", "openai", "gpt-4o-mini", 120, 30)
+
+        _, qa_report, _ = await pipeline.run("job_1", "content", {}, run_context=run_context)
+
+        assert len(qa_results.reports) == 1
+        assert qa_results.reports[0]["llm_usage"] == qa_report.llm_usage == run_context.llm_ledger.summary()
+        assert qa_report.llm_usage["calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_run_stores_its_llm_usage(self):
+        """Test that a run failing before validation still stores its report and LLM usage"""
+        pipeline = _make_pipeline([], stage_delay=0.05)
+        run_context = RunContext("job_1", deadline_seconds=0.02)
+
+        _, qa_report, _ = await pipeline.run("job_1", "content", {}, run_context=run_context)
+
+        [stored] = pipeline._qa_results.reports
+        assert stored["stored_job_id"].startswith("run_") and stored["job_id"] == "job_1"
+        assert stored["llm_usage"] == qa_report.llm_usage
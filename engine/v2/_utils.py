@@ -4,9 +4,10 @@ Shared utility functions extracted from server.py for V2 processing stages
 """
 
 import uuid
+import asyncio
 import hashlib
 import re
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Sequence
 from datetime import datetime
 from ..models.io import NormDoc, Section
 
@@ -310,4 +311,23 @@ def estimate_processing_time(complexity: str, content_length: int) -> str:
     return f"{base_time}-{base_time + 2} minutes"
 
 
-print("✅ KE-M16: V2 Engine utilities loaded")
\ No newline at end of file
+async def gather_bounded(worker: Callable[[int, Any], Awaitable[Any]], items: Sequence[Any],
+                         max_concurrency: int, timeout: Optional[float] = None) -> List[Any]:
+    """
+    Run worker(index, item) for every item with at most max_concurrency calls in flight.
+    Results keep input order; a failing or timed-out call yields its exception
+    (asyncio.TimeoutError for timeouts) in place of a result instead of raising.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run_with_semaphore(index: int, item: Any):
+        async with semaphore:
+            if timeout:
+                return await asyncio.wait_for(worker(index, item), timeout=timeout)
+            return await worker(index, item)
+
+    tasks = [run_with_semaphore(i, item) for i, item in enumerate(items)]
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+print("✅ KE-M16: V2 Engine utilities loaded")
@@ -44,8 +44,11 @@ class V2AdaptiveAdjustmentSystem:
                 'error': str(e)
             }
     
-    async def perform_adaptive_adjustment(self, generated_articles_result: dict, analysis: dict, run_id: str) -> dict:
-        """V2 Engine: Perform adaptive adjustment for optimal article balance (legacy interface)"""
+    async def perform_adaptive_adjustment(self, generated_articles_result: dict, analysis: dict, run_id: str, use_llm: bool = True) -> dict:
+        """V2 Engine: Perform adaptive adjustment for optimal article balance (legacy interface)
+        
+        use_llm=False replaces the LLM balancing analysis with the rule-based fallback (runs near their deadline).
+        """
         try:
             print(f"⚖️ V2 ADAPTIVE ADJUSTMENT: Starting length and split balancing - run {run_id} - engine=v2")
             
@@ -58,9 +61,15 @@ class V2AdaptiveAdjustmentSystem:
             word_count_analysis = await self._analyze_word_counts(generated_articles, run_id)
             
             # Step 2: LLM-based balancing analysis
-            llm_adjustment_result = await self._perform_llm_balancing_analysis(
-                word_count_analysis, analysis, run_id
-            )
+            if use_llm:
+                llm_adjustment_result = await self._perform_llm_balancing_analysis(
+                    word_count_analysis, analysis, run_id
+                )
+            else:
+                print(f"⏱️ V2 ADAPTIVE ADJUSTMENT: Skipping LLM balancing, using rule-based fallback - run {run_id}")
+                llm_adjustment_result = self._get_fallback_llm_analysis(
+                    word_count_analysis.get('articles', []), analysis.get('granularity', 'moderate')
+                )
             
             # Step 3: Programmatic adjustment validation
             programmatic_adjustment_result = await self._perform_programmatic_adjustment_analysis(
@@ -203,7 +212,7 @@ Provide analysis and specific recommendations for improvement."""
                 system_message=system_message,
                 user_message=user_message,
                 temperature=0.3,
-                max_tokens=1000
+                call_type="adaptive"
             )
             
             if llm_response:
@@ -3,15 +3,91 @@ KE-PR6: V2 Multi-Dimensional Analyzer with Centralized LLM Client
 Extracted from server.py - Deep content analysis with LLM-driven insights and rule-based validation
 """
 
-from typing import Dict, Any, List
-from ..llm.client import get_llm_client
+import os
+from typing import Dict, Any, List, Awaitable, Optional
+from ..llm.client import get_llm_client, LLMStructuredOutputError
+from ..llm.tokens import estimate_tokens, pack_blocks, truncate_to_tokens
 from ..llm.prompts import CONTENT_ANALYSIS_PROMPT
 
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "content_type": {"type": "string"},
+        "key_topics": {"type": "array", "items": {"type": "string"}},
+        "recommended_article_count": {"type": "number"},
+        "confidence_score": {"type": "number"}
+    }
+}
+
+class DocumentPreview:
+    """
+    Analysis preview of a document, built one block at a time.
+
+    The packed preview takes headings across the whole document first, then body
+    blocks in document order, so only blocks that can still be packed are kept:
+    headings until they alone fill the budget, and body blocks until they alone do.
+    Memory stays bounded by the budget however long the document is.
+    """
+    
+    def __init__(self, title: str, budget_tokens: int, block_tokens: int):
+        self.title = title
+        self.budget_tokens = budget_tokens
+        self.block_tokens = block_tokens
+        self.block_count = 0
+        self.word_count = 0
+        self._kept: List[tuple] = []  # (block index, is_heading, text)
+        self._heading_tokens = 0
+        self._body_tokens = 0
+    
+    def add(self, block):
+        """Account for the next block of the document"""
+        i = self.block_count
+        self.block_count += 1
+        content = getattr(block, 'content', '')
+        self.word_count += len(content.split())
+        block_type = getattr(block, 'block_type', 'unknown')
+        is_heading = block_type.startswith('heading')
+        if (self._heading_tokens if is_heading else self._body_tokens) >= self.budget_tokens:
+            return
+        
+        text = f"Block_{i+1}[{block_type}]: {truncate_to_tokens(content, self.block_tokens)}"
+        self._kept.append((i, is_heading, text))
+        if is_heading:
+            self._heading_tokens += estimate_tokens(text)
+        else:
+            self._body_tokens += estimate_tokens(text)
+    
+    @property
+    def full(self) -> bool:
+        """Body blocks fill the budget: later blocks can only add headings"""
+        return self._body_tokens >= self.budget_tokens
+    
+    def render(self, word_count: Optional[int] = None) -> str:
+        preview_parts = [
+            f"DOCUMENT: {self.title}",
+            f"WORD_COUNT: {self.word_count if word_count is None else word_count}",
+            f"CONTENT_BLOCKS: {self.block_count}"
+        ]
+        
+        # Headings first, then body blocks, in document order within each
+        total = max(self.block_count, 1)
+        scores = [(1.0 if is_heading else 0.0) - i / total for i, is_heading, _ in self._kept]
+        packed = pack_blocks([text for _, _, text in self._kept], self.budget_tokens, scores)
+        preview_parts.extend(text for _, text in packed)
+        
+        if self.block_count > len(packed):
+            preview_parts.append(f"... and {self.block_count - len(packed)} more blocks")
+        
+        return "\n".join(preview_parts)
+
 class V2MultiDimensionalAnalyzer:
     """V2 Engine: Deep content analysis with LLM-driven insights and rule-based validation using centralized LLM client"""
     
     def __init__(self, llm_client=None):
         self.llm_client = llm_client or get_llm_client()
+        # Prompt budget of the document preview, and the most any one block may use of it
+        self.preview_tokens = int(os.getenv("V2_ANALYSIS_PREVIEW_TOKENS", "1500"))
+        self.preview_block_tokens = int(os.getenv("V2_ANALYSIS_PREVIEW_BLOCK_TOKENS", "150"))
         self.analysis_dimensions = [
             'content_type', 'technical_depth', 'audience_level', 'granularity', 
             'structure', 'completeness', 'complexity'
@@ -21,19 +97,25 @@ class V2MultiDimensionalAnalyzer:
             'troubleshooting', 'overview', 'specification', 'mixed'
         ]
     
-    async def run(self, normalized_doc) -> dict:
+    async def run(self, normalized_doc, llm_analysis: Optional[Awaitable[dict]] = None) -> dict:
         """
         Perform comprehensive multi-dimensional analysis using centralized LLM client
         Returns enhanced analysis with both LLM insights and rule-based validation
+        
+        llm_analysis: LLM analysis already started from a preview (see analyze_preview),
+        awaited instead of building the preview from normalized_doc
         """
         try:
             print(f"🔍 V2 ANALYZER: Starting multi-dimensional analysis with LLM client - engine=v2")
             
-            # Create document preview for analysis
-            doc_preview = self._create_document_preview(normalized_doc)
-            
-            # Perform LLM-based analysis using centralized client
-            llm_analysis = await self._perform_llm_analysis(doc_preview)
+            if llm_analysis is not None:
+                llm_analysis = await llm_analysis
+            else:
+                # Create document preview for analysis
+                doc_preview = self._create_document_preview(normalized_doc)
+                
+                # Perform LLM-based analysis using centralized client
+                llm_analysis = await self._perform_llm_analysis(doc_preview)
             
             # Enhance with rule-based analysis
             enhanced_analysis = await self._enhance_analysis(llm_analysis, normalized_doc)
@@ -62,31 +144,21 @@ class V2MultiDimensionalAnalyzer:
                 "error": str(e)
             }
     
+    def new_preview(self, title: str) -> DocumentPreview:
+        """Empty analysis preview for a document whose blocks arrive one at a time"""
+        return DocumentPreview(title, self.preview_tokens, self.preview_block_tokens)
+    
+    async def analyze_preview(self, doc_preview: str) -> Optional[dict]:
+        """LLM analysis of a rendered preview; pass the awaitable to run() to finish the analysis"""
+        return await self._perform_llm_analysis(doc_preview)
+    
     def _create_document_preview(self, normalized_doc) -> str:
         """Create a structured preview of the document for LLM analysis"""
         try:
-            preview_parts = []
-            
-            # Document metadata
-            title = getattr(normalized_doc, 'title', 'Unknown Document')
-            word_count = getattr(normalized_doc, 'word_count', 0)
-            preview_parts.append(f"DOCUMENT: {title}")
-            preview_parts.append(f"WORD_COUNT: {word_count}")
-            
-            # Content blocks preview
-            blocks = getattr(normalized_doc, 'blocks', [])
-            preview_parts.append(f"CONTENT_BLOCKS: {len(blocks)}")
-            
-            # Sample content blocks (first few for analysis)
-            for i, block in enumerate(blocks[:5]):  # Limit to first 5 blocks
-                block_type = getattr(block, 'block_type', 'unknown')
-                content = getattr(block, 'content', '')[:200]  # First 200 chars
-                preview_parts.append(f"Block_{i+1}[{block_type}]: {content}")
-            
-            if len(blocks) > 5:
-                preview_parts.append(f"... and {len(blocks) - 5} more blocks")
-            
-            return "\n".join(preview_parts)
+            preview = self.new_preview(getattr(normalized_doc, 'title', 'Unknown Document'))
+            for block in getattr(normalized_doc, 'blocks', []):
+                preview.add(block)
+            return preview.render(getattr(normalized_doc, 'word_count', 0))
             
         except Exception as e:
             print(f"❌ V2 ANALYZER: Error creating document preview - {e}")
@@ -123,27 +195,21 @@ Return your analysis in this JSON format:
             user_message = f"Analyze this document content:\n\n{doc_preview}"
             
             # Use centralized LLM client
-            response = await self.llm_client.complete(
-                system_message=system_message,
-                user_message=user_message,
-                temperature=0.1,
-                max_tokens=1000
-            )
+            try:
+                llm_analysis = await self.llm_client.complete_json(
+                    system_message=system_message,
+                    user_message=user_message,
+                    schema=ANALYSIS_SCHEMA,
+                    temperature=0.1,
+                    call_type="analysis"
+                )
+            except LLMStructuredOutputError as e:
+                # Fallback parsing if JSON is malformed
+                print(f"⚠️ V2 ANALYZER: LLM response not valid JSON, using fallback parsing - {e}")
+                return self._parse_llm_response(e.text) if e.text else None
             
-            if response:
-                # Try to parse JSON response
-                import json
-                try:
-                    llm_analysis = json.loads(response)
-                    print(f"✅ V2 ANALYZER: LLM analysis complete - {llm_analysis.get('content_type', 'unknown')}")
-                    return llm_analysis
-                except json.JSONDecodeError:
-                    # Fallback parsing if JSON is malformed
-                    print("⚠️ V2 ANALYZER: LLM response not valid JSON, using fallback parsing")
-                    return self._parse_llm_response(response)
-            else:
-                print("⚠️ V2 ANALYZER: No response from LLM, using rule-based fallback")
-                return None
+            print(f"✅ V2 ANALYZER: LLM analysis complete - {llm_analysis.get('content_type', 'unknown')}")
+            return llm_analysis
                 
         except Exception as e:
             print(f"❌ V2 ANALYZER: Error in LLM analysis - {e}")
@@ -0,0 +1,202 @@
+"""
+V2 Stage Checkpoints
+Persists every stage output of a pipeline run so failed or tweaked runs can resume
+"""
+
+import os
+import sys
+import json
+import base64
+import asyncio
+from enum import Enum
+from datetime import date, datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+# Pseudo-stage holding the run's initial inputs (content, metadata, run_id, job_id)
+INPUTS_STAGE = "__inputs__"
+
+# Stored with every checkpoint; records in any other format are not restored
+CHECKPOINT_FORMAT = "json-v1"
+
+_TAG = "__ckpt__"
+
+
+class CheckpointNotFoundError(Exception):
+    """Raised when a run has no stored checkpoints to resume from"""
+    pass
+
+
+def _class_path(value) -> str:
+    return f"{type(value).__module__}:{type(value).__qualname__}"
+
+
+def _restorable_class(path: str):
+    """
+    Class named by a checkpoint. Only classes of modules that are already imported
+    are resolved, so restoring a checkpoint never imports or calls arbitrary code.
+    """
+    module_name, _, qualname = path.partition(":")
+    target = sys.modules.get(module_name)
+    for name in qualname.split("."):
+        target = getattr(target, name, None)
+    if not isinstance(target, type):
+        raise TypeError(f"Unknown checkpoint type: {path}")
+    return target
+
+
+def _encode(value):
+    """JSON-compatible form of a stage output, with tags for the types JSON lacks"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, dict):
+        if all(isinstance(key, str) for key in value) and _TAG not in value:
+            return {key: _encode(item) for key, item in value.items()}
+        return {_TAG: "dict", "v": [[_encode(key), _encode(item)] for key, item in value.items()]}
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, tuple):
+        return {_TAG: "tuple", "v": [_encode(item) for item in value]}
+    if isinstance(value, (set, frozenset)):
+        return {_TAG: "set", "v": [_encode(item) for item in value]}
+    if isinstance(value, datetime):
+        return {_TAG: "datetime", "v": value.isoformat()}
+    if isinstance(value, date):
+        return {_TAG: "date", "v": value.isoformat()}
+    if isinstance(value, bytes):
+        return {_TAG: "bytes", "v": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, Enum):
+        return {_TAG: "enum", "cls": _class_path(value), "v": _encode(value.value)}
+    if type(value).__name__ == "ObjectId":
+        return {_TAG: "oid", "v": str(value)}
+    if hasattr(value, "model_dump") or hasattr(value, "__fields__"):
+        state = value.model_dump() if hasattr(value, "model_dump") else value.dict()
+        return {_TAG: "model", "cls": _class_path(value), "v": _encode(state)}
+    if hasattr(value, "__dict__") and type(value).__module__.startswith("engine."):
+        return {_TAG: "object", "cls": _class_path(value), "v": _encode(vars(value))}
+    raise TypeError(f"Cannot checkpoint a {type(value).__name__}")
+
+
+def _decode(value):
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    tag = value.get(_TAG)
+    if tag is None:
+        return {key: _decode(item) for key, item in value.items()}
+    if tag == "dict":
+        return {_decode(key): _decode(item) for key, item in value["v"]}
+    if tag == "tuple":
+        return tuple(_decode(item) for item in value["v"])
+    if tag == "set":
+        return {_decode(item) for item in value["v"]}
+    if tag == "datetime":
+        return datetime.fromisoformat(value["v"])
+    if tag == "date":
+        return date.fromisoformat(value["v"])
+    if tag == "bytes":
+        return base64.b64decode(value["v"])
+    if tag == "oid":
+        from bson import ObjectId
+        return ObjectId(value["v"])
+
+    cls = _restorable_class(value["cls"])
+    state = _decode(value["v"])
+    if tag == "enum" and issubclass(cls, Enum):
+        return cls(state)
+    if tag == "model":
+        return cls.model_validate(state) if hasattr(cls, "model_validate") else cls.parse_obj(state)
+    if tag == "object" and cls.__module__.startswith("engine."):
+        instance = cls.__new__(cls)
+        instance.__dict__.update(state)
+        return instance
+    raise TypeError(f"Cannot restore a checkpointed {value['cls']}")
+
+
+def encode_checkpoint(value: Any) -> bytes:
+    """
+    Serialize a stage output as tagged JSON. Unlike pickle, restoring it cannot
+    execute code: engine objects get their attributes back without a constructor
+    call, pydantic models are validated from their fields.
+    """
+    return json.dumps(_encode(value), separators=(",", ":")).encode("utf-8")
+
+
+def decode_checkpoint(payload: bytes) -> Any:
+    """Restore a stage output serialized by encode_checkpoint"""
+    return _decode(json.loads(payload))
+
+
+class StageCheckpointStore:
+    """
+    Stage checkpoint persistence for the V2 pipeline.
+
+    Outputs are serialized at the moment a stage completes (later stages mutate
+    the shared article list in place), then written in the background so that
+    checkpointing never delays dependent stages.
+    """
+
+    def __init__(self, repository=None, enabled: bool = None):
+        if enabled is None:
+            enabled = os.getenv("V2_STAGE_CHECKPOINTS", "true").lower() == "true"
+        self.enabled = enabled
+        self._repository = repository
+        self._pending_writes: Dict[str, List[asyncio.Task]] = {}
+
+    @property
+    def repository(self):
+        """Checkpoint repository, created on first use"""
+        if self._repository is None:
+            from ..stores.mongo import RepositoryFactory
+            self._repository = RepositoryFactory.get_v2_checkpoints()
+        return self._repository
+
+    def save(self, run_id: str, stage: str, output_name: Optional[str], value: Any):
+        """Snapshot a stage output and schedule its write"""
+        if not self.enabled:
+            return
+
+        try:
+            payload = encode_checkpoint(value)
+        except Exception as e:
+            print(f"⚠️ V2 CHECKPOINTS: Could not serialize {stage} output for {run_id} - {e}")
+            return
+
+        checkpoint = {
+            "output": output_name,
+            "format": CHECKPOINT_FORMAT,
+            "payload": payload,
+            "size_bytes": len(payload),
+            "engine": "v2"
+        }
+        task = asyncio.ensure_future(self.repository.save_checkpoint(run_id, stage, checkpoint))
+        self._pending_writes.setdefault(run_id, []).append(task)
+
+    async def flush(self, run_id: str):
+        """Wait for all scheduled checkpoint writes of a run"""
+        pending = self._pending_writes.pop(run_id, [])
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def load(self, run_id: str) -> Dict[str, Tuple[Optional[str], Any]]:
+        """Load checkpoints for a run as {stage: (output_name, value)}"""
+        checkpoints = {}
+        for record in await self.repository.find_checkpoints(run_id):
+            try:
+                if record.get("format") != CHECKPOINT_FORMAT:
+                    raise ValueError(f"unsupported checkpoint format {record.get('format')!r}")
+                checkpoints[record["stage"]] = (record.get("output"), decode_checkpoint(record["payload"]))
+            except Exception as e:
+                # A stage that cannot be restored simply reruns
+                print(f"⚠️ V2 CHECKPOINTS: Could not restore {record.get('stage')} for {run_id} - {e}")
+
+        if INPUTS_STAGE not in checkpoints:
+            raise CheckpointNotFoundError(f"No checkpoints found for run: {run_id}")
+
+        return checkpoints
+
+    async def invalidate(self, run_id: str, stages: List[str]) -> int:
+        """Drop checkpoints for stages that are about to rerun"""
+        if not stages:
+            return 0
+        return await self.repository.delete_checkpoints(run_id, stages)
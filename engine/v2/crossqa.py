@@ -9,6 +9,19 @@ from datetime import datetime
 from bs4 import BeautifulSoup
 from ..llm.client import get_llm_client
 
+_LIST_OF_OBJECTS = {"type": "array", "items": {"type": "object"}}
+
+CROSS_QA_SCHEMA = {
+    "type": "object",
+    "required": ["duplicates", "invalid_related_links", "duplicate_faqs", "terminology_issues"],
+    "properties": {
+        "duplicates": _LIST_OF_OBJECTS,
+        "invalid_related_links": _LIST_OF_OBJECTS,
+        "duplicate_faqs": _LIST_OF_OBJECTS,
+        "terminology_issues": _LIST_OF_OBJECTS
+    }
+}
+
 class V2CrossArticleQASystem:
     """V2 Engine: Cross-article quality assurance for coherence, deduplication, and consistency"""
     
@@ -48,8 +61,11 @@ class V2CrossArticleQASystem:
                 "engine": "v2"
             }
     
-    async def perform_cross_article_qa(self, generated_articles_result: dict, run_id: str) -> dict:
-        """V2 Engine: Perform comprehensive cross-article quality assurance"""
+    async def perform_cross_article_qa(self, generated_articles_result: dict, run_id: str, use_llm: bool = True) -> dict:
+        """V2 Engine: Perform comprehensive cross-article quality assurance
+        
+        use_llm=False replaces the LLM analysis with the programmatic fallback (runs near their deadline).
+        """
         try:
             print(f"🔍 V2 CROSS-ARTICLE QA: Starting comprehensive QA analysis - run {run_id} - engine=v2")
             
@@ -62,7 +78,11 @@ class V2CrossArticleQASystem:
             article_set = self._prepare_article_set(generated_articles)
             
             # Step 1: LLM-based cross-article analysis
-            llm_qa_result = await self._perform_llm_cross_article_analysis(article_set, run_id)
+            if use_llm:
+                llm_qa_result = await self._perform_llm_cross_article_analysis(article_set, run_id)
+            else:
+                print(f"⏱️ V2 CROSS-ARTICLE QA: Skipping LLM analysis, using programmatic fallback - run {run_id} - engine=v2")
+                llm_qa_result = self._create_fallback_qa_analysis(article_set)
             
             # Step 2: Programmatic validation and enhancement
             programmatic_qa_result = await self._perform_programmatic_qa_analysis(article_set, run_id)
@@ -266,36 +286,24 @@ Analyze these articles and return ONLY JSON in this exact format:
             # Call LLM for analysis
             print(f"🤖 V2 CROSS-ARTICLE QA: Sending cross-article analysis request to LLM - run {run_id} - engine=v2")
             try:
-                ai_response = await self.llm_client.generate_response(system_message, user_message)
+                qa_data = await self.llm_client.complete_json(
+                    system_message=system_message,
+                    user_message=user_message,
+                    schema=CROSS_QA_SCHEMA,
+                    temperature=0.1,
+                    call_type="crossqa"
+                )
             except Exception as llm_error:
-                print(f"⚠️ V2 CROSS-ARTICLE QA: LLM client error, using fallback - {llm_error}")
+                print(f"⚠️ V2 CROSS-ARTICLE QA: No usable LLM analysis, using fallback - {llm_error} - run {run_id} - engine=v2")
                 return self._create_fallback_qa_analysis(article_set)
             
-            if ai_response:
-                # Parse JSON response
-                json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
-                if json_match:
-                    qa_data = json.loads(json_match.group(0))
-                    
-                    # Validate required fields
-                    required_fields = ['duplicates', 'invalid_related_links', 'duplicate_faqs', 'terminology_issues']
-                    if all(field in qa_data for field in required_fields):
-                        duplicates_count = len(qa_data.get('duplicates', []))
-                        invalid_links_count = len(qa_data.get('invalid_related_links', []))
-                        duplicate_faqs_count = len(qa_data.get('duplicate_faqs', []))
-                        terminology_issues_count = len(qa_data.get('terminology_issues', []))
-                        
-                        print(f"🔍 V2 CROSS-ARTICLE QA: LLM found {duplicates_count} duplicates, {invalid_links_count} invalid links, {duplicate_faqs_count} duplicate FAQs, {terminology_issues_count} terminology issues - run {run_id} - engine=v2")
-                        return qa_data
-                    else:
-                        print(f"⚠️ V2 CROSS-ARTICLE QA: Missing fields in LLM response - run {run_id} - engine=v2")
-                        return self._create_fallback_qa_analysis(article_set)
-                else:
-                    print(f"⚠️ V2 CROSS-ARTICLE QA: No JSON found in LLM response - run {run_id} - engine=v2")
-                    return self._create_fallback_qa_analysis(article_set)
-            else:
-                print(f"❌ V2 CROSS-ARTICLE QA: No LLM response for cross-article analysis - run {run_id} - engine=v2")
-                return self._create_fallback_qa_analysis(article_set)
+            duplicates_count = len(qa_data.get('duplicates', []))
+            invalid_links_count = len(qa_data.get('invalid_related_links', []))
+            duplicate_faqs_count = len(qa_data.get('duplicate_faqs', []))
+            terminology_issues_count = len(qa_data.get('terminology_issues', []))
+            
+            print(f"🔍 V2 CROSS-ARTICLE QA: LLM found {duplicates_count} duplicates, {invalid_links_count} invalid links, {duplicate_faqs_count} duplicate FAQs, {terminology_issues_count} terminology issues - run {run_id} - engine=v2")
+            return qa_data
                 
         except Exception as e:
             print(f"❌ V2 CROSS-ARTICLE QA: Error in LLM cross-article analysis - {e} - run {run_id} - engine=v2")
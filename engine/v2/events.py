@@ -0,0 +1,45 @@
+"""
+V2 Run Events
+Progress events published to the streaming consumer of a pipeline run
+"""
+
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Optional
+from ..llm.streaming import PartialJSONStringField
+
+# Event queue of the run being streamed; stage tasks inherit it from the run's context
+_run_events: ContextVar = ContextVar("v2_run_events", default=None)
+
+
+def emit_run_event(event: str, **data):
+    """Publish a progress event to the streaming consumer of the current run, if any"""
+    events = _run_events.get()
+    if events is not None:
+        events.put_nowait({"event": event, "timestamp": datetime.utcnow().isoformat(), **data})
+
+
+def run_is_streamed() -> bool:
+    """True when a consumer is streaming the current run (stages may then stream partial output)"""
+    return _run_events.get() is not None
+
+
+def delta_emitter(event: str, delta_key: str = "delta", json_field: Optional[str] = None,
+                  **data) -> Optional[Callable[[str], None]]:
+    """
+    on_delta callback for LLM calls that publishes each completion delta as event
+    (with data, the delta under delta_key), or None when the run is not streamed.
+    With json_field, only the decoded value of that string field of a JSON
+    completion is published.
+    """
+    if not run_is_streamed():
+        return None
+    field = PartialJSONStringField(json_field) if json_field else None
+
+    def on_delta(delta: str):
+        if field is not None:
+            delta = field.feed(delta)
+        if delta:
+            emit_run_event(event, **{**data, delta_key: delta})
+
+    return on_delta
@@ -4,8 +4,10 @@ Extracted from server.py - Advanced content extraction with provenance tracking
 """
 
 import uuid
+import hashlib
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, AsyncIterable, Callable, Optional
+from ..extraction.stream import classify_paragraph
 
 class ContentBlock:
     """Simple content block for V2 extraction compatibility"""
@@ -38,13 +40,20 @@ class ContentBlock:
     def __contains__(self, key):
         """Dictionary-like 'in' operator for compatibility"""
         return hasattr(self, key) or key in self.metadata
+    
+    @property
+    def content_hash(self) -> str:
+        """Stable hash of block type and whitespace-normalized content (position independent)"""
+        normalized_content = ' '.join(str(self.content).split())
+        return hashlib.sha256(f"{self.block_type}:{normalized_content}".encode('utf-8')).hexdigest()
 
 class MediaRecord:
     """Simple media record for V2 extraction compatibility"""
-    def __init__(self, media_type: str, url: str, metadata: Dict[str, Any] = None):
+    def __init__(self, media_type: str, url: str, metadata: Dict[str, Any] = None, alt_text: str = None):
         self.media_type = media_type
         self.url = url
         self.metadata = metadata or {}
+        self.alt_text = alt_text
 
 class NormalizedDocument:
     """V2 Compatible NormalizedDocument for pipeline integration"""
@@ -87,6 +96,10 @@ class NormalizedDocument:
             setattr(self, key, value)
         else:
             self.metadata[key] = value
+    
+    def block_hashes(self) -> Dict[str, str]:
+        """Map outline block ids (block_1, block_2, ...) to block content hashes"""
+        return {f"block_{i + 1}": block.content_hash for i, block in enumerate(self.blocks)}
 
 class V2ContentExtractor:
     """V2 Engine: Advanced content extraction with 100% capture and provenance tracking"""
@@ -113,23 +126,7 @@ class V2ContentExtractor:
                     continue
                     
                 # Detect block type
-                if paragraph.startswith('#'):
-                    # Heading
-                    level = len(paragraph) - len(paragraph.lstrip('#'))
-                    text = paragraph.lstrip('# ').strip()
-                    block_type = f"heading_h{min(level, 6)}"
-                elif paragraph.startswith('```'):
-                    # Code block
-                    text = paragraph
-                    block_type = "code"
-                elif paragraph.startswith('- ') or paragraph.startswith('* '):
-                    # List
-                    text = paragraph
-                    block_type = "list"
-                else:
-                    # Regular paragraph
-                    text = paragraph
-                    block_type = "paragraph"
+                block_type, text = classify_paragraph(paragraph)
                 
                 # Count words
                 word_count += len(text.split())
@@ -179,4 +176,62 @@ class V2ContentExtractor:
                 blocks=[fallback_block],
                 extraction_metadata={"extraction_method": "v2_text_extractor_fallback", "error": str(e)},
                 job_id=job_id  # Pass job_id to fallback document too
-            )
\ No newline at end of file
+            )
+    
+    async def extract_block_stream(self, blocks: AsyncIterable[Dict[str, Any]], title: str = "Text Content",
+                                   job_id: str = None, mime_type: str = "text/plain",
+                                   on_block: Optional[Callable[[ContentBlock], Any]] = None) -> NormalizedDocument:
+        """
+        Build a NormalizedDocument from normalized blocks as they are extracted
+        (engine.extraction.stream), calling on_block with each ContentBlock so
+        downstream consumers can start before extraction finishes. Image items become
+        the document's media; their metadata keeps the Asset Library entry ("asset")
+        and the index of the block they follow ("after_block").
+        """
+        print(f"📝 V2 EXTRACTOR: Building document from block stream - {title} - engine=v2")
+        file_id = f"file_{int(datetime.utcnow().timestamp())}_{uuid.uuid4().hex[:8]}"
+        
+        content_blocks = []
+        media = []
+        word_count = 0
+        content_length = 0
+        async for item in blocks:
+            if item["block_type"] == "image":
+                media.append(MediaRecord("image", item["url"], metadata={
+                    "page": item.get("page"),
+                    "after_block": len(content_blocks) - 1,
+                    "asset": item.get("asset")
+                }, alt_text=item["content"]))
+                continue
+            text = item["content"]
+            words = len(text.split())
+            word_count += words
+            content_length += len(text)
+            
+            metadata = {
+                "block_index": len(content_blocks),
+                "length": len(text),
+                "word_count": words
+            }
+            if item.get("page") is not None:
+                metadata["page"] = item["page"]
+            content_block = ContentBlock(block_type=item["block_type"], content=text, metadata=metadata)
+            content_blocks.append(content_block)
+            if on_block:
+                on_block(content_block)
+        
+        normalized_doc = NormalizedDocument(
+            title=title,
+            original_filename=title,
+            file_id=file_id,
+            mime_type=mime_type,
+            word_count=word_count,
+            blocks=content_blocks,
+            media=media,
+            metadata={"content_length": content_length, "block_count": len(content_blocks)},
+            extraction_metadata={"extraction_method": "v2_stream_extractor", "engine": "v2"},
+            job_id=job_id
+        )
+        
+        print(f"✅ V2 EXTRACTOR: Streamed {len(content_blocks)} blocks, {len(media)} media, {word_count} words - job_id: {job_id} - engine=v2")
+        return normalized_doc
\ No newline at end of file
@@ -4,14 +4,25 @@ Migrated from server.py - Intelligent gap filling system with in-corpus retrieva
 """
 
 import os
-import json
 import re
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
-from ..llm.client import get_llm_client
+from ..llm.client import get_llm_client, LLMStructuredOutputError
+from ..llm.structured import parse_json
 from ..stores.mongo import RepositoryFactory
 from ._utils import create_processing_metadata
 
+GAP_PATCH_SCHEMA = {
+    "type": "object",
+    "required": ["text"],
+    "properties": {
+        "text": {"type": ["string", "null"]},
+        "confidence": {"type": "string"},
+        "support_block_ids": {"type": "array", "items": {"type": "string"}},
+        "reasoning": {"type": "string"}
+    }
+}
+
 class V2GapFillingSystem:
     """V2 Engine: Intelligent gap filling system to replace [MISSING] placeholders with in-corpus retrieval"""
     
@@ -484,6 +495,32 @@ class V2GapFillingSystem:
             print(f"❌ V2 GAP FILLING: Error generating gap patches - {e}")
             return []
     
+    @staticmethod
+    def _recover_gap_patch(text: str) -> Optional[dict]:
+        """Salvage a gap patch from a reply that complete_json rejected
+        
+        Prose replies become the patch text. JSON that failed the schema keeps its
+        string text and drops malformed fields; any other JSON yields no patch.
+        """
+        if not (text or '').strip():
+            return None
+        try:
+            value, _ = parse_json(text)
+        except ValueError:
+            # Not JSON: use the reply as the patch text
+            return {"text": text.strip(), "reasoning": "LLM response parsing fallback"}
+        
+        if not isinstance(value, dict) or not isinstance(value.get('text'), str):
+            return None
+        patch_data = {"text": value['text']}
+        for key in ('confidence', 'reasoning'):
+            if isinstance(value.get(key), str):
+                patch_data[key] = value[key]
+        block_ids = value.get('support_block_ids')
+        if isinstance(block_ids, list) and all(isinstance(block_id, str) for block_id in block_ids):
+            patch_data['support_block_ids'] = block_ids
+        return patch_data
+    
     async def _create_gap_patch(self, gap: dict, relevant_blocks: list, enrich_mode: str) -> dict:
         """Create a single gap patch using LLM"""
         try:
@@ -541,47 +578,39 @@ Section: {section}
 Available Evidence:
 {evidence_text}
 
-Create a patch for this gap using only the provided evidence. If evidence is insufficient, return null."""
+Create a patch for this gap using only the provided evidence. If evidence is insufficient, return {{"text": null}}."""
             
             # Call LLM for gap patch using centralized client
             try:
-                llm_response = await self.llm_client.generate_response(
-                    system_message, user_message
+                patch_data = await self.llm_client.complete_json(
+                    system_message=system_message,
+                    user_message=user_message,
+                    schema=GAP_PATCH_SCHEMA,
+                    temperature=0.2,
+                    call_type="gap_fill"
                 )
+            except LLMStructuredOutputError as parse_error:
+                patch_data = self._recover_gap_patch(parse_error.text)
+                if patch_data is None:
+                    return None
             except Exception as llm_error:
                 print(f"⚠️ V2 GAP FILLING: LLM client error, skipping gap - {llm_error}")
                 return None
             
-            if not llm_response:
+            if not patch_data.get('text'):
+                # Evidence insufficient
                 return None
             
-            # Parse LLM response
-            try:
-                patch_data = json.loads(llm_response)
-                
-                return {
-                    "location": f"Section: {section}",
-                    "text": patch_data.get('text', ''),
-                    "support_block_ids": patch_data.get('support_block_ids', support_block_ids),
-                    "confidence": patch_data.get('confidence', 'medium'),
-                    "gap_pattern": gap.get('pattern', '[MISSING]'),
-                    "gap_position": gap.get('position', 0),
-                    "reasoning": patch_data.get('reasoning', ''),
-                    "enrich_mode": enrich_mode
-                }
-                
-            except json.JSONDecodeError:
-                # Fallback parsing
-                return {
-                    "location": f"Section: {section}",
-                    "text": llm_response.strip(),
-                    "support_block_ids": support_block_ids,
-                    "confidence": "medium",
-                    "gap_pattern": gap.get('pattern', '[MISSING]'),
-                    "gap_position": gap.get('position', 0),
-                    "reasoning": "LLM response parsing fallback",
-                    "enrich_mode": enrich_mode
-                }
+            return {
+                "location": f"Section: {section}",
+                "text": patch_data['text'],
+                "support_block_ids": patch_data.get('support_block_ids', support_block_ids),
+                "confidence": patch_data.get('confidence', 'medium'),
+                "gap_pattern": gap.get('pattern', '[MISSING]'),
+                "gap_position": gap.get('position', 0),
+                "reasoning": patch_data.get('reasoning', ''),
+                "enrich_mode": enrich_mode
+            }
             
         except Exception as e:
             print(f"❌ V2 GAP FILLING: Error creating gap patch - {e}")
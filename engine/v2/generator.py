@@ -3,19 +3,33 @@ KE-M9: V2 Article Generator - Complete Implementation Migration
 Migrated from server.py - Final article generation with strict format and audience-aware styling
 """
 
-import json
+import os
 import re
 import uuid
+import asyncio
 from datetime import datetime
 from bs4 import BeautifulSoup
 from ..llm.client import get_llm_client
 from ..stores.mongo import RepositoryFactory
+from ._utils import gather_bounded
+from .events import delta_emitter
+
+ARTICLE_SCHEMA = {
+    "type": "object",
+    "required": ["html", "summary"],
+    "properties": {"html": {"type": "string"}, "summary": {"type": "string"}}
+}
 
 class V2ArticleGenerator:
     """V2 Engine: Final article generation with strict format and audience-aware styling"""
     
-    def __init__(self, llm_client=None):
+    def __init__(self, llm_client=None, max_concurrent_articles: int = None, article_timeout: float = None):
         self.llm_client = llm_client or get_llm_client()
+        
+        # Per-article fan-out: 1 keeps the original one-at-a-time generation
+        self.max_concurrent_articles = max_concurrent_articles or int(os.getenv("V2_GENERATION_CONCURRENCY", "4"))
+        self.article_timeout = article_timeout or float(os.getenv("V2_ARTICLE_TIMEOUT", "300"))
+        
         self.required_structure = [
             "h1_title",
             "intro_paragraph", 
@@ -75,31 +89,50 @@ class V2ArticleGenerator:
                 "engine": "v2"
             }
     
-    async def generate_final_articles(self, normalized_doc, per_article_outlines: list, analysis: dict, run_id: str) -> dict:
-        """V2 Engine: Generate final articles with strict format and audience-aware styling"""
+    async def generate_final_articles(self, normalized_doc, per_article_outlines: list, analysis: dict, run_id: str,
+                                      reused_articles: dict = None) -> dict:
+        """V2 Engine: Generate final articles with strict format and audience-aware styling
+        
+        reused_articles maps article_id to article data from a previous version whose
+        source blocks are unchanged; those articles are carried over instead of regenerated.
+        """
         try:
             print("📝 V2 ARTICLE GEN: Generating final articles with strict format - engine=v2")
             
-            generated_articles = []
             audience = analysis.get('audience', 'end_user')
             
-            for article_outline_data in per_article_outlines:
-                article_id = article_outline_data.get('article_id', 'unknown')
-                outline = article_outline_data.get('outline', {})
-                
-                if not outline:
-                    continue
-                
+            # Skip outlines without content, keeping source order for the fan-out
+            article_jobs = [
+                (data.get('article_id', 'unknown'), data.get('outline', {}))
+                for data in per_article_outlines
+                if data.get('outline', {})
+            ]
+            
+            print(f"📝 V2 ARTICLE GEN: Generating {len(article_jobs)} articles (max {self.max_concurrent_articles} concurrent, {self.article_timeout:.0f}s timeout) - engine=v2")
+            
+            reused_articles = reused_articles or {}
+            if reused_articles:
+                print(f"♻️ V2 ARTICLE GEN: Reusing {len(reused_articles)} unchanged articles from previous version - engine=v2")
+            
+            async def generate_job(index: int, job: tuple):
+                article_id, outline = job
+                if article_id in reused_articles:
+                    return reused_articles[article_id]
                 print(f"📝 V2 ARTICLE GEN: Generating article '{outline.get('title', 'Untitled')}' for {audience} audience - engine=v2")
-                
-                # Generate final article with strict format
-                article_result = await self._generate_single_article(
-                    normalized_doc, 
-                    article_id, 
-                    outline, 
-                    analysis, 
-                    audience
-                )
+                return await self._generate_single_article(normalized_doc, article_id, outline, analysis, audience)
+            
+            article_results = await gather_bounded(
+                generate_job, article_jobs, self.max_concurrent_articles, timeout=self.article_timeout
+            )
+            
+            generated_articles = []
+            for (article_id, outline), article_result in zip(article_jobs, article_results):
+                if isinstance(article_result, BaseException):
+                    # Timeouts and unexpected errors fall back for this article only
+                    reason = "timed out" if isinstance(article_result, asyncio.TimeoutError) else str(article_result)
+                    print(f"🔄 V2 ARTICLE GEN: Article {article_id} {reason}, using rule-based fallback - engine=v2")
+                    article_blocks = self._extract_blocks_from_outline(normalized_doc, outline)
+                    article_result = await self._rule_based_article_generation(outline, article_blocks, audience) if article_blocks else None
                 
                 if article_result:
                     generated_articles.append({
@@ -131,7 +164,7 @@ class V2ArticleGenerator:
             article_input = self._create_article_generation_input(outline, article_blocks, analysis, audience)
             
             # Generate article using LLM
-            article_result = await self._perform_llm_article_generation(article_input, audience)
+            article_result = await self._perform_llm_article_generation(article_input, audience, article_id)
             
             if article_result:
                 # Validate and enhance the generated article
@@ -256,8 +289,8 @@ class V2ArticleGenerator:
             print(f"❌ V2 ARTICLE GEN: Error creating article input - {e}")
             return f"ARTICLE_TITLE: {outline.get('title', 'Error')}\nERROR: Could not create article input"
     
-    async def _perform_llm_article_generation(self, article_input: str, audience: str) -> dict:
-        """Perform LLM-based article generation using specified format"""
+    async def _perform_llm_article_generation(self, article_input: str, audience: str, article_id: str = None) -> dict:
+        """Perform LLM-based article generation using specified format; streams the HTML to a watching client"""
         try:
             system_message = f"""You are a professional technical writer. Generate a full article based on the outline and source blocks.
 
@@ -351,42 +384,25 @@ CRITICAL REQUIREMENTS:
 
             print(f"🤖 V2 ARTICLE GEN: Sending article generation request to LLM - {audience} audience - engine=v2")
             
+            # Stream the article body to the run's consumer as it is written
+            on_delta = delta_emitter("article_delta", delta_key="html_delta", json_field="html", article_id=article_id)
+            
             # Use centralized LLM client
             try:
-                ai_response = await self.llm_client.generate_response(system_message, user_message)
+                article_data = await self.llm_client.complete_json(
+                    system_message=system_message,
+                    user_message=user_message,
+                    schema=ARTICLE_SCHEMA,
+                    temperature=0.1,
+                    call_type="article",
+                    on_delta=on_delta
+                )
             except Exception as llm_error:
-                print(f"⚠️ V2 ARTICLE GEN: LLM client error - {llm_error}")
+                print(f"⚠️ V2 ARTICLE GEN: No usable LLM article - {llm_error} - engine=v2")
                 return None
             
-            if ai_response:
-                # Parse JSON response
-                # Clean response and extract JSON
-                cleaned_response = re.sub(r'[-\x1f\x7f-\x9f]', '', ai_response)
-                
-                # Try to extract JSON from response
-                json_match = re.search(r'\{.*\}', cleaned_response, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                    try:
-                        article_data = json.loads(json_str)
-                        
-                        # Validate required fields
-                        if 'html' in article_data and 'summary' in article_data:
-                            html_length = len(article_data.get('html', ''))
-                            print(f"🎯 V2 ARTICLE GEN: LLM article generation successful - {html_length} chars HTML - engine=v2")
-                            return article_data
-                        else:
-                            print("⚠️ V2 ARTICLE GEN: Missing required fields in LLM response - engine=v2")
-                            return None
-                    except json.JSONDecodeError as json_error:
-                        print(f"⚠️ V2 ARTICLE GEN: JSON parsing error - {json_error}")
-                        return None
-                else:
-                    print("⚠️ V2 ARTICLE GEN: No JSON found in LLM article response - engine=v2")
-                    return None
-            else:
-                print("❌ V2 ARTICLE GEN: No response from LLM for article generation - engine=v2")
-                return None
+            print(f"🎯 V2 ARTICLE GEN: LLM article generation successful - {len(article_data['html'])} chars HTML - engine=v2")
+            return article_data
                 
         except Exception as e:
             print(f"❌ V2 ARTICLE GEN: Error in LLM article generation - {e} - engine=v2")
@@ -0,0 +1,163 @@
+"""
+V2 Incremental Re-ingest
+Block-level change detection so a re-upload only regenerates articles whose source blocks changed
+"""
+
+import os
+import json
+import hashlib
+from typing import Dict, Any, List, Optional
+
+
+class V2IncrementalReingest:
+    """
+    V2 Engine: Reuse prewrite, generation and style results across re-uploads of a document.
+
+    Every article is fingerprinted by the content hashes of the source blocks its
+    per-article outline references (plus the target audience). Block hashes are
+    position independent, so inserting a paragraph in one chapter leaves the
+    fingerprints of articles built from other chapters unchanged. After style
+    processing, a snapshot of each article is stored per source document; the next
+    upload of that document diffs its fingerprints against the latest snapshots.
+    """
+
+    def __init__(self, repository=None, enabled: bool = None):
+        if enabled is None:
+            enabled = os.getenv("V2_INCREMENTAL_REINGEST", "true").lower() == "true"
+        self.enabled = enabled
+        self._repository = repository
+
+    @property
+    def repository(self):
+        """Snapshot repository, created on first use"""
+        if self._repository is None:
+            from ..stores.mongo import RepositoryFactory
+            self._repository = RepositoryFactory.get_v2_article_snapshots()
+        return self._repository
+
+    def _document_key(self, metadata: Dict[str, Any], normalized_doc) -> Optional[str]:
+        """Identify the source document across uploads (explicit key, filename or title)"""
+        metadata = metadata or {}
+        return (metadata.get('document_key') or metadata.get('original_filename')
+                or metadata.get('title') or getattr(normalized_doc, 'original_filename', None))
+
+    def article_fingerprint(self, block_hashes: Dict[str, str], outline: dict, audience: str) -> Optional[str]:
+        """Fingerprint an article outline by the content of the blocks it references"""
+        referenced = [
+            block_hashes[block_id]
+            for section in outline.get('sections', [])
+            for subsection in section.get('subsections', [])
+            for block_id in subsection.get('block_ids', [])
+            if block_id in block_hashes
+        ]
+        if not referenced:
+            return None
+
+        fingerprint_input = json.dumps({"audience": audience, "blocks": referenced})
+        return hashlib.sha256(fingerprint_input.encode('utf-8')).hexdigest()
+
+    async def plan_reuse(self, normalized_doc, per_article_outlines: list, metadata: Dict[str, Any],
+                         analysis: Dict[str, Any], run_id: str) -> dict:
+        """Diff article fingerprints against the previous version of the same document"""
+        document_key = self._document_key(metadata, normalized_doc)
+        reuse_plan = {
+            "enabled": self.enabled and bool(document_key),
+            "document_key": document_key,
+            "fingerprints": {},
+            "reusable": {},
+            "changed_articles": [],
+            "removed_articles": 0
+        }
+        if not reuse_plan["enabled"]:
+            return reuse_plan
+
+        try:
+            block_hashes = normalized_doc.block_hashes()
+            audience = (analysis or {}).get('audience', 'end_user')
+
+            for data in per_article_outlines:
+                article_id = data.get('article_id', 'unknown')
+                fingerprint = self.article_fingerprint(block_hashes, data.get('outline', {}) or {}, audience)
+                if fingerprint:
+                    reuse_plan["fingerprints"][article_id] = fingerprint
+
+            previous = {snapshot["fingerprint"]: snapshot for snapshot in await self.repository.find_latest_snapshots(document_key)}
+
+            for article_id, fingerprint in reuse_plan["fingerprints"].items():
+                if fingerprint in previous:
+                    reuse_plan["reusable"][article_id] = previous[fingerprint]
+                else:
+                    reuse_plan["changed_articles"].append(article_id)
+            reuse_plan["removed_articles"] = len(set(previous) - set(reuse_plan["fingerprints"].values()))
+
+            print(f"♻️ V2 INCREMENTAL: {len(reuse_plan['reusable'])} articles unchanged, "
+                  f"{len(reuse_plan['changed_articles'])} changed, {reuse_plan['removed_articles']} removed "
+                  f"for '{document_key}' - run {run_id} - engine=v2")
+
+        except Exception as e:
+            # Without a plan every article is regenerated, exactly like a first upload
+            print(f"⚠️ V2 INCREMENTAL: Could not plan reuse for '{document_key}' - {e} - run {run_id} - engine=v2")
+            reuse_plan["reusable"] = {}
+
+        return reuse_plan
+
+    def reused_generated_articles(self, reuse_plan: dict) -> Dict[str, dict]:
+        """Generated article data to reuse, keyed by article_id"""
+        return {
+            article_id: snapshot["generated"]
+            for article_id, snapshot in (reuse_plan or {}).get("reusable", {}).items()
+            if snapshot.get("generated")
+        }
+
+    def reused_prewrites(self, reuse_plan: dict) -> Dict[str, dict]:
+        """Prewrite results to reuse, keyed by article_id"""
+        return {
+            article_id: snapshot["prewrite"]
+            for article_id, snapshot in (reuse_plan or {}).get("reusable", {}).items()
+            if snapshot.get("prewrite")
+        }
+
+    def reused_styles(self, reuse_plan: dict, articles: List[dict]) -> Dict[int, dict]:
+        """Successful style results to reuse, keyed by index in the pipeline article list"""
+        reusable = (reuse_plan or {}).get("reusable", {})
+        reused = {}
+        for index, article in enumerate(articles):
+            snapshot = reusable.get(article.get('metadata', {}).get('article_id'))
+            if snapshot and (snapshot.get("style") or {}).get('style_status') == 'success':
+                reused[index] = snapshot["style"]
+        return reused
+
+    async def record_snapshots(self, reuse_plan: dict, generated_articles: dict, prewrite_result: dict,
+                               articles: List[dict], style_result: dict, run_id: str) -> int:
+        """Store per-article snapshots of this run for the next upload of the document"""
+        if not (reuse_plan or {}).get("enabled"):
+            return 0
+
+        try:
+            fingerprints = reuse_plan["fingerprints"]
+            prewrite_by_id = {r.get('article_id'): r for r in (prewrite_result or {}).get('prewrite_results', [])}
+            style_by_index = {r.get('article_index'): r for r in (style_result or {}).get('style_results', [])}
+            article_index = {article.get('metadata', {}).get('article_id'): i for i, article in enumerate(articles)}
+
+            snapshots = []
+            for generated in (generated_articles or {}).get('generated_articles', []):
+                article_id = generated.get('article_id')
+                if article_id not in fingerprints:
+                    continue
+
+                snapshots.append({
+                    "fingerprint": fingerprints[article_id],
+                    "article_id": article_id,
+                    "generated": generated.get('article_data'),
+                    "prewrite": prewrite_by_id.get(article_id),
+                    "style": style_by_index.get(article_index.get(article_id)),
+                    "engine": "v2"
+                })
+
+            stored = await self.repository.replace_snapshots(reuse_plan["document_key"], run_id, snapshots)
+            print(f"📸 V2 INCREMENTAL: Stored {stored} article snapshots for '{reuse_plan['document_key']}' - run {run_id} - engine=v2")
+            return stored
+
+        except Exception as e:
+            print(f"⚠️ V2 INCREMENTAL: Could not store article snapshots - {e} - run {run_id} - engine=v2")
+            return 0
@@ -4,10 +4,27 @@ Migrated from server.py - Global and per-article outline planning with LLM intel
 """
 
 from typing import Dict, Any, List, Optional
-from ..llm.client import get_llm_client
+from ..llm.client import get_llm_client, LLMStructuredOutputError
 from ..llm.prompts import ARTICLE_OUTLINE_PROMPT
 from ._utils import generate_run_id, create_processing_metadata
-import json
+
+OUTLINE_SCHEMA = {
+    "type": "object",
+    "required": ["articles", "discarded_blocks"],
+    "properties": {
+        "articles": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "proposed_title": {"type": "string"},
+                    "block_ids": {"type": "array", "items": {"type": "string"}}
+                }
+            }
+        },
+        "discarded_blocks": {"type": "array", "items": {"type": "object"}}
+    }
+}
 
 class V2GlobalOutlinePlanner:
     """V2 Engine: Global outline planning with 100% block assignment and granularity compliance"""
@@ -242,42 +259,19 @@ Return ONLY JSON in this exact format:
 }}"""
 
             # Use centralized LLM client
-            llm_response = await self.llm_client.complete(
+            outline_data = await self.llm_client.complete_json(
                 system_message=system_message,
                 user_message=user_message,
+                schema=OUTLINE_SCHEMA,
                 temperature=0.3,
-                max_tokens=4000
+                call_type="outline"
             )
             
-            if llm_response:
-                # Parse JSON response
-                import re
-                
-                # Clean response and extract JSON
-                cleaned_response = re.sub(r'[-\x1f\x7f-\x9f]', '', llm_response)
-                
-                # Try to extract JSON from response
-                json_match = re.search(r'\{.*\}', cleaned_response, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                    outline_data = json.loads(json_str)
-                    
-                    # Validate required fields
-                    if 'articles' in outline_data and 'discarded_blocks' in outline_data:
-                        print(f"🎯 V2 OUTLINE: LLM outline planning successful - {len(outline_data['articles'])} articles, {len(outline_data['discarded_blocks'])} discarded - engine=v2")
-                        return outline_data
-                    else:
-                        print(f"⚠️ V2 OUTLINE: Invalid outline structure from LLM - engine=v2")
-                        return None
-                else:
-                    print(f"⚠️ V2 OUTLINE: No JSON found in LLM outline response - engine=v2")
-                    return None
-            else:
-                print(f"❌ V2 OUTLINE: No response from LLM for outline planning - engine=v2")
-                return None
+            print(f"🎯 V2 OUTLINE: LLM outline planning successful - {len(outline_data['articles'])} articles, {len(outline_data['discarded_blocks'])} discarded - engine=v2")
+            return outline_data
                 
-        except json.JSONDecodeError as e:
-            print(f"⚠️ V2 OUTLINE: Invalid JSON response from LLM - {e}")
+        except LLMStructuredOutputError as e:
+            print(f"⚠️ V2 OUTLINE: Invalid outline from LLM - {e}")
             return None
         except Exception as e:
             print(f"❌ V2 OUTLINE: Error in LLM outline planning - {e}")
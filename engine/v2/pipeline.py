@@ -3,15 +3,20 @@ KE-PR5: V2 Pipeline Orchestrator
 Coordinates all V2 stages with typed I/O and comprehensive logging
 """
 
+import os
+import copy
+import mimetypes
 import uuid
 import time
+import asyncio
 from datetime import datetime
-from typing import Tuple, Dict, Any, List
+from typing import Tuple, Dict, Any, List, AsyncIterator, Optional
 
 # Import typed models from KE-PR1
 from ..models.io import RawBundle, NormDoc, Section, SourceSpan
 from ..models.qa import QAReport, QAFlag
 from ..logging_util import stage_log, logger
+from ..run_context import RunContext, RunCancelledError, RunDeadlineExceeded, current_run_context
 
 # Import all V2 stage classes from KE-PR4
 from .analyzer import V2MultiDimensionalAnalyzer
@@ -30,14 +35,56 @@ from .publish import V2PublishingSystem
 from .versioning import V2VersioningSystem
 from .review import V2ReviewSystem
 from .extractor import V2ContentExtractor
+from .incremental import V2IncrementalReingest
+from .scheduler import StageNode, StageScheduler
+from .checkpoints import StageCheckpointStore, CheckpointNotFoundError, INPUTS_STAGE
+from .events import _run_events, emit_run_event
+from ._utils import gather_bounded
+from ..extraction.stream import STREAMABLE_EXTENSIONS, stream_document_blocks
+
+
+# Values supplied by Pipeline.run before any stage executes
+STAGE_GRAPH_INPUTS = ("content", "metadata", "run_id", "job_id")
+
+def document_text(normalized_doc) -> str:
+    """Markdown text of a normalized document, rebuilt from its blocks"""
+    parts = []
+    for block in normalized_doc.blocks:
+        block_type = block.block_type
+        if block_type.startswith('heading_h'):
+            parts.append(f"{'#' * int(block_type[len('heading_h'):])} {block.content}")
+        elif block_type == 'heading' and getattr(block, 'level', None):
+            parts.append(f"{'#' * block.level} {block.content}")
+        else:
+            parts.append(block.content)
+    return "\n\n".join(parts)
+
+
+# Stage outcome of the P0 flag codes Pipeline._failed_run reports a stopped run with
+RUN_FAILURE_OUTCOMES = {
+    "P0_RUN_CANCELLED": "cancelled",
+    "P0_RUN_DEADLINE_EXCEEDED": "failure",
+    "P0_PIPELINE_ERROR": "failure",
+}
+
+
+def run_outcome(result) -> Optional[str]:
+    """Stage outcome of a (articles, qa_report, version_id) run result; None when the run succeeded"""
+    qa_report = result[1]
+    for flag in getattr(qa_report, "flags", None) or []:
+        if flag.severity == "P0" and flag.code in RUN_FAILURE_OUTCOMES:
+            return RUN_FAILURE_OUTCOMES[flag.code]
+    return None
 
 
 class Pipeline:
     """V2 Pipeline Orchestrator: Coordinates all V2 stages with typed I/O and comprehensive logging"""
     
-    def __init__(self, llm_client=None, existing_v2_instances=None):
+    def __init__(self, llm_client=None, existing_v2_instances=None, checkpoint_store=None, qa_results=None):
         """Initialize pipeline with all V2 stage instances"""
         self.llm = llm_client
+        self.checkpoints = checkpoint_store or StageCheckpointStore()
+        self._qa_results = qa_results
         
         # Use existing V2 instances if provided (for integration with server.py globals)
         if existing_v2_instances:
@@ -59,6 +106,7 @@ class Pipeline:
             self.publisher = existing_v2_instances.get('publisher', V2PublishingSystem())
             self.versioning = existing_v2_instances.get('versioning', V2VersioningSystem())
             self.reviewer = existing_v2_instances.get('reviewer', V2ReviewSystem())
+            self.incremental = existing_v2_instances.get('incremental', V2IncrementalReingest())
         else:
             # Initialize new V2 stage class instances
             self.extractor = V2ContentExtractor()
@@ -78,11 +126,13 @@ class Pipeline:
             self.publisher = V2PublishingSystem()
             self.versioning = V2VersioningSystem()
             self.reviewer = V2ReviewSystem()
+            self.incremental = V2IncrementalReingest()
         
         print("🚀 KE-PR5: V2 Pipeline orchestrator initialized with 17 stages")
 
-    @stage_log("v2_pipeline_complete")
-    async def run(self, job_id: str, content: str, metadata: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], QAReport, str]:
+    @stage_log("v2_pipeline_complete", outcome=run_outcome)
+    async def run(self, job_id: str, content: str, metadata: Dict[str, Any],
+                  run_context: RunContext = None) -> Tuple[List[Dict[str, Any]], QAReport, str]:
         """
         Run the complete V2 pipeline orchestration
         
@@ -90,70 +140,297 @@ class Pipeline:
             job_id: Unique job identifier
             content: Raw content to process
             metadata: Content metadata (title, type, etc.)
+            run_context: Cancellation token and deadline; defaults to the caller's
+                current run context, or a new one for job_id
         
         Returns:
             Tuple of (articles, qa_report, version_id)
         """
+        run_id = f"run_{int(datetime.utcnow().timestamp())}_{uuid.uuid4().hex[:8]}"
+        print(f"🚀 KE-PR5: Starting V2 pipeline - job_id: {job_id}, run_id: {run_id}")
+        
+        context = {
+            "content": content,
+            "metadata": metadata,
+            "run_id": run_id,
+            "job_id": job_id
+        }
+        self.checkpoints.save(run_id, INPUTS_STAGE, None, context)
+        emit_run_event("run_started", job_id=job_id, run_id=run_id)
+        
+        run_context = run_context or current_run_context() or RunContext(job_id)
+        return await self._execute_stage_graph(job_id, run_id, context, run_context)
+
+    def stream(self, job_id: str, content: str, metadata: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run the V2 pipeline, yielding progress events as they happen
+        
+        Events (dicts with an "event" key):
+            run_started: run_id to resume with if the stream is interrupted
+            stage_complete: stage name and completed/total stage counts
+            article_delta: article_id and the next fragment of its HTML while it is generated
+            article: index, total and a final article
+            pipeline_complete: final articles, qa_report and version_id
+        
+        Each article event is sent as soon as that article has been styled, linked,
+        gap filled and code normalized, while other articles are still in progress;
+        events may arrive out of index order. Publishing and versioning run after the
+        last article, so pipeline_complete follows every article event.
+        
+        Closing the generator early cancels the run; its checkpoints remain resumable.
+        """
+        return self._stream_run(job_id, lambda: self.run(job_id, content, metadata))
+
+    def stream_document(self, job_id: str, file_path: str,
+                        metadata: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run the V2 pipeline on a document file (see run_document), yielding the
+        progress events of stream()
+        
+        Raises:
+            ValueError: From the first iteration, if the file type cannot be
+                streamed (see STREAMABLE_EXTENSIONS)
+        """
+        return self._stream_run(job_id, lambda: self.run_document(job_id, file_path, metadata))
+
+    async def _stream_run(self, job_id: str, start_run) -> AsyncIterator[Dict[str, Any]]:
+        """Run start_run() with the run's events routed to this generator, then yield pipeline_complete"""
+        events: asyncio.Queue = asyncio.Queue()
+        
+        async def run_with_events():
+            _run_events.set(events)
+            try:
+                return await start_run()
+            finally:
+                events.put_nowait(None)
+        
+        run_task = asyncio.create_task(run_with_events())
         try:
-            pipeline_start = time.time()
-            run_id = f"run_{int(datetime.utcnow().timestamp())}_{uuid.uuid4().hex[:8]}"
-            
-            print(f"🚀 KE-PR5: Starting V2 pipeline - job_id: {job_id}, run_id: {run_id}")
-            
-            # Stage 1: Content Extraction & Normalization
-            normalized_doc = await self._stage_extract_content(content, metadata, run_id, job_id)
-            
-            # Stage 2: Multi-dimensional Analysis
-            analysis_result = await self._stage_analyze(normalized_doc, run_id)
-            analysis = analysis_result.get('analysis', {}) if analysis_result else {}
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
             
-            # Stage 3: Global Outline Planning
-            global_outline = await self._stage_global_outline(normalized_doc, analysis, run_id)
-            
-            # Stage 4: Per-Article Outline Planning  
-            per_article_outlines = await self._stage_per_article_outline(normalized_doc, global_outline, analysis, run_id)
-            
-            # Stage 5: Section-Grounded Prewrite
-            prewrite_result = await self._stage_prewrite(content, metadata, global_outline, per_article_outlines, analysis, run_id)
-            
-            # Stage 6: Article Generation
-            generated_articles = await self._stage_generate_articles(normalized_doc, per_article_outlines, analysis, run_id)
-            
-            # Stage 7: Evidence Tagging
-            articles = await self._stage_evidence_tagging(generated_articles, normalized_doc, prewrite_result, run_id)
-            
-            # Stage 8: Style Processing
-            articles = await self._stage_style_processing(content, metadata, articles, generated_articles, analysis, run_id)
-            
-            # Stage 9: Related Links Generation
-            articles = await self._stage_related_links(articles, content, normalized_doc, run_id)
-            
-            # Stage 10: Gap Filling
-            articles = await self._stage_gap_filling(articles, content, normalized_doc, run_id)
-            
-            # Stage 11: Code Normalization
-            articles = await self._stage_code_normalization(articles, normalized_doc, prewrite_result, run_id)
+            articles, qa_report, version_id = await run_task
+            yield {
+                "event": "pipeline_complete",
+                "timestamp": datetime.utcnow().isoformat(),
+                "job_id": job_id,
+                "articles": articles,
+                "qa_report": qa_report,
+                "version_id": version_id
+            }
+        finally:
+            if not run_task.done():
+                print(f"⚠️ KE-PR5: Stream consumer went away - cancelling V2 pipeline - job_id: {job_id}")
+                run_task.cancel()
+                await asyncio.gather(run_task, return_exceptions=True)
+
+    @stage_log("v2_pipeline_complete", outcome=run_outcome)
+    async def run_document(self, job_id: str, file_path: str, metadata: Dict[str, Any],
+                           run_context: RunContext = None) -> Tuple[List[Dict[str, Any]], QAReport, str]:
+        """
+        Run the V2 pipeline on a document file, building the normalized document from
+        blocks as they are extracted instead of from the full text
+        
+        Blocks are streamed page by page (PDF) or section by section (DOCX, text). When
+        the analyzer supports previews, its LLM analysis starts as soon as the preview
+        budget is full (V2_STREAM_EARLY_ANALYSIS, default true) and overlaps the rest of
+        the extraction. Extraction and analysis failures are reported like stage
+        failures in run(): a P0 QA report and no articles.
+        
+        Embedded PDF/DOCX images are saved as their page or paragraph is reached (session
+        job_id[:8], as the full extractors use) and become the document's media; their
+        Asset Library entries are inserted in one batch once extraction finishes. Later
+        stages still need the document text; it is assembled once from the blocks and is
+        not checkpointed separately, resume rebuilds it from the normalized document.
+        
+        Args:
+            job_id: Unique job identifier
+            file_path: Document on disk; its extension selects the block parser
+            metadata: Content metadata (title, original_filename, etc.)
+            run_context: Cancellation token and deadline; defaults to the caller's
+                current run context, or a new one for job_id
+        
+        Returns:
+            Tuple of (articles, qa_report, version_id)
+        
+        Raises:
+            ValueError: If the file type cannot be streamed (see STREAMABLE_EXTENSIONS)
+        """
+        run_id = f"run_{int(datetime.utcnow().timestamp())}_{uuid.uuid4().hex[:8]}"
+        print(f"🚀 KE-PR5: Starting streaming V2 pipeline - job_id: {job_id}, run_id: {run_id}")
+        run_context = run_context or current_run_context() or RunContext(job_id)
+        
+        title = metadata.get('title', metadata.get('original_filename', os.path.basename(file_path)))
+        extension = os.path.splitext(metadata.get('original_filename') or file_path)[1].lower().lstrip('.')
+        if extension not in STREAMABLE_EXTENSIONS:
+            raise ValueError(f"Streaming extraction does not support .{extension} files")
+        mime_type = mimetypes.guess_type(f"document.{extension}")[0] or "text/plain"
+        early_analysis = (hasattr(self.analyzer, 'analyze_preview')
+                          and os.getenv("V2_STREAM_EARLY_ANALYSIS", "true").lower() == "true")
+        preview = self.analyzer.new_preview(title) if hasattr(self.analyzer, 'new_preview') else None
+        analysis_task = None
+        
+        def on_block(block):
+            nonlocal analysis_task
+            if preview is None:
+                return
+            preview.add(block)
+            if early_analysis and analysis_task is None and preview.full:
+                print(f"🔍 KE-PR5: Preview budget full after {preview.block_count} blocks - starting analysis during extraction")
+                analysis_task = asyncio.ensure_future(self.analyzer.analyze_preview(preview.render()))
+        
+        context = {
+            "content": None,
+            "metadata": metadata,
+            "run_id": run_id,
+            "job_id": job_id
+        }
+        # The text is rebuilt from the extract_content checkpoint on resume
+        self.checkpoints.save(run_id, INPUTS_STAGE, None, context)
+        emit_run_event("run_started", job_id=job_id, run_id=run_id)
+        
+        try:
+            with run_context:
+                run_context.check("extract_content")
+                stage_start = time.monotonic()
+                try:
+                    normalized_doc = await self.extractor.extract_block_stream(
+                        stream_document_blocks(file_path, extension, session_id=job_id[:8]), title=title,
+                        job_id=job_id, mime_type=mime_type, on_block=on_block)
+                finally:
+                    run_context.record_stage("extract_content", time.monotonic() - stage_start)
             
-            # Stage 12: Validation
-            validation_result = await self._stage_validation(normalized_doc, generated_articles, analysis, run_id)
+            await self._store_media_assets(normalized_doc)
+            context["normalized_doc"] = normalized_doc
+            self.checkpoints.save(run_id, "extract_content", "normalized_doc", normalized_doc)
+            context["content"] = document_text(normalized_doc)
             
-            # Stage 13: Cross-Article QA
-            qa_result = await self._stage_cross_qa(generated_articles, run_id)
+            if early_analysis:
+                with run_context:
+                    run_context.check("analyze")
+                    stage_start = time.monotonic()
+                    try:
+                        llm_analysis = analysis_task or self.analyzer.analyze_preview(preview.render(normalized_doc.word_count))
+                        result = await self.analyzer.run(normalized_doc, llm_analysis=llm_analysis)
+                    finally:
+                        run_context.record_stage("analyze", time.monotonic() - stage_start)
+                context["analysis_result"] = {
+                    "analysis": result.get("content_analysis", {}),
+                    "analysis_metadata": result.get("analysis_metadata", {}),
+                    "run_id": run_id
+                }
+                self.checkpoints.save(run_id, "analyze", "analysis_result", context["analysis_result"])
+        except Exception as e:
+            try:
+                return await self._failed_run(job_id, run_id, run_context, e)
+            finally:
+                await self.checkpoints.flush(run_id)
+        finally:
+            if analysis_task is not None and not analysis_task.done():
+                analysis_task.cancel()
+        
+        return await self._execute_stage_graph(job_id, run_id, context, run_context)
+
+    @stage_log("v2_pipeline_resume", outcome=run_outcome)
+    async def resume(self, run_id: str, from_stage: str = None,
+                     run_context: RunContext = None) -> Tuple[List[Dict[str, Any]], QAReport, str]:
+        """
+        Resume a previous run from its stage checkpoints
+        
+        Args:
+            run_id: Run identifier returned in the run's logs and stored records
+            from_stage: Stage to rerun from (e.g. "finalize_articles"); defaults to the
+                first stage without a checkpoint
+        
+        Returns:
+            Tuple of (articles, qa_report, version_id)
+        
+        Raises:
+            CheckpointNotFoundError: If the run has no stored inputs
+            StageGraphError: If from_stage is not a stage of the pipeline
+        """
+        checkpoints = await self.checkpoints.load(run_id)
+        context = dict(checkpoints[INPUTS_STAGE][1])
+        job_id = context["job_id"]
+        if context.get("content") is None:
+            # Streamed runs (run_document) keep the document only as blocks
+            if "extract_content" not in checkpoints:
+                raise CheckpointNotFoundError(f"No extracted document stored for streamed run: {run_id}")
+            context["content"] = document_text(checkpoints["extract_content"][1])
+        
+        # Rerun the requested stage, every stage without a checkpoint and everything downstream
+        scheduler = StageScheduler(self._build_stage_graph(), initial_inputs=STAGE_GRAPH_INPUTS)
+        rerun_from = [node.name for node in scheduler.nodes if node.name not in checkpoints]
+        if from_stage:
+            rerun_from.append(from_stage)
+        invalid_stages = scheduler.downstream_of(rerun_from)
+        
+        for node in scheduler.nodes:
+            if node.name not in invalid_stages:
+                context[node.output] = checkpoints[node.name][1]
+        
+        await self.checkpoints.invalidate(run_id, invalid_stages)
+        print(f"🔁 KE-PR5: Resuming V2 pipeline - run_id: {run_id}, reusing {len(scheduler.nodes) - len(invalid_stages)} stages, rerunning {invalid_stages}")
+        
+        run_context = run_context or current_run_context() or RunContext(job_id)
+        return await self._execute_stage_graph(job_id, run_id, context, run_context)
+
+    async def _execute_stage_graph(self, job_id: str, run_id: str, context: Dict[str, Any],
+                                   run_context: RunContext) -> Tuple[List[Dict[str, Any]], QAReport, str]:
+        """Run the stage graph from the given context, checkpointing every stage output"""
+        with run_context:
+            return await self._run_stage_graph(job_id, run_id, context, run_context)
+
+    async def _run_stage_graph(self, job_id: str, run_id: str, context: Dict[str, Any],
+                               run_context: RunContext) -> Tuple[List[Dict[str, Any]], QAReport, str]:
+        try:
+            pipeline_start = time.time()
             
-            # Stage 14: Adaptive Adjustment
-            adjustment_result = await self._stage_adaptive_adjustment(generated_articles, analysis, run_id)
+            # Stages 1-17: run the declared stage graph, independent stages concurrently
+            graph = [StageNode(node.name, self._guard_stage(node, run_context), node.inputs, node.output)
+                     for node in self._build_stage_graph()]
+            scheduler = StageScheduler(graph, initial_inputs=STAGE_GRAPH_INPUTS)
+            total_stages = len(scheduler.nodes)
+            completed_stages = len([node for node in scheduler.nodes if node.output in context])
             
-            # Stage 15: Publishing
-            publishing_result = await self._stage_publishing(articles, generated_articles, validation_result, qa_result, adjustment_result, run_id)
+            def on_stage_complete(node: StageNode, output: Any):
+                nonlocal completed_stages
+                completed_stages += 1
+                self.checkpoints.save(run_id, node.name, node.output, output)
+                emit_run_event("stage_complete", run_id=run_id, stage=node.name,
+                               completed=completed_stages, total=total_stages)
             
-            # Stage 16: Versioning
-            version_id = await self._stage_versioning(articles, publishing_result, run_id)
+            # Cancelling the run context cancels this task and with it every in-flight stage and LLM call
+            graph_task = asyncio.ensure_future(scheduler.run(context, on_stage_complete=on_stage_complete))
+            run_context.attach(graph_task)
+            try:
+                results = await asyncio.wait_for(graph_task, timeout=run_context.remaining())
+            except asyncio.TimeoutError:
+                raise RunDeadlineExceeded(f"Job {job_id} exceeded its {run_context.deadline_seconds:.0f}s deadline")
+            except asyncio.CancelledError:
+                if run_context.cancelled and graph_task.cancelled():
+                    raise RunCancelledError(f"Job {job_id} cancelled: {run_context.cancel_reason}")
+                raise
             
-            # Stage 17: Review Queue
-            await self._stage_review(version_id, qa_result, run_id)
+            articles = results["final_articles"]
+            validation_result = results["validation_result"]
+            qa_result = results["qa_result"]
+            adjustment_result = results["adjustment_result"]
+            version_id = results["version_id"]
             
             # Create QA Report
             qa_report = self._create_qa_report(job_id, validation_result, qa_result, adjustment_result)
+            if run_context.skipped_stages:
+                qa_report.flags.append(QAFlag(
+                    code="P1_DEADLINE_DEGRADED",
+                    severity="P1",
+                    message=f"Optional LLM work skipped near the run deadline: {', '.join(run_context.skipped_stages)}"
+                ))
+            qa_report.llm_usage = run_context.llm_ledger.summary()
+            await self._store_llm_usage(run_id, qa_report)
             
             # Log pipeline completion
             pipeline_duration = (time.time() - pipeline_start) * 1000
@@ -162,12 +439,130 @@ class Pipeline:
             return articles, qa_report, version_id
             
         except Exception as e:
-            print(f"❌ KE-PR5: V2 pipeline failed - {e}")
-            # Return empty results on failure
-            empty_qa = QAReport(job_id=job_id, coverage_percent=0.0, flags=[
-                QAFlag(code="P0_PIPELINE_ERROR", severity="P0", message=str(e))
-            ])
-            return [], empty_qa, f"error_{job_id}"
+            return await self._failed_run(job_id, run_id, run_context, e)
+        finally:
+            print(f"⏱️ KE-PR5: Run budget - {run_context.budget_summary()}")
+            await self.checkpoints.flush(run_id)
+
+    async def _failed_run(self, job_id: str, run_id: str, run_context: RunContext,
+                          error: Exception) -> Tuple[List[Dict[str, Any]], QAReport, str]:
+        """Empty results with a P0 QA report describing why the run stopped"""
+        print(f"❌ KE-PR5: V2 pipeline failed - {error} - resume with run_id: {run_id}")
+        if isinstance(error, RunCancelledError):
+            code = "P0_RUN_CANCELLED"
+        elif isinstance(error, RunDeadlineExceeded):
+            code = "P0_RUN_DEADLINE_EXCEEDED"
+        else:
+            code = "P0_PIPELINE_ERROR"
+        empty_qa = QAReport(job_id=job_id, coverage_percent=0.0, flags=[
+            QAFlag(code=code, severity="P0", message=str(error))
+        ], llm_usage=run_context.llm_ledger.summary())
+        await self._store_llm_usage(run_id, empty_qa)
+        return [], empty_qa, f"error_{job_id}"
+
+    @property
+    def qa_results(self):
+        """QA results repository, created on first use"""
+        if getattr(self, '_qa_results', None) is None:
+            from ..stores.mongo import RepositoryFactory
+            self._qa_results = RepositoryFactory.get_qa_results()
+        return self._qa_results
+
+    @property
+    def assets(self):
+        """Asset Library repository, created on first use"""
+        if getattr(self, '_assets', None) is None:
+            from ..stores.mongo import RepositoryFactory
+            self._assets = RepositoryFactory.get_assets()
+        return self._assets
+
+    async def _store_media_assets(self, normalized_doc):
+        """Insert the Asset Library entries of a streamed document's images; a failed insert is logged and the run goes on"""
+        assets = [dict(media.metadata["asset"]) for media in normalized_doc.media if media.metadata.get("asset")]
+        if not assets:
+            return
+        try:
+            await self.assets.insert_assets(assets)
+            print(f"📚 KE-PR5: Inserted {len(assets)} streamed images into Asset Library")
+        except Exception as e:
+            print(f"❌ KE-PR5: Failed to save streamed images to Asset Library: {e}")
+
+    async def _store_llm_usage(self, run_id: str, qa_report: QAReport):
+        """
+        Store the run's LLM usage with its persisted QA report. Validation persists
+        the report mid-run, before the usage is known; a run that never reached
+        validation stores its final report instead.
+        """
+        try:
+            if not await self.qa_results.update_llm_usage(run_id, qa_report.llm_usage):
+                qa_dict = qa_report.model_dump() if hasattr(qa_report, 'model_dump') else qa_report.dict()
+                qa_dict['stored_job_id'] = run_id
+                await self.qa_results.insert_qa_report(qa_dict)
+        except Exception as e:
+            print(f"⚠️ KE-PR7: Could not store LLM usage with the QA report - {e}")
+
+    @staticmethod
+    def _guard_stage(node: StageNode, run_context: RunContext):
+        """Wrap a stage so it checks cancellation and the deadline first and is charged to the run budget"""
+        async def guarded(*args):
+            run_context.check(node.name)
+            stage_start = time.monotonic()
+            try:
+                result = node.fn(*args)
+                if asyncio.iscoroutine(result):
+                    result = await result
+                return result
+            finally:
+                run_context.record_stage(node.name, time.monotonic() - stage_start)
+        return guarded
+
+    def _build_stage_graph(self) -> List[StageNode]:
+        """
+        Declare the V2 stage graph. Each node lists the outputs it consumes, in the
+        order of the stage method's positional arguments.
+
+        The incremental plan marks articles whose source blocks are unchanged since the
+        previous upload; prewrite, generation and style reuse their stored results.
+        Evidence tagging works on the whole article list; finalize_articles then runs
+        style -> related links -> gaps -> code per article, so each article is final
+        (and streamed) as soon as its own chain is done.
+        Prewrite runs alongside generation; validation, cross-article QA and adaptive
+        adjustment only read generated_articles and run alongside the article chain.
+        """
+        return [
+            StageNode("extract_content", self._stage_extract_content,
+                      ("content", "metadata", "run_id", "job_id"), "normalized_doc"),
+            StageNode("analyze", self._stage_analyze,
+                      ("normalized_doc", "run_id"), "analysis_result"),
+            StageNode("select_analysis", lambda result: result.get('analysis', {}) if result else {},
+                      ("analysis_result",), "analysis"),
+            StageNode("global_outline", self._stage_global_outline,
+                      ("normalized_doc", "analysis", "run_id"), "global_outline"),
+            StageNode("per_article_outline", self._stage_per_article_outline,
+                      ("normalized_doc", "global_outline", "analysis", "run_id"), "per_article_outlines"),
+            StageNode("incremental_plan", self._stage_incremental_plan,
+                      ("normalized_doc", "per_article_outlines", "metadata", "analysis", "run_id"), "reuse_plan"),
+            StageNode("prewrite", self._stage_prewrite,
+                      ("content", "metadata", "global_outline", "per_article_outlines", "analysis", "reuse_plan", "run_id"), "prewrite_result"),
+            StageNode("generate_articles", self._stage_generate_articles,
+                      ("normalized_doc", "per_article_outlines", "analysis", "reuse_plan", "run_id"), "generated_articles"),
+            StageNode("evidence_tagging", self._stage_evidence_tagging,
+                      ("generated_articles", "normalized_doc", "prewrite_result", "run_id"), "tagged_articles"),
+            StageNode("finalize_articles", self._stage_finalize_articles,
+                      ("content", "tagged_articles", "generated_articles", "normalized_doc", "analysis", "prewrite_result", "reuse_plan", "run_id"), "final_articles"),
+            StageNode("validation", self._stage_validation,
+                      ("normalized_doc", "generated_articles", "analysis", "run_id"), "validation_result"),
+            StageNode("cross_qa", self._stage_cross_qa,
+                      ("generated_articles", "run_id"), "qa_result"),
+            StageNode("adaptive_adjustment", self._stage_adaptive_adjustment,
+                      ("generated_articles", "analysis", "run_id"), "adjustment_result"),
+            StageNode("publishing", self._stage_publishing,
+                      ("final_articles", "generated_articles", "validation_result", "qa_result", "adjustment_result", "run_id"), "publishing_result"),
+            StageNode("versioning", self._stage_versioning,
+                      ("final_articles", "publishing_result", "run_id"), "version_id"),
+            StageNode("review", self._stage_review,
+                      ("version_id", "qa_result", "run_id"), "review_result"),
+        ]
 
     @stage_log("extract_content")
     async def _stage_extract_content(self, content: str, metadata: Dict[str, Any], run_id: str, job_id: str):
@@ -218,8 +613,20 @@ class Pipeline:
         print(f"✅ KE-PR5: Stage 4 complete - {outline_count} detailed outlines created")
         return per_article_outlines
 
+    @stage_log("incremental_plan")
+    async def _stage_incremental_plan(self, normalized_doc, per_article_outlines: Dict[str, Any], metadata: Dict[str, Any], analysis: Dict[str, Any], run_id: str):
+        """Stage 4b: Incremental Re-ingest Planning"""
+        print(f"♻️ KE-PR5: Stage 4b - Incremental re-ingest planning")
+        
+        reuse_plan = await self.incremental.plan_reuse(
+            normalized_doc, per_article_outlines.get('per_article_outlines', []), metadata, analysis, run_id
+        )
+        
+        print(f"✅ KE-PR5: Stage 4b complete - {len(reuse_plan.get('reusable', {}))} articles reusable")
+        return reuse_plan
+
     @stage_log("prewrite")
-    async def _stage_prewrite(self, content: str, metadata: Dict[str, Any], global_outline: Dict[str, Any], per_article_outlines: Dict[str, Any], analysis: Dict[str, Any], run_id: str):
+    async def _stage_prewrite(self, content: str, metadata: Dict[str, Any], global_outline: Dict[str, Any], per_article_outlines: Dict[str, Any], analysis: Dict[str, Any], reuse_plan: Dict[str, Any], run_id: str):
         """Stage 5: Section-Grounded Prewrite"""
         print(f"📚 KE-PR5: Stage 5 - Section-grounded prewrite")
         
@@ -228,7 +635,8 @@ class Pipeline:
         
         prewrite_result = await self.prewrite_system.execute_prewrite_pass(
             content, metadata.get('content_type', 'text'), article_outlines,
-            per_article_outlines.get('per_article_outlines', {}), analysis, run_id
+            per_article_outlines.get('per_article_outlines', {}), analysis, run_id,
+            reused_prewrites=self.incremental.reused_prewrites(reuse_plan)
         )
         
         success_count = prewrite_result.get('successful_prewrites', 0)
@@ -236,13 +644,14 @@ class Pipeline:
         return prewrite_result
 
     @stage_log("generate_articles")
-    async def _stage_generate_articles(self, normalized_doc, per_article_outlines: Dict[str, Any], analysis: Dict[str, Any], run_id: str):
+    async def _stage_generate_articles(self, normalized_doc, per_article_outlines: Dict[str, Any], analysis: Dict[str, Any], reuse_plan: Dict[str, Any], run_id: str):
         """Stage 6: Article Generation"""
         print(f"✍️ KE-PR5: Stage 6 - Article generation")
         
         outlines = per_article_outlines.get('per_article_outlines', [])
         generated_articles = await self.generator.generate_final_articles(
-            normalized_doc, outlines, analysis, run_id
+            normalized_doc, outlines, analysis, run_id,
+            reused_articles=self.incremental.reused_generated_articles(reuse_plan)
         )
         
         article_count = len(generated_articles.get('generated_articles', []))
@@ -265,74 +674,86 @@ class Pipeline:
         print(f"✅ KE-PR5: Stage 7 complete - {tagged_count} paragraphs tagged with evidence")
         return articles
 
-    @stage_log("style_processing")
-    async def _stage_style_processing(self, content: str, metadata: Dict[str, Any], articles: List[Dict[str, Any]], generated_articles: Dict[str, Any], analysis: Dict[str, Any], run_id: str):
-        """Stage 8: Style Processing"""
-        print(f"🎨 KE-PR5: Stage 8 - Woolf-aligned style processing")
-        
-        style_result = await self.style_processor.apply_style_formatting(
-            content, metadata.get('content_type', 'text'), articles,
-            generated_articles, analysis, run_id
+    @stage_log("finalize_articles")
+    async def _stage_finalize_articles(self, content: str, articles: List[Dict[str, Any]], generated_articles: Dict[str, Any], normalized_doc, analysis: Dict[str, Any], prewrite_result: Dict[str, Any], reuse_plan: Dict[str, Any], run_id: str):
+        """Stages 8-11: Style, Related Links, Gap Filling and Code Normalization per article"""
+        print(f"🎨 KE-PR5: Stages 8-11 - Finalizing {len(articles)} articles (style, related links, gaps, code)")
+        
+        reused_styles = self.incremental.reused_styles(reuse_plan, articles)
+        run_context = current_run_context()
+        fill_gaps = not (run_context and run_context.should_degrade("gap_filling"))
+        if not fill_gaps:
+            print(f"⏱️ KE-PR5: Stage 10 skipped - run is near its deadline")
+        
+        style_results = [None] * len(articles)
+        counts = {"styled": 0, "links": 0, "gaps": 0, "code_blocks": 0}
+        
+        async def finalize(index: int, article: Dict[str, Any]) -> Dict[str, Any]:
+            style_results[index] = await self._style_article(
+                article, index, content, generated_articles, analysis, run_id, reused_styles.get(index))
+            if style_results[index].get('style_status') == 'success':
+                counts["styled"] += 1
+            counts["links"] += await self._link_article(article, content, normalized_doc, run_id)
+            if fill_gaps:
+                counts["gaps"] += await self._fill_article_gaps(article, content, normalized_doc, run_id)
+            article = await self._normalize_article_code(article)
+            counts["code_blocks"] += article.get('code_normalization_metadata', {}).get('blocks_normalized', 0)
+            
+            # Last step that changes article content: this article is final
+            articles[index] = article
+            emit_run_event("article", run_id=run_id, index=index, total=len(articles), article=copy.deepcopy(article))
+            return article
+        
+        results = await gather_bounded(finalize, list(articles), self.style_processor.max_concurrent_articles)
+        failure = next((result for result in results if isinstance(result, BaseException)), None)
+        if failure is not None:
+            raise failure
+        
+        # Snapshot articles for the next upload of the document
+        await self.incremental.record_snapshots(
+            reuse_plan, generated_articles, prewrite_result, articles, {"style_results": style_results}, run_id
         )
         
-        # Apply formatted content to articles
-        style_results = style_result.get('style_results', [])
-        for i, article in enumerate(articles):
-            article_style_result = next((r for r in style_results if r.get('article_index') == i), None)
-            if article_style_result and article_style_result.get('style_status') == 'success':
-                formatted_content = article_style_result.get('formatted_content', '')
-                if formatted_content and len(formatted_content) > 100:
-                    article['content'] = formatted_content
-                    article['formatted_content'] = formatted_content
-        
-        success_count = style_result.get('successful_formatting', 0)
-        print(f"✅ KE-PR5: Stage 8 complete - {success_count} articles styled")
+        print(f"✅ KE-PR5: Stages 8-11 complete - {counts['styled']} articles styled, {counts['links']} related links, "
+              f"{counts['gaps']} gaps filled, {counts['code_blocks']} code blocks normalized")
         return articles
 
-    @stage_log("related_links")
-    async def _stage_related_links(self, articles: List[Dict[str, Any]], content: str, normalized_doc, run_id: str):
-        """Stage 9: Related Links Generation"""
-        print(f"🔗 KE-PR5: Stage 9 - Related links generation")
-        
-        links_added = 0
-        for article in articles:
-            related_result = await self.related_links.generate_related_links(
-                article, content, normalized_doc.blocks, run_id
-            )
-            
-            if related_result.get('related_links_status') == 'success':
-                article['related_links'] = related_result.get('related_links', [])
-                article['related_links_count'] = len(article['related_links'])
-                links_added += len(article['related_links'])
+    async def _style_article(self, article: Dict[str, Any], index: int, content: str, generated_articles: Dict[str, Any], analysis: Dict[str, Any], run_id: str, reused_style: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Stage 8: Woolf-aligned style processing of one article"""
+        style_result = await self.style_processor.style_article(
+            article, content, generated_articles, analysis, run_id, index, reused_style=reused_style
+        )
         
-        print(f"✅ KE-PR5: Stage 9 complete - {links_added} related links generated")
-        return articles
+        # Apply formatted content to the article
+        if style_result.get('style_status') == 'success':
+            formatted_content = style_result.get('formatted_content', '')
+            if formatted_content and len(formatted_content) > 100:
+                article['content'] = formatted_content
+                article['formatted_content'] = formatted_content
+        return style_result
 
-    @stage_log("gap_filling")
-    async def _stage_gap_filling(self, articles: List[Dict[str, Any]], content: str, normalized_doc, run_id: str):
-        """Stage 10: Gap Filling"""
-        print(f"🔍 KE-PR5: Stage 10 - Intelligent gap filling")
-        
-        gap_result = await self.gap_filling.fill_content_gaps(
-            articles, content, normalized_doc.blocks, run_id, enrich_mode="internal"
+    async def _link_article(self, article: Dict[str, Any], content: str, normalized_doc, run_id: str) -> int:
+        """Stage 9: Related links generation for one article; returns the number of links added"""
+        related_result = await self.related_links.generate_related_links(
+            article, content, normalized_doc.blocks, run_id
         )
         
-        gaps_filled = gap_result.get('total_gaps_filled', 0)
-        print(f"✅ KE-PR5: Stage 10 complete - {gaps_filled} gaps filled")
-        return articles
+        if related_result.get('related_links_status') != 'success':
+            return 0
+        article['related_links'] = related_result.get('related_links', [])
+        article['related_links_count'] = len(article['related_links'])
+        return len(article['related_links'])
 
-    @stage_log("code_normalization")
-    async def _stage_code_normalization(self, articles: List[Dict[str, Any]], normalized_doc, prewrite_result: Dict[str, Any], run_id: str):
-        """Stage 11: Code Normalization"""
-        print(f"💻 KE-PR5: Stage 11 - Code block normalization")
-        
-        code_result = await self.code_norm.normalize_code_blocks(
-            articles, normalized_doc.blocks, prewrite_result, run_id
+    async def _fill_article_gaps(self, article: Dict[str, Any], content: str, normalized_doc, run_id: str) -> int:
+        """Stage 10: Gap filling for one article; returns the number of gaps filled"""
+        gap_result = await self.gap_filling.fill_content_gaps(
+            [article], content, normalized_doc.blocks, run_id, enrich_mode="internal"
         )
-        
-        normalized_count = code_result.get('normalized_blocks', 0)
-        print(f"✅ KE-PR5: Stage 11 complete - {normalized_count} code blocks normalized")
-        return articles
+        return gap_result.get('total_gaps_filled', 0)
+
+    async def _normalize_article_code(self, article: Dict[str, Any]) -> Dict[str, Any]:
+        """Stage 11: Code block normalization for one article; returns the normalized article"""
+        return await self.code_norm.normalize_code_blocks(article)
 
     @stage_log("validation")
     async def _stage_validation(self, normalized_doc, generated_articles: Dict[str, Any], analysis: Dict[str, Any], run_id: str):
@@ -378,7 +799,9 @@ class Pipeline:
         """Stage 13: Cross-Article QA"""
         print(f"🔍 KE-PR5: Stage 13 - Cross-article quality assurance")
         
-        qa_result = await self.cross_qa.perform_cross_article_qa(generated_articles, run_id)
+        run_context = current_run_context()
+        use_llm = not (run_context and run_context.should_degrade("cross_qa"))
+        qa_result = await self.cross_qa.perform_cross_article_qa(generated_articles, run_id, use_llm=use_llm)
         
         issues_found = qa_result.get('summary', {}).get('issues_found', 0)
         print(f"✅ KE-PR5: Stage 13 complete - {issues_found} issues found")
@@ -389,8 +812,10 @@ class Pipeline:
         """Stage 14: Adaptive Adjustment"""
         print(f"⚖️ KE-PR5: Stage 14 - Adaptive adjustment")
         
+        run_context = current_run_context()
+        use_llm = not (run_context and run_context.should_degrade("adaptive_adjustment"))
         adjustment_result = await self.adaptive_adjustment.perform_adaptive_adjustment(
-            generated_articles, analysis, run_id
+            generated_articles, analysis, run_id, use_llm=use_llm
         )
         
         adjustments = adjustment_result.get('adjustment_summary', {}).get('total_adjustments', 0)
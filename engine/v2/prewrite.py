@@ -7,14 +7,35 @@ import os
 import json
 from typing import Dict, Any, List, Optional
 from datetime import datetime
-from ..llm.client import get_llm_client
-from ._utils import create_processing_metadata
+from ..llm.client import get_llm_client, LLMStructuredOutputError
+from ._utils import create_processing_metadata, gather_bounded
+
+PREWRITE_SCHEMA = {
+    "type": "object",
+    "required": ["sections"],
+    "properties": {
+        "sections": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "heading": {"type": "string"},
+                    "facts": {"type": "array", "items": {"type": "object"}},
+                    "gaps": {"type": "array"},
+                    "terms": {"type": "array"}
+                }
+            }
+        }
+    }
+}
 
 class V2PrewriteSystem:
     """V2 Engine: Section-Grounded Prewrite Pass - Facts extraction before article generation"""
     
-    def __init__(self, llm_client=None):
+    def __init__(self, llm_client=None, max_concurrent_prewrites: int = None):
         self.llm_client = llm_client or get_llm_client()
+        # Articles are prewritten concurrently; 1 keeps the original serial pass
+        self.max_concurrent_prewrites = max_concurrent_prewrites or int(os.getenv("V2_PREWRITE_CONCURRENCY", "4"))
         self.prewrite_storage_path = "/app/backend/static/prewrite_data"
         os.makedirs(self.prewrite_storage_path, exist_ok=True)
     
@@ -49,40 +70,59 @@ class V2PrewriteSystem:
             }
     
     async def execute_prewrite_pass(self, content: str, content_type: str, articles: list, 
-                                  per_article_outlines: dict, global_analysis: dict, run_id: str) -> dict:
-        """Execute section-grounded prewrite pass for all articles (legacy interface)"""
+                                  per_article_outlines: dict, global_analysis: dict, run_id: str,
+                                  reused_prewrites: dict = None) -> dict:
+        """Execute section-grounded prewrite pass for all articles (legacy interface)
+        
+        reused_prewrites maps article_id to the prewrite result of a previous version
+        whose source blocks are unchanged; those articles skip the LLM prewrite.
+        Every result carries the article_id of its outline article.
+        """
         try:
             print(f"🔍 V2 PREWRITE: Starting section-grounded prewrite pass - {len(articles)} articles - engine=v2")
             
-            # Process each article individually
+            reused_prewrites = reused_prewrites or {}
+            if reused_prewrites:
+                print(f"♻️ V2 PREWRITE: Reusing {len(reused_prewrites)} unchanged prewrites from previous version - engine=v2")
+            
+            async def prewrite_job(i: int, article: dict):
+                if article.get('article_id') in reused_prewrites:
+                    return {**reused_prewrites[article['article_id']], "article_index": i}
+                return await self._process_article_prewrite(
+                    article, content, per_article_outlines, global_analysis, run_id, i
+                )
+            
+            # Process articles concurrently; each article's failure stays isolated
+            article_prewrites = await gather_bounded(prewrite_job, articles, self.max_concurrent_prewrites)
+            
+            # Aggregate in article order so counters match the serial pass
             prewrite_results = []
             successful_prewrites = 0
             failed_prewrites = 0
             
-            for i, article in enumerate(articles):
-                try:
-                    article_prewrite = await self._process_article_prewrite(
-                        article, content, per_article_outlines, global_analysis, run_id, i
-                    )
-                    
-                    if article_prewrite.get('prewrite_status') == 'success':
-                        successful_prewrites += 1
-                        # Add prewrite data to article for use in generation
-                        article['prewrite_data'] = article_prewrite.get('prewrite_data', {})
-                        article['prewrite_file'] = article_prewrite.get('prewrite_file', '')
-                    else:
-                        failed_prewrites += 1
-                    
-                    prewrite_results.append(article_prewrite)
-                    
-                except Exception as article_error:
-                    print(f"❌ V2 PREWRITE: Error processing article {i+1} - {article_error} - engine=v2")
+            for i, (article, article_prewrite) in enumerate(zip(articles, article_prewrites)):
+                if isinstance(article_prewrite, BaseException):
+                    print(f"❌ V2 PREWRITE: Error processing article {i+1} - {article_prewrite} - engine=v2")
                     failed_prewrites += 1
                     prewrite_results.append({
                         "article_index": i,
+                        "article_id": article.get('article_id'),
                         "prewrite_status": "error",
-                        "error": str(article_error)
+                        "error": str(article_prewrite)
                     })
+                    continue
+                
+                article_prewrite["article_id"] = article.get('article_id')
+                
+                if article_prewrite.get('prewrite_status') == 'success':
+                    successful_prewrites += 1
+                    # Add prewrite data to article for use in generation
+                    article['prewrite_data'] = article_prewrite.get('prewrite_data', {})
+                    article['prewrite_file'] = article_prewrite.get('prewrite_file', '')
+                else:
+                    failed_prewrites += 1
+                
+                prewrite_results.append(article_prewrite)
             
             # Calculate overall success metrics
             total_articles = len(articles)
@@ -314,42 +354,20 @@ SOURCE BLOCKS:
 Extract facts for each section from the source blocks. Focus on concrete, actionable information."""
 
             # Use centralized LLM client
-            llm_response = await self.llm_client.complete(
-                system_message=system_message,
-                user_message=user_message,
-                temperature=0.2,
-                max_tokens=3000
-            )
-            
-            if llm_response:
-                try:
-                    # Parse JSON response
-                    import re
-                    # Clean response and extract JSON
-                    cleaned_response = re.sub(r'[-\x1f\x7f-\x9f]', '', llm_response)
-                    
-                    # Try to extract JSON from response
-                    json_match = re.search(r'\{.*\}', cleaned_response, re.DOTALL)
-                    if json_match:
-                        json_str = json_match.group(0)
-                        prewrite_data = json.loads(json_str)
-                        
-                        if 'sections' in prewrite_data:
-                            print(f"✅ V2 PREWRITE: LLM prewrite successful - {len(prewrite_data['sections'])} sections - engine=v2")
-                            return prewrite_data
-                        else:
-                            print(f"⚠️ V2 PREWRITE: Invalid prewrite structure from LLM - engine=v2")
-                            return self._get_fallback_prewrite(sections, content_blocks)
-                    else:
-                        print(f"⚠️ V2 PREWRITE: No JSON found in LLM response - engine=v2")
-                        return self._get_fallback_prewrite(sections, content_blocks)
-                        
-                except json.JSONDecodeError as e:
-                    print(f"⚠️ V2 PREWRITE: JSON parsing error - {e} - engine=v2")
-                    return self._get_fallback_prewrite(sections, content_blocks)
-            else:
-                print(f"❌ V2 PREWRITE: No response from LLM - engine=v2")
+            try:
+                prewrite_data = await self.llm_client.complete_json(
+                    system_message=system_message,
+                    user_message=user_message,
+                    schema=PREWRITE_SCHEMA,
+                    temperature=0.2,
+                    call_type="prewrite"
+                )
+            except LLMStructuredOutputError as e:
+                print(f"⚠️ V2 PREWRITE: Invalid prewrite from LLM - {e} - engine=v2")
                 return self._get_fallback_prewrite(sections, content_blocks)
+            
+            print(f"✅ V2 PREWRITE: LLM prewrite successful - {len(prewrite_data['sections'])} sections - engine=v2")
+            return prewrite_data
                 
         except Exception as e:
             print(f"❌ V2 PREWRITE: Error generating prewrite - {e} - engine=v2")
@@ -0,0 +1,175 @@
+"""
+V2 Stage Scheduler
+Declarative stage graph for the V2 pipeline - runs independent stages concurrently
+"""
+
+import asyncio
+import inspect
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class StageGraphError(Exception):
+    """Raised when a stage graph is malformed (unknown inputs, duplicate outputs, cycles)"""
+    pass
+
+
+class StageNode:
+    """Single stage in the pipeline graph: named inputs in, one named output out"""
+
+    def __init__(self, name: str, fn: Callable[..., Any], inputs: Sequence[str], output: str):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.output = output
+
+    def __repr__(self):
+        return f"StageNode({self.name}: {', '.join(self.inputs)} -> {self.output})"
+
+
+class StageScheduler:
+    """
+    Runs a graph of stages with asyncio, starting every stage as soon as all of its
+    inputs are available. Stages are started in declaration order, so runs are
+    deterministic for the same graph; wall-clock time is bounded by the longest
+    dependency chain rather than the sum of all stages.
+    """
+
+    def __init__(self, nodes: List[StageNode], initial_inputs: Sequence[str] = ()):
+        self.nodes = list(nodes)
+        self.initial_inputs = tuple(initial_inputs)
+        self._validate()
+
+    def _validate(self):
+        """Check that every input is produced exactly once and the graph is acyclic"""
+        producers: Dict[str, StageNode] = {}
+        for node in self.nodes:
+            if node.output in producers or node.output in self.initial_inputs:
+                raise StageGraphError(f"Output '{node.output}' is produced more than once")
+            producers[node.output] = node
+
+        available = set(self.initial_inputs) | set(producers)
+        for node in self.nodes:
+            missing = [name for name in node.inputs if name not in available]
+            if missing:
+                raise StageGraphError(f"Stage '{node.name}' depends on unknown inputs: {missing}")
+
+        # Topological order doubles as the cycle check
+        self.topological_order()
+
+    def topological_order(self) -> List[StageNode]:
+        """Return nodes in a dependency-respecting order (declaration order breaks ties)"""
+        resolved = set(self.initial_inputs)
+        remaining = list(self.nodes)
+        ordered = []
+
+        while remaining:
+            ready = [node for node in remaining if all(name in resolved for name in node.inputs)]
+            if not ready:
+                raise StageGraphError(f"Cycle detected between stages: {[node.name for node in remaining]}")
+            for node in ready:
+                ordered.append(node)
+                resolved.add(node.output)
+                remaining.remove(node)
+
+        return ordered
+
+    def downstream_of(self, stage_names: Sequence[str]) -> List[str]:
+        """Return the given stages plus every stage that transitively consumes their outputs"""
+        by_name = {node.name: node for node in self.nodes}
+        unknown = [name for name in stage_names if name not in by_name]
+        if unknown:
+            raise StageGraphError(f"Unknown stages: {unknown}")
+
+        affected = set(stage_names)
+        invalid_outputs = {by_name[name].output for name in stage_names}
+        for node in self.topological_order():
+            if any(name in invalid_outputs for name in node.inputs):
+                affected.add(node.name)
+                invalid_outputs.add(node.output)
+
+        return [node.name for node in self.nodes if node.name in affected]
+
+    def critical_path(self) -> List[str]:
+        """Return stage names along the longest dependency chain of the graph"""
+        producers = {node.output: node for node in self.nodes}
+        depth: Dict[str, int] = {}
+        parent: Dict[str, Optional[str]] = {}
+
+        for node in self.topological_order():
+            upstream = [producers[name] for name in node.inputs if name in producers]
+            best = max(upstream, key=lambda n: depth[n.name], default=None)
+            depth[node.name] = (depth[best.name] if best else 0) + 1
+            parent[node.name] = best.name if best else None
+
+        if not depth:
+            return []
+
+        path = []
+        current = max(depth, key=depth.get)
+        while current:
+            path.append(current)
+            current = parent[current]
+        return list(reversed(path))
+
+    async def run(self, context: Dict[str, Any],
+                  on_stage_complete: Optional[Callable[[StageNode, Any], Any]] = None) -> Dict[str, Any]:
+        """
+        Execute the graph against an initial context.
+
+        Args:
+            context: Values for the graph's initial inputs, plus any stage outputs
+                that are already known (those stages are skipped, e.g. on resume)
+            on_stage_complete: Optional callback invoked with (node, output) as each
+                stage finishes, before any dependent stage starts
+
+        Returns:
+            Dictionary of the initial context plus every stage output
+
+        The first stage failure cancels all in-flight stages and is re-raised.
+        """
+        missing = [name for name in self.initial_inputs if name not in context]
+        if missing:
+            raise StageGraphError(f"Missing initial inputs: {missing}")
+
+        results = dict(context)
+        pending = [node for node in self.nodes if node.output not in results]
+        running: Dict[asyncio.Task, StageNode] = {}
+
+        try:
+            while pending or running:
+                ready = [node for node in pending if all(name in results for name in node.inputs)]
+                for node in ready:
+                    pending.remove(node)
+                    args = [results[name] for name in node.inputs]
+                    running[asyncio.create_task(self._invoke(node, args))] = node
+
+                if not running:
+                    raise StageGraphError(f"No runnable stages left: {[node.name for node in pending]}")
+
+                done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+
+                # Collect in declaration order so downstream start order stays stable
+                for task in sorted(done, key=lambda t: self.nodes.index(running[t])):
+                    node = running.pop(task)
+                    results[node.output] = task.result()
+                    if on_stage_complete:
+                        callback_result = on_stage_complete(node, results[node.output])
+                        if inspect.isawaitable(callback_result):
+                            await callback_result
+
+        except BaseException:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running.keys(), return_exceptions=True)
+            raise
+
+        return results
+
+    @staticmethod
+    async def _invoke(node: StageNode, args: List[Any]) -> Any:
+        """Call a stage function, awaiting it if it is a coroutine"""
+        result = node.fn(*args)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
@@ -3,18 +3,60 @@ KE-M4: V2 Style Processor - Complete Implementation Migration
 Migrated from server.py - Woolf-aligned technical writing style + structural lint post-processor
 """
 
+import os
 import re
 import uuid
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from ..llm.client import get_llm_client
-from ._utils import create_processing_metadata, generate_doc_uid, generate_doc_slug
+from ..extraction import ExtractionExecutor
+from ._utils import create_processing_metadata, generate_doc_uid, generate_doc_slug, gather_bounded
+from .events import delta_emitter
+
+# Worker-process instance for the post-processing passes (they need no LLM client)
+_pass_processor = None
+
+# Post-processing passes get their own pool: a pass that times out recycles only
+# these workers, never the document conversions of other uploads
+_post_processing_executor: Optional[ExtractionExecutor] = None
+
+
+def get_post_processing_executor() -> ExtractionExecutor:
+    """Get or create the worker pool for the style post-processing passes"""
+    global _post_processing_executor
+    if _post_processing_executor is None:
+        _post_processing_executor = ExtractionExecutor(
+            max_workers=int(os.getenv("V2_STYLE_POST_PROCESSING_WORKERS", str(min(4, os.cpu_count() or 1)))))
+    return _post_processing_executor
+
+
+def shutdown_post_processing_executor():
+    """Stop the post-processing worker processes"""
+    if _post_processing_executor is not None:
+        _post_processing_executor.shutdown()
+
+
+def run_post_processing_pass(pass_name: str, content: str, article_title: str):
+    """
+    Run one V2StyleProcessor post-processing pass by method name. Entry point for
+    the post-processing worker processes: arguments and results are plain strings,
+    lists and dicts, so BeautifulSoup/regex work on several articles runs in
+    parallel instead of contending for the GIL.
+    """
+    global _pass_processor
+    if _pass_processor is None:
+        _pass_processor = V2StyleProcessor()
+    return getattr(_pass_processor, pass_name)(content, article_title)
+
 
 class V2StyleProcessor:
     """V2 Engine: Woolf-aligned technical writing style + structural lint post-processor"""
     
-    def __init__(self, llm_client=None):
-        self.llm_client = llm_client or get_llm_client()
+    def __init__(self, llm_client=None, max_concurrent_articles: int = None):
+        self._llm_client = llm_client
+        
+        # LLM linting fans out per article; 1 keeps the original serial pass
+        self.max_concurrent_articles = max_concurrent_articles or int(os.getenv("V2_STYLE_CONCURRENCY", "4"))
         
         self.woolf_terminology = {
             "api key": "API key",
@@ -39,6 +81,17 @@ class V2StyleProcessor:
             "demote_h1_to_h2": True
         }
     
+    @property
+    def llm_client(self):
+        """LLM client, created on first use (worker processes only run the post-processing passes)"""
+        if self._llm_client is None:
+            self._llm_client = get_llm_client()
+        return self._llm_client
+    
+    @llm_client.setter
+    def llm_client(self, llm_client):
+        self._llm_client = llm_client
+    
     async def run(self, prewrite_result: dict, **kwargs) -> dict:
         """Run style processing on prewrite result (new interface)"""
         try:
@@ -71,41 +124,51 @@ class V2StyleProcessor:
             }
     
     async def apply_style_formatting(self, content: str, content_type: str, articles: list, 
-                                   prewrite_data: dict, global_analysis: dict, run_id: str) -> dict:
-        """Apply Woolf-aligned style and formatting to all generated articles (legacy interface)"""
+                                   prewrite_data: dict, global_analysis: dict, run_id: str,
+                                   reused_styles: dict = None) -> dict:
+        """Apply Woolf-aligned style and formatting to all generated articles (legacy interface)
+        
+        reused_styles maps article index to the style result of a previous version whose
+        source blocks are unchanged; those articles skip linting and post-processing.
+        """
         try:
             print(f"✍️ V2 STYLE: Starting Woolf-aligned style formatting - {len(articles)} articles - engine=v2")
             
-            # Process each article individually
+            reused_styles = reused_styles or {}
+            if reused_styles:
+                print(f"♻️ V2 STYLE: Reusing {len(reused_styles)} unchanged style results from previous version - engine=v2")
+            
+            async def style_job(i: int, article: dict):
+                return await self.style_article(
+                    article, content, prewrite_data, global_analysis, run_id, i,
+                    reused_style=reused_styles.get(i)
+                )
+            
+            # Lint articles concurrently; each article's failure stays isolated
+            article_style_results = await gather_bounded(style_job, articles, self.max_concurrent_articles)
+            
+            # Aggregate in article order so results match the serial pass
             style_results = []
             successful_formatting = 0
             failed_formatting = 0
             
-            for i, article in enumerate(articles):
-                try:
-                    article_style_result = await self._process_article_style(
-                        article, content, prewrite_data, global_analysis, run_id, i
-                    )
-                    
-                    if article_style_result.get('style_status') == 'success':
-                        successful_formatting += 1
-                        # Update article with formatted content
-                        article['formatted_content'] = article_style_result.get('formatted_content', '')
-                        article['style_metadata'] = article_style_result.get('style_metadata', {})
-                        article['structural_compliance'] = article_style_result.get('structural_compliance', {})
-                    else:
-                        failed_formatting += 1
-                    
-                    style_results.append(article_style_result)
-                    
-                except Exception as article_error:
-                    print(f"❌ V2 STYLE: Error processing article style {i+1} - {article_error} - engine=v2")
+            for i, (article, article_style_result) in enumerate(zip(articles, article_style_results)):
+                if isinstance(article_style_result, BaseException):
+                    print(f"❌ V2 STYLE: Error processing article style {i+1} - {article_style_result} - engine=v2")
                     failed_formatting += 1
                     style_results.append({
                         "article_index": i,
                         "style_status": "error",
-                        "error": str(article_error)
+                        "error": str(article_style_result)
                     })
+                    continue
+                
+                if article_style_result.get('style_status') == 'success':
+                    successful_formatting += 1
+                else:
+                    failed_formatting += 1
+                
+                style_results.append(article_style_result)
             
             # Calculate overall success metrics
             total_articles = len(articles)
@@ -145,6 +208,28 @@ class V2StyleProcessor:
                 "engine": "v2"
             }
     
+    async def style_article(self, article: dict, content: str, prewrite_data: dict,
+                            global_analysis: dict, run_id: str, article_index: int,
+                            reused_style: dict = None) -> dict:
+        """Style a single article in place and return its style result
+        
+        reused_style is the style result of a previous version whose source blocks are
+        unchanged; the article then skips linting and post-processing.
+        """
+        if reused_style is not None:
+            article_style_result = {**reused_style, "article_index": article_index}
+        else:
+            article_style_result = await self._process_article_style(
+                article, content, prewrite_data, global_analysis, run_id, article_index
+            )
+        
+        if article_style_result.get('style_status') == 'success':
+            # Update article with formatted content
+            article['formatted_content'] = article_style_result.get('formatted_content', '')
+            article['style_metadata'] = article_style_result.get('style_metadata', {})
+            article['structural_compliance'] = article_style_result.get('structural_compliance', {})
+        return article_style_result
+    
     async def _process_article_style(self, article: dict, content: str, 
                                    prewrite_data: dict, global_analysis: dict, 
                                    run_id: str, article_index: int) -> dict:
@@ -195,33 +280,18 @@ class V2StyleProcessor:
             formatted_result['formatted_content'] = post_processed_content['content']
             formatted_result['post_processing_applied'] = post_processed_content['changes_applied']
             
-            # TICKET 2: Apply stable anchors + Mini-TOC generation
-            stable_anchors_result = self._apply_stable_anchors_and_minitoc(
-                formatted_result['formatted_content'], article_title
+            # TICKET 2/3: stable anchors, bookmark registry, compliance and terminology (worker process)
+            stable_anchors_result, bookmark_registry_result, compliance_result, terminology_result = await self._run_post_processing(
+                "_apply_structural_passes", formatted_result['formatted_content'], article_title
             )
             formatted_result['formatted_content'] = stable_anchors_result['content']
             formatted_result['stable_anchors_applied'] = stable_anchors_result['changes_applied']
             formatted_result['heading_ladder_valid'] = stable_anchors_result['heading_ladder_valid']
             formatted_result['anchors_resolve'] = stable_anchors_result['anchors_resolve']
-            
-            # TICKET 3: Extract headings for bookmark registry
-            bookmark_registry_result = self._apply_bookmark_registry(
-                formatted_result['formatted_content'], article_title
-            )
             formatted_result['headings_registry'] = bookmark_registry_result['headings']
             formatted_result['doc_uid'] = bookmark_registry_result['doc_uid']
             formatted_result['doc_slug'] = bookmark_registry_result['doc_slug']
             
-            # Validate structural compliance
-            compliance_result = self._validate_structural_compliance(
-                formatted_result.get('formatted_content', ''), article_title
-            )
-            
-            # Apply terminology standardization
-            terminology_result = self._standardize_terminology(
-                formatted_result.get('formatted_content', '')
-            )
-            
             style_metadata = {
                 "formatting_method": formatted_result.get('method', 'llm_style_linting'),
                 "structural_changes": formatted_result.get('structural_changes', []),
@@ -300,13 +370,17 @@ Apply Woolf Help Center style standards. Ensure:
 
 Return the fully formatted article with improved clarity, structure, and clickable navigation."""
 
+            # Stream the restyled article to the run's consumer as it is written
+            on_delta = delta_emitter("style_delta", article_title=article_title)
+            
             # Call LLM for style formatting
             try:
                 response = await self.llm_client.complete(
                     system_message=system_message,
                     user_message=user_message,
                     temperature=0.3,
-                    max_tokens=4000
+                    call_type="style",
+                    on_delta=on_delta
                 )
                 
                 if response is None:
@@ -379,7 +453,26 @@ Return the fully formatted article with improved clarity, structure, and clickab
                 "error": str(e)
             }
     
+    async def _run_post_processing(self, pass_name: str, content: str, article_title: str):
+        """Run a synchronous post-processing pass in the post-processing worker processes"""
+        return await get_post_processing_executor().run(run_post_processing_pass, pass_name, content, article_title)
+    
+    def _apply_structural_passes(self, content: str, article_title: str) -> tuple:
+        """Apply stable anchors, then registry/compliance/terminology on the anchored content"""
+        stable_anchors_result = self._apply_stable_anchors_and_minitoc(content, article_title)
+        anchored_content = stable_anchors_result['content']
+        
+        bookmark_registry_result = self._apply_bookmark_registry(anchored_content, article_title)
+        compliance_result = self._validate_structural_compliance(anchored_content, article_title)
+        terminology_result = self._standardize_terminology(anchored_content)
+        
+        return stable_anchors_result, bookmark_registry_result, compliance_result, terminology_result
+    
     async def _apply_comprehensive_post_processing(self, content: str, article_title: str) -> dict:
+        """Apply comprehensive post-processing for key issues in a worker process"""
+        return await self._run_post_processing("_comprehensive_post_processing", content, article_title)
+    
+    def _comprehensive_post_processing(self, content: str, article_title: str) -> dict:
         """Apply comprehensive post-processing for key issues"""
         try:
             processed_content = content
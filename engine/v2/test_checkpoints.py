@@ -0,0 +1,134 @@
+"""
+Unit tests for V2 stage checkpoints and pipeline resume
+Tests for snapshot semantics and resume-from-stage with an in-memory repository
+"""
+
+import pickle
+import pytest
+from datetime import datetime
+from .checkpoints import (StageCheckpointStore, CheckpointNotFoundError, INPUTS_STAGE,
+                          encode_checkpoint, decode_checkpoint)
+from .scheduler import StageNode
+from .extractor import ContentBlock, NormalizedDocument
+from ..models.qa import QAReport, QAFlag
+
+
+class InMemoryCheckpointRepository:
+    """In-memory stand-in for V2CheckpointRepository"""
+
+    def __init__(self):
+        self.records = {}
+
+    async def save_checkpoint(self, run_id, stage, checkpoint):
+        self.records[(run_id, stage)] = {**checkpoint, "run_id": run_id, "stage": stage}
+        return True
+
+    async def find_checkpoints(self, run_id):
+        return [record for (rid, _), record in self.records.items() if rid == run_id]
+
+    async def delete_checkpoints(self, run_id, stages):
+        doomed = [key for key in self.records if key[0] == run_id and key[1] in stages]
+        for key in doomed:
+            del self.records[key]
+        return len(doomed)
+
+
+class TestStageCheckpointStore:
+    """Unit tests for checkpoint persistence"""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_taken_at_save_time(self):
+        """Test that later in-place mutation does not leak into a saved checkpoint"""
+        store = StageCheckpointStore(repository=InMemoryCheckpointRepository(), enabled=True)
+        articles = [{"content": "draft"}]
+
+        store.save("run_1", INPUTS_STAGE, None, {"job_id": "job_1"})
+        store.save("run_1", "evidence_tagging", "tagged_articles", articles)
+        articles[0]["content"] = "styled"
+        await store.flush("run_1")
+
+        checkpoints = await store.load("run_1")
+        assert checkpoints["evidence_tagging"] == ("tagged_articles", [{"content": "draft"}])
+
+    def test_stage_outputs_round_trip(self):
+        """Test that engine objects, pydantic models and non-JSON types survive serialization"""
+        doc = NormalizedDocument(title="Guide", blocks=[ContentBlock("heading_h1", "Install", {"level": 1})])
+        value = {
+            "doc": doc,
+            "qa": QAReport(job_id="job_1", coverage_percent=90.0, flags=[QAFlag(code="P1_X", severity="P1", message="m")]),
+            "by_index": {0: ("a1", "a2")},
+            "created_at": datetime(2026, 1, 2, 3, 4, 5),
+            "__ckpt__": "not a tag"
+        }
+
+        restored = decode_checkpoint(encode_checkpoint(value))
+
+        assert isinstance(restored["doc"], NormalizedDocument) and restored["doc"].title == "Guide"
+        assert restored["doc"].blocks[0].content_hash == doc.blocks[0].content_hash
+        assert restored["doc"].block_hashes() == doc.block_hashes() and restored["doc"].created_at == doc.created_at
+        assert restored["qa"] == value["qa"]
+        assert restored["by_index"] == {0: ("a1", "a2")}
+        assert restored["created_at"] == value["created_at"] and restored["__ckpt__"] == "not a tag"
+
+    def test_unknown_types_are_not_restored(self):
+        """Test that a payload naming a class outside the imported modules is rejected"""
+        with pytest.raises(TypeError):
+            encode_checkpoint({"handle": object()})
+        with pytest.raises(TypeError):
+            decode_checkpoint(b'{"__ckpt__": "object", "cls": "os:system", "v": {}}')
+        with pytest.raises(TypeError):
+            decode_checkpoint(b'{"__ckpt__": "model", "cls": "not_imported.module:Model", "v": {}}')
+
+    @pytest.mark.asyncio
+    async def test_pickled_checkpoints_are_ignored(self):
+        """Test that records in another format are skipped rather than unpickled"""
+        repository = InMemoryCheckpointRepository()
+        store = StageCheckpointStore(repository=repository, enabled=True)
+        store.save("run_1", INPUTS_STAGE, None, {"job_id": "job_1"})
+        await store.flush("run_1")
+        repository.records[("run_1", "analyze")] = {
+            "run_id": "run_1", "stage": "analyze", "output": "analysis_result", "payload": pickle.dumps({"x": 1})
+        }
+
+        checkpoints = await store.load("run_1")
+        assert set(checkpoints) == {INPUTS_STAGE}
+
+    @pytest.mark.asyncio
+    async def test_missing_run_raises(self):
+        """Test that loading a run without inputs raises CheckpointNotFoundError"""
+        store = StageCheckpointStore(repository=InMemoryCheckpointRepository(), enabled=True)
+        with pytest.raises(CheckpointNotFoundError):
+            await store.load("unknown_run")
+
+    @pytest.mark.asyncio
+    async def test_pipeline_resume_reruns_only_invalid_stages(self):
+        """Test that resume reuses upstream checkpoints and reruns from_stage onwards"""
+        from .pipeline import Pipeline
+        from ..test_run_context import InMemoryQAResultsRepository
+
+        calls = []
+
+        def stage(name):
+            async def fn(*args):
+                calls.append(name)
+                return f"{name}_result"
+            return fn
+
+        pipeline = Pipeline.__new__(Pipeline)
+        pipeline.checkpoints = StageCheckpointStore(repository=InMemoryCheckpointRepository(), enabled=True)
+        pipeline._qa_results = InMemoryQAResultsRepository()
+        graph = [
+            StageNode(node.name, stage(node.name), node.inputs, node.output)
+            for node in Pipeline._build_stage_graph(pipeline)
+        ]
+        pipeline._build_stage_graph = lambda: graph
+        pipeline._create_qa_report = lambda job_id, *args: QAReport(job_id=job_id, coverage_percent=100.0, flags=[])
+
+        # Full run populates every checkpoint
+        _, _, version_id = await pipeline.run("job_1", "content", {})
+        assert version_id == "versioning_result"
+        run_id = next(rid for rid, _ in pipeline.checkpoints.repository.records)
+
+        calls.clear()
+        await pipeline.resume(run_id, from_stage="cross_qa")
+        assert calls == ["cross_qa", "publishing", "versioning", "review"]
@@ -0,0 +1,58 @@
+"""
+Unit tests for V2GapFillingSystem gap patches
+Tests for replies that complete_json rejects: prose, JSON off the schema and non-object JSON
+"""
+
+import pytest
+from types import MethodType
+from unittest.mock import AsyncMock, Mock
+from ..llm.client import LLMClient
+from .gaps import V2GapFillingSystem
+
+GAP = {"context": "Authenticate with [MISSING].", "gap_type": "generic_content", "section": "Setup",
+       "pattern": "[MISSING]", "position": 17}
+BLOCKS = [{"block_id": "b1", "content": "Requests are authenticated with an API key."}]
+
+
+def _gap_system(reply: str) -> V2GapFillingSystem:
+    """Gap filler whose LLM answers reply and runs the real complete_json parsing and schema checks"""
+    llm_client = Mock()
+    llm_client.complete = AsyncMock(return_value=reply)
+    llm_client.complete_json = MethodType(LLMClient.complete_json, llm_client)
+    return V2GapFillingSystem(llm_client=llm_client)
+
+
+class TestGapPatchFallback:
+    """Unit tests for _create_gap_patch when the reply does not match GAP_PATCH_SCHEMA"""
+
+    @pytest.mark.asyncio
+    async def test_valid_reply(self):
+        reply = '{"text": "Use the API key.", "confidence": "high", "support_block_ids": ["b1"]}'
+        patch = await _gap_system(reply)._create_gap_patch(GAP, BLOCKS, "internal")
+
+        assert patch["text"] == "Use the API key."
+        assert patch["confidence"] == "high" and patch["support_block_ids"] == ["b1"]
+
+    @pytest.mark.asyncio
+    async def test_prose_reply_becomes_patch_text(self):
+        patch = await _gap_system("Use the API key.")._create_gap_patch(GAP, BLOCKS, "internal")
+
+        assert patch["text"] == "Use the API key."
+        assert patch["confidence"] == "medium" and patch["support_block_ids"] == ["b1"]
+
+    @pytest.mark.asyncio
+    async def test_malformed_confidence_keeps_text(self):
+        reply = '{"text": "Use the API key.", "confidence": 0.8}'
+        patch = await _gap_system(reply)._create_gap_patch(GAP, BLOCKS, "internal")
+
+        assert patch["text"] == "Use the API key."
+        assert patch["confidence"] == "medium"
+        assert (patch["gap_pattern"], patch["gap_position"]) == ("[MISSING]", 17)
+
+    @pytest.mark.asyncio
+    async def test_json_without_text_gives_no_patch(self):
+        assert await _gap_system('{"patch": "x"}')._create_gap_patch(GAP, BLOCKS, "internal") is None
+
+    @pytest.mark.asyncio
+    async def test_null_reply_gives_no_patch(self):
+        assert await _gap_system("null")._create_gap_patch(GAP, BLOCKS, "internal") is None
@@ -0,0 +1,122 @@
+"""
+Unit tests for V2 incremental re-ingest
+Tests for block fingerprint diffing across uploads with an in-memory snapshot repository
+"""
+
+import pytest
+from unittest.mock import Mock
+from .incremental import V2IncrementalReingest
+from .prewrite import V2PrewriteSystem
+from .extractor import ContentBlock, NormalizedDocument
+
+
+class InMemorySnapshotRepository:
+    """In-memory stand-in for V2ArticleSnapshotRepository"""
+
+    def __init__(self):
+        self.snapshots = {}
+
+    async def find_latest_snapshots(self, document_key):
+        return list(self.snapshots.get(document_key, []))
+
+    async def replace_snapshots(self, document_key, run_id, snapshots):
+        self.snapshots[document_key] = [{**snapshot, "run_id": run_id} for snapshot in snapshots]
+        return len(snapshots)
+
+
+def _make_doc(paragraphs: list) -> NormalizedDocument:
+    return NormalizedDocument(blocks=[ContentBlock("paragraph", text) for text in paragraphs])
+
+
+def _make_outlines(assignments: dict) -> list:
+    """Build per-article outlines from {article_id: [block_ids]}"""
+    return [
+        {"article_id": article_id, "outline": {"sections": [{"heading": "Overview", "subsections": [{"heading": "Intro", "block_ids": block_ids}]}]}}
+        for article_id, block_ids in assignments.items()
+    ]
+
+
+async def _record_run(reingest, doc, outlines, run_id):
+    reuse_plan = await reingest.plan_reuse(doc, outlines, {"original_filename": "manual.docx"}, {}, run_id)
+    generated = {"generated_articles": [
+        {"article_id": data["article_id"], "article_data": {"html": f"<p>{data['article_id']} from {run_id}</p>"}}
+        for data in outlines
+    ]}
+    articles = [{"metadata": {"article_id": data["article_id"]}} for data in outlines]
+    style_result = {"style_results": [
+        {"article_index": i, "style_status": "success", "formatted_content": f"styled {run_id}"}
+        for i in range(len(outlines))
+    ]}
+    # Prewrite runs over the global outline, whose order need not match the per-article outlines
+    prewrite_result = {"prewrite_results": [
+        {"article_index": i, "article_id": data["article_id"], "prewrite_status": "success",
+         "prewrite_data": {"facts": f"{data['article_id']} from {run_id}"}}
+        for i, data in enumerate(reversed(outlines))
+    ]}
+    await reingest.record_snapshots(reuse_plan, generated, prewrite_result, articles, style_result, run_id)
+    return reuse_plan
+
+
+class TestIncrementalReingest:
+    """Unit tests for article-level reuse planning"""
+
+    def test_block_hash_ignores_position_and_whitespace(self):
+        """Test that block hashes depend on content only"""
+        assert ContentBlock("paragraph", "Install  the\nCLI").content_hash == ContentBlock("paragraph", "Install the CLI").content_hash
+        assert ContentBlock("paragraph", "Install the CLI").content_hash != ContentBlock("code", "Install the CLI").content_hash
+
+    @pytest.mark.asyncio
+    async def test_only_changed_articles_are_regenerated(self):
+        """Test that an inserted and an edited paragraph only invalidate their own articles"""
+        reingest = V2IncrementalReingest(repository=InMemorySnapshotRepository(), enabled=True)
+        first_doc = _make_doc(["Setup intro", "Setup steps", "Usage intro", "Usage steps", "FAQ"])
+        await _record_run(reingest, first_doc, _make_outlines({
+            "a1": ["block_1", "block_2"], "a2": ["block_3", "block_4"], "a3": ["block_5"]
+        }), "run_1")
+
+        # New paragraph inserted into the setup chapter shifts every later block id
+        second_doc = _make_doc(["Setup intro", "Setup prerequisites", "Setup steps", "Usage intro", "Usage steps", "FAQ updated"])
+        reuse_plan = await reingest.plan_reuse(second_doc, _make_outlines({
+            "a1": ["block_1", "block_2", "block_3"], "a2": ["block_4", "block_5"], "a3": ["block_6"]
+        }), {"original_filename": "manual.docx"}, {}, "run_2")
+
+        assert list(reuse_plan["reusable"]) == ["a2"]
+        assert reuse_plan["changed_articles"] == ["a1", "a3"]
+        assert reuse_plan["removed_articles"] == 2
+        assert reingest.reused_generated_articles(reuse_plan) == {"a2": {"html": "<p>a2 from run_1</p>"}}
+        assert reingest.reused_styles(reuse_plan, [{"metadata": {"article_id": "a2"}}])[0]["formatted_content"] == "styled run_1"
+
+    @pytest.mark.asyncio
+    async def test_disabled_without_document_key(self):
+        """Test that documents without a stable key are always fully processed"""
+        reingest = V2IncrementalReingest(repository=InMemorySnapshotRepository(), enabled=True)
+        reuse_plan = await reingest.plan_reuse(_make_doc(["Only block"]), _make_outlines({"a1": ["block_1"]}), {}, {}, "run_1")
+
+        assert reuse_plan["enabled"] is False
+        assert reuse_plan["reusable"] == {}
+
+    @pytest.mark.asyncio
+    async def test_prewrites_reused_by_article_id(self):
+        """Test that reused prewrites follow their article when the outline order changes"""
+        reingest = V2IncrementalReingest(repository=InMemorySnapshotRepository(), enabled=True)
+        doc = _make_doc(["Setup", "Usage"])
+        await _record_run(reingest, doc, _make_outlines({"a1": ["block_1"], "a2": ["block_2"]}), "run_1")
+
+        reuse_plan = await reingest.plan_reuse(_make_doc(["Setup changed", "Usage"]), _make_outlines({
+            "a1": ["block_1"], "a2": ["block_2"]
+        }), {"original_filename": "manual.docx"}, {}, "run_2")
+        reused = reingest.reused_prewrites(reuse_plan)
+        assert list(reused) == ["a2"] and reused["a2"]["prewrite_data"] == {"facts": "a2 from run_1"}
+
+        prewrite_system = V2PrewriteSystem(llm_client=Mock())
+
+        async def prewrite(article, *args):
+            raise AssertionError(f"{article['article_id']} should be reused")
+
+        prewrite_system._process_article_prewrite = prewrite
+        result = await prewrite_system.execute_prewrite_pass(
+            "content", "text", [{"article_id": "a2", "title": "Usage"}], {}, {}, "run_2", reused_prewrites=reused)
+
+        [prewrite_result] = result["prewrite_results"]
+        assert (prewrite_result["article_index"], prewrite_result["article_id"]) == (0, "a2")
+        assert prewrite_result["prewrite_data"] == {"facts": "a2 from run_1"}
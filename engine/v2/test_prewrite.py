@@ -0,0 +1,89 @@
+"""
+Unit tests for V2PrewriteSystem concurrent prewrite pass
+Tests for serial-equivalent results and counters, per-article failure isolation and bounded concurrency
+"""
+
+import pytest
+import asyncio
+from unittest.mock import Mock
+from .prewrite import V2PrewriteSystem
+
+
+def _make_articles(count: int) -> list:
+    return [{"article_id": f"a{i + 1}", "title": f"Article {i + 1}"} for i in range(count)]
+
+
+def _make_prewrite_system(max_concurrent_prewrites: int, prewrite) -> V2PrewriteSystem:
+    prewrite_system = V2PrewriteSystem(llm_client=Mock(), max_concurrent_prewrites=max_concurrent_prewrites)
+    prewrite_system._process_article_prewrite = prewrite
+    return prewrite_system
+
+
+async def _prewrite(article, content, per_article_outlines, global_analysis, run_id, i):
+    """Stub prewrite: later articles finish first, every third article has no outline"""
+    await asyncio.sleep(0.01 * (5 - i))
+    if i % 3 == 2:
+        return {"article_index": i, "prewrite_status": "skipped", "reason": "no_outline_sections"}
+    return {"article_index": i, "prewrite_status": "success",
+            "prewrite_data": {"sections": [{"heading": article["title"]}]}, "prewrite_file": f"prewrite_{i}.json"}
+
+
+def _comparable(result: dict) -> dict:
+    return {key: value for key, value in result.items() if key not in ("prewrite_id", "timestamp")}
+
+
+class TestConcurrentPrewritePass:
+    """Unit tests for execute_prewrite_pass"""
+
+    @pytest.mark.asyncio
+    async def test_results_and_counters_match_serial_pass(self):
+        """Test that a concurrent pass returns what the serial pass returns, in article order"""
+        serial_articles, concurrent_articles = _make_articles(5), _make_articles(5)
+
+        serial = await _make_prewrite_system(1, _prewrite).execute_prewrite_pass(
+            "Intro\n\nSteps", "text", serial_articles, {}, {}, "run_1")
+        concurrent = await _make_prewrite_system(4, _prewrite).execute_prewrite_pass(
+            "Intro\n\nSteps", "text", concurrent_articles, {}, {}, "run_1")
+
+        assert _comparable(concurrent) == _comparable(serial)
+        assert [r["article_index"] for r in concurrent["prewrite_results"]] == [0, 1, 2, 3, 4]
+        assert (concurrent["successful_prewrites"], concurrent["failed_prewrites"]) == (4, 1)
+        assert concurrent["prewrite_status"] == "partial" and concurrent["success_rate"] == 80.0
+        assert concurrent_articles == serial_articles
+        assert concurrent_articles[0]["prewrite_file"] == "prewrite_0.json" and "prewrite_data" not in concurrent_articles[2]
+
+    @pytest.mark.asyncio
+    async def test_failing_article_is_isolated(self):
+        """Test that an article whose prewrite raises is reported without failing the others"""
+        async def prewrite(article, *args):
+            if article["article_id"] == "a2":
+                raise RuntimeError("LLM unavailable")
+            return await _prewrite(article, *args)
+
+        articles = _make_articles(2)
+        result = await _make_prewrite_system(4, prewrite).execute_prewrite_pass("Intro", "text", articles, {}, {}, "run_1")
+
+        assert [r["prewrite_status"] for r in result["prewrite_results"]] == ["success", "error"]
+        assert result["prewrite_results"][1] == {
+            "article_index": 1, "article_id": "a2", "prewrite_status": "error", "error": "LLM unavailable"
+        }
+        assert (result["successful_prewrites"], result["failed_prewrites"]) == (1, 1)
+        assert "prewrite_data" in articles[0] and "prewrite_data" not in articles[1]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """Test that no more than max_concurrent_prewrites run at once"""
+        active = 0
+        peak = 0
+
+        async def prewrite(article, content, per_article_outlines, global_analysis, run_id, i):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return {"article_index": i, "prewrite_status": "success"}
+
+        await _make_prewrite_system(2, prewrite).execute_prewrite_pass("Intro", "text", _make_articles(6), {}, {}, "run_1")
+
+        assert peak == 2
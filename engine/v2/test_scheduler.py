@@ -0,0 +1,161 @@
+"""
+Unit tests for the V2 stage scheduler
+Tests for dependency ordering, concurrency of independent stages and failure handling
+"""
+
+import pytest
+import asyncio
+from .scheduler import StageNode, StageScheduler, StageGraphError
+
+
+class TestStageScheduler:
+    """Unit tests for the declarative stage graph scheduler"""
+
+    def test_unknown_input_rejected(self):
+        """Test that a stage depending on a missing output is rejected"""
+        with pytest.raises(StageGraphError, match="unknown inputs"):
+            StageScheduler([StageNode("a", lambda x: x, ("missing",), "a_out")])
+
+    def test_duplicate_output_rejected(self):
+        """Test that two stages producing the same output are rejected"""
+        nodes = [
+            StageNode("a", lambda x: x, ("seed",), "out"),
+            StageNode("b", lambda x: x, ("seed",), "out"),
+        ]
+        with pytest.raises(StageGraphError, match="more than once"):
+            StageScheduler(nodes, initial_inputs=("seed",))
+
+    def test_cycle_rejected(self):
+        """Test that cyclic graphs are rejected"""
+        nodes = [
+            StageNode("a", lambda x: x, ("b_out",), "a_out"),
+            StageNode("b", lambda x: x, ("a_out",), "b_out"),
+        ]
+        with pytest.raises(StageGraphError, match="Cycle"):
+            StageScheduler(nodes)
+
+    def test_critical_path(self):
+        """Test that the critical path follows the longest dependency chain"""
+        nodes = [
+            StageNode("root", lambda x: x, ("seed",), "root_out"),
+            StageNode("short", lambda x: x, ("root_out",), "short_out"),
+            StageNode("long_1", lambda x: x, ("root_out",), "long_1_out"),
+            StageNode("long_2", lambda x: x, ("long_1_out",), "long_2_out"),
+            StageNode("join", lambda a, b: a, ("short_out", "long_2_out"), "join_out"),
+        ]
+        scheduler = StageScheduler(nodes, initial_inputs=("seed",))
+        assert scheduler.critical_path() == ["root", "long_1", "long_2", "join"]
+
+    @pytest.mark.asyncio
+    async def test_independent_stages_run_concurrently(self):
+        """Test that stages sharing only an upstream input overlap in time"""
+        active = 0
+        peak = 0
+
+        async def slow(value):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.05)
+            active -= 1
+            return value
+
+        nodes = [
+            StageNode("qa", slow, ("articles",), "qa_out"),
+            StageNode("adjust", slow, ("articles",), "adjust_out"),
+            StageNode("validate", slow, ("articles",), "validate_out"),
+        ]
+        results = await StageScheduler(nodes, initial_inputs=("articles",)).run({"articles": [1, 2]})
+
+        assert peak == 3
+        assert results["qa_out"] == [1, 2]
+        assert results["validate_out"] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_outputs_flow_downstream(self):
+        """Test that sync and async stages feed their outputs to dependents"""
+        async def double(x):
+            return x * 2
+
+        nodes = [
+            StageNode("double", double, ("seed",), "doubled"),
+            StageNode("add", lambda a, b: a + b, ("seed", "doubled"), "total"),
+        ]
+        results = await StageScheduler(nodes, initial_inputs=("seed",)).run({"seed": 3})
+        assert results["total"] == 9
+
+    @pytest.mark.asyncio
+    async def test_failure_cancels_running_stages(self):
+        """Test that a failing stage cancels siblings and re-raises"""
+        cancelled = asyncio.Event()
+
+        async def fails(_):
+            await asyncio.sleep(0.01)
+            raise ValueError("stage failed")
+
+        async def hangs(_):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        nodes = [
+            StageNode("fails", fails, ("seed",), "a"),
+            StageNode("hangs", hangs, ("seed",), "b"),
+        ]
+        with pytest.raises(ValueError, match="stage failed"):
+            await StageScheduler(nodes, initial_inputs=("seed",)).run({"seed": None})
+        assert cancelled.is_set()
+
+    def test_downstream_of(self):
+        """Test that invalidating a stage also invalidates its dependents only"""
+        nodes = [
+            StageNode("a", lambda x: x, ("seed",), "a_out"),
+            StageNode("b", lambda x: x, ("a_out",), "b_out"),
+            StageNode("c", lambda x: x, ("seed",), "c_out"),
+            StageNode("d", lambda b, c: b, ("b_out", "c_out"), "d_out"),
+        ]
+        scheduler = StageScheduler(nodes, initial_inputs=("seed",))
+        assert scheduler.downstream_of(["b"]) == ["b", "d"]
+        assert scheduler.downstream_of(["c"]) == ["c", "d"]
+        with pytest.raises(StageGraphError, match="Unknown stages"):
+            scheduler.downstream_of(["missing"])
+
+    @pytest.mark.asyncio
+    async def test_known_outputs_are_skipped_and_reported(self):
+        """Test that stages with outputs in the context are skipped and completions are reported"""
+        calls = []
+        completed = []
+
+        def stage(name):
+            def fn(value):
+                calls.append(name)
+                return f"{value}>{name}"
+            return fn
+
+        nodes = [
+            StageNode("a", stage("a"), ("seed",), "a_out"),
+            StageNode("b", stage("b"), ("a_out",), "b_out"),
+        ]
+        results = await StageScheduler(nodes, initial_inputs=("seed",)).run(
+            {"seed": "s", "a_out": "cached"},
+            on_stage_complete=lambda node, output: completed.append((node.name, output))
+        )
+
+        assert calls == ["b"]
+        assert completed == [("b", "cached>b")]
+        assert results["b_out"] == "cached>b"
+
+    def test_pipeline_graph_is_valid(self):
+        """Test that the V2 pipeline graph resolves and overlaps the QA stages"""
+        from .pipeline import Pipeline, STAGE_GRAPH_INPUTS
+
+        pipeline = Pipeline.__new__(Pipeline)
+        scheduler = StageScheduler(pipeline._build_stage_graph(), initial_inputs=STAGE_GRAPH_INPUTS)
+        path = scheduler.critical_path()
+
+        assert path[0] == "extract_content"
+        assert path[-1] == "review"
+        assert "cross_qa" not in path
+        assert "adaptive_adjustment" not in path
@@ -0,0 +1,284 @@
+"""
+Unit tests for streaming V2 pipeline runs
+Tests for progress event order, per-article delivery and cancellation when the consumer goes away
+"""
+
+import pytest
+import asyncio
+from types import SimpleNamespace
+from .pipeline import Pipeline, emit_run_event
+from .events import _run_events, delta_emitter
+from .checkpoints import StageCheckpointStore
+from .scheduler import StageNode
+from ..models.qa import QAReport
+from ..metrics import STAGE_RUNS
+from ..test_run_context import InMemoryQAResultsRepository
+
+
+def _make_pipeline(stage_delay: float = 0) -> Pipeline:
+    """Pipeline whose stages are stubs that emit an article event when articles are finalized"""
+    pipeline = Pipeline.__new__(Pipeline)
+    pipeline.checkpoints = StageCheckpointStore(enabled=False)
+    pipeline._qa_results = InMemoryQAResultsRepository()
+
+    def stage(name):
+        async def fn(*args):
+            await asyncio.sleep(stage_delay)
+            if name == "finalize_articles":
+                emit_run_event("article", index=0, total=1, article={"title": "Streamed"})
+            return f"{name}_result"
+        return fn
+
+    graph = [StageNode(node.name, stage(node.name), node.inputs, node.output)
+             for node in Pipeline._build_stage_graph(pipeline)]
+    pipeline._build_stage_graph = lambda: graph
+    pipeline._create_qa_report = lambda job_id, *args: QAReport(job_id=job_id, coverage_percent=100.0, flags=[])
+    return pipeline
+
+
+def _make_finalizing_pipeline(release: asyncio.Event) -> Pipeline:
+    """Pipeline with stub stages around the real finalize_articles stage; styling article B waits for release"""
+    class _Style:
+        max_concurrent_articles = 2
+
+        async def style_article(self, article, content, prewrite_data, analysis, run_id, index, reused_style=None):
+            if article["title"] == "B":
+                await release.wait()
+            return {"article_index": index, "style_status": "skipped"}
+
+    class _Related:
+        async def generate_related_links(self, article, *args):
+            return {"related_links_status": "success", "related_links": [{"title": "Other"}]}
+
+    class _Gaps:
+        async def fill_content_gaps(self, articles, *args, **kwargs):
+            return {"total_gaps_filled": 0}
+
+    class _CodeNorm:
+        async def normalize_code_blocks(self, article):
+            return {**article, "content": article["content"] + "<pre>normalized</pre>"}
+
+    class _Incremental:
+        def reused_styles(self, reuse_plan, articles):
+            return {}
+
+        async def record_snapshots(self, *args):
+            return 0
+
+    pipeline = Pipeline.__new__(Pipeline)
+    pipeline.checkpoints = StageCheckpointStore(enabled=False)
+    pipeline._qa_results = InMemoryQAResultsRepository()
+    pipeline.style_processor, pipeline.related_links, pipeline.gap_filling = _Style(), _Related(), _Gaps()
+    pipeline.code_norm, pipeline.incremental = _CodeNorm(), _Incremental()
+    stub_outputs = {
+        "normalized_doc": SimpleNamespace(blocks=[]),
+        "tagged_articles": [{"title": "A", "content": "<p>a</p>"}, {"title": "B", "content": "<p>b</p>"}],
+    }
+
+    def stage(node):
+        if node.name == "finalize_articles":
+            return node.fn
+        async def fn(*args):
+            return stub_outputs.get(node.output, f"{node.name}_result")
+        return fn
+
+    graph = [StageNode(node.name, stage(node), node.inputs, node.output)
+             for node in Pipeline._build_stage_graph(pipeline)]
+    pipeline._build_stage_graph = lambda: graph
+    pipeline._create_qa_report = lambda job_id, *args: QAReport(job_id=job_id, coverage_percent=100.0, flags=[])
+    return pipeline
+
+
+class TestPipelineStream:
+    """Unit tests for Pipeline.stream"""
+
+    @pytest.mark.asyncio
+    async def test_events_arrive_in_order(self):
+        """Test that progress, article and completion events are yielded in order"""
+        pipeline = _make_pipeline()
+        events = [event async for event in pipeline.stream("job_1", "content", {})]
+        names = [event["event"] for event in events]
+        stages = len(pipeline._build_stage_graph())
+
+        assert names[0] == "run_started"
+        assert names[-1] == "pipeline_complete"
+        assert names.count("stage_complete") == stages
+        assert names.index("article") < names.index("pipeline_complete")
+        assert events[-2]["completed"] == events[-2]["total"] == stages
+        assert events[-1]["version_id"] == "versioning_result"
+
+    @pytest.mark.asyncio
+    async def test_closing_stream_cancels_run(self):
+        """Test that a consumer going away cancels the underlying run"""
+        pipeline = _make_pipeline(stage_delay=0.01)
+        stream = pipeline.stream("job_1", "content", {})
+
+        assert (await stream.__anext__())["event"] == "run_started"
+        await stream.aclose()
+
+        running = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        assert running == []
+
+    @pytest.mark.asyncio
+    async def test_each_article_streamed_when_its_chain_finishes(self):
+        """Test that a finished article is streamed while another article is still being styled"""
+        release = asyncio.Event()
+        pipeline = _make_finalizing_pipeline(release)
+
+        async def consume():
+            events = []
+            async for event in pipeline.stream("job_1", "content", {}):
+                events.append(event)
+                if event["event"] == "article":
+                    # B stays blocked in style processing until A has been received
+                    release.set()
+            return events
+
+        events = await asyncio.wait_for(consume(), timeout=5)
+        names = [event.get("stage", event["event"]) for event in events]
+        articles = [event for event in events if event["event"] == "article"]
+
+        assert [(e["index"], e["article"]["title"]) for e in articles] == [(0, "A"), (1, "B")]
+        assert articles[0]["article"]["content"] == "<p>a</p><pre>normalized</pre>"
+        assert articles[0]["article"]["related_links_count"] == 1
+        assert names.index("article") < names.index("finalize_articles") < names.index("pipeline_complete")
+        assert [a["title"] for a in events[-1]["articles"]] == ["A", "B"]
+
+
+class TestDeltaEmitter:
+    """Unit tests for delta_emitter"""
+
+    def test_no_callback_when_not_streamed(self):
+        assert delta_emitter("style_delta", article_title="A") is None
+
+    def test_json_field_deltas_published(self):
+        """Test that only the decoded JSON field value is published, under delta_key"""
+        events = asyncio.Queue()
+        token = _run_events.set(events)
+        try:
+            on_delta = delta_emitter("article_delta", delta_key="html_delta", json_field="html", article_id="a1")
+            for delta in ['{"title": "T", "ht', 'ml": "<p>Hi', '</p>"}']:
+                on_delta(delta)
+        finally:
+            _run_events.reset(token)
+
+        emitted = [events.get_nowait() for _ in range(events.qsize())]
+        assert [(e["event"], e["article_id"], e["html_delta"]) for e in emitted] == [
+            ("article_delta", "a1", "<p>Hi"), ("article_delta", "a1", "</p>")]
+
+
+class TestRunDocument:
+    """Unit tests for Pipeline.run_document"""
+
+    @staticmethod
+    def _make_document_pipeline(calls: dict) -> Pipeline:
+        """Pipeline with the block-stream extractor and stub stages that record their inputs"""
+        from .extractor import V2ContentExtractor
+        from .test_checkpoints import InMemoryCheckpointRepository
+
+        pipeline = Pipeline.__new__(Pipeline)
+        pipeline.checkpoints = StageCheckpointStore(repository=InMemoryCheckpointRepository(), enabled=True)
+        pipeline._qa_results = InMemoryQAResultsRepository()
+        pipeline.extractor = V2ContentExtractor()
+        pipeline.analyzer = SimpleNamespace()
+
+        def stage(name):
+            async def fn(*args):
+                calls[name] = args
+                return f"{name}_result"
+            return fn
+
+        graph = [StageNode(node.name, stage(node.name), node.inputs, node.output)
+                 for node in Pipeline._build_stage_graph(pipeline)]
+        pipeline._build_stage_graph = lambda: graph
+        pipeline._create_qa_report = lambda job_id, *args: QAReport(job_id=job_id, coverage_percent=100.0, flags=[])
+        return pipeline
+
+    @pytest.mark.asyncio
+    async def test_text_rebuilt_from_blocks_and_on_resume(self, tmp_path):
+        """Test that stages get the document text, which is checkpointed only as the normalized document"""
+        path = tmp_path / "guide.md"
+        path.write_text("# Guide\n\nInstall the CLI.\n\n## Usage\n\nRun it.\n")
+        calls = {}
+        pipeline = self._make_document_pipeline(calls)
+
+        _, _, version_id = await pipeline.run_document("job_1", str(path), {"original_filename": "guide.md"})
+
+        assert version_id == "versioning_result" and "extract_content" not in calls
+        assert calls["prewrite"][0] == "# Guide\n\nInstall the CLI.\n\n## Usage\n\nRun it."
+        records = pipeline.checkpoints.repository.records
+        run_id = next(rid for rid, _ in records)
+        checkpoints = await pipeline.checkpoints.load(run_id)
+        assert checkpoints["__inputs__"][1]["content"] is None
+        assert [b.content for b in checkpoints["extract_content"][1].blocks] == ["Guide", "Install the CLI.", "Usage", "Run it."]
+
+        calls.clear()
+        await pipeline.resume(run_id, from_stage="prewrite")
+        assert calls["prewrite"][0] == "# Guide\n\nInstall the CLI.\n\n## Usage\n\nRun it."
+
+    @pytest.mark.asyncio
+    async def test_extraction_failure_reports_p0(self, tmp_path):
+        """Test that a document that cannot be parsed yields a P0 QA report instead of raising"""
+        path = tmp_path / "broken.docx"
+        path.write_bytes(b"not a zip file")
+        calls = {}
+        pipeline = self._make_document_pipeline(calls)
+
+        failures = STAGE_RUNS.value(stage="v2_pipeline_complete", outcome="failure")
+        successes = STAGE_RUNS.value(stage="v2_pipeline_complete", outcome="success")
+
+        articles, qa_report, version_id = await pipeline.run_document("job_1", str(path), {"original_filename": "broken.docx"})
+
+        assert articles == [] and version_id == "error_job_1" and calls == {}
+        assert qa_report.flags[0].code == "P0_PIPELINE_ERROR"
+        assert pipeline._qa_results.reports[0]["job_id"] == "job_1"
+        # Counted as a failed run, not a successful one
+        assert STAGE_RUNS.value(stage="v2_pipeline_complete", outcome="failure") == failures + 1
+        assert STAGE_RUNS.value(stage="v2_pipeline_complete", outcome="success") == successes
+
+    @pytest.mark.asyncio
+    async def test_stream_document_yields_progress_then_completion(self, tmp_path):
+        """Test that a streamed document run reports every stage and ends with its articles"""
+        path = tmp_path / "guide.md"
+        path.write_text("# Guide\n\nInstall the CLI.\n")
+        calls = {}
+        pipeline = self._make_document_pipeline(calls)
+
+        events = [event async for event in pipeline.stream_document("job_1", str(path), {"original_filename": "guide.md"})]
+        names = [event["event"] for event in events]
+
+        assert names[0] == "run_started" and names[-1] == "pipeline_complete"
+        assert names.count("stage_complete") == len(pipeline._build_stage_graph()) - 1
+        assert events[-1]["version_id"] == "versioning_result"
+        assert calls["prewrite"][0] == "# Guide\n\nInstall the CLI."
+
+    @pytest.mark.asyncio
+    async def test_document_images_saved_to_asset_library(self, tmp_path, monkeypatch):
+        """Test that a document's images are streamed with its blocks and their Asset Library entries inserted"""
+        from ..extraction.test_stream import _write_docx_with_images
+
+        class _Assets:
+            def __init__(self):
+                self.inserted = []
+
+            async def insert_assets(self, assets):
+                self.inserted.extend(assets)
+
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / "guide.docx"
+        _write_docx_with_images(path)
+        calls = {}
+        pipeline = self._make_document_pipeline(calls)
+        pipeline._assets = _Assets()
+
+        await pipeline.run_document("job12345_abc", str(path), {"original_filename": "guide.docx"})
+
+        assert [asset["session_url"] for asset in pipeline._assets.inserted] == ["/api/static/uploads/session_job12345/img_1.png"]
+        normalized_doc = calls["analyze"][0]
+        assert len(normalized_doc.media) == 1 and len(normalized_doc.blocks) == 5
+
+    @pytest.mark.asyncio
+    async def test_unsupported_extension_raises(self, tmp_path):
+        pipeline = self._make_document_pipeline({})
+        with pytest.raises(ValueError):
+            await pipeline.run_document("job_1", str(tmp_path / "deck.pptx"), {"original_filename": "deck.pptx"})
@@ -0,0 +1,166 @@
+"""
+Unit tests for V2StyleProcessor concurrent linting
+Tests for serial-equivalent results, bounded concurrency and post-processing in worker processes
+"""
+
+import os
+import time
+import pytest
+import asyncio
+from . import style
+from .style import V2StyleProcessor, run_post_processing_pass, get_post_processing_executor
+from ..extraction import executor as extraction_executor
+from ..extraction.executor import ExtractionExecutor, ExtractionTimeout
+
+_STYLED = "## Overview\n\nRestyled Article 1.\n\n## Set up the api key\n\nClick **Save**."
+
+
+@pytest.fixture(autouse=True)
+def _in_thread_post_processing(monkeypatch):
+    """Run post-processing passes on threads unless a test sets up worker processes"""
+    monkeypatch.setattr(style, "get_post_processing_executor", lambda: ExtractionExecutor(max_workers=0))
+
+
+class _LLMClient:
+    """Returns each article's content restyled, later articles first, tracking concurrent calls"""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def complete(self, system_message, user_message, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        title = user_message.split("\n", 1)[0].replace("ARTICLE TITLE: ", "")
+        await asyncio.sleep(0.01 * (6 - int(title.split()[-1])))
+        self.active -= 1
+        return f"## Overview\n\nRestyled {title}.\n\n## Set up the api key\n\nClick **Save**."
+
+
+def _make_articles(count: int) -> list:
+    return [{"title": f"Article {i + 1}", "content": f"<p>Body {i + 1}</p>"} for i in range(count)]
+
+
+def _comparable(result: dict) -> dict:
+    return {key: value for key, value in result.items() if key not in ("style_id", "timestamp")}
+
+
+class TestConcurrentStyleLinting:
+    """Unit tests for apply_style_formatting"""
+
+    @pytest.mark.asyncio
+    async def test_results_match_serial_pass(self):
+        """Test that a concurrent pass returns what the serial pass returns, in article order"""
+        serial_articles, concurrent_articles = _make_articles(5), _make_articles(5)
+        llm_client = _LLMClient()
+
+        serial = await V2StyleProcessor(_LLMClient(), max_concurrent_articles=1).apply_style_formatting(
+            "content", "text", serial_articles, {}, {}, "run_1")
+        concurrent = await V2StyleProcessor(llm_client, max_concurrent_articles=3).apply_style_formatting(
+            "content", "text", concurrent_articles, {}, {}, "run_1")
+
+        assert _comparable(concurrent) == _comparable(serial)
+        assert [r["article_index"] for r in concurrent["style_results"]] == [0, 1, 2, 3, 4]
+        assert concurrent["successful_formatting"] == 5 and concurrent["style_status"] == "success"
+        assert concurrent_articles == serial_articles
+        assert "Restyled Article 2" in concurrent_articles[1]["formatted_content"]
+        assert "API key" in concurrent_articles[1]["formatted_content"]
+        assert llm_client.peak == 3
+
+    @pytest.mark.asyncio
+    async def test_failing_article_is_isolated(self):
+        """Test that an article whose styling raises is reported without failing the others"""
+        processor = V2StyleProcessor(_LLMClient(), max_concurrent_articles=4)
+        process_article_style = processor._process_article_style
+
+        async def style(article, *args):
+            if article["title"] == "Article 2":
+                raise RuntimeError("lint crashed")
+            return await process_article_style(article, *args)
+
+        processor._process_article_style = style
+        articles = _make_articles(2)
+        result = await processor.apply_style_formatting("content", "text", articles, {}, {}, "run_1")
+
+        assert [r["style_status"] for r in result["style_results"]] == ["success", "error"]
+        assert result["style_results"][1] == {"article_index": 1, "style_status": "error", "error": "lint crashed"}
+        assert result["style_status"] == "partial"
+        assert "formatted_content" in articles[0] and "formatted_content" not in articles[1]
+
+    @pytest.mark.asyncio
+    async def test_style_article_reuses_previous_result(self):
+        """Test that a reused style result is applied to the article under its new index without linting"""
+        llm_client = _LLMClient()
+        article = _make_articles(1)[0]
+        reused = {"article_index": 4, "style_status": "success", "formatted_content": "<p>Reused</p>",
+                  "style_metadata": {"compliance_score": 90}}
+
+        result = await V2StyleProcessor(llm_client).style_article(
+            article, "content", {}, {}, "run_1", 0, reused_style=reused)
+
+        assert result == {**reused, "article_index": 0}
+        assert article["formatted_content"] == "<p>Reused</p>" and article["style_metadata"] == {"compliance_score": 90}
+        assert llm_client.peak == 0
+
+
+class TestPostProcessingExecutor:
+    """Unit tests for post-processing in its own worker processes"""
+
+    @pytest.mark.asyncio
+    async def test_post_processing_passes_run_in_worker_processes(self, monkeypatch):
+        """Test that both passes go through the process pool and match the in-process result"""
+        executor = ExtractionExecutor(max_workers=2)
+        submitted = []
+        run = executor.run
+
+        async def record(fn, *args, **kwargs):
+            submitted.append((fn, args[0]))
+            return await run(fn, *args, **kwargs)
+
+        monkeypatch.setattr(executor, "run", record)
+        monkeypatch.setattr(style, "get_post_processing_executor", lambda: executor)
+        try:
+            result = await V2StyleProcessor(_LLMClient())._process_article_style(
+                _make_articles(1)[0], "content", {}, {}, "run_1", 0)
+            worker_pids = {process.pid for process in executor.pool._processes.values()}
+        finally:
+            executor.shutdown()
+
+        assert submitted == [(run_post_processing_pass, "_comprehensive_post_processing"),
+                             (run_post_processing_pass, "_apply_structural_passes")]
+        assert os.getpid() not in worker_pids
+        assert result["style_status"] == "success" and "API key" in result["formatted_content"]
+
+        processor = V2StyleProcessor(_LLMClient())
+        in_process = processor._comprehensive_post_processing(_STYLED, "Article 1")
+        assert run_post_processing_pass("_comprehensive_post_processing", _STYLED, "Article 1") == in_process
+
+    def test_post_processing_needs_no_llm_client(self, monkeypatch):
+        """Test that the worker-side processor never creates an LLM client"""
+        def no_client():
+            raise AssertionError("LLM client created")
+
+        monkeypatch.setattr(style, "get_llm_client", no_client)
+        monkeypatch.setattr(style, "_pass_processor", None)
+
+        result = run_post_processing_pass("_apply_structural_passes", _STYLED, "Article 1")
+        assert len(result) == 4 and "content" in result[0]
+
+    @pytest.mark.asyncio
+    async def test_pass_timeout_leaves_extraction_workers_running(self, monkeypatch):
+        """Test that a timed-out pass recycles only the post-processing pool, not other uploads' conversions"""
+        extraction = ExtractionExecutor(max_workers=1)
+        monkeypatch.setattr(extraction_executor, "_extraction_executor", extraction)
+        monkeypatch.setattr(style, "_post_processing_executor", ExtractionExecutor(max_workers=1, timeout=0.5))
+        post_processing = get_post_processing_executor()
+        try:
+            assert post_processing is not extraction_executor.get_extraction_executor()
+            conversion = asyncio.ensure_future(extraction.run(time.sleep, 1))
+            with pytest.raises(ExtractionTimeout):
+                await post_processing.run(time.sleep, 5)
+            await conversion
+            # Only the post-processing pool was killed and restarted
+            assert post_processing._generation == 1 and extraction._generation == 0
+        finally:
+            extraction.shutdown()
+            post_processing.shutdown()
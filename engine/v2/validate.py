@@ -15,6 +15,17 @@ from ..linking.toc import build_minitoc, anchors_resolve
 from ..linking.bookmarks import extract_headings_registry, generate_doc_uid, generate_doc_slug
 from ..linking.links import build_href, get_default_route_map
 
+FIDELITY_COVERAGE_SCHEMA = {
+    "type": "object",
+    "required": ["fidelity_score", "coverage_percent", "hallucinated_claims", "uncovered_blocks"],
+    "properties": {
+        "fidelity_score": {"type": "number"},
+        "coverage_percent": {"type": "number"},
+        "hallucinated_claims": {"type": "array"},
+        "uncovered_blocks": {"type": "array"}
+    }
+}
+
 class V2ValidationSystem:
     """V2 Engine: Comprehensive validation system for fidelity, coverage, placeholders, and style"""
     
@@ -828,31 +839,19 @@ Return ONLY JSON in this exact format:
             # Call LLM for validation
             print(f"🤖 V2 VALIDATION: Sending fidelity & coverage request to LLM - run {run_id} - engine=v2")
             try:
-                ai_response = await self.llm_client.generate_response(system_message, user_message)
+                validation_data = await self.llm_client.complete_json(
+                    system_message=system_message,
+                    user_message=user_message,
+                    schema=FIDELITY_COVERAGE_SCHEMA,
+                    temperature=0.1,
+                    call_type="validation"
+                )
             except Exception as llm_error:
-                print(f"⚠️ V2 VALIDATION: LLM client error, using fallback - {llm_error}")
+                print(f"⚠️ V2 VALIDATION: No usable LLM validation, using fallback - {llm_error} - run {run_id} - engine=v2")
                 return self._create_fallback_fidelity_coverage(normalized_doc, generated_articles)
             
-            if ai_response:
-                # Parse JSON response
-                json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
-                if json_match:
-                    validation_data = json.loads(json_match.group(0))
-                    
-                    # Validate required fields
-                    required_fields = ['fidelity_score', 'coverage_percent', 'hallucinated_claims', 'uncovered_blocks']
-                    if all(field in validation_data for field in required_fields):
-                        print(f"✅ V2 VALIDATION: Fidelity={validation_data['fidelity_score']}, Coverage={validation_data['coverage_percent']}% - run {run_id} - engine=v2")
-                        return validation_data
-                    else:
-                        print(f"⚠️ V2 VALIDATION: Missing fields in LLM response - run {run_id} - engine=v2")
-                        return self._create_fallback_fidelity_coverage(normalized_doc, generated_articles)
-                else:
-                    print(f"⚠️ V2 VALIDATION: No JSON found in LLM response - run {run_id} - engine=v2")
-                    return self._create_fallback_fidelity_coverage(normalized_doc, generated_articles)
-            else:
-                print(f"❌ V2 VALIDATION: No LLM response for fidelity validation - run {run_id} - engine=v2")
-                return self._create_fallback_fidelity_coverage(normalized_doc, generated_articles)
+            print(f"✅ V2 VALIDATION: Fidelity={validation_data['fidelity_score']}, Coverage={validation_data['coverage_percent']}% - run {run_id} - engine=v2")
+            return validation_data
                 
         except Exception as e:
             print(f"❌ V2 VALIDATION: Error in fidelity & coverage validation - {e} - run {run_id} - engine=v2")
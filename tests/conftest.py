@@ -47,6 +47,35 @@ def pytest_addoption(parser):
         default=False,
         help="Update golden baseline files with current outputs"
     )
+    parser.addoption(
+        "--llm-cassette",
+        choices=["replay", "record", "off"],
+        default="off",
+        help="Call the LLM provider directly (default), replay golden LLM responses from "
+             "tests/golden/cassettes, or record them from the live provider"
+    )
+
+@pytest.fixture
+def llm_cassette(request, monkeypatch):
+    """
+    With --llm-cassette=replay, golden runs replay recorded LLM responses, so they
+    need no API keys and give the same output (and, with LLM_CASSETTE_LATENCY, the
+    same timings) every run
+    """
+    mode = request.config.getoption("--llm-cassette", "off")
+    if mode == "off":
+        yield None
+        return
+    
+    from engine.llm import client as llm_client_module
+    from engine.llm.cassette import use_cassette
+    
+    path = pathlib.Path(__file__).parent / "golden" / "cassettes" / "golden_pipeline.json"
+    # The global client must be built inside the cassette scope (replay keeps the recorded provider)
+    monkeypatch.setattr(llm_client_module, "_llm_client_instance", None)
+    with use_cassette(str(path), mode=mode, latency=os.getenv("LLM_CASSETTE_LATENCY", "none"),
+                      seed=int(os.getenv("LLM_CASSETTE_SEED", "0"))) as cassette:
+        yield cassette
 
 @pytest.fixture
 def normalize_html():
@@ -131,7 +160,7 @@ def compare_json():
     return _compare_json
 
 @pytest.fixture
-async def run_golden_pipeline():
+async def run_golden_pipeline(llm_cassette):
     """
     Core fixture that runs V2 pipeline on input files and returns structured results
     """
@@ -0,0 +1,133 @@
+"""
+Unit tests for streamed ingest in backend/server.py
+Tests for building documents from block streams with the server's V2ContentExtractor,
+and for failed streamed runs never being reported as completed uploads
+"""
+
+import io
+import pytest
+from fastapi import HTTPException, UploadFile
+from engine.extraction.stream import block, image_block
+from engine.extraction.upload import SpooledUpload
+from engine.models.qa import QAReport, QAFlag
+from engine.run_context import RunCancelledError
+
+
+async def _blocks(items):
+    for item in items:
+        yield item
+
+
+@pytest.mark.unit
+class TestServerBlockStreamExtractor:
+    """Unit tests for V2ContentExtractor.extract_block_stream in the server"""
+
+    @pytest.mark.asyncio
+    async def test_image_items_become_media_with_assets(self):
+        """Test that streamed images become media carrying their Asset Library entry, not body blocks"""
+        import server
+
+        asset = {"id": "asset_1", "asset_type": "image", "url": "/api/static/uploads/asset_1_img_1.png"}
+        streamed = []
+        doc = await server.V2ContentExtractor().extract_block_stream(_blocks([
+            block("heading_h1", "Guide", 1),
+            block("paragraph", "hello world", 1),
+            image_block("/api/static/uploads/session_job12345/img_1.png", "Figure 1", asset, 1),
+        ]), title="guide", job_id="job12345", mime_type="application/pdf", on_block=streamed.append)
+
+        assert [(b.block_type, b.content) for b in doc.blocks] == [("heading", "Guide"), ("paragraph", "hello world")]
+        assert streamed == doc.blocks and doc.word_count == 3
+        [media] = doc.media
+        assert media.url == "/api/static/uploads/session_job12345/img_1.png" and media.alt_text == "Figure 1"
+        assert media.format == "png" and media.source_pointer.page_number == 1
+        assert media.metadata == {"after_block": 1, "asset": asset}
+        assert doc.extraction_metadata["media_extracted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_pipeline_stores_assets_of_server_extracted_media(self):
+        """Test that Pipeline.run_document's asset insert finds the server extractor's media"""
+        import server
+        from engine.v2.pipeline import Pipeline
+
+        class _Assets:
+            def __init__(self):
+                self.inserted = []
+
+            async def insert_assets(self, assets):
+                self.inserted.extend(assets)
+
+        asset = {"id": "asset_1", "asset_type": "image"}
+        doc = await server.V2ContentExtractor().extract_block_stream(_blocks([
+            block("paragraph", "hello world"), image_block("/api/static/uploads/img_1.png", "Figure 1", asset)]))
+        pipeline = Pipeline.__new__(Pipeline)
+        pipeline._assets = _Assets()
+
+        await pipeline._store_media_assets(doc)
+        assert pipeline._assets.inserted == [asset]
+
+
+class _FailedRunPipeline:
+    """Pipeline whose run_document fails like Pipeline._failed_run"""
+
+    def __init__(self, code: str):
+        self.code = code
+
+    async def run_document(self, job_id, file_path, metadata):
+        return [], QAReport(job_id=job_id, coverage_percent=0.0, flags=[
+            QAFlag(code=self.code, severity="P0", message="extraction failed")]), f"error_{job_id}"
+
+
+class _JobsRepository:
+    """Records the job status updates of process_file_upload"""
+
+    def __init__(self):
+        self.statuses = []
+
+    async def update_job_status(self, job_id, status, update_data=None):
+        self.statuses.append(status)
+
+
+@pytest.mark.unit
+class TestStreamedUploadFailures:
+    """Unit tests for failed runs on the streaming ingest path"""
+
+    @pytest.mark.asyncio
+    async def test_failed_run_is_raised(self, monkeypatch):
+        """Test that a run ending in a P0 report raises instead of returning no articles"""
+        import server
+
+        monkeypatch.setattr(server, "get_v2_pipeline_with_instances", lambda: _FailedRunPipeline("P0_PIPELINE_ERROR"))
+        with pytest.raises(server.V2PipelineRunError, match="extraction failed"):
+            await server.process_file_v2_pipeline("guide.pdf", {}, job_id="job_1")
+
+        monkeypatch.setattr(server, "get_v2_pipeline_with_instances", lambda: _FailedRunPipeline("P0_RUN_CANCELLED"))
+        with pytest.raises(RunCancelledError):
+            await server.process_file_v2_pipeline("guide.pdf", {}, job_id="job_1")
+
+    @pytest.mark.asyncio
+    async def test_failed_stream_falls_back_to_whole_document_path(self, tmp_path, monkeypatch):
+        """Test that an upload whose streamed run fails is extracted again in full, not completed empty"""
+        import server
+        from engine.stores.mongo import RepositoryFactory
+
+        path = tmp_path / "guide.pdf"
+        path.write_bytes(b"%PDF")
+        jobs = _JobsRepository()
+        extracted = []
+
+        async def extract_upload_content(file, upload, file_extension, job_id, update_job_progress):
+            extracted.append(file_extension)
+            raise RuntimeError("whole-document extraction reached")
+
+        monkeypatch.setattr(RepositoryFactory, "get_processing_jobs", staticmethod(lambda: jobs))
+        monkeypatch.setattr(server, "V2_STREAMING_INGEST", True)
+        monkeypatch.setattr(server, "get_v2_pipeline_with_instances", lambda: _FailedRunPipeline("P0_PIPELINE_ERROR"))
+        monkeypatch.setattr(server, "extract_upload_content", extract_upload_content)
+
+        upload = UploadFile(io.BytesIO(b"%PDF"), filename="guide.pdf")
+        with pytest.raises(HTTPException) as error:
+            await server.process_file_upload(upload, queued_job_id="job_1",
+                                             spooled=SpooledUpload(str(path), 4, "sha"))
+
+        assert error.value.detail == "whole-document extraction reached" and extracted == ["pdf"]
+        assert "completed" not in jobs.statuses and jobs.statuses[-1] == "failed"